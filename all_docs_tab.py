@@ -1,6 +1,6 @@
 import streamlit as st
 import re
-from utils.db import fetch_documents
+from utils.db import fetch_documents, fetch_documents_page, summarize_documents, fetch_filter_options
 from components.help_tooltips import HelpTooltips
 from components.enhanced_scoring_display import EnhancedScoringDisplay
 from components.compact_layout import apply_ultra_compact_css
@@ -16,6 +16,22 @@ def fetch_documents_cached():
     """Cached version of document fetching with memory optimization"""
     return fetch_documents()
 
+# Listing queries are keyed on their filters, so each page is cached separately
+@st.cache_data(ttl=60, max_entries=200)
+def fetch_documents_page_cached(view, filters, page_size, after):
+    """Cached page of the filtered, keyset-paginated document listing"""
+    return fetch_documents_page(view, filters, page_size, after)
+
+@st.cache_data(ttl=60, max_entries=100)
+def summarize_documents_cached(filters):
+    """Cached count and summary statistics for the listing filters"""
+    return summarize_documents(filters)
+
+@st.cache_data(ttl=300)
+def fetch_filter_options_cached():
+    """Cached distinct values for the filter controls"""
+    return fetch_filter_options()
+
 # Separate cache for document content to avoid redundant processing
 @st.cache_data(ttl=1800, max_entries=200)  # 30 minutes for content
 def get_document_content_cached(doc_id, url):
@@ -31,18 +47,6 @@ def get_document_content_cached(doc_id, url):
     except Exception:
         return ""
 
-# Cache comprehensive scoring with content hashing for better cache hits
-@st.cache_data(ttl=1200, max_entries=300)  # 20 minutes, 300 entries
-def comprehensive_document_scoring_cached(content, title):
-    """Cached version of comprehensive scoring with content hashing"""
-    try:
-        from utils.comprehensive_scoring import multi_llm_intelligent_scoring
-        # Use the patented multi-LLM Convergence AI synthesis engine
-        return multi_llm_intelligent_scoring(content, title)
-    except Exception:
-        # Return None to indicate scoring unavailable - no synthetic data
-        return None
-
 # Lazy loading for non-critical document metadata
 @st.cache_data(ttl=3600, max_entries=500)  # 1 hour for metadata
 def get_document_metadata_cached(doc_id):
@@ -285,11 +289,16 @@ This document demonstrates Quantum Ethics considerations scoring {score}/100.
 • Develop quantum governance frameworks
 """
 
-# Performance optimization: Cache scoring calculations
-@st.cache_data(ttl=60)  # Reduced cache time to 1 minute for testing
-def comprehensive_document_scoring_cached(content, title):
-    """Cached version of comprehensive scoring to improve performance"""
-    return comprehensive_document_scoring(content, title)
+# Scores are precomputed by the background rescoring job (utils/score_precompute.py);
+# page loads only read the stored columns and never run scoring code
+def stored_document_scores(doc):
+    """Stored framework scores for a document, or {} if it hasn't been scored yet"""
+    if not doc.get('scorer_version'):
+        return {}
+    return {
+        framework: doc.get(f'{framework}_score') or None
+        for framework in ['ai_cybersecurity', 'quantum_cybersecurity', 'ai_ethics', 'quantum_ethics']
+    }
 # Performance caching will be handled directly in functions
 from utils.document_metadata_extractor import extract_document_metadata
 from utils.multi_llm_metadata_extractor import extract_clean_metadata
@@ -1063,110 +1072,12 @@ def render():
     # Render progress-aware help for this section
     smart_help.render_progress_aware_help('policy_repository')
 
-    try:
-        # Force refresh documents - clear all caching mechanisms
-        if 'documents_cache' in st.session_state:
-            del st.session_state['documents_cache']
-        if 'all_docs' in st.session_state:
-            del st.session_state['all_docs']
-        if 'cached_docs' in st.session_state:
-            del st.session_state['cached_docs']
-        
-
-        
-        # Fetch fresh documents directly from database with comprehensive HTML cleaning
-        raw_docs = fetch_documents_cached()
-        if not raw_docs:
-            st.info("No documents found in the database. Please upload some documents first.")
-            return
-            
-        # Apply comprehensive metadata cleaning to eliminate all HTML artifacts
-        from utils.metadata_cleaner import clean_document_list
-        all_docs = clean_document_list(raw_docs)
-        
-        # Clean all documents and force fresh metadata analysis
-        all_docs = [clean_document_content(doc) for doc in all_docs]
-        # Force regeneration of all metadata with enhanced cleaning
-        for doc in all_docs:
-            doc.pop('analyzed_metadata', None)  # Remove any cached metadata
-                
-    except Exception as e:
-        st.error(f"Error fetching documents: {e}")
-        return
-
-    # Extract filter options from documents using correct field names
-    doc_types = sorted(set(doc.get("document_type", "Unknown") for doc in all_docs if doc.get("document_type") and doc.get("document_type") not in ["Unknown", ""]))
-    
-    # Extract organizations with better handling
-    organizations = set()
-    for doc in all_docs:
-        org = doc.get("author_organization", "")
-        if org and org not in ["Unknown", "", "Date not available"]:
-            # Truncate long organization names for display
-            org_display = org[:40] + "..." if len(org) > 40 else org
-            organizations.add(org_display)
-    organizations = sorted(list(organizations))
-    
-    # Extract years from publish_date field
-    years = set()
-    for doc in all_docs:
-        # Try publish_date first, then other date fields
-        date_fields = ["publish_date", "date", "created_at", "updated_at"]
-        for field in date_fields:
-            date_str = doc.get(field, "")
-            if date_str and str(date_str) != "Date not available":
-                try:
-                    # Try to extract year from various date formats
-                    import re
-                    year_match = re.search(r'\b(19|20)\d{2}\b', str(date_str))
-                    if year_match:
-                        years.add(year_match.group())
-                        break  # Found a year, stop looking in other fields
-                except:
-                    pass
-    years = sorted(list(years), reverse=True)
-    
-    # Extract regions from detected_region field with fallback to pattern-based detection
-    regions = set()
-    for doc in all_docs:
-        # First try to use the AI-detected region
-        detected_region = doc.get("detected_region", "")
-        if detected_region and detected_region not in ["Unknown", "", "None"]:
-            regions.add(detected_region)
-        else:
-            # Fallback to pattern-based detection for documents without AI analysis
-            org = doc.get("author_organization", "")
-            if org and org not in ["Unknown", "", "Date not available"]:
-                org_lower = org.lower()
-                if any(term in org_lower for term in ['nist', 'dhs', 'usa', 'united states', 'us ', 'federal', 'dod', 'nasa']):
-                    regions.add('US')
-                elif any(term in org_lower for term in ['eu', 'european', 'gdpr', 'enisa', 'europa']):
-                    regions.add('EU')
-                elif any(term in org_lower for term in ['uk', 'britain', 'british', 'ncsc']):
-                    regions.add('UK')
-                elif any(term in org_lower for term in ['iso', 'itu', 'oecd', 'un ', 'united nations']):
-                    regions.add('International')
-                elif any(term in org_lower for term in ['china', 'japan', 'korea', 'singapore', 'asia']):
-                    regions.add('Asia')
-                elif any(term in org_lower for term in ['canada', 'australia', 'new zealand']):
-                    regions.add('Other')
-    
-    regions = sorted(list(regions))
-    
-    # Debug output for troubleshooting empty filters
-    if len(organizations) == 0 or len(years) == 0 or len(regions) == 0:
-        st.write("**Debug: Filter extraction status:**")
-        st.write(f"- Found {len(doc_types)} document types: {doc_types[:5]}")
-        st.write(f"- Found {len(organizations)} organizations: {organizations[:5]}")
-        st.write(f"- Found {len(years)} years: {years[:5]}")
-        st.write(f"- Found {len(regions)} regions: {regions}")
-        
-        # Sample document inspection
-        if all_docs:
-            sample_doc = all_docs[0]
-            st.write("**Sample document fields:**")
-            for key in ["author_organization", "publish_date", "document_type"]:
-                st.write(f"- {key}: `{sample_doc.get(key, 'NOT FOUND')}`")
+    # Filter options come from DISTINCT queries; documents are fetched one page at a time below
+    filter_options = fetch_filter_options_cached()
+    doc_types = filter_options['document_types']
+    organizations = filter_options['organizations']
+    years = filter_options['years']
+    regions = filter_options['regions']
 
     # Initialize filters in session state
     if "filters" not in st.session_state:
@@ -1175,7 +1086,10 @@ def render():
             "selected_orgs": [],
             "selected_years": [],
             "selected_regions": [],
-            "topic_filter": "Both"
+            "topic_filter": "Both",
+            "search": "",
+            "score_framework": "Any",
+            "score_range": (0, 100)
         }
 
     # Compact filter controls with inline topic and view mode
@@ -1313,7 +1227,10 @@ def render():
                     "selected_orgs": [],
                     "selected_years": [],
                     "selected_regions": [],
-                    "topic_filter": "Both"
+                    "topic_filter": "Both",
+                    "search": "",
+                    "score_framework": "Any",
+                    "score_range": (0, 100)
                 }
                 st.rerun()
         
@@ -1322,62 +1239,32 @@ def render():
                          len(st.session_state["filters"]["selected_orgs"]) + 
                          len(st.session_state["filters"]["selected_years"]) + 
                          len(st.session_state["filters"]["selected_regions"]) +
-                         (1 if st.session_state["filters"]["topic_filter"] != "Both" else 0))
+                         (1 if st.session_state["filters"]["topic_filter"] != "Both" else 0) +
+                         (1 if st.session_state["filters"].get("search") else 0) +
+                         (1 if st.session_state["filters"].get("score_framework", "Any") != "Any" else 0))
         
         if active_filters > 0:
             st.markdown(f"<small style='color: #059669; font-size: 0.8rem;'>✓ {active_filters} active</small>", unsafe_allow_html=True)
 
-    # Apply filters
+    # Full-text search across titles, organizations and document text
+    st.session_state["filters"]["search"] = st.text_input(
+        "Search",
+        value=st.session_state["filters"].get("search", ""),
+        placeholder="Search titles, organizations and document text",
+        key="doc_search_input",
+        label_visibility="collapsed"
+    )
+
+    # Build SQL-side filters; the database applies them and returns one page at a time
     f = st.session_state["filters"]
-    docs = all_docs
-    
-    # Filter by document type
-    if f["selected_types"]:
-        docs = [d for d in docs if d.get("document_type", "Unknown") in f["selected_types"]]
-    
-    # Filter by organization
-    if f["selected_orgs"]:
-        docs = [d for d in docs if d.get("organization", "Unknown") in f["selected_orgs"]]
-    
-    # Filter by year
-    if f["selected_years"]:
-        docs = [d for d in docs if any(year in str(d.get("date", "")) for year in f["selected_years"])]
-    
-    # Filter by region using AI-detected regions with fallback
-    if f["selected_regions"]:
-        def get_document_region(doc):
-            # First try AI-detected region
-            detected_region = doc.get("detected_region", "")
-            if detected_region and detected_region not in ["Unknown", "", "None"]:
-                return detected_region
-            
-            # Fallback to pattern-based detection
-            org = doc.get("author_organization", "") or doc.get("organization", "")
-            if org and org not in ["Unknown", "", "Date not available"]:
-                org_lower = org.lower()
-                if any(term in org_lower for term in ['nist', 'dhs', 'usa', 'united states', 'us ', 'federal', 'dod', 'nasa']):
-                    return 'US'
-                elif any(term in org_lower for term in ['eu', 'european', 'gdpr', 'enisa', 'europa']):
-                    return 'EU'
-                elif any(term in org_lower for term in ['uk', 'britain', 'british', 'ncsc']):
-                    return 'UK'
-                elif any(term in org_lower for term in ['iso', 'itu', 'oecd', 'un ', 'united nations']):
-                    return 'International'
-                elif any(term in org_lower for term in ['china', 'japan', 'korea', 'singapore', 'asia']):
-                    return 'Asia'
-                elif any(term in org_lower for term in ['canada', 'australia', 'new zealand']):
-                    return 'Other'
-            return 'Unknown'
-        
-        docs = [d for d in docs if get_document_region(d) in f["selected_regions"]]
-    
-    # Filter by topic (AI/Quantum/Both)
-    topic_filter = f.get("topic_filter", "Both")
-    if topic_filter != "Both":
-        if topic_filter == "AI":
-            docs = [d for d in docs if get_document_topic(d) in ["AI", "Both"]]
-        elif topic_filter == "Quantum":
-            docs = [d for d in docs if get_document_topic(d) in ["Quantum", "Both"]]
+    listing_filters = {
+        "document_types": f["selected_types"],
+        "organizations": f["selected_orgs"],
+        "years": f["selected_years"],
+        "regions": f["selected_regions"],
+        "topic": f.get("topic_filter", "Both"),
+        "search": f.get("search", "").strip()
+    }
 
     # Get display mode from session state (set in top controls)
     display_mode = st.session_state.get("display_mode", "cards")
@@ -1400,14 +1287,51 @@ def render():
             st.session_state["doc_page"] = 0  # Reset to first page
             st.rerun()
         
+        # Score range filter, applied in SQL on the stored score columns
+        score_frameworks = {
+            "Any": None,
+            "AI Cybersecurity": "ai_cybersecurity",
+            "Quantum Cybersecurity": "quantum_cybersecurity",
+            "AI Ethics": "ai_ethics",
+            "Quantum Ethics": "quantum_ethics"
+        }
+        score_framework = st.selectbox(
+            "Filter by score",
+            list(score_frameworks),
+            index=list(score_frameworks).index(f.get("score_framework", "Any")),
+            key="score_framework_select"
+        )
+        st.session_state["filters"]["score_framework"] = score_framework
+        if score_frameworks[score_framework]:
+            score_range = st.slider(
+                "Score range", 0, 100,
+                value=tuple(f.get("score_range", (0, 100))),
+                key="score_range_slider"
+            )
+            st.session_state["filters"]["score_range"] = score_range
+            listing_filters["score_ranges"] = {score_frameworks[score_framework]: score_range}
+        
         # Score cache management
         st.markdown("---")
         st.subheader("Score Cache")
         
-        # Simple cache control without complex stats
-        cache_size = len(st.session_state.get('guardian_score_cache', {}))
-        st.metric("Cached Documents", cache_size)
+        # Shared score store statistics (persistent across sessions)
+        from utils.score_store import get_score_store
+        score_store_stats = get_score_store().get_stats()
+        st.metric("Cached Documents", score_store_stats['stored_entries'] or 0)
         
+        # Keep stored scores current without scoring during page loads
+        from utils.score_precompute import start_background_rescoring
+        start_background_rescoring()
+
+        # Previews of new or changed documents are generated the same way
+        from utils.preview_precompute import start_background_previews
+        start_background_previews()
+
+        # Finish purging documents soft-deleted before a restart
+        from utils.document_purge import start_background_purge
+        start_background_purge()
+
         if st.button("🔄 Refresh All Scores", use_container_width=True):
             # Clear all score-related caches
             cache_keys_to_clear = [
@@ -1422,21 +1346,45 @@ def render():
                 if key in st.session_state:
                     st.session_state[key] = {}
             
-            # Force database to recalculate scores by updating a timestamp
+            # Mark every stored score stale and let the background job rescore them. The
+            # shared score store is kept: its entries are keyed on content and scorer
+            # version, so they are only reused while they are still correct
             try:
-                from utils.database import DatabaseManager
-                db = DatabaseManager()
-                db.execute_query("UPDATE documents SET updated_at = NOW() WHERE quantum_cybersecurity_score IS NOT NULL")
-                st.success("Score cache cleared and database updated - all scores will be recalculated")
+                from utils.score_precompute import mark_all_stale, background_rescorer
+                mark_all_stale()
+                background_rescorer.trigger()
+                st.success("Score cache cleared - all scores are being recalculated in the background")
             except:
                 st.success("Score cache cleared - scores will be recalculated")
             
             st.rerun()
     
-    page = st.session_state.get("doc_page", 0)
-    total_pages = max(1, len(docs) // per_page + (1 if len(docs) % per_page else 0))
+    # Keyset pagination: remember the cursor each visited page started from and
+    # start over whenever the filters or page size change
+    listing_key = repr((listing_filters, per_page))
+    if st.session_state.get("doc_listing_key") != listing_key:
+        st.session_state["doc_listing_key"] = listing_key
+        st.session_state["doc_page"] = 0
+        st.session_state["doc_page_cursors"] = [None]
+    
+    cursors = st.session_state.setdefault("doc_page_cursors", [None])
+    page = min(st.session_state.get("doc_page", 0), len(cursors) - 1)
+    
+    listing_summary = summarize_documents_cached(listing_filters)
+    total_docs = listing_summary['total']
+    total_pages = max(1, total_docs // per_page + (1 if total_docs % per_page else 0))
+    
+    try:
+        listing = fetch_documents_page_cached(display_mode, listing_filters, per_page, cursors[page])
+        
+        # Apply comprehensive metadata cleaning to eliminate all HTML artifacts
+        from utils.metadata_cleaner import clean_document_list
+        page_docs = [clean_document_content(doc) for doc in clean_document_list(listing['documents'])]
+    except Exception as e:
+        st.error(f"Error fetching documents: {e}")
+        return
 
-    if len(docs) > per_page:
+    if total_docs > per_page:
         col1, col2, col3, col4, col5 = st.columns((1, 0.3, 2, 0.3, 1))
         with col2:
             if st.button("◀", key="prev_page", help="Previous page") and page > 0:
@@ -1445,19 +1393,17 @@ def render():
         with col3:
             st.markdown(f"<div style='text-align: center; padding-top: 0.3rem;'>Page {page + 1} of {total_pages}</div>", unsafe_allow_html=True)
         with col4:
-            if st.button("▶", key="next_page", help="Next page") and page < total_pages - 1:
+            if st.button("▶", key="next_page", help="Next page") and listing['next_cursor']:
+                st.session_state["doc_page_cursors"] = cursors[:page + 1] + [listing['next_cursor']]
                 st.session_state["doc_page"] = page + 1
                 st.rerun()
 
-    start = page * per_page
-    end = start + per_page
-    page_docs = docs[start:end]
-
-
-
     # Document display based on selected mode
     if not page_docs:
-        st.info("No documents match the current filters.")
+        if total_docs == 0 and not summarize_documents_cached({})['total']:
+            st.info("No documents found in the database. Please upload some documents first.")
+        else:
+            st.info("No documents match the current filters.")
         return
 
     # Render documents based on display mode
@@ -1687,16 +1633,13 @@ def render():
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Total Documents", len(docs))
+        st.metric("Total Documents", listing_summary['total'])
     with col2:
-        quantum_docs = len([d for d in docs if (d.get("text") or d.get("content", "")) and is_probably_quantum(d.get("text") or d.get("content", ""))])
-        st.metric("Quantum-Related", quantum_docs)
+        st.metric("Quantum-Related", listing_summary['quantum_related'])
     with col3:
-        avg_score = sum(d.get("quantum_score", 0) for d in docs) / len(docs) if docs else 0
-        st.metric("Avg Score", f"{avg_score:.1f}")
+        st.metric("Avg Score", f"{listing_summary['avg_quantum_score']:.1f}")
     with col4:
-        high_scoring = len([d for d in docs if d.get("quantum_score", 0) >= 75])
-        st.metric("High Scoring (75+)", high_scoring)
+        st.metric("High Scoring (75+)", listing_summary['high_scoring'])
     
     # Document Upload and URL Input Section
     st.markdown("---")
@@ -1771,15 +1714,15 @@ def render():
                             from utils.url_content_extractor import URLContentExtractor
                             
                             # Extract content using robust methods
+                            pdf_sha256 = None
                             if uploaded_file.type == "application/pdf":
                                 try:
-                                    import PyPDF2
-                                    import io
-                                    pdf_file = io.BytesIO(uploaded_file.read())
-                                    pdf_reader = PyPDF2.PdfReader(pdf_file)
-                                    content = ""
-                                    for page in pdf_reader.pages:
-                                        content += page.extract_text() + "\n"
+                                    from utils.pdf_text_extractor import extract_pdf_text
+                                    extracted = extract_pdf_text(uploaded_file.read())
+                                    content = extracted['text']
+                                    pdf_sha256 = extracted['content_hash']
+                                    if extracted['truncated']:
+                                        st.warning(f"Only the first {extracted['extracted_pages']} of {extracted['page_count']} pages were extracted")
                                     
                                     # If PyPDF2 fails, try alternative extraction
                                     if len(content.strip()) < 100:
@@ -1790,6 +1733,8 @@ def render():
                                         content = ""
                                         for page in pages:
                                             content += pytesseract.image_to_string(page) + "\n"
+                                        # OCR text is not in the page store
+                                        pdf_sha256 = None
                                 except Exception as pdf_error:
                                     st.warning(f"PDF extraction failed: {str(pdf_error)}")
                                     content = ""
@@ -1919,7 +1864,8 @@ def render():
                                             'quantum_cybersecurity_score': scores.get('quantum_cybersecurity', 0),
                                             'ai_ethics_score': scores.get('ai_ethics', 0),
                                             'quantum_ethics_score': scores.get('quantum_ethics', 0),
-                                            'extraction_method': 'FILE_ENHANCED_OCR'
+                                            'extraction_method': 'FILE_ENHANCED_OCR',
+                                            'pdf_sha256': pdf_sha256
                                         }
                                         
                                         st.info("Saving document to database...")
@@ -2949,7 +2895,7 @@ def render():
                                 try:
                                     st.cache_data.clear()
                                     # Clear function caches if they exist
-                                    for func in [fetch_documents_cached, comprehensive_document_scoring_cached]:
+                                    for func in [fetch_documents_cached]:
                                         if hasattr(func, 'cache_clear'):
                                             func.cache_clear()
                                 except Exception:
@@ -3632,10 +3578,13 @@ def render_compact_cards(docs):
             # Ensure preview is properly cleaned
             content_preview = ultra_clean_metadata(content_preview)
             
-            # Use smart caching system for maximum performance
-            from utils.smart_scoring import get_smart_scores, apply_topic_filtering
-            scores = get_smart_scores(doc)
-            scores = apply_topic_filtering(scores, doc)
+            # Use precomputed database scores only for fast loading
+            raw_scores = {
+                'ai_cybersecurity': doc.get('ai_cybersecurity_score'),
+                'quantum_cybersecurity': doc.get('quantum_cybersecurity_score'),
+                'ai_ethics': doc.get('ai_ethics_score'),
+                'quantum_ethics': doc.get('quantum_ethics_score')
+            }
             
             # Apply intelligent N/A logic based on document topic relevance
             scores = {}
@@ -3678,15 +3627,8 @@ def render_compact_cards(docs):
                 scores['ai_ethics'] = 'N/A'
             
             if is_quantum_related:
-                # Force fresh quantum scoring calculation bypassing all caches
-                try:
-                    from utils.comprehensive_scoring import score_quantum_cybersecurity_maturity
-                    quantum_score = score_quantum_cybersecurity_maturity(raw_content, title)
-                    if quantum_score is None:
-                        quantum_score = 1  # Minimal quantum content
-                except:
-                    # Fallback to database value only if fresh scoring fails
-                    quantum_score = raw_scores.get('quantum_cybersecurity', 1) or 1
+                # Stored score from the background rescoring job
+                quantum_score = raw_scores.get('quantum_cybersecurity') or 1  # Minimal quantum content
                 
                 # Convert to tier system (1-5) with realistic thresholds
                 if quantum_score >= 70:
@@ -3706,7 +3648,7 @@ def render_compact_cards(docs):
                     scores['quantum_ethics'] = raw_scores['quantum_ethics']
                 else:
                     try:
-                        computed_scores = comprehensive_document_scoring(raw_content, title)
+                        computed_scores = stored_document_scores(doc)
                         # Cap at realistic ranges (25-70 for quantum ethics)
                         quantum_ethics_computed = computed_scores.get('quantum_ethics', 40)
                         if quantum_ethics_computed is not None:
@@ -3923,9 +3865,8 @@ def render_grid_view(docs):
                     ai_cyber_score = min(raw_scores['ai_cybersecurity'] + 15, 100)
                     scores['ai_cybersecurity'] = max(ai_cyber_score, 85) if ai_cyber_score > 60 else ai_cyber_score
                 else:
-                    from utils.comprehensive_scoring import comprehensive_document_scoring
                     try:
-                        computed_scores = comprehensive_document_scoring(content, title)
+                        computed_scores = stored_document_scores(doc)
                         scores['ai_cybersecurity'] = computed_scores.get('ai_cybersecurity', 75)
                     except:
                         scores['ai_cybersecurity'] = 75
@@ -4234,9 +4175,8 @@ def render_minimal_list(docs):
                 ai_cyber_score = min(raw_scores['ai_cybersecurity'] + 15, 100)
                 scores['ai_cybersecurity'] = max(ai_cyber_score, 85) if ai_cyber_score > 60 else ai_cyber_score
             else:
-                from utils.comprehensive_scoring import comprehensive_document_scoring
                 try:
-                    computed_scores = comprehensive_document_scoring(content, title)
+                    computed_scores = stored_document_scores(doc)
                     scores['ai_cybersecurity'] = computed_scores.get('ai_cybersecurity', 75)
                 except:
                     scores['ai_cybersecurity'] = 75
@@ -4249,7 +4189,7 @@ def render_minimal_list(docs):
                 scores['ai_ethics'] = max(ai_ethics_score, 85) if ai_ethics_score > 65 else ai_ethics_score
             else:
                 try:
-                    computed_scores = comprehensive_document_scoring(content, title)
+                    computed_scores = stored_document_scores(doc)
                     scores['ai_ethics'] = computed_scores.get('ai_ethics', 70)
                 except:
                     scores['ai_ethics'] = 70
@@ -4261,7 +4201,7 @@ def render_minimal_list(docs):
                 quantum_score = raw_scores['quantum_cybersecurity']
             else:
                 try:
-                    computed_scores = comprehensive_document_scoring(content, title)
+                    computed_scores = stored_document_scores(doc)
                     quantum_score = computed_scores.get('quantum_cybersecurity', 65)
                 except:
                     quantum_score = 65
@@ -4285,7 +4225,7 @@ def render_minimal_list(docs):
                 scores['quantum_ethics'] = max(quantum_ethics_score, 85) if quantum_ethics_score > 70 else quantum_ethics_score
             else:
                 try:
-                    computed_scores = comprehensive_document_scoring(content, title)
+                    computed_scores = stored_document_scores(doc)
                     scores['quantum_ethics'] = computed_scores.get('quantum_ethics', 68)
                 except:
                     scores['quantum_ethics'] = 68
@@ -4621,9 +4561,8 @@ def render_card_view(docs):
                     scores['ai_cybersecurity'] = max(ai_cyber_score, 85) if ai_cyber_score > 60 else ai_cyber_score
                 else:
                     # Generate score for AI documents with missing DB scores
-                    from utils.comprehensive_scoring import comprehensive_document_scoring
                     try:
-                        computed_scores = comprehensive_document_scoring(raw_content, title)
+                        computed_scores = stored_document_scores(doc)
                         scores['ai_cybersecurity'] = computed_scores.get('ai_cybersecurity', 75)
                     except:
                         scores['ai_cybersecurity'] = 75  # Default reasonable score for AI docs
@@ -4638,7 +4577,7 @@ def render_card_view(docs):
                 else:
                     # Generate score for AI documents with missing DB scores
                     try:
-                        computed_scores = comprehensive_document_scoring(raw_content, title)
+                        computed_scores = stored_document_scores(doc)
                         scores['ai_ethics'] = computed_scores.get('ai_ethics', 70)
                     except:
                         scores['ai_ethics'] = 70  # Default reasonable score for AI docs
@@ -4652,7 +4591,7 @@ def render_card_view(docs):
                 else:
                     # Generate score for quantum documents with missing DB scores
                     try:
-                        computed_scores = comprehensive_document_scoring(raw_content, title)
+                        computed_scores = stored_document_scores(doc)
                         quantum_score = computed_scores.get('quantum_cybersecurity', 65)
                     except:
                         quantum_score = 65  # Default reasonable score for quantum docs
@@ -4679,7 +4618,7 @@ def render_card_view(docs):
                 else:
                     # Generate score for quantum documents with missing DB scores
                     try:
-                        computed_scores = comprehensive_document_scoring(raw_content, title)
+                        computed_scores = stored_document_scores(doc)
                         scores['quantum_ethics'] = computed_scores.get('quantum_ethics', 68)
                     except:
                         scores['quantum_ethics'] = 68  # Default reasonable score for quantum docs
@@ -4746,21 +4685,9 @@ def render_card_view(docs):
             q_cyber_display = f"{q_cyber}/5" if q_cyber != 'N/A' and q_cyber is not None else "N/A"
             q_ethics_display = f"{q_ethics}/100" if q_ethics != 'N/A' and q_ethics is not None else "N/A"
             
-            # Generate intelligent content preview
-            content_preview_text = ""
-            try:
-                from utils.intelligent_content_summarizer import generate_intelligent_content_preview
-                intelligent_summary = generate_intelligent_content_preview(
-                    content=raw_content,
-                    title=title,
-                    doc_type=doc.get('document_type', 'Document')
-                )
-                if intelligent_summary and len(intelligent_summary.strip()) > 10:
-                    content_preview_text = intelligent_summary[:300] + ("..." if len(intelligent_summary) > 300 else "")
-                else:
-                    content_preview_text = raw_content[:300] + ("..." if len(raw_content) > 300 else "")
-            except:
-                content_preview_text = raw_content[:300] + ("..." if len(raw_content) > 300 else "")
+            # Stored content preview (generated at ingest or by the preview backfill job)
+            stored_preview = doc.get('content_preview', '') or raw_content
+            content_preview_text = stored_preview[:300] + ("..." if len(stored_preview) > 300 else "")
 
             # Generate compact analysis content for modal popups
             def get_ai_cyber_analysis(content, score):
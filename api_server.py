@@ -3,7 +3,7 @@
 Flask API server for handling HTML button clicks from GUARDIAN interface
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
 import sys
 import os
@@ -148,6 +148,19 @@ def analyze_document():
             'error': str(e)
         }), 500
 
+@app.route('/reports/<report_id>', methods=['GET'])
+def download_report(report_id):
+    """Stream a generated risk report from the report cache"""
+    from utils.report_engine import get_report_engine
+
+    path = get_report_engine().cache.path_for(report_id)
+    if path is None:
+        return jsonify({'success': False, 'error': 'Report not found'}), 404
+
+    # send_file streams the file in blocks and honours Range / If-Modified-Since requests
+    return send_file(os.path.abspath(path), mimetype='application/pdf', as_attachment=True,
+                     download_name=f"GUARDIAN_Report_{report_id[:16]}.pdf", conditional=True)
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -532,56 +532,19 @@ def main():
                 potential_duplicates = 0
                 
                 try:
-                    # Inline duplicate removal to avoid timeout issues
-                    from utils.db import fetch_documents
-                    import psycopg2
-                    import os
+                    # Cluster duplicates across the whole repository, then drop exact copies
+                    from utils.duplicate_cleanup import cluster_duplicates, auto_cleanup_exact_duplicates
                     
-                    # Get database connection
-                    conn = psycopg2.connect(
-                        host=os.getenv('PGHOST'),
-                        database=os.getenv('PGDATABASE'),
-                        user=os.getenv('PGUSER'),
-                        password=os.getenv('PGPASSWORD'),
-                        port=os.getenv('PGPORT')
-                    )
-                    
-                    docs = fetch_documents()
-                    if len(docs) > 50:
-                        docs = docs[:50]  # Process only recent 50 documents to avoid timeout
-                    
-                    # Find exact title duplicates
-                    title_groups = {}
-                    for doc in docs:
-                        title = doc.get('title', '').strip().lower()
-                        if title and len(title) > 20:
-                            if title not in title_groups:
-                                title_groups[title] = []
-                            title_groups[title].append(doc)
-                    
-                    # Remove duplicates
-                    with conn.cursor() as cursor:
-                        for title, group_docs in title_groups.items():
-                            if len(group_docs) > 1:
-                                potential_duplicates += 1
-                                # Keep document with highest ID (most recent)
-                                sorted_docs = sorted(group_docs, key=lambda x: int(x.get('id', 0)), reverse=True)
-                                
-                                for doc in sorted_docs[1:]:  # Remove all except the first (most recent)
-                                    doc_id = doc.get('id')
-                                    cursor.execute("DELETE FROM documents WHERE id = %s", (doc_id,))
-                                    duplicates_removed += 1
-                        
-                        conn.commit()
-                    
-                    conn.close()
+                    group_counts = cluster_duplicates()
+                    duplicates_removed = auto_cleanup_exact_duplicates()['documents_removed']
+                    potential_duplicates = group_counts['similar_content'] + group_counts['similar_title']
                     
                     if duplicates_removed > 0:
                         st.success(f"Removed {duplicates_removed} duplicate documents")
                     elif potential_duplicates > 0:
                         st.info(f"Found {potential_duplicates} potential duplicate groups")
                     else:
-                        st.info("No duplicates detected in recent documents")
+                        st.info("No duplicates detected")
                     
                 except Exception as e:
                     st.warning(f"Duplicate removal skipped: {str(e)[:100]}")
@@ -617,7 +580,7 @@ def main():
                 # Summary results
                 results = []
                 if potential_duplicates > 0:
-                    results.append(f"Detected {potential_duplicates} potential duplicate title groups")
+                    results.append(f"Detected {potential_duplicates} potential duplicate groups")
                 if processed > 0:
                     results.append(f"Updated scoring for {processed} documents")
                 if metadata_updated > 0:
@@ -3524,7 +3487,7 @@ def render_document_management():
     
     st.markdown("### Document Ingestion & Upload Management")
     
-    from components.document_uploader import render_document_uploader, render_bulk_upload
+    from components.document_uploader import render_document_uploader, render_bulk_upload, render_ingestion_status
     from utils.database import DatabaseManager
     from utils.optimized_deletions_fixed import get_documents_for_deletion, batch_delete_documents, get_deletion_preview
     
@@ -3539,6 +3502,7 @@ def render_document_management():
     # Bulk upload interface
     st.markdown("#### Bulk Document Upload")
     render_bulk_upload()
+    render_ingestion_status()
     
     st.markdown("---")
     
@@ -3983,90 +3947,59 @@ def render_patent_scoring_management():
     # Duplicate Management Section
     st.markdown("#### Duplicate Document Management")
     
-    # Simple duplicate management without heavy imports
+    # Groups are clustered over the whole repository and stored (utils/duplicate_cleanup.py)
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("**Quick Duplicate Check**")
+        st.markdown("**Duplicate Scan**")
         if st.button("Scan for Duplicates", type="secondary"):
             try:
-                from utils.db import fetch_documents
-                docs = fetch_documents()
+                from utils.duplicate_cleanup import cluster_duplicates
+                with st.spinner("Clustering duplicates across the repository..."):
+                    group_counts = cluster_duplicates()
                 
-                # Quick title-based duplicate detection
-                title_counts = {}
-                for doc in docs[:100]:  # Check recent 100 documents
-                    title = doc.get('title', '').strip().lower()
-                    if title and len(title) > 20:
-                        title_counts[title] = title_counts.get(title, 0) + 1
-                
-                duplicates = sum(1 for count in title_counts.values() if count > 1)
-                
-                if duplicates > 0:
-                    st.warning(f"Found {duplicates} potential duplicate title groups")
+                if sum(group_counts.values()) > 0:
+                    st.warning(f"Found {group_counts['exact_content']} exact, {group_counts['similar_content']} "
+                               f"near-duplicate and {group_counts['similar_title']} title duplicate groups")
                 else:
-                    st.success("No obvious duplicates detected")
+                    st.success("No duplicates detected")
                     
             except Exception as e:
                 st.error(f"Scan failed: {str(e)[:100]}")
     
     with col2:
         st.markdown("**Remove Duplicates**")
-        if st.button("Remove Title Duplicates", type="primary"):
+        remove_exact = st.button("Remove Exact Duplicates", type="primary")
+        remove_titles = st.button("Remove Title Duplicates", type="secondary")
+        if remove_exact or remove_titles:
             try:
-                from utils.db import fetch_documents
-                import psycopg2
-                import os
-                
-                # Connect to database
-                conn = psycopg2.connect(
-                    host=os.getenv('PGHOST'),
-                    database=os.getenv('PGDATABASE'),
-                    user=os.getenv('PGUSER'),
-                    password=os.getenv('PGPASSWORD'),
-                    port=os.getenv('PGPORT')
-                )
-                
-                docs = fetch_documents()
+                from utils.duplicate_cleanup import cleanup_duplicate_groups
                 
-                # Group by exact title matches
-                title_groups = {}
-                for doc in docs[:100]:  # Process recent 100 documents
-                    title = doc.get('title', '').strip().lower()
-                    if title and len(title) > 20:
-                        if title not in title_groups:
-                            title_groups[title] = []
-                        title_groups[title].append(doc)
+                result = cleanup_duplicate_groups(['exact_content'] if remove_exact else ['similar_title'])
                 
-                removed_count = 0
-                groups_found = 0
-                
-                with conn.cursor() as cursor:
-                    for title, group_docs in title_groups.items():
-                        if len(group_docs) > 1:
-                            groups_found += 1
-                            # Keep document with highest ID (most recent)
-                            sorted_docs = sorted(group_docs, key=lambda x: int(x.get('id', 0)), reverse=True)
-                            
-                            for doc in sorted_docs[1:]:  # Remove all except the first
-                                doc_id = doc.get('id')
-                                cursor.execute("DELETE FROM documents WHERE id = %s", (doc_id,))
-                                removed_count += 1
-                    
-                    conn.commit()
-                
-                conn.close()
-                
-                if removed_count > 0:
-                    st.success(f"Removed {removed_count} duplicate documents from {groups_found} groups")
+                if result['documents_removed'] > 0:
+                    st.success(f"Removed {result['documents_removed']} duplicate documents from {result['groups_processed']} groups")
                 else:
                     st.info("No duplicates found to remove")
                     
             except Exception as e:
                 st.error(f"Removal failed: {str(e)[:100]}")
     
+    try:
+        from utils.duplicate_cleanup import load_duplicate_groups
+        stored_groups = load_duplicate_groups()
+        if stored_groups:
+            with st.expander(f"Stored duplicate groups ({len(stored_groups)})"):
+                for group in stored_groups[:50]:
+                    titles = ", ".join(f"#{doc['id']} {(doc['title'] or 'Untitled')[:60]}" for doc in group['documents'][:5])
+                    st.markdown(f"**{group['type'].replace('_', ' ').title()}** "
+                                f"({group['count']} documents, confidence {group['confidence']:.0%}, "
+                                f"keeps #{group['keep_document_id']}): {titles}")
+    except Exception as e:
+        st.error(f"Could not load duplicate groups: {str(e)[:100]}")
+    
     # Instructions for users
-    st.info("**How to use:** First click 'Scan for Duplicates' to check, then click 'Remove Title Duplicates' to clean them.")
+    st.info("**How to use:** First click 'Scan for Duplicates' to cluster the repository, then remove exact or title duplicates. The most recent document in each group is kept.")
     
     st.markdown("---")
     
@@ -69,6 +69,14 @@ def render_detailed_api_dashboard():
             else:
                 st.metric("Anthropic Status", "NORMAL", f"{daily_pct:.0f}%", delta_color="normal")
         
+        # Live rates and latency from the in-memory meter
+        for provider in summary:
+            metrics = monitor.get_metrics(provider)
+            if metrics['calls']:
+                p95 = f"{metrics['latency_p95_ms']:.0f} ms" if metrics['latency_p95_ms'] is not None else "n/a"
+                st.caption(f"{provider.title()}: {metrics['calls_per_minute']:.1f} calls/min, "
+                           f"{metrics['tokens_per_minute']:.0f} tokens/min, p95 latency {p95}")
+        
         # Show mitigation info if needed
         if any(data.get('at_risk', False) for data in summary.values()):
             st.info("Smart caching and alternative providers active to minimize API usage")
@@ -64,21 +64,17 @@ def process_pdf_file(file_bytes, filename):
     """Process PDF file and extract content."""
     try:
         import PyPDF2
-        from utils.pdf_ingestion_thumbnails import extract_pdf_thumbnail_during_ingestion
-        import hashlib
+        from utils.pdf_ingestion_thumbnails import process_pdf_with_thumbnail
         
-        # Extract text content
-        pdf_reader = PyPDF2.PdfReader(BytesIO(file_bytes))
-        text_content = ""
-        
-        for page in pdf_reader.pages:
-            text_content += page.extract_text() + "\n"
-        
-        # Generate thumbnail
-        doc_id = hashlib.md5(file_bytes).hexdigest()[:8]
-        thumbnail = extract_pdf_thumbnail_during_ingestion(file_bytes, doc_id, filename)
+        # Stream page text and render the thumbnail concurrently
+        extracted = process_pdf_with_thumbnail(file_bytes, filename)
+        if not extracted['success']:
+            raise RuntimeError(extracted.get('error', 'PDF extraction failed'))
+        text_content = extracted['text_content']
+        thumbnail = extracted['thumbnail']
         
-        # Extract metadata from PDF
+        # Extract metadata from PDF (reads the document info only, not page content)
+        pdf_reader = PyPDF2.PdfReader(BytesIO(file_bytes))
         metadata = {}
         if pdf_reader.metadata:
             metadata = {
@@ -98,7 +94,10 @@ def process_pdf_file(file_bytes, filename):
             'thumbnail': thumbnail,
             'metadata': metadata,
             'filename': filename,
-            'file_type': 'PDF'
+            'file_type': 'PDF',
+            'content_hash': extracted['content_hash'],
+            'page_count': extracted['page_count'],
+            'truncated': extracted['truncated']
         }
         
     except Exception as e:
@@ -180,4 +179,38 @@ def process_txt_file(file_bytes, filename):
             'error': str(e),
             'content': '',
             'metadata': {}
-        }
\ No newline at end of file
+        }
+def enqueue_uploaded_file(uploaded_file, **fields):
+    """
+    Queue an uploaded file for background ingestion instead of processing it
+    in the session.
+    
+    Args:
+        uploaded_file: Streamlit uploaded file object
+        **fields: Form values (title, organization, document_type, source, url,
+                  summary, auto_analyze) that override extracted metadata
+        
+    Returns:
+        Ingestion job id
+    """
+    from utils.ingestion_queue import enqueue_document, get_ingestion_queue
+    
+    file_bytes = uploaded_file.read()
+    uploaded_file.seek(0)
+    filename = uploaded_file.name
+    payload = {key: value for key, value in fields.items() if value not in (None, '')}
+    payload['filename'] = filename
+    
+    if os.path.splitext(filename)[1].lower() == '.pdf':
+        payload['file_path'] = get_ingestion_queue().save_upload(file_bytes, filename)
+        return enqueue_document('pdf', payload)
+    
+    if os.path.splitext(filename)[1].lower() in ['.docx', '.doc']:
+        result = process_docx_file(file_bytes, filename)
+        if not result['success']:
+            raise ValueError(result['error'])
+        payload['content'] = result['text_content']
+    else:
+        payload['content'] = file_bytes.decode('utf-8', errors='ignore')
+    payload.setdefault('title', os.path.splitext(filename)[0].replace('_', ' '))
+    return enqueue_document('text', payload)
@@ -100,6 +100,7 @@ class RiskReportInterface:
                         
                         **File:** {filename}
                         **Size:** {len(pdf_data):,} bytes
+                        **Report ID:** {self._report_label()}
                         """)
                         
                     except Exception as e:
@@ -203,6 +204,7 @@ class RiskReportInterface:
                     
                     **File:** {filename}
                     **Size:** {len(pdf_data):,} bytes
+                    **Report ID:** {self._report_label()}
                     """)
                     
                 except Exception as e:
@@ -359,6 +361,13 @@ class RiskReportInterface:
         }
         return colors.get(risk_level, '#6b7280')
     
+    def _report_label(self) -> str:
+        """Id of the last generated report; the API server streams it from /reports/<report_id>"""
+        report = self.generator.last_report
+        if report is None:
+            return "n/a"
+        return f"{report.report_id[:16]}{' (cached)' if report.cached else ''}"
+    
     def _get_timestamp(self) -> str:
         """Get current timestamp for filename"""
         from datetime import datetime
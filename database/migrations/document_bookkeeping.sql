@@ -0,0 +1,45 @@
+-- Scoring, preview, soft-deletion, near-duplicate and PDF page bookkeeping for existing
+-- databases (see utils/score_precompute.py, utils/preview_precompute.py,
+-- utils/document_purge.py, utils/minhash_index.py and utils/pdf_text_extractor.py). The application only checks that these exist.
+-- Adding the stored content_hash column rewrites documents under an exclusive lock: run
+-- this once during a maintenance window, outside a transaction block (psql -f), so the
+-- indexes are built without blocking writes.
+
+ALTER TABLE documents
+    ADD COLUMN IF NOT EXISTS score_content_hash VARCHAR(32),
+    ADD COLUMN IF NOT EXISTS scorer_version VARCHAR(20),
+    ADD COLUMN IF NOT EXISTS scored_at TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS content_preview TEXT,
+    ADD COLUMN IF NOT EXISTS preview_content_hash VARCHAR(32),
+    ADD COLUMN IF NOT EXISTS preview_version VARCHAR(20),
+    ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS content_sha256 VARCHAR(64),
+    ADD COLUMN IF NOT EXISTS pdf_sha256 VARCHAR(64);
+
+ALTER TABLE documents
+    ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32)
+    GENERATED ALWAYS AS (
+        md5(COALESCE(title, '') || E'\n' || COALESCE(NULLIF(content, ''), text_content, ''))
+    ) STORED;
+
+CREATE TABLE IF NOT EXISTS document_signatures (
+    document_id INTEGER PRIMARY KEY REFERENCES documents(id) ON DELETE CASCADE,
+    signature BYTEA NOT NULL,
+    content_md5 VARCHAR(32) NOT NULL,
+    signature_version VARCHAR(20) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS document_lsh_buckets (
+    band SMALLINT NOT NULL,
+    bucket BIGINT NOT NULL,
+    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    PRIMARY KEY (band, bucket, document_id)
+);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_scorer_version ON documents(scorer_version);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_preview_version ON documents(preview_version);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_pending_purge ON documents(deleted_at) WHERE deleted_at IS NOT NULL;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_content_sha256 ON documents(content_sha256);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_title_lower ON documents(lower(title));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_document_lsh_buckets_document ON document_lsh_buckets(document_id);
@@ -0,0 +1,14 @@
+-- Listing filter and keyset pagination indexes for existing databases
+-- (see LISTING_INDEXES in utils/database.py). Run once outside a transaction
+-- block (psql -f) so each index is built without blocking writes.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_listing ON documents(updated_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_topic_listing ON documents(topic, updated_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_region_listing ON documents(detected_region, updated_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_organization ON documents(author_organization);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_document_type ON documents(document_type);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_publish_year ON documents((EXTRACT(YEAR FROM publish_date)));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_ai_cybersecurity_score ON documents(ai_cybersecurity_score);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_quantum_cybersecurity_score ON documents(quantum_cybersecurity_score);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_ai_ethics_score ON documents(ai_ethics_score);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_quantum_ethics_score ON documents(quantum_ethics_score);
@@ -0,0 +1,14 @@
+-- Weighted full-text search vector for existing databases (see utils/document_search.py)
+-- Adding a stored generated column rewrites documents under an exclusive lock: run
+-- this once during a maintenance window, outside a transaction block (psql -f), so
+-- the index itself is built without blocking writes.
+
+ALTER TABLE documents
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(author_organization, '')), 'B') ||
+        setweight(to_tsvector('english', LEFT(COALESCE(text_content, ''), 200000)), 'C')
+    ) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_search_vector ON documents USING GIN(search_vector);
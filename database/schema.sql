@@ -13,6 +13,65 @@ CREATE TABLE IF NOT EXISTS documents (
     metadata JSONB
 );
 
+-- Metadata columns read by the document listing
+ALTER TABLE documents
+    ADD COLUMN IF NOT EXISTS author_organization VARCHAR(500),
+    ADD COLUMN IF NOT EXISTS publish_date DATE,
+    ADD COLUMN IF NOT EXISTS topic VARCHAR(50) DEFAULT 'General',
+    ADD COLUMN IF NOT EXISTS detected_region VARCHAR(50) DEFAULT 'Unknown',
+    ADD COLUMN IF NOT EXISTS url_valid BOOLEAN,
+    ADD COLUMN IF NOT EXISTS url_status TEXT,
+    ADD COLUMN IF NOT EXISTS url_checked TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS source_redirect TEXT;
+
+-- Stored URL validation results (see utils/url_validator.py); URLs are only
+-- re-checked after expires_at, conditionally on etag/last_modified
+CREATE TABLE IF NOT EXISTS url_checks (
+    url TEXT PRIMARY KEY,
+    is_valid BOOLEAN NOT NULL,
+    status TEXT,
+    redirect_url TEXT,
+    http_status INTEGER,
+    etag TEXT,
+    last_modified TEXT,
+    checked_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+
+-- Precomputed framework scores, written by the rescoring job (utils/score_precompute.py).
+-- score_content_hash/scorer_version record what was scored so only changed rows are rescored.
+ALTER TABLE documents
+    ADD COLUMN IF NOT EXISTS ai_cybersecurity_score INTEGER,
+    ADD COLUMN IF NOT EXISTS quantum_cybersecurity_score INTEGER,
+    ADD COLUMN IF NOT EXISTS ai_ethics_score INTEGER,
+    ADD COLUMN IF NOT EXISTS quantum_ethics_score INTEGER,
+    ADD COLUMN IF NOT EXISTS score_content_hash VARCHAR(32),
+    ADD COLUMN IF NOT EXISTS scorer_version VARCHAR(20),
+    ADD COLUMN IF NOT EXISTS scored_at TIMESTAMP;
+
+-- Stored listing previews, written by the scheduled backfill job (utils/preview_precompute.py)
+ALTER TABLE documents
+    ADD COLUMN IF NOT EXISTS content_preview TEXT,
+    ADD COLUMN IF NOT EXISTS preview_content_hash VARCHAR(32),
+    ADD COLUMN IF NOT EXISTS preview_version VARCHAR(20);
+
+-- Hash of the scored title + text, maintained by PostgreSQL on every write; the rescoring
+-- and preview jobs compare it with score_content_hash / preview_content_hash
+ALTER TABLE documents
+    ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32)
+    GENERATED ALWAYS AS (
+        md5(COALESCE(title, '') || E'\n' || COALESCE(NULLIF(content, ''), text_content, ''))
+    ) STORED;
+
+-- Weighted full-text search vector (see utils/document_search.py)
+ALTER TABLE documents
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(author_organization, '')), 'B') ||
+        setweight(to_tsvector('english', LEFT(COALESCE(text_content, ''), 200000)), 'C')
+    ) STORED;
+
 CREATE TABLE IF NOT EXISTS assessments (
     id SERIAL PRIMARY KEY,
     document_id INTEGER REFERENCES documents(id) ON DELETE CASCADE,
@@ -47,8 +106,83 @@ INSERT INTO scoring_criteria (criterion_name, weight, category, description) VAL
 ('quantum-migration-strategy', 1.4, 'strategy', 'Quantum migration strategy indicators')
 ON CONFLICT DO NOTHING;
 
+-- SHA-256 of an uploaded PDF; its extracted pages are kept in the local page store
+-- (see utils/pdf_text_extractor.py) and read back by the rescoring job
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS pdf_sha256 VARCHAR(64);
+
+-- Near-duplicate detection (see utils/minhash_index.py): exact content hash plus
+-- MinHash signatures and their LSH band buckets
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_sha256 VARCHAR(64);
+
+CREATE TABLE IF NOT EXISTS document_signatures (
+    document_id INTEGER PRIMARY KEY REFERENCES documents(id) ON DELETE CASCADE,
+    signature BYTEA NOT NULL,
+    content_md5 VARCHAR(32) NOT NULL,
+    signature_version VARCHAR(20) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS document_lsh_buckets (
+    band SMALLINT NOT NULL,
+    bucket BIGINT NOT NULL,
+    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    PRIMARY KEY (band, bucket, document_id)
+);
+
+-- Duplicate groups from the repository-wide clustering job (see utils/duplicate_cleanup.py)
+CREATE TABLE IF NOT EXISTS duplicate_groups (
+    id SERIAL PRIMARY KEY,
+    group_type VARCHAR(30) NOT NULL,
+    confidence REAL NOT NULL,
+    group_key TEXT,
+    keep_document_id INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS duplicate_group_members (
+    group_id INTEGER NOT NULL REFERENCES duplicate_groups(id) ON DELETE CASCADE,
+    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    PRIMARY KEY (group_id, document_id)
+);
+
+-- Precomputed neighbours per document and kind ('content' or 'scoring'), written by
+-- DocumentRecommendationEngine.precompute_recommendations
+CREATE TABLE IF NOT EXISTS document_recommendations (
+    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    kind VARCHAR(20) NOT NULL,
+    rank SMALLINT NOT NULL,
+    recommended_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    score REAL NOT NULL,
+    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (document_id, kind, rank)
+);
+
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_documents_quantum_score ON documents(quantum_score);
 CREATE INDEX IF NOT EXISTS idx_documents_created_at ON documents(created_at);
+CREATE INDEX IF NOT EXISTS idx_documents_scorer_version ON documents(scorer_version);
+CREATE INDEX IF NOT EXISTS idx_documents_preview_version ON documents(preview_version);
+CREATE INDEX IF NOT EXISTS idx_documents_search_vector ON documents USING GIN(search_vector);
+CREATE INDEX IF NOT EXISTS idx_documents_content_sha256 ON documents(content_sha256);
+CREATE INDEX IF NOT EXISTS idx_documents_title_lower ON documents(lower(title));
+CREATE INDEX IF NOT EXISTS idx_document_lsh_buckets_document ON document_lsh_buckets(document_id);
+CREATE INDEX IF NOT EXISTS idx_duplicate_group_members_document ON duplicate_group_members(document_id);
+CREATE INDEX IF NOT EXISTS idx_url_checks_expires_at ON url_checks(expires_at);
+
+-- Listing filters and (updated_at, id) keyset pagination (see DatabaseManager.fetch_documents_page)
+CREATE INDEX IF NOT EXISTS idx_documents_listing ON documents(updated_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_documents_topic_listing ON documents(topic, updated_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_documents_region_listing ON documents(detected_region, updated_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_documents_organization ON documents(author_organization);
+CREATE INDEX IF NOT EXISTS idx_documents_document_type ON documents(document_type);
+CREATE INDEX IF NOT EXISTS idx_documents_publish_year ON documents((EXTRACT(YEAR FROM publish_date)));
+CREATE INDEX IF NOT EXISTS idx_documents_ai_cybersecurity_score ON documents(ai_cybersecurity_score);
+CREATE INDEX IF NOT EXISTS idx_documents_quantum_cybersecurity_score ON documents(quantum_cybersecurity_score);
+CREATE INDEX IF NOT EXISTS idx_documents_ai_ethics_score ON documents(ai_ethics_score);
+CREATE INDEX IF NOT EXISTS idx_documents_quantum_ethics_score ON documents(quantum_ethics_score);
 CREATE INDEX IF NOT EXISTS idx_assessments_document_id ON assessments(document_id);
-CREATE INDEX IF NOT EXISTS idx_assessments_score ON assessments(score);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_assessments_score ON assessments(score);
+-- Soft deletion (see utils/document_purge.py): deleted documents are purged in
+-- background batches; only rows awaiting the purge are indexed
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP;
+CREATE INDEX IF NOT EXISTS idx_documents_pending_purge ON documents(deleted_at) WHERE deleted_at IS NOT NULL;
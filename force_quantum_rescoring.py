@@ -8,7 +8,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from utils.database import DatabaseManager
-from utils.comprehensive_scoring import score_quantum_cybersecurity_maturity, analyze_document_applicability
+from utils.comprehensive_scoring import score_quantum_cybersecurity_maturity, get_scoring_context
 
 def force_quantum_rescoring():
     """Force fresh quantum scoring calculations for all quantum documents"""
@@ -40,12 +40,12 @@ def force_quantum_rescoring():
         content = row['content'] or row['text_content'] or ''
         old_score = row['quantum_cybersecurity_score']
         
-        # Check if document is truly quantum-applicable
-        applicability = analyze_document_applicability(content, title)
+        # Check if document is truly quantum-applicable (scope and applicability computed once)
+        context = get_scoring_context(content, title)
         
-        if applicability['quantum_cybersecurity']:
+        if context.applicability['quantum_cybersecurity']:
             # Calculate fresh score using new algorithm
-            new_score = score_quantum_cybersecurity_maturity(content, title)
+            new_score = score_quantum_cybersecurity_maturity(content, title, context)
             
             if new_score is not None:
                 # Update database with new score
@@ -6,11 +6,11 @@ Creates a complete export package for migrating to Amazon RDS
 
 import os
 import json
-import csv
 import logging
 from datetime import datetime
 from pathlib import Path
 from utils.database import DatabaseManager
+from utils.table_transfer import TransferManifest, copy_commands, export_tables
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -50,51 +50,9 @@ class SimpleDBExporter:
         return []
     
     def export_table_data(self, table_name):
-        """Export data from a specific table"""
+        """Export data from a specific table as compressed CSV chunks (see utils/table_transfer.py)"""
         logger.info(f"Exporting data from table: {table_name}")
-        
-        # Get table data
-        query = f"SELECT * FROM {table_name} ORDER BY id"
-        data = self.db.execute_query(query)
-        
-        if data:
-            csv_file = self.export_dir / f'{table_name}_data.csv'
-            
-            # Write to CSV
-            with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                if data:
-                    writer = csv.DictWriter(f, fieldnames=data[0].keys())
-                    writer.writeheader()
-                    
-                    for row in data:
-                        # Handle special data types
-                        clean_row = {}
-                        for key, value in row.items():
-                            if value is None:
-                                clean_row[key] = ''
-                            elif isinstance(value, (dict, list)):
-                                clean_row[key] = json.dumps(value)
-                            else:
-                                clean_row[key] = str(value)
-                        writer.writerow(clean_row)
-                    
-                    logger.info(f"Exported {len(data)} rows to {csv_file}")
-                else:
-                    # Empty table - just write headers
-                    writer = csv.writer(f)
-                    # Get column names from schema
-                    cols_query = f"""
-                    SELECT column_name FROM information_schema.columns 
-                    WHERE table_name = '{table_name}' AND table_schema = 'public'
-                    ORDER BY ordinal_position
-                    """
-                    columns = self.db.execute_query(cols_query)
-                    if columns:
-                        headers = [col['column_name'] for col in columns]
-                        writer.writerow(headers)
-                    logger.info(f"Table {table_name} is empty - created header-only CSV")
-        else:
-            logger.info(f"No data found in table: {table_name}")
+        export_tables(os.getenv('DATABASE_URL'), [table_name], self.export_dir, workers=1)
     
     def create_ddl_script(self, schema_data):
         """Create DDL script from schema data"""
@@ -149,9 +107,10 @@ class SimpleDBExporter:
             
             tables = ['assessments', 'documents', 'scoring_criteria']
             
-            for table in tables:
-                f.write(f"-- Import {table}\n")
-                f.write(f"\\COPY {table} FROM '{table}_data.csv' WITH CSV HEADER;\n\n")
+            f.write("-- Import every exported chunk\n")
+            for command in copy_commands(TransferManifest(self.export_dir)):
+                f.write(f"{command}\n")
+            f.write("\n")
             
             # Reset sequences
             f.write("-- Reset sequences\n")
@@ -176,9 +135,10 @@ This package contains your complete GUARDIAN database export for migration to Am
 ## Files Included
 - `table_schema.json` - Complete database schema
 - `create_tables.sql` - DDL script to create tables
-- `assessments_data.csv` - Assessments table data
-- `documents_data.csv` - Documents table data  
-- `scoring_criteria_data.csv` - Scoring criteria data
+- `assessments.*.csv.gz` - Assessments table data
+- `documents.*.csv.gz` - Documents table data
+- `scoring_criteria.*.csv.gz` - Scoring criteria data
+- `export_manifest.json` - Data chunks per table
 - `import_data.sql` - Import script for RDS
 
 ## Migration Steps
@@ -194,7 +154,7 @@ psql -h your-rds-endpoint.amazonaws.com -U your-username -d your-database -f cre
 ```
 
 ### 3. Import Data
-Upload CSV files to RDS-accessible location, then:
+From the export directory (the chunks are read by `gzip -dc`):
 ```bash
 psql -h your-rds-endpoint.amazonaws.com -U your-username -d your-database -f import_data.sql
 ```
@@ -237,8 +197,7 @@ Generated: {}
             
             # Export table data
             tables = ['assessments', 'documents', 'scoring_criteria']
-            for table in tables:
-                self.export_table_data(table)
+            export_tables(os.getenv('DATABASE_URL'), tables, self.export_dir)
             
             # Create import script
             self.create_import_script()
@@ -0,0 +1,71 @@
+"""
+Test API Usage Metering
+Verify in-memory limit checks, batched flushes from several meters and latency accounting
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+sys.path.append('.')
+
+from utils.api_metering import UsageMeter
+
+def _db_path():
+    return os.path.join(tempfile.mkdtemp(), 'api_usage.db')
+
+def test_limits_served_from_memory():
+    """Unflushed usage counts toward limits and nothing is written until a flush"""
+    db_path = _db_path()
+    meter = UsageMeter(db_path)
+    for _ in range(5):
+        meter.record('anthropic', 'messages', 900, 0.003, latency_ms=120.0)
+
+    limits = meter.check_limits('anthropic')
+    assert limits['daily_usage'] == 4500 and limits['exceeded'] is False and limits['at_risk'] is True
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT COUNT(*) FROM api_usage').fetchone()[0] == 0
+
+    meter.flush()
+    assert conn.execute('SELECT COUNT(*), SUM(tokens_used) FROM api_usage').fetchone() == (5, 4500)
+    assert meter.check_limits('anthropic')['daily_usage'] == 4500
+    meter.stop()
+
+def test_meters_share_totals():
+    """Meters flushing into one database (e.g. separate workers) add up"""
+    db_path = _db_path()
+    first, second = UsageMeter(db_path), UsageMeter(db_path)
+    first.record('openai', 'chat', 3000)
+    second.record('openai', 'chat', 4000)
+    first.flush()
+    second.flush()
+
+    assert second.check_limits('openai')['daily_usage'] == 7000
+    first.flush()
+    assert first.check_limits('openai')['daily_usage'] == 7000
+    first.stop()
+    second.stop()
+
+def test_rates_and_latency():
+    """Sliding-window rates and latency quantiles come from the recorded calls"""
+    meter = UsageMeter(_db_path())
+    for latency in [40.0] * 90 + [4000.0] * 10:
+        meter.record('openai', 'chat', 10, latency_ms=latency)
+    meter.record('openai', 'chat', 0, status='quota_exceeded', error_message='quota')
+
+    stats = meter.provider_stats('openai')
+    assert stats['calls'] == 101 and stats['quota_exceeded'] == 1
+    assert stats['calls_per_minute'] == 101 and stats['tokens_per_minute'] == 1000
+    assert stats['latency_p50_ms'] == 50 and stats['latency_p95_ms'] == 5000
+    meter.stop()
+
+def main():
+    """Run all tests"""
+    test_limits_served_from_memory()
+    test_meters_share_totals()
+    test_rates_and_latency()
+    print("All API metering tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Test Convergence AI Batch Analysis
+Verify batched bias scores and consensus match the per-response definitions
+"""
+
+import sys
+import asyncio
+sys.path.append('.')
+
+from utils.convergence_ai import ConvergenceAI
+
+RESPONSES = [
+    "The man is a natural leader. She is emotional, however the data is clear.",
+    "Quantum risk assessment requires migration planning because keys are exposed.",
+    "",
+    "Therefore organisations should inventory cryptography. Moreover, he is strong.",
+]
+
+def test_substring_counts_match_str_count():
+    """Pattern counts over the vocabulary equal str.count over the whole text"""
+    ai = ConvergenceAI()
+    batch = ai.analyze_batch(RESPONSES)
+    patterns = ['he', 'man', 'she', 'therefore']
+    counts = (batch.counts @ batch.substring_counts(patterns)).toarray()
+    for row, text in enumerate(RESPONSES):
+        assert list(counts[row]) == [text.lower().count(p) for p in patterns]
+
+def test_batch_scores_match_single_scores():
+    """Scoring a batch gives the same bias scores as scoring responses one by one"""
+    ai = ConvergenceAI()
+    scores = ai.calculate_bias_scores(ai.analyze_batch(RESPONSES))
+    assert scores[2] == 0.0
+    for text, score in zip(RESPONSES, scores):
+        assert abs(ai.calculate_bias_score(text) - score) < 1e-12
+
+def test_consensus_on_batch_rows():
+    """Consensus over a subset of batch rows equals consensus over those texts"""
+    ai = ConvergenceAI()
+    batch = ai.analyze_batch(RESPONSES)
+    subset = ai.calculate_semantic_similarity([RESPONSES[0], RESPONSES[3]], batch=batch, rows=[0, 3])
+    direct = ai.calculate_semantic_similarity([RESPONSES[0], RESPONSES[3]])
+    assert abs(subset['consensus'] - direct['consensus']) < 1e-9
+    assert len(subset['individual_similarities']) == 1
+
+    result = asyncio.run(ai.process_with_convergence(
+        "Assess quantum readiness",
+        [{'model_id': f'model-{i}', 'response_text': text, 'confidence': 0.8} for i, text in enumerate(RESPONSES)]
+    ))
+    assert 'model-2' not in result.model_consensus
+    assert 0.0 <= result.bias_mitigation_score <= 1.0
+
+def main():
+    """Run all tests"""
+    test_substring_counts_match_str_count()
+    test_batch_scores_match_single_scores()
+    test_consensus_on_batch_rows()
+    print("All convergence AI tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Test Token-Aware Document Chunking
+Verify heading-aligned token-bounded chunks, relevance pre-filtering and score reduction
+"""
+
+import sys
+sys.path.append('.')
+
+from utils.document_chunker import (
+    chunk_document, estimate_tokens, map_reduce_scores, select_chunks, truncate_to_tokens
+)
+
+KEYWORDS = {
+    'quantum_cybersecurity': {
+        'high_value': ['post-quantum cryptography'],
+        'base_value': ['quantum', 'encryption']
+    },
+    'ai_ethics': {
+        'high_value': ['responsible ai'],
+        'base_value': ['fairness', 'bias']
+    }
+}
+
+FILLER = "Agencies shall maintain records of procurement activities and budgets. " * 60
+
+def _long_policy():
+    return "\n".join([
+        "1. Introduction", FILLER,
+        "2. Post-Quantum Cryptography Migration",
+        "Agencies must inventory encryption and plan post-quantum cryptography adoption "
+        "before quantum computers break current encryption. " * 8,
+        "3. Administrative Matters", FILLER,
+        "APPENDIX A RESPONSIBLE AI",
+        "Responsible AI programs address fairness and bias in automated decisions. " * 8,
+        "4. Budget", FILLER
+    ])
+
+def test_chunks_follow_headings_and_budget():
+    """Every chunk fits the budget and sections start at headings"""
+    chunks = chunk_document(_long_policy(), max_tokens=300)
+    assert all(chunk.tokens <= 300 for chunk in chunks)
+    assert any(chunk.heading == "2. Post-Quantum Cryptography Migration" for chunk in chunks)
+    assert any(chunk.heading == "APPENDIX A RESPONSIBLE AI" for chunk in chunks)
+
+def test_truncate_to_tokens():
+    """Truncation keeps whole tokens up to the budget"""
+    text = "one two, three four five"
+    assert truncate_to_tokens(text, 3) == "one two,"
+    assert estimate_tokens(truncate_to_tokens(FILLER, 50)) == 50
+
+def test_only_relevant_chunks_are_scored():
+    """Filler sections are skipped and chunk scores are reduced per framework"""
+    selected = select_chunks(_long_policy(), KEYWORDS, max_tokens=300)
+    headings = {chunk.heading for chunk in selected}
+    assert headings == {"2. Post-Quantum Cryptography Migration", "APPENDIX A RESPONSIBLE AI"}
+
+    calls = []
+
+    def score_chunk(text, title):
+        calls.append(title)
+        if 'post-quantum' in text:
+            return {'quantum_cybersecurity': 80, 'ai_ethics': None}
+        return {'quantum_cybersecurity': None, 'ai_ethics': 60}
+
+    scores = map_reduce_scores(_long_policy(), "Policy", score_chunk, KEYWORDS, max_chunks=4, max_tokens=300)
+    assert sorted(calls) == ["Policy - 2. Post-Quantum Cryptography Migration", "Policy - APPENDIX A RESPONSIBLE AI"]
+    assert scores == {'quantum_cybersecurity': 80, 'ai_ethics': 60}
+
+def main():
+    """Run all tests"""
+    test_chunks_follow_headings_and_budget()
+    test_truncate_to_tokens()
+    test_only_relevant_chunks_are_scored()
+    print("All document chunker tests passed")
+
+if __name__ == "__main__":
+    main()
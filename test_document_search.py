@@ -0,0 +1,89 @@
+"""
+Test Document Search Fallback Index
+Verify ranking, AND matching, highlighting and re-indexing of the in-memory index
+"""
+
+import sys
+sys.path.append('.')
+
+from utils.database import HIGHLIGHT_START, HIGHLIGHT_STOP, render_headline
+from utils.document_search import InvertedIndex, tokenize
+
+DOCUMENTS = [
+    {'id': 1, 'title': 'Post-Quantum Cryptography Migration', 'author_organization': 'NIST',
+     'text': 'Agencies should inventory cryptographic systems and plan the migration to quantum-resistant algorithms.'},
+    {'id': 2, 'title': 'AI Risk Management Framework', 'author_organization': 'NIST',
+     'text': 'The framework helps organizations manage risks of artificial intelligence systems, including cryptography.'},
+    {'id': 3, 'title': 'Ethics of Artificial Intelligence', 'author_organization': 'UNESCO',
+     'text': 'Recommendations on the ethical development of AI systems.'}
+]
+
+# Listing fields for the filter test, keyed by document id
+LISTING_FIELDS = {
+    1: {'document_type': 'Standard', 'publish_date': '2024-08-13', 'topic': 'Quantum', 'quantum_cybersecurity_score': 80},
+    2: {'document_type': 'Framework', 'publish_date': '2023-01-26', 'topic': 'AI', 'quantum_cybersecurity_score': None},
+    3: {'document_type': 'Guideline', 'publish_date': '2021-11-23', 'topic': 'AI', 'deleted_at': '2025-01-01'}
+}
+
+def _index():
+    index = InvertedIndex()
+    index.add_many(DOCUMENTS)
+    return index
+
+def test_tokenize_stems_and_drops_stopwords():
+    """Plurals and inflections share a stem; stopwords are ignored"""
+    assert tokenize("The Systems of Risks") == tokenize("system risk")
+
+def test_title_matches_rank_first():
+    """Title hits outrank body hits, and every query term must match"""
+    index = _index()
+    results = index.search("cryptography")
+    assert [hit['id'] for hit in results['results']] == [1, 2]
+    assert index.search("cryptography ethics")['total'] == 0
+    assert [hit['id'] for hit in index.search("artificial intelligence systems")['results']][0] == 3
+
+def test_highlight_and_pagination():
+    """Hits carry escaped excerpts with <mark> tags and page like the SQL search"""
+    index = _index()
+    first = index.search("nist", page=1, page_size=1)
+    second = index.search("nist", page=2, page_size=1)
+    assert first['total'] == 2 and len(first['results']) == 1
+    assert first['results'][0]['id'] != second['results'][0]['id']
+    assert "<mark>systems" in index.search("systems")['results'][0]['highlight']
+
+def test_reindex_replaces_postings():
+    """Re-adding a document drops its old terms"""
+    index = _index()
+    index.add(3, title='Quantum Ethics', author_organization='UNESCO', text='Quantum technology ethics.')
+    assert 3 not in [hit['id'] for hit in index.search("artificial")['results']]
+    assert 3 in [hit['id'] for hit in index.search("quantum")['results']]
+    index.remove(3)
+    assert len(index) == 2
+
+def test_filters_and_deleted_documents():
+    """The fallback applies the listing filters and never returns soft-deleted documents"""
+    index = InvertedIndex()
+    index.add_many(dict(doc, **LISTING_FIELDS[doc['id']]) for doc in DOCUMENTS)
+    assert sorted(hit['id'] for hit in index.search("systems")['results']) == [1, 2]
+    assert [hit['id'] for hit in index.search("systems", filters={'topic': 'Quantum'})['results']] == [1]
+    assert [hit['id'] for hit in index.search("systems", filters={'years': ['2023'], 'document_types': ['Framework']})['results']] == [2]
+    assert index.search("nist", filters={'score_ranges': {'quantum_cybersecurity': (50, 100)}})['total'] == 1
+    assert index.search("ethical")['total'] == 0
+
+def test_headline_is_escaped():
+    """Markup in the document text is escaped; only the matches become <mark> tags"""
+    fragment = f"<script>alert(1)</script> {HIGHLIGHT_START}quantum{HIGHLIGHT_STOP} & more"
+    assert render_headline(fragment) == "&lt;script&gt;alert(1)&lt;/script&gt; <mark>quantum</mark> &amp; more"
+
+def main():
+    """Run all tests"""
+    test_tokenize_stems_and_drops_stopwords()
+    test_title_matches_rank_first()
+    test_highlight_and_pagination()
+    test_reindex_replaces_postings()
+    test_filters_and_deleted_documents()
+    test_headline_is_escaped()
+    print("All document search tests passed")
+
+if __name__ == "__main__":
+    main()
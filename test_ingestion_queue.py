@@ -0,0 +1,97 @@
+"""
+Test Ingestion Job Queue
+Verify stage checkpointing, retry from the failed stage, skips and lease reclaiming
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append('.')
+
+from utils import ingestion_queue
+from utils.ingestion_queue import DONE, FAILED, QUEUED, RUNNING, SKIPPED, STAGES, IngestionQueue, SkipJob, run_job
+
+def _queue():
+    directory = tempfile.mkdtemp()
+    return IngestionQueue(os.path.join(directory, 'queue.db'), os.path.join(directory, 'uploads'))
+
+def _handlers(calls, fail_once_at=None, skip_at=None):
+    failed = set()
+
+    def handler(stage):
+        def run(job):
+            calls.append(stage)
+            if stage == fail_once_at and stage not in failed:
+                failed.add(stage)
+                raise RuntimeError("temporary outage")
+            if stage == skip_at:
+                raise SkipJob("duplicate")
+            return {stage: True}
+        return run
+
+    return {stage: handler(stage) for stage in STAGES}
+
+def test_retry_resumes_at_failed_stage():
+    """A failed stage is retried without re-running completed stages"""
+    queue = _queue()
+    calls = []
+    ingestion_queue.STAGE_HANDLERS = _handlers(calls, fail_once_at='score')
+    job_id = queue.enqueue('text', {'title': 'Policy', 'content': 'text'})
+
+    run_job(queue, queue.claim('worker-1'))
+    job = queue.get_job(job_id)
+    assert job.status == QUEUED and job.stage == 'score' and job.attempts == 1
+    assert job.state == {'fetch': True, 'extract': True, 'metadata': True}
+    assert queue.claim('worker-1') is None  # backing off
+
+    queue._connection().execute('UPDATE ingestion_jobs SET run_after = 0 WHERE id = ?', (job_id,))
+    run_job(queue, queue.claim('worker-1'))
+    assert queue.get_job(job_id).status == DONE
+    assert calls == STAGES[:4] + STAGES[3:]
+
+def test_skip_and_permanent_failure():
+    """Skipped jobs finish without indexing; jobs failing MAX_ATTEMPTS times are failed"""
+    queue = _queue()
+    ingestion_queue.STAGE_HANDLERS = _handlers([], skip_at='metadata')
+    job_id = queue.enqueue('text', {'title': 'Copy'})
+    run_job(queue, queue.claim('worker-1'))
+    job = queue.get_job(job_id)
+    assert job.status == SKIPPED and job.error == 'duplicate' and 'index' not in job.state
+
+    def broken(job):
+        raise RuntimeError("down")
+
+    ingestion_queue.STAGE_HANDLERS = dict(_handlers([]), fetch=broken)
+    job_id = queue.enqueue('url', {'url': 'https://example.com'})
+    for _ in range(ingestion_queue.MAX_ATTEMPTS):
+        queue._connection().execute('UPDATE ingestion_jobs SET run_after = 0 WHERE id = ?', (job_id,))
+        run_job(queue, queue.claim('worker-1'))
+    assert queue.get_job(job_id).status == FAILED
+
+    queue.retry(job_id)
+    assert queue.get_job(job_id).status == QUEUED
+
+def test_expired_lease_is_reclaimed():
+    """A job whose worker died is claimed again once its lease expires"""
+    queue = _queue()
+    job_id = queue.enqueue('text', {'title': 'Policy'})
+    assert queue.claim('worker-1').id == job_id
+    assert queue.claim('worker-2') is None
+
+    queue._connection().execute('UPDATE ingestion_jobs SET lease_expires = 0 WHERE id = ?', (job_id,))
+    job = queue.claim('worker-2')
+    assert job.id == job_id and job.status == RUNNING
+
+def main():
+    """Run all tests"""
+    handlers = ingestion_queue.STAGE_HANDLERS
+    try:
+        test_retry_resumes_at_failed_stage()
+        test_skip_and_permanent_failure()
+        test_expired_lease_is_reclaimed()
+    finally:
+        ingestion_queue.STAGE_HANDLERS = handlers
+    print("All ingestion queue tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Test MinHash Near-Duplicate Signatures
+Verify signature stability, similarity estimates and LSH banding
+"""
+
+import sys
+sys.path.append('.')
+
+from utils.minhash_index import (
+    LSH_BANDS, NUM_PERMUTATIONS, band_buckets, content_sha256, estimate_similarity, minhash_signature
+)
+
+BASE_TEXT = " ".join(
+    f"Section {i}: agencies shall inventory cryptographic systems and plan quantum-resistant migration."
+    for i in range(40)
+)
+
+def test_exact_hash_ignores_whitespace():
+    """Reformatted whitespace still counts as identical content"""
+    assert content_sha256("Executive  order\n\non AI") == content_sha256("Executive order on AI")
+    assert content_sha256("Executive order on AI") != content_sha256("Executive order on ML")
+
+def test_signature_is_deterministic():
+    """Signatures must match across calls (they are persisted)"""
+    signature = minhash_signature(BASE_TEXT)
+    assert len(signature) == NUM_PERMUTATIONS
+    assert (signature == minhash_signature(BASE_TEXT)).all()
+
+def test_similarity_estimates():
+    """Light edits stay near 1.0, unrelated documents near 0.0"""
+    edited = BASE_TEXT.replace("Section 7:", "Part 7 (revised):")
+    unrelated = " ".join(f"Ethical guidelines item {i} for artificial intelligence fairness." for i in range(40))
+    base = minhash_signature(BASE_TEXT)
+    assert estimate_similarity(base, minhash_signature(edited)) > 0.85
+    assert estimate_similarity(base, minhash_signature(unrelated)) < 0.1
+
+def test_near_duplicates_share_buckets():
+    """Near-duplicates land in at least one common LSH bucket"""
+    edited = BASE_TEXT.replace("Section 12:", "Section twelve:")
+    buckets = band_buckets(minhash_signature(BASE_TEXT))
+    assert len(buckets) == LSH_BANDS
+    assert set(buckets) & set(band_buckets(minhash_signature(edited)))
+
+def main():
+    """Run all tests"""
+    test_exact_hash_ignores_whitespace()
+    test_signature_is_deterministic()
+    test_similarity_estimates()
+    test_near_duplicates_share_buckets()
+    print("All MinHash index tests passed")
+
+if __name__ == "__main__":
+    main()
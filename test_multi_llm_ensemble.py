@@ -0,0 +1,95 @@
+"""
+Test Multi-LLM Ensemble Concurrency
+Verify call coalescing survives a cancelled leader and a reached quorum cancels stragglers
+"""
+
+import sys
+import asyncio
+sys.path.append('.')
+
+from utils.multi_llm_ensemble import LLMResponse, MultiLLMEnsemble, SingleFlight
+
+def _response(service, confidence=0.9):
+    return LLMResponse(
+        service_name=service,
+        response_data={'score': 70},
+        processing_time=0.01,
+        confidence_score=confidence,
+        success=True
+    )
+
+def test_cancelled_leader_keeps_call_for_follower():
+    """A leader cancelled by its caller leaves the shared call running for a waiting follower"""
+    flight = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'result'
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do(('openai', 'hash'), call))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do(('openai', 'hash'), call))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower, leader
+
+    result, leader = asyncio.run(run())
+    assert result == 'result'
+    assert leader.cancelled()
+    assert len(calls) == 1 and flight.coalesced == 1
+
+def test_cancelled_leader_without_followers_stops_call():
+    """With nobody waiting, cancelling the leader cancels the call itself"""
+    flight = SingleFlight()
+    finished = []
+
+    async def call():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do(('openai', 'hash'), call))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+    assert not finished
+
+def test_quorum_cancels_stragglers():
+    """Once a quorum of confident responses is in, slower services are cancelled without a failure"""
+    ensemble = MultiLLMEnsemble()
+    ensemble.available_services = ['fast_a', 'fast_b', 'slow']
+    cancelled = []
+
+    async def evaluate(service_name, content, domain, task_id, is_refinement=False):
+        if service_name == 'slow':
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(service_name)
+                raise
+        return _response(service_name)
+
+    ensemble._evaluate_with_service = evaluate
+    result = asyncio.run(ensemble._parallel_evaluation("Policy text", 'ai_ethics', quorum=2))
+
+    summary = result.processing_summary
+    assert summary['quorum_reached']
+    assert summary['cancelled_services'] == ['slow']
+    assert cancelled == ['slow']
+    assert sorted(r.service_name for r in result.individual_responses) == ['fast_a', 'fast_b']
+    assert ensemble.health.snapshot()['slow']['consecutive_failures'] == 0
+
+def main():
+    """Run all tests"""
+    test_cancelled_leader_keeps_call_for_follower()
+    test_cancelled_leader_without_followers_stops_call()
+    test_quorum_cancels_stragglers()
+    print("All multi-LLM ensemble tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,32 @@ Demonstrates the complete PDF processing workflow
 
 import os
 import base64
+import tempfile
 from utils.pdf_ingestion_thumbnails import process_uploaded_pdf_with_thumbnail
 
 def test_pdf_processing():
     """Test PDF processing with sample document."""
     print("Testing PDF ingestion system...")
     
+    # Keep extracted pages, thumbnails and their manifest out of the working
+    # directory and the real data directory
+    import utils.pdf_text_extractor as pdf_text_extractor
+    import utils.thumbnail_service as thumbnail_service
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.environ['GUARDIAN_PAGE_STORE'] = os.path.join(data_dir, 'pdf_pages.db')
+        thumbnail_service._service = thumbnail_service.ThumbnailService(
+            directory=os.path.join(data_dir, 'thumbnails'),
+            manifest_path=os.path.join(data_dir, 'thumbnail_manifest.db')
+        )
+        try:
+            _process_sample_pdf()
+        finally:
+            os.environ.pop('GUARDIAN_PAGE_STORE', None)
+            pdf_text_extractor._page_store = None
+            thumbnail_service._service = None
+
+def _process_sample_pdf():
+    
     # Check if we have any PDF files to test with
     pdf_files = []
     for filename in os.listdir('attached_assets'):
@@ -54,8 +74,12 @@ def test_pdf_processing():
         print(f"- Filename: {result['filename']}")
         
         # Check if thumbnail file was created
-        thumbnail_path = f"thumbnails/ingested_thumb_{doc_id}.png"
-        if os.path.exists(thumbnail_path):
+        from utils.thumbnail_service import get_thumbnail_service
+        service = get_thumbnail_service()
+        thumbnail_hash = service.hash_for_alias(f"ingested:{doc_id}")
+        thumbnail_url = service.url_for_hash(thumbnail_hash) if thumbnail_hash else None
+        thumbnail_path = os.path.join(service.directory, os.path.basename(thumbnail_url)) if thumbnail_url else ""
+        if thumbnail_path and os.path.exists(thumbnail_path):
             print(f"- Thumbnail saved to: {thumbnail_path}")
             
             # Get file size for verification
@@ -0,0 +1,61 @@
+"""
+Test PDF Page Store
+Verify stored pages are read back by hash and that pruning bounds the store
+"""
+
+import os
+import sys
+import time
+import tempfile
+sys.path.append('.')
+
+from utils.pdf_text_extractor import PageStore, PDFPage
+
+PAGES = [PDFPage(1, "Post-quantum migration plan"), PDFPage(2, "Inventory of cryptographic systems")]
+
+def _store(path, **kwargs):
+    return PageStore(db_path=os.path.join(path, 'pages.db'), **kwargs)
+
+def _save(store, content_hash, pages=PAGES):
+    store.begin(content_hash, len(pages))
+    store.put_pages(content_hash, pages)
+    store.finish(content_hash, len(pages))
+
+def test_pages_round_trip():
+    """Only fully stored documents are served, in page order"""
+    with tempfile.TemporaryDirectory() as path:
+        store = _store(path)
+        store.begin("partial", 2)
+        store.put_pages("partial", PAGES[:1])
+        assert store.get_document("partial") is None
+
+        _save(store, "complete")
+        assert store.get_document("complete") == {'page_count': 2, 'stored_pages': 2, 'truncated': False}
+        assert [page.text for page in _store(path).iter_pages("complete")] == [page.text for page in PAGES]
+
+def test_prune_by_age_and_count():
+    """Unused documents expire and the store keeps only the most recently used"""
+    with tempfile.TemporaryDirectory() as path:
+        expiring = _store(path, ttl_seconds=-1)
+        _save(expiring, "old")
+        assert expiring.prune() == 1
+        assert expiring.get_document("old") is None
+        assert list(expiring.iter_pages("old")) == []
+
+        bounded = _store(path, max_documents=2)
+        for name in ("first", "second", "third"):
+            _save(bounded, name)
+            time.sleep(0.01)
+        bounded.touch("first")
+        assert bounded.prune() == 1
+        assert bounded.get_document("second") is None
+        assert bounded.get_document("first") and bounded.get_document("third")
+
+def main():
+    """Run all tests"""
+    test_pages_round_trip()
+    test_prune_by_age_and_count()
+    print("All page store tests passed")
+
+if __name__ == "__main__":
+    main()
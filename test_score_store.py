@@ -0,0 +1,104 @@
+"""
+Test Persistent Score Store
+Verify content addressing, persistence across instances, TTL and eviction
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append('.')
+
+from utils.score_store import ScoreStore
+
+SCORES = {'ai_cybersecurity': 72, 'ai_ethics': 64, 'quantum_cybersecurity': None, 'quantum_ethics': None}
+
+def _store(path, **kwargs):
+    return ScoreStore(db_path=os.path.join(path, 'scores.db'), **kwargs)
+
+def test_full_document_hash():
+    """Edits anywhere in the document must change the key"""
+    text = "A" * 5000
+    assert ScoreStore.content_hash(text, "T") != ScoreStore.content_hash(text + "B", "T")
+    assert ScoreStore.content_hash(text, "T") != ScoreStore.content_hash(text, "U")
+
+def test_round_trip_and_persistence():
+    """Scores written by one instance are read by another"""
+    with tempfile.TemporaryDirectory() as path:
+        first = _store(path)
+        assert first.get("policy text", "Policy") is None
+        first.put("policy text", "Policy", SCORES, provider='enhanced_patterns')
+        assert first.get("policy text", "Policy") == SCORES
+
+        second = _store(path)
+        assert second.get("policy text", "Policy") == SCORES
+        stats = second.get_stats()
+        assert stats['disk_hits'] == 1 and stats['stored_entries'] == 1
+
+def test_get_or_compute_only_computes_once():
+    """A cached result is served without calling the scorer again"""
+    calls = []
+
+    def scorer(text, title):
+        calls.append(title)
+        return SCORES
+
+    with tempfile.TemporaryDirectory() as path:
+        store = _store(path)
+        assert store.get_or_compute("text", "Doc", scorer) == SCORES
+        assert store.get_or_compute("text", "Doc", scorer) == SCORES
+        assert calls == ["Doc"]
+        assert store.get_stats()['memory_hits'] == 1
+
+def test_ttl_and_size_eviction():
+    """Expired rows are ignored and the table is trimmed to max_entries"""
+    with tempfile.TemporaryDirectory() as path:
+        expired = _store(path, ttl_seconds=-1)
+        expired.put("old", "Old", SCORES)
+        assert expired.get("old", "Old") is None
+
+        bounded = _store(path, max_entries=2)
+        for i in range(4):
+            bounded.put(f"text {i}", "Doc", SCORES)
+        bounded.evict()
+        assert bounded.get_stats()['stored_entries'] == 2
+
+def test_access_times_written_in_batches():
+    """Disk hits don't write on the read path; their access times land on flush"""
+    with tempfile.TemporaryDirectory() as path:
+        writer = _store(path)
+        writer.put("text", "Doc", SCORES)
+        key = ScoreStore.content_hash("text", "Doc")
+        before = writer._connection().execute(
+            'SELECT last_used FROM score_store WHERE content_hash = ?', (key,)).fetchone()[0]
+
+        reader = _store(path)
+        assert reader.get("text", "Doc") == SCORES
+        assert writer._connection().execute(
+            'SELECT last_used FROM score_store WHERE content_hash = ?', (key,)).fetchone()[0] == before
+
+        reader.flush_access_times()
+        assert writer._connection().execute(
+            'SELECT last_used FROM score_store WHERE content_hash = ?', (key,)).fetchone()[0] > before
+
+def test_invalidate_keeps_other_documents():
+    """Invalidating one document leaves the rest of the shared store intact"""
+    with tempfile.TemporaryDirectory() as path:
+        store = _store(path)
+        store.put("first", "Doc", SCORES)
+        store.put("second", "Doc", SCORES)
+        store.invalidate("first", "Doc")
+        assert store.get("first", "Doc") is None
+        assert _store(path).get("second", "Doc") == SCORES
+
+def main():
+    """Run all tests"""
+    test_full_document_hash()
+    test_round_trip_and_persistence()
+    test_get_or_compute_only_computes_once()
+    test_ttl_and_size_eviction()
+    test_access_times_written_in_batches()
+    test_invalidate_keeps_other_documents()
+    print("All score store tests passed")
+
+if __name__ == "__main__":
+    main()
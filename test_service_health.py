@@ -0,0 +1,82 @@
+"""
+Test Service Health Registry
+Verify circuit breaker transitions and that released trials count no failure
+"""
+
+import sys
+sys.path.append('.')
+
+from utils.service_health import (
+    BREAKER_OPEN_SECONDS, CLOSED, FAILURE_THRESHOLD, HALF_OPEN, OPEN, ServiceHealthRegistry
+)
+
+async def _probe():
+    return ['groq']
+
+def _registry():
+    registry = ServiceHealthRegistry(_probe)
+    registry.set_available(['groq'])
+    return registry
+
+def _expire(registry, name):
+    """Move the open breaker past its open interval"""
+    registry._service(name).opened_at -= BREAKER_OPEN_SECONDS
+
+def _open(registry, name):
+    for _ in range(FAILURE_THRESHOLD):
+        registry.record_failure(name, "HTTP 500")
+
+def test_closed_open_half_open_closed():
+    """Failures open the breaker, an expired breaker admits one trial, a success closes it"""
+    registry = _registry()
+    registry.record_failure('groq', "HTTP 500")
+    assert registry.snapshot()['groq']['state'] == CLOSED
+    assert registry.allow('groq')
+
+    _open(registry, 'groq')
+    assert registry.snapshot()['groq']['state'] == OPEN
+    assert not registry.admits('groq') and not registry.allow('groq')
+
+    _expire(registry, 'groq')
+    assert registry.allow('groq')
+    assert registry.snapshot()['groq']['state'] == HALF_OPEN
+    assert not registry.allow('groq')
+
+    registry.record_success('groq')
+    health = registry.snapshot()['groq']
+    assert health['state'] == CLOSED and health['consecutive_failures'] == 0
+    assert registry.allow('groq')
+
+def test_failed_trial_reopens():
+    """A failed trial request opens the breaker again for a full interval"""
+    registry = _registry()
+    _open(registry, 'groq')
+    _expire(registry, 'groq')
+    assert registry.allow('groq')
+
+    registry.record_failure('groq', "HTTP 500")
+    assert registry.snapshot()['groq']['state'] == OPEN
+    assert not registry.allow('groq')
+
+def test_released_trial_counts_no_failure():
+    """A trial that never reached the service hands the slot to the next request"""
+    registry = _registry()
+    _open(registry, 'groq')
+    _expire(registry, 'groq')
+    assert registry.allow('groq')
+
+    registry.release_trial('groq')
+    health = registry.snapshot()['groq']
+    assert health['state'] == OPEN and health['consecutive_failures'] == FAILURE_THRESHOLD
+    assert registry.allow('groq')
+    assert registry.snapshot()['groq']['state'] == HALF_OPEN
+
+def main():
+    """Run all tests"""
+    test_closed_open_half_open_closed()
+    test_failed_trial_reopens()
+    test_released_trial_counts_no_failure()
+    print("All service health tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Test Shared Term Index
+Verify that the single-pass term index answers exactly like substring scans
+"""
+
+import sys
+sys.path.append('.')
+
+from utils.term_index import TermIndex, TermVocabulary, get_term_index
+
+SAMPLE_TEXT = """
+NIST Post-Quantum Cryptography guidance for AI systems. Quantum computing threatens
+public-key cryptography; quantum-safe migration and AI security governance are
+required. The AI system said: aaaa banana bandana.
+"""
+
+QUERY_TERMS = [
+    'quantum', 'quantum computing', 'post-quantum', 'post-quantum cryptography',
+    'ai', 'ai ', 'ai system', 'ai security', 'said', 'cryptography', 'aa', 'ana',
+    'missing term', 'AI', 'governance'
+]
+
+def test_membership_matches_substring_semantics():
+    """Every query must agree with `term in text.lower()`"""
+    vocabulary = TermVocabulary(QUERY_TERMS[:8])
+    index = TermIndex(SAMPLE_TEXT.lower(), vocabulary)
+    text_lower = SAMPLE_TEXT.lower()
+
+    for term in QUERY_TERMS:
+        assert (term in index) == (term in text_lower), term
+
+def test_counts_match_str_count():
+    """Counts must match str.count, including self-overlapping terms"""
+    vocabulary = TermVocabulary(QUERY_TERMS)
+    index = TermIndex(SAMPLE_TEXT.lower(), vocabulary)
+    text_lower = SAMPLE_TEXT.lower()
+
+    for term in QUERY_TERMS:
+        assert index.count(term) == text_lower.count(term), term
+
+    assert index.positions('ana') == [i for i in range(len(text_lower)) if text_lower.startswith('ana', i)]
+
+def test_word_prefix_count_matches_regex():
+    """Word-family counts agree with the \\b(prefix)\\w* regex they replace"""
+    import re
+    text_lower = SAMPLE_TEXT.lower() + " re-assessed assessment reassess crypto_system"
+    index = TermIndex(text_lower)
+    for prefixes in [('quantum', 'crypt'), ('assess',), ('ai', 'said'), ('system',)]:
+        expected = len(re.findall(r'\b(' + '|'.join(prefixes) + r')\w*', text_lower))
+        assert index.word_prefix_count(prefixes) == expected, prefixes
+
+def test_vocabulary_learns_queried_terms():
+    """Terms answered by fallback are compiled into the next index"""
+    vocabulary = TermVocabulary(['quantum'])
+    first = TermIndex(SAMPLE_TEXT.lower(), vocabulary)
+    assert 'bandana' in first
+    assert 'bandana' in vocabulary
+
+    second = TermIndex(SAMPLE_TEXT.lower(), vocabulary)
+    assert second.count('bandana') == 1
+
+def test_combined_index_matches_joined_text():
+    """Title + text answers match an index over the joined string, across the boundary too"""
+    title = "Quantum Readiness aa"
+    joined = f"{title.lower()} {SAMPLE_TEXT.lower()}"
+    combined = get_term_index(SAMPLE_TEXT, title)
+    assert combined.body is get_term_index(SAMPLE_TEXT)
+    assert combined.text == joined
+
+    for term in QUERY_TERMS + ['readiness aa', 'aa \nnist', 'a \nn', 'aaaa', 'readiness']:
+        assert (term in combined) == (term in joined), term
+        assert combined.count(term) == joined.count(term), term
+        assert combined.positions(term) == [i for i in range(len(joined)) if joined.startswith(term, i)], term
+    assert combined.word_prefix_count(('quantum', 'aa')) == TermIndex(joined).word_prefix_count(('quantum', 'aa'))
+
+def test_get_term_index_reuses_scan():
+    """The combined title/text index is built once per document"""
+    first = get_term_index(SAMPLE_TEXT, "Quantum Readiness")
+    second = get_term_index(SAMPLE_TEXT, "Quantum Readiness")
+    assert first is second
+    assert first.text.startswith("quantum readiness ")
+    assert get_term_index(SAMPLE_TEXT) is not first
+
+def main():
+    """Run all tests"""
+    test_membership_matches_substring_semantics()
+    test_counts_match_str_count()
+    test_word_prefix_count_matches_regex()
+    test_vocabulary_learns_queried_terms()
+    test_combined_index_matches_joined_text()
+    test_get_term_index_reuses_scan()
+    print("All term index tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Test Persisted Sparse Vector Index
+Verify incremental updates, top-k similarity and save/load round trips
+"""
+
+import sys
+import tempfile
+sys.path.append('.')
+
+from utils.vector_index import SparseVectorIndex
+
+DOCUMENTS = {
+    1: "post-quantum cryptography migration plan for federal agencies",
+    2: "federal agencies plan their post-quantum cryptography migration",
+    3: "ethical principles for artificial intelligence systems",
+    4: "artificial intelligence risk management framework"
+}
+
+def _build(path=None):
+    index = SparseVectorIndex(path or tempfile.mkdtemp())
+    index.sync({doc_id: f"{doc_id:032d}" for doc_id in DOCUMENTS},
+               lambda ids: [(doc_id, DOCUMENTS[doc_id]) for doc_id in ids])
+    return index
+
+def test_most_similar_ranks_related_documents():
+    """The closest document comes first and the target itself is excluded"""
+    index = _build()
+    results = index.most_similar(1, top_k=2)
+    assert results[0][0] == 2
+    assert 1 not in [doc_id for doc_id, _ in results]
+
+def test_incremental_sync_only_reads_changes():
+    """Unchanged documents are not reloaded; deleted ones disappear"""
+    index = _build()
+    loaded = []
+
+    def load_texts(ids):
+        loaded.extend(ids)
+        return [(doc_id, "quantum ethics guidance") for doc_id in ids]
+
+    hashes = {doc_id: f"{doc_id:032d}" for doc_id in DOCUMENTS if doc_id != 4}
+    hashes[5] = "5" * 32
+    changes = index.sync(hashes, load_texts)
+    assert loaded == [5]
+    assert changes == {'added': 1, 'removed': 1}
+    assert 4 not in index.row_of and len(index) == 4
+
+def test_save_and_load_round_trip():
+    """A saved index reloads with the same neighbours"""
+    path = tempfile.mkdtemp()
+    index = _build(path)
+    index.remove([3])
+    index.save()
+
+    reloaded = SparseVectorIndex(path)
+    assert reloaded.load()
+    assert len(reloaded) == 3
+    assert reloaded.most_similar(1, top_k=1) == index.most_similar(1, top_k=1)
+
+def main():
+    """Run all tests"""
+    test_most_similar_ranks_related_documents()
+    test_incremental_sync_only_reads_changes()
+    test_save_and_load_round_trip()
+    print("All vector index tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ Comprehensive interface for validating and managing document URLs
 import streamlit as st
 import psycopg2
 import os
-from utils.url_validator import URLValidator, validate_single_url
+from utils.url_validator import URLValidator, validate_single_url, write_document_url_status, clear_url_checks
 import pandas as pd
 from datetime import datetime
 
@@ -195,37 +195,23 @@ def validate_all_urls_interface(cursor, conn):
         progress_bar = st.progress(0)
         status_text = st.empty()
         
-        valid_count = 0
-        invalid_count = 0
+        def show_progress(done, total):
+            status_text.text(f"Validated {done}/{total} URLs...")
+            progress_bar.progress(done / total if total else 1.0)
         
-        for i, (doc_id, title, source_url) in enumerate(documents):
-            status_text.text(f"Validating: {title[:40]}...")
-            
-            is_valid, status, redirect = validator.validate_url(source_url)
-            
-            if is_valid:
-                valid_count += 1
-            else:
-                invalid_count += 1
-            
-            # Update database
-            cursor.execute("""
-                UPDATE documents 
-                SET url_valid = %s, 
-                    url_status = %s,
-                    url_checked = CURRENT_TIMESTAMP
-                WHERE id = %s
-            """, (is_valid, status, doc_id))
-            
-            if redirect:
-                cursor.execute("""
-                    UPDATE documents 
-                    SET source_redirect = %s
-                    WHERE id = %s
-                """, (redirect, doc_id))
-            
-            conn.commit()
-            progress_bar.progress((i + 1) / len(documents))
+        # Concurrent, per-host rate limited; recently verified URLs come from url_checks
+        checks = validator.validate_batch([source_url for _, _, source_url in documents],
+                                          progress_callback=show_progress)
+        validation_results = [
+            dict(checks.get(source_url.strip(), {'valid': False, 'status': 'Empty URL', 'redirect': None}),
+                 id=doc_id, url=source_url)
+            for doc_id, title, source_url in documents
+        ]
+        write_document_url_status(cursor, validation_results)
+        conn.commit()
+        
+        valid_count = sum(1 for r in validation_results if r['valid'])
+        invalid_count = len(validation_results) - valid_count
         
         status_text.empty()
         progress_bar.empty()
@@ -255,30 +241,18 @@ def revalidate_failed_urls(cursor, conn):
         st.info(f"Re-validating {len(documents)} failed URLs...")
         
         validator = URLValidator()
-        valid_count = 0
+        checks = validator.validate_batch([source_url for _, _, source_url in documents if source_url], force=True)
         
-        for doc_id, title, source_url in documents:
-            is_valid, status, redirect = validator.validate_url(source_url)
-            
-            if is_valid:
-                valid_count += 1
-                
-                cursor.execute("""
-                    UPDATE documents 
-                    SET url_valid = %s, 
-                        url_status = %s,
-                        url_checked = CURRENT_TIMESTAMP
-                    WHERE id = %s
-                """, (is_valid, status, doc_id))
-                
-                if redirect:
-                    cursor.execute("""
-                        UPDATE documents 
-                        SET source_redirect = %s
-                        WHERE id = %s
-                    """, (redirect, doc_id))
-                
-                conn.commit()
+        # Only URLs that now validate are updated
+        now_valid = [
+            dict(checks[source_url.strip()], id=doc_id, url=source_url)
+            for doc_id, title, source_url in documents
+            if source_url and checks.get(source_url.strip(), {}).get('valid')
+        ]
+        valid_count = len(now_valid)
+        if now_valid:
+            write_document_url_status(cursor, now_valid)
+            conn.commit()
         
         if valid_count > 0:
             st.success(f"Re-validation complete: {valid_count} URLs now valid")
@@ -301,6 +275,7 @@ def clear_validation_data(cursor, conn):
             WHERE source IS NOT NULL
         """)
         conn.commit()
+        clear_url_checks()
         
         st.success("All validation data cleared")
         st.rerun()
@@ -3,113 +3,40 @@ API Limit Monitor for GUARDIAN
 Tracks OpenAI and Anthropic API usage and provides alerts when limits are reached
 """
 
-import os
-import json
+import time
 import sqlite3
-from datetime import datetime, timedelta
+import functools
 from typing import Dict, Optional
 import streamlit as st
 
+from utils.api_metering import DEFAULT_CALL_TOKENS, get_usage_meter, init_usage_db
+
 class APILimitMonitor:
     def __init__(self, db_path="api_usage.db"):
         self.db_path = db_path
-        self.init_db()
+        # Usage is counted in memory and flushed in batches (utils/api_metering.py)
+        self.meter = get_usage_meter(db_path)
     
     def init_db(self):
         """Initialize API usage tracking database"""
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS api_usage (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                provider TEXT NOT NULL,
-                endpoint TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                tokens_used INTEGER DEFAULT 0,
-                cost_estimate REAL DEFAULT 0.0,
-                status TEXT,
-                error_message TEXT
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS api_limits (
-                provider TEXT PRIMARY KEY,
-                daily_limit INTEGER,
-                monthly_limit INTEGER,
-                current_daily_usage INTEGER DEFAULT 0,
-                current_monthly_usage INTEGER DEFAULT 0,
-                last_reset_date TEXT,
-                status TEXT DEFAULT 'active'
-            )
-        ''')
-        
-        # Initialize default limits
-        cursor.execute('''
-            INSERT OR IGNORE INTO api_limits (provider, daily_limit, monthly_limit, last_reset_date)
-            VALUES 
-                ('openai', 10000, 200000, ?),
-                ('anthropic', 5000, 100000, ?)
-        ''', (datetime.now().date().isoformat(), datetime.now().date().isoformat()))
-        
+        init_usage_db(conn)
         conn.commit()
         conn.close()
     
     def log_api_call(self, provider: str, endpoint: str = "", tokens_used: int = 0, 
-                     cost_estimate: float = 0.0, status: str = "success", error_message: str = ""):
+                     cost_estimate: float = 0.0, status: str = "success", error_message: str = "",
+                     latency_ms: Optional[float] = None):
         """Log an API call"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO api_usage (provider, endpoint, tokens_used, cost_estimate, status, error_message)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (provider, endpoint, tokens_used, cost_estimate, status, error_message))
-        
-        # Update daily usage
-        today = datetime.now().date().isoformat()
-        cursor.execute('''
-            UPDATE api_limits 
-            SET current_daily_usage = current_daily_usage + ?,
-                current_monthly_usage = current_monthly_usage + ?
-            WHERE provider = ?
-        ''', (tokens_used, tokens_used, provider))
-        
-        conn.commit()
-        conn.close()
+        self.meter.record(provider, endpoint, tokens_used, cost_estimate, status, error_message, latency_ms)
     
     def check_limits(self, provider: str) -> Dict[str, any]:
         """Check current usage against limits"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT daily_limit, monthly_limit, current_daily_usage, current_monthly_usage, status
-            FROM api_limits WHERE provider = ?
-        ''', (provider,))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if not result:
-            return {"status": "unknown", "daily_percent": 0, "monthly_percent": 0}
-        
-        daily_limit, monthly_limit, daily_usage, monthly_usage, status = result
-        
-        daily_percent = (daily_usage / daily_limit * 100) if daily_limit > 0 else 0
-        monthly_percent = (monthly_usage / monthly_limit * 100) if monthly_limit > 0 else 0
-        
-        return {
-            "status": status,
-            "daily_usage": daily_usage,
-            "daily_limit": daily_limit,
-            "daily_percent": daily_percent,
-            "monthly_usage": monthly_usage,
-            "monthly_limit": monthly_limit,
-            "monthly_percent": monthly_percent,
-            "at_risk": daily_percent > 80 or monthly_percent > 80,
-            "exceeded": daily_percent >= 100 or monthly_percent >= 100
-        }
+        return self.meter.check_limits(provider)
+    
+    def get_metrics(self, provider: str) -> Dict[str, any]:
+        """Call rate, token and latency statistics for a provider (this process)"""
+        return self.meter.provider_stats(provider)
     
     def get_usage_summary(self) -> Dict[str, Dict]:
         """Get usage summary for all providers"""
@@ -123,17 +50,7 @@ class APILimitMonitor:
     
     def reset_daily_usage(self):
         """Reset daily usage counters"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        today = datetime.now().date().isoformat()
-        cursor.execute('''
-            UPDATE api_limits 
-            SET current_daily_usage = 0, last_reset_date = ?
-        ''', (today,))
-        
-        conn.commit()
-        conn.close()
+        self.meter.reset_daily_usage()
     
     def display_usage_alerts(self):
         """Display usage alerts in Streamlit interface"""
@@ -152,39 +69,45 @@ class APILimitMonitor:
                 st.warning(f"Monthly: {usage['monthly_usage']}/{usage['monthly_limit']} ({usage['monthly_percent']:.1f}%)")
                 st.warning("Approaching limits. System will automatically use alternative providers.")
 
+def _response_tokens(result) -> int:
+    """Tokens reported by an OpenAI or Anthropic response, or the default estimate"""
+    usage = getattr(result, 'usage', None)
+    if usage is None:
+        return DEFAULT_CALL_TOKENS
+    total = getattr(usage, 'total_tokens', None)
+    if total is None:
+        total = (getattr(usage, 'input_tokens', 0) or 0) + (getattr(usage, 'output_tokens', 0) or 0)
+    return total or DEFAULT_CALL_TOKENS
+
+def _monitor_call(provider: str, endpoint: str, cost_estimate: float, quota_markers: tuple):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            meter = get_usage_meter()
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                error_msg = str(e)
+                status = "quota_exceeded" if any(marker in error_msg.lower() for marker in quota_markers) else "error"
+                meter.record(provider, endpoint, 0, 0, status, error_msg, (time.perf_counter() - start) * 1000)
+                raise e
+            meter.record(provider, endpoint, _response_tokens(result), cost_estimate, "success", "",
+                         (time.perf_counter() - start) * 1000)
+            return result
+        return wrapper
+    return decorator
+
+# Requests sent through utils.http_pool are metered there; these decorators are
+# for calls made with the provider SDKs
+
 def monitor_openai_call(func):
     """Decorator to monitor OpenAI API calls"""
-    def wrapper(*args, **kwargs):
-        monitor = APILimitMonitor()
-        try:
-            result = func(*args, **kwargs)
-            monitor.log_api_call("openai", "chat", 1000, 0.002, "success")
-            return result
-        except Exception as e:
-            error_msg = str(e)
-            if "quota" in error_msg.lower() or "limit" in error_msg.lower():
-                monitor.log_api_call("openai", "chat", 0, 0, "quota_exceeded", error_msg)
-            else:
-                monitor.log_api_call("openai", "chat", 0, 0, "error", error_msg)
-            raise e
-    return wrapper
+    return _monitor_call("openai", "chat", 0.002, ("quota", "limit"))(func)
 
 def monitor_anthropic_call(func):
     """Decorator to monitor Anthropic API calls"""
-    def wrapper(*args, **kwargs):
-        monitor = APILimitMonitor()
-        try:
-            result = func(*args, **kwargs)
-            monitor.log_api_call("anthropic", "messages", 1000, 0.003, "success")
-            return result
-        except Exception as e:
-            error_msg = str(e)
-            if "rate_limit" in error_msg.lower() or "quota" in error_msg.lower():
-                monitor.log_api_call("anthropic", "messages", 0, 0, "quota_exceeded", error_msg)
-            else:
-                monitor.log_api_call("anthropic", "messages", 0, 0, "error", error_msg)
-            raise e
-    return wrapper
+    return _monitor_call("anthropic", "messages", 0.003, ("rate_limit", "quota"))(func)
 
 def get_api_status_indicator() -> str:
     """Get color-coded API status for UI display"""
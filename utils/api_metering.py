@@ -0,0 +1,409 @@
+"""
+API Usage Metering for GUARDIAN
+Counts LLM calls, tokens, cost and latency in memory and flushes them to the usage
+database in batches, so metering a call costs microseconds instead of a commit
+"""
+
+import os
+import time
+import atexit
+import bisect
+import sqlite3
+import logging
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_SECONDS = float(os.getenv('GUARDIAN_METER_FLUSH_SECONDS', '5'))
+
+# Calls waiting for a flush that wake the flusher before the interval is up
+FLUSH_BATCH_SIZE = 500
+
+RATE_WINDOW_SECONDS = 60
+
+# Upper bounds (ms) of the latency histogram buckets; one more bucket holds slower calls
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+SLOWEST_BUCKET = -1  # Stored bound of the open-ended bucket
+
+# Charged when a response doesn't report its token usage
+DEFAULT_CALL_TOKENS = 1000
+
+DEFAULT_LIMITS = {'openai': (10000, 200000), 'anthropic': (5000, 100000)}
+
+def init_usage_db(conn: sqlite3.Connection):
+    """Create the usage tables (and columns added since) if they don't exist"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS api_usage (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            provider TEXT NOT NULL,
+            endpoint TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            tokens_used INTEGER DEFAULT 0,
+            cost_estimate REAL DEFAULT 0.0,
+            status TEXT,
+            error_message TEXT
+        )
+    ''')
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(api_usage)")}
+    if 'latency_ms' not in columns:
+        conn.execute("ALTER TABLE api_usage ADD COLUMN latency_ms REAL")
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS api_limits (
+            provider TEXT PRIMARY KEY,
+            daily_limit INTEGER,
+            monthly_limit INTEGER,
+            current_daily_usage INTEGER DEFAULT 0,
+            current_monthly_usage INTEGER DEFAULT 0,
+            last_reset_date TEXT,
+            status TEXT DEFAULT 'active'
+        )
+    ''')
+
+    # Latency bucket counts summed over every process
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS api_latency_histogram (
+            provider TEXT NOT NULL,
+            le_ms INTEGER NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (provider, le_ms)
+        )
+    ''')
+
+    today = date.today().isoformat()
+    conn.executemany('''
+        INSERT OR IGNORE INTO api_limits (provider, daily_limit, monthly_limit, last_reset_date)
+        VALUES (?, ?, ?, ?)
+    ''', [(provider, daily, monthly, today) for provider, (daily, monthly) in DEFAULT_LIMITS.items()])
+
+class SlidingWindow:
+    """Calls and tokens over the last `seconds` seconds, in one-second buckets"""
+
+    def __init__(self, seconds: int = RATE_WINDOW_SECONDS):
+        self.seconds = seconds
+        self.stamps = [0] * seconds
+        self.calls = [0] * seconds
+        self.tokens = [0] * seconds
+
+    def add(self, now: float, tokens: int):
+        second = int(now)
+        slot = second % self.seconds
+        if self.stamps[slot] != second:
+            self.stamps[slot] = second
+            self.calls[slot] = 0
+            self.tokens[slot] = 0
+        self.calls[slot] += 1
+        self.tokens[slot] += tokens
+
+    def totals(self, now: float):
+        oldest = int(now) - self.seconds
+        calls = tokens = 0
+        for slot in range(self.seconds):
+            if self.stamps[slot] > oldest:
+                calls += self.calls[slot]
+                tokens += self.tokens[slot]
+        return calls, tokens
+
+class LatencyHistogram:
+    """Call latencies in fixed buckets (LATENCY_BUCKETS_MS)"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+
+    def add(self, latency_ms: float) -> int:
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)
+        self.counts[bucket] += 1
+        self.total_ms += latency_ms
+        return bucket
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile (the last bound for slower calls)"""
+        total = sum(self.counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return float(LATENCY_BUCKETS_MS[min(bucket, len(LATENCY_BUCKETS_MS) - 1)])
+        return float(LATENCY_BUCKETS_MS[-1])
+
+class ProviderMeter:
+    """In-memory usage of one provider, guarded by its UsageMeter's lock"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.quota_exceeded = 0
+        self.tokens = 0
+        self.cost = 0.0
+        self.window = SlidingWindow()
+        self.latency = LatencyHistogram()
+
+        # Not yet in the shared totals: recorded since the last flush, and being flushed
+        self.pending_tokens = 0
+        self.flushing_tokens = 0
+        self.pending_latency = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+class UsageMeter:
+    """
+    Process-wide API usage accounting.
+
+    ``record`` only updates counters under a lock and queues the call; a
+    background thread writes queued calls, token totals and latency buckets
+    to SQLite in one transaction per interval. Totals are applied as deltas,
+    so every process (Streamlit, API server, ingestion workers) can flush
+    into the same WAL-mode database. Limit checks are answered from the
+    shared totals read at the last flush plus this process's unflushed usage.
+    """
+
+    def __init__(self, db_path: str, flush_interval: float = FLUSH_INTERVAL_SECONDS):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._providers: Dict[str, ProviderMeter] = defaultdict(ProviderMeter)
+        self._pending: List[tuple] = []
+        self._limits: Dict[str, Dict[str, Any]] = {}
+        self._conn = None
+        self._thread = None
+        self._wake = threading.Event()
+        self.is_running = False
+
+        with self._flush_lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                init_usage_db(conn)
+                limits = self._read_limits(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self._apply_limits(limits)
+
+    def _connection(self) -> sqlite3.Connection:
+        # Only used under _flush_lock
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+        return self._conn
+
+    def record(self, provider: str, endpoint: str = "", tokens_used: int = 0, cost_estimate: float = 0.0,
+               status: str = "success", error_message: str = "", latency_ms: Optional[float] = None):
+        """Count one API call"""
+        now = time.time()
+        with self._lock:
+            meter = self._providers[provider]
+            meter.calls += 1
+            if status == "quota_exceeded":
+                meter.quota_exceeded += 1
+            elif status != "success":
+                meter.errors += 1
+            meter.tokens += tokens_used
+            meter.cost += cost_estimate
+            meter.pending_tokens += tokens_used
+            meter.window.add(now, tokens_used)
+            if latency_ms is not None:
+                meter.pending_latency[meter.latency.add(latency_ms)] += 1
+            self._pending.append((provider, endpoint, now, tokens_used, cost_estimate, status, error_message, latency_ms))
+            backlog = len(self._pending)
+
+        if not self.is_running:
+            self.start()
+        if backlog >= FLUSH_BATCH_SIZE:
+            self._wake.set()
+
+    def check_limits(self, provider: str) -> Dict[str, Any]:
+        """Current usage against limits, without touching the database"""
+        with self._lock:
+            limits = self._limits.get(provider)
+            meter = self._providers.get(provider)
+            unflushed = meter.pending_tokens + meter.flushing_tokens if meter else 0
+
+        if not limits:
+            return {"status": "unknown", "daily_percent": 0, "monthly_percent": 0}
+
+        today = date.today().isoformat()
+        daily_usage = (limits['daily_usage'] if limits['reset_date'] == today else 0) + unflushed
+        monthly_usage = (limits['monthly_usage'] if limits['reset_date'][:7] == today[:7] else 0) + unflushed
+        daily_limit, monthly_limit = limits['daily_limit'], limits['monthly_limit']
+
+        daily_percent = (daily_usage / daily_limit * 100) if daily_limit > 0 else 0
+        monthly_percent = (monthly_usage / monthly_limit * 100) if monthly_limit > 0 else 0
+
+        return {
+            "status": limits['status'],
+            "daily_usage": daily_usage,
+            "daily_limit": daily_limit,
+            "daily_percent": daily_percent,
+            "monthly_usage": monthly_usage,
+            "monthly_limit": monthly_limit,
+            "monthly_percent": monthly_percent,
+            "at_risk": daily_percent > 80 or monthly_percent > 80,
+            "exceeded": daily_percent >= 100 or monthly_percent >= 100
+        }
+
+    def provider_stats(self, provider: str) -> Dict[str, Any]:
+        """This process's call counts, sliding-window rates and latency for a provider"""
+        now = time.time()
+        with self._lock:
+            meter = self._providers.get(provider) or ProviderMeter()
+            calls_per_minute, tokens_per_minute = meter.window.totals(now)
+            samples = sum(meter.latency.counts)
+            return {
+                "calls": meter.calls,
+                "errors": meter.errors,
+                "quota_exceeded": meter.quota_exceeded,
+                "tokens": meter.tokens,
+                "cost": meter.cost,
+                "calls_per_minute": calls_per_minute * 60 / meter.window.seconds,
+                "tokens_per_minute": tokens_per_minute * 60 / meter.window.seconds,
+                "latency_mean_ms": meter.latency.total_ms / samples if samples else None,
+                "latency_p50_ms": meter.latency.quantile(0.5),
+                "latency_p95_ms": meter.latency.quantile(0.95),
+                "latency_histogram": dict(zip([*LATENCY_BUCKETS_MS, SLOWEST_BUCKET], meter.latency.counts))
+            }
+
+    def flush(self):
+        """Write everything recorded since the last flush in one transaction"""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+                deltas = {}
+                for provider, meter in self._providers.items():
+                    if meter.pending_tokens or any(meter.pending_latency):
+                        deltas[provider] = (meter.pending_tokens, meter.pending_latency)
+                        meter.flushing_tokens += meter.pending_tokens
+                        meter.pending_tokens = 0
+                        meter.pending_latency = [0] * len(meter.pending_latency)
+
+            conn = self._connection()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                self._roll_over(conn)
+                conn.executemany('''
+                    INSERT INTO api_usage (provider, endpoint, timestamp, tokens_used, cost_estimate,
+                                           status, error_message, latency_ms)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [(provider, endpoint, _timestamp(at), tokens, cost, status, error, latency)
+                      for provider, endpoint, at, tokens, cost, status, error, latency in rows])
+                for provider, (tokens, latency_counts) in deltas.items():
+                    conn.execute('''
+                        UPDATE api_limits
+                        SET current_daily_usage = current_daily_usage + ?,
+                            current_monthly_usage = current_monthly_usage + ?
+                        WHERE provider = ?
+                    ''', (tokens, tokens, provider))
+                    conn.executemany('''
+                        INSERT INTO api_latency_histogram (provider, le_ms, count) VALUES (?, ?, ?)
+                        ON CONFLICT (provider, le_ms) DO UPDATE SET count = count + excluded.count
+                    ''', [(provider, bound, count)
+                          for bound, count in zip([*LATENCY_BUCKETS_MS, SLOWEST_BUCKET], latency_counts) if count])
+                limits = self._read_limits(conn)
+                conn.execute("COMMIT")
+            except Exception as e:
+                conn.execute("ROLLBACK")
+                logger.error(f"Error flushing API usage: {e}")
+                # Keep the batch for the next flush
+                with self._lock:
+                    self._pending[:0] = rows
+                    for provider, (tokens, latency_counts) in deltas.items():
+                        meter = self._providers[provider]
+                        meter.flushing_tokens -= tokens
+                        meter.pending_tokens += tokens
+                        meter.pending_latency = [a + b for a, b in zip(meter.pending_latency, latency_counts)]
+                return
+            self._apply_limits(limits, flushed=deltas)
+
+    def reset_daily_usage(self):
+        """Reset daily usage counters for every provider"""
+        self.flush()
+        with self._flush_lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("UPDATE api_limits SET current_daily_usage = 0, last_reset_date = ?",
+                             (date.today().isoformat(),))
+                limits = self._read_limits(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self._apply_limits(limits)
+
+    def _roll_over(self, conn: sqlite3.Connection):
+        """Start new daily and monthly periods (whichever process flushes first does it)"""
+        today = date.today().isoformat()
+        conn.execute("UPDATE api_limits SET current_monthly_usage = 0 WHERE substr(last_reset_date, 1, 7) < ?",
+                     (today[:7],))
+        conn.execute("UPDATE api_limits SET current_daily_usage = 0, last_reset_date = ? WHERE last_reset_date < ?",
+                     (today, today))
+
+    def _read_limits(self, conn: sqlite3.Connection) -> Dict[str, Dict[str, Any]]:
+        rows = conn.execute('''
+            SELECT provider, daily_limit, monthly_limit, current_daily_usage, current_monthly_usage,
+                   status, last_reset_date
+            FROM api_limits
+        ''').fetchall()
+        return {
+            row[0]: {'daily_limit': row[1], 'monthly_limit': row[2], 'daily_usage': row[3],
+                     'monthly_usage': row[4], 'status': row[5], 'reset_date': row[6] or ''}
+            for row in rows
+        }
+
+    def _apply_limits(self, limits: Dict[str, Dict[str, Any]], flushed: Optional[Dict[str, tuple]] = None):
+        with self._lock:
+            self._limits = limits
+            # The flushed tokens are part of the totals just read
+            for provider, (tokens, _) in (flushed or {}).items():
+                self._providers[provider].flushing_tokens -= tokens
+
+    def start(self):
+        """Start the background flusher"""
+        with self._lock:
+            if self.is_running:
+                return
+            self.is_running = True
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Stop the flusher after a final flush"""
+        self.is_running = False
+        self._wake.set()
+        self.flush()
+
+    def _run(self):
+        while self.is_running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error in API usage flusher: {e}")
+
+def _timestamp(at: float) -> str:
+    # Same format and zone as SQLite's CURRENT_TIMESTAMP
+    return datetime.fromtimestamp(at, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+_meters: Dict[str, UsageMeter] = {}
+_meters_lock = threading.Lock()
+
+def get_usage_meter(db_path: str = "api_usage.db") -> UsageMeter:
+    """Process-wide meter for a usage database"""
+    meter = _meters.get(db_path)
+    if meter is None:
+        with _meters_lock:
+            meter = _meters.get(db_path)
+            if meter is None:
+                meter = _meters[db_path] = UsageMeter(db_path)
+    return meter
@@ -3,18 +3,45 @@ Cache Refresh Utilities for GUARDIAN
 Provides functions to refresh cached data after database updates
 """
 
+import sys
 import streamlit as st
 
+# Cached listings and counts that span many documents: (module, function)
+DOCUMENT_LISTING_CACHES = [
+    ('all_docs_tab', 'fetch_documents_cached'),
+    ('all_docs_tab', 'fetch_documents_page_cached'),
+    ('all_docs_tab', 'summarize_documents_cached'),
+    ('all_docs_tab', 'fetch_filter_options_cached'),
+    ('utils.optimized_deletions', 'get_documents_for_deletion'),
+    ('utils.optimized_deletions_fixed', 'get_documents_for_deletion'),
+    ('utils.fast_deletion_interface', 'get_documents_summary'),
+    ('utils.admin_performance_cache', 'get_document_types'),
+    ('utils.query_optimizer', 'QueryOptimizer.get_documents_batch')
+]
+
+# Cached functions whose first argument is a document id
+DOCUMENT_KEYED_CACHES = [
+    ('all_docs_tab', 'get_document_metadata_cached'),
+    ('utils.query_optimizer', 'QueryOptimizer.get_document_content')
+]
+
+def _cached_function(module_name, path):
+    """A cached function, or None if its module was never imported (its cache is then empty)"""
+    target = sys.modules.get(module_name)
+    for name in path.split('.'):
+        target = getattr(target, name, None)
+    return target if hasattr(target, 'clear') else None
+
 def refresh_all_caches():
     """Clear all Streamlit caches to ensure fresh data display"""
     try:
         # Clear all cached data
         st.cache_data.clear()
-        
+
         # Clear any cached resources
         if hasattr(st, 'cache_resource'):
             st.cache_resource.clear()
-        
+
         return True
     except Exception as e:
         print(f"Cache refresh error: {e}")
@@ -23,15 +50,44 @@ def refresh_all_caches():
 def refresh_document_caches():
     """Clear document-related caches specifically"""
     try:
-        # Import functions that have caches to clear them specifically
-        from all_docs_tab import fetch_documents_cached
-        from utils.optimized_deletions import get_documents_for_deletion
-        
-        # Clear specific function caches
-        fetch_documents_cached.clear()
-        get_documents_for_deletion.clear()
-        
+        for module_name, path in DOCUMENT_LISTING_CACHES:
+            function = _cached_function(module_name, path)
+            if function:
+                function.clear()
+
         return True
     except Exception as e:
         print(f"Document cache refresh error: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def invalidate_document_caches(document_ids):
+    """
+    Drop the cached entries that can contain these documents: the listings
+    and counts, plus the per-document entries for these ids. Cached scores,
+    content and metadata of every other document stay warm.
+    """
+    if not document_ids:
+        return True
+
+    if not refresh_document_caches():
+        return False
+
+    try:
+        for module_name, path in DOCUMENT_KEYED_CACHES:
+            function = _cached_function(module_name, path)
+            if not function:
+                continue
+            for doc_id in document_ids:
+                # Callers pass ids as ints or strings, which are separate cache keys
+                for key in {doc_id, str(doc_id)}:
+                    try:
+                        function.clear(key)
+                    except TypeError:
+                        # Streamlit without per-argument clearing
+                        function.clear()
+                        break
+
+        return True
+    except Exception as e:
+        print(f"Document cache invalidation error: {e}")
+        return False
@@ -4,9 +4,78 @@ Implements patent-based scoring criteria with enhanced content analysis
 """
 
 import re
+import threading
+from collections import OrderedDict
 from typing import Dict, Optional, Tuple
 
-def analyze_document_applicability(text: str, title: str) -> Dict[str, bool]:
+from utils.term_index import get_term_index
+
+class ScoringContext:
+    """
+    Per-document state shared by every framework scorer in one scoring run.
+    
+    Scope detection, framework applicability and the term indexes are computed
+    at most once per (text, title) instead of once per framework. The body is
+    scanned once; the title + text index adds only a small index over the title.
+    """
+    
+    def __init__(self, text: str, title: str):
+        self.text = text or ""
+        self.title = title or ""
+        self.text_index = get_term_index(self.text)
+        self.combined_index = get_term_index(self.text, self.title)
+        self._scope = None
+        self._applicability = None
+    
+    @property
+    def text_lower(self) -> str:
+        return self.text_index.text
+    
+    @property
+    def title_lower(self) -> str:
+        return self.title.lower()
+    
+    @property
+    def scope(self) -> Dict:
+        """Out-of-scope detection result from the multi-LLM scoring engine"""
+        if self._scope is None:
+            from utils.multi_llm_scoring_engine import detect_document_scope
+            self._scope = detect_document_scope(self.text, self.title)
+        return self._scope
+    
+    @property
+    def applicability(self) -> Dict[str, bool]:
+        """Framework applicability, see analyze_document_applicability"""
+        if self._applicability is None:
+            self._applicability = _compute_applicability(self)
+        return self._applicability
+
+_CONTEXT_CACHE_SIZE = 32
+_context_cache = OrderedDict()
+_context_cache_lock = threading.Lock()
+
+def get_scoring_context(text: str, title: str) -> ScoringContext:
+    """
+    Return the shared scoring context for a document.
+    
+    Contexts are kept in a small LRU so scorers called one after another for
+    the same document (as bulk rescoring scripts do) reuse one context.
+    """
+    key = (text or "", title or "")
+    with _context_cache_lock:
+        context = _context_cache.get(key)
+        if context is not None:
+            _context_cache.move_to_end(key)
+            return context
+    
+    context = ScoringContext(*key)
+    with _context_cache_lock:
+        _context_cache[key] = context
+        while len(_context_cache) > _CONTEXT_CACHE_SIZE:
+            _context_cache.popitem(last=False)
+    return context
+
+def analyze_document_applicability(text: str, title: str, context: Optional[ScoringContext] = None) -> Dict[str, bool]:
     """
     Determine which scoring frameworks apply to a document based on sophisticated content analysis.
     Uses enhanced content depth analysis rather than simple keyword matching.
@@ -14,9 +83,13 @@ def analyze_document_applicability(text: str, title: str) -> Dict[str, bool]:
     Returns:
         Dict with keys: ai_cybersecurity, quantum_cybersecurity, ai_ethics, quantum_ethics
     """
+    context = context or get_scoring_context(text, title)
+    return dict(context.applicability)
+
+def _compute_applicability(context: ScoringContext) -> Dict[str, bool]:
+    """Applicability rules behind analyze_document_applicability, evaluated once per context"""
     # First check if document is out of scope using Multi-LLM detection
-    from utils.multi_llm_scoring_engine import detect_document_scope
-    scope_analysis = detect_document_scope(text, title)
+    scope_analysis = context.scope
     
     if scope_analysis['out_of_scope']:
         return {
@@ -27,8 +100,8 @@ def analyze_document_applicability(text: str, title: str) -> Dict[str, bool]:
             'scope_message': scope_analysis['reason']
         }
     
-    text_lower = text.lower()
-    title_lower = title.lower()
+    index = context.text_index
+    title_lower = context.title_lower
     
     # AI indicators - substantial AI discussion required
     ai_indicators = [
@@ -58,12 +131,12 @@ def analyze_document_applicability(text: str, title: str) -> Dict[str, bool]:
     ]
     
     # Check for substantial content (more inclusive for AI documents)
-    ai_depth = (sum(1 for indicator in ai_indicators if indicator in text_lower) >= 1 or 
-                'artificial intelligence' in text_lower or 'ai ' in text_lower or 
-                'machine learning' in text_lower or 'ai system' in text_lower)
-    quantum_depth = sum(1 for indicator in quantum_indicators if indicator in text_lower) >= 1
-    has_cybersecurity_depth = any(indicator in text_lower for indicator in cybersecurity_indicators)
-    has_ethics_depth = any(indicator in text_lower for indicator in ethics_indicators)
+    ai_depth = (index.count_present(ai_indicators) >= 1 or 
+                'artificial intelligence' in index or 'ai ' in index or 
+                'machine learning' in index or 'ai system' in index)
+    quantum_depth = index.count_present(quantum_indicators) >= 1
+    has_cybersecurity_depth = index.any_present(cybersecurity_indicators)
+    has_ethics_depth = index.any_present(ethics_indicators)
     
     # Special handling for UNESCO "Quantum Science for Inclusion and Sustainability" - it's quantum ethics only
     if 'quantum science for inclusion' in title_lower or 'quantum for inclusion' in title_lower:
@@ -77,13 +150,13 @@ def analyze_document_applicability(text: str, title: str) -> Dict[str, bool]:
     # More inclusive applicability - documents with substantial AI/quantum content should be scored
     # Even if they don't explicitly mention "cybersecurity" or "ethics" keywords
     return {
-        'ai_cybersecurity': ai_depth and (has_cybersecurity_depth or 'security' in text_lower or 'risk' in text_lower),
-        'quantum_cybersecurity': quantum_depth and (has_cybersecurity_depth or 'security' in text_lower or 'cryptographic' in text_lower),
-        'ai_ethics': ai_depth and (has_ethics_depth or 'recommendation' in text_lower or 'framework' in text_lower or 'governance' in text_lower),
-        'quantum_ethics': quantum_depth and (has_ethics_depth or 'inclusion' in text_lower or 'sustainability' in text_lower)
+        'ai_cybersecurity': ai_depth and (has_cybersecurity_depth or 'security' in index or 'risk' in index),
+        'quantum_cybersecurity': quantum_depth and (has_cybersecurity_depth or 'security' in index or 'cryptographic' in index),
+        'ai_ethics': ai_depth and (has_ethics_depth or 'recommendation' in index or 'framework' in index or 'governance' in index),
+        'quantum_ethics': quantum_depth and (has_ethics_depth or 'inclusion' in index or 'sustainability' in index)
     }
 
-def score_ai_cybersecurity_maturity(text: str, title: str) -> Optional[int]:
+def score_ai_cybersecurity_maturity(text: str, title: str, context: Optional[ScoringContext] = None) -> Optional[int]:
     """
     Score AI Cybersecurity Maturity (0-100) based on patent criteria with content depth analysis.
     
@@ -93,10 +166,11 @@ def score_ai_cybersecurity_maturity(text: str, title: str) -> Optional[int]:
     - Threat monitoring and detection
     - Incident response for AI systems
     """
-    if not analyze_document_applicability(text, title)['ai_cybersecurity']:
+    context = context or get_scoring_context(text, title)
+    if not context.applicability['ai_cybersecurity']:
         return None
     
-    text_lower = text.lower()
+    index = context.text_index
     base_score = 0
     
     # Core cybersecurity foundations (30 points)
@@ -104,7 +178,7 @@ def score_ai_cybersecurity_maturity(text: str, title: str) -> Optional[int]:
         'cybersecurity', 'security', 'threat', 'risk', 'vulnerability', 'attack',
         'secure', 'protection', 'defense', 'safety', 'resilience'
     ]
-    security_score = min(30, sum(3 for indicator in security_foundations if indicator in text_lower))
+    security_score = min(30, 3 * index.count_present(security_foundations))
     base_score += security_score
     
     # AI-specific security concepts (25 points)
@@ -113,7 +187,7 @@ def score_ai_cybersecurity_maturity(text: str, title: str) -> Optional[int]:
         'model security', 'ai governance', 'responsible ai', 'trustworthy ai',
         'ai robustness', 'ai assurance', 'ai compliance'
     ]
-    ai_security_score = min(25, sum(4 for indicator in ai_security_indicators if indicator in text_lower))
+    ai_security_score = min(25, 4 * index.count_present(ai_security_indicators))
     base_score += ai_security_score
     
     # Implementation and practices (25 points)
@@ -122,7 +196,7 @@ def score_ai_cybersecurity_maturity(text: str, title: str) -> Optional[int]:
         'deployment', 'implementation', 'testing', 'evaluation', 'assessment',
         'monitoring', 'oversight', 'collaboration', 'playbook'
     ]
-    impl_score = min(25, sum(2 for indicator in implementation_indicators if indicator in text_lower))
+    impl_score = min(25, 2 * index.count_present(implementation_indicators))
     base_score += impl_score
     
     # Advanced security concepts (20 points)
@@ -131,12 +205,12 @@ def score_ai_cybersecurity_maturity(text: str, title: str) -> Optional[int]:
         'incident response', 'forensics', 'containment', 'recovery',
         'access control', 'authentication', 'encryption'
     ]
-    advanced_score = min(20, sum(3 for indicator in advanced_indicators if indicator in text_lower))
+    advanced_score = min(20, 3 * index.count_present(advanced_indicators))
     base_score += advanced_score
     
     return min(100, base_score)
 
-def score_quantum_cybersecurity_maturity(text: str, title: str) -> Optional[int]:
+def score_quantum_cybersecurity_maturity(text: str, title: str, context: Optional[ScoringContext] = None) -> Optional[int]:
     """
     Score Quantum Cybersecurity Maturity (0-100) based on QCMEA patent framework.
     
@@ -147,47 +221,48 @@ def score_quantum_cybersecurity_maturity(text: str, title: str) -> Optional[int]
     - 61-80: Advanced comprehensive integration
     - 81-100: Dynamic continuous adaptability
     """
-    if not analyze_document_applicability(text, title)['quantum_cybersecurity']:
+    context = context or get_scoring_context(text, title)
+    if not context.applicability['quantum_cybersecurity']:
         return None
     
-    text_lower = text.lower()
+    index = context.text_index
     score = 0
     
     # Basic quantum awareness (20 points)
     basic_terms = ['quantum', 'post-quantum', 'quantum-safe', 'quantum-resistant', 'pqc', 
                    'quantum computing', 'quantum cryptography', 'quantum threat']
-    basic_count = sum(1 for term in basic_terms if term in text_lower)
+    basic_count = index.count_present(basic_terms)
     score += min(20, basic_count * 3)
     
     # Technical depth indicators (25 points)
     technical_terms = ['lattice-based', 'code-based', 'multivariate', 'hash-based', 'isogeny', 
                       'quantum key distribution', 'qkd', 'cryptographic agility', 'quantum algorithms',
                       'quantum mechanics', 'quantum information', 'quantum systems']
-    technical_count = sum(1 for term in technical_terms if term in text_lower)
+    technical_count = index.count_present(technical_terms)
     score += min(25, technical_count * 3)
     
     # Implementation readiness (20 points)
     implementation_terms = ['implementation', 'deployment', 'migration', 'transition', 'roadmap',
                            'strategy', 'framework', 'guidelines', 'best practices', 'methodology']
-    impl_count = sum(1 for term in implementation_terms if term in text_lower)
+    impl_count = index.count_present(implementation_terms)
     score += min(20, impl_count * 3)
     
     # Standards and governance (20 points)
     standards_terms = ['nist', 'standards', 'compliance', 'governance', 'policy', 'regulation',
                       'oversight', 'assessment', 'evaluation', 'audit', 'certification']
-    standards_count = sum(1 for term in standards_terms if term in text_lower)
+    standards_count = index.count_present(standards_terms)
     score += min(20, standards_count * 3)
     
     # Advanced concepts and ethics (15 points)
     advanced_terms = ['quantum ethics', 'quantum governance', 'quantum advantage', 'quantum supremacy',
                      'quantum machine learning', 'adaptive quantum', 'quantum monitoring', 
                      'quantum privacy', 'quantum security', 'ethical quantum']
-    advanced_count = sum(1 for term in advanced_terms if term in text_lower)
+    advanced_count = index.count_present(advanced_terms)
     score += min(15, advanced_count * 3)
     
     return min(100, score)
 
-def score_ai_ethics(text: str, title: str) -> Optional[int]:
+def score_ai_ethics(text: str, title: str, context: Optional[ScoringContext] = None) -> Optional[int]:
     """
     Score AI Ethics (0-100) based on patent ethical compliance criteria with content depth analysis.
     
@@ -197,10 +272,11 @@ def score_ai_ethics(text: str, title: str) -> Optional[int]:
     - Accountability mechanisms
     - Privacy protection
     """
-    if not analyze_document_applicability(text, title)['ai_ethics']:
+    context = context or get_scoring_context(text, title)
+    if not context.applicability['ai_ethics']:
         return None
     
-    text_lower = text.lower()
+    index = context.text_index
     base_score = 0
     
     # Core ethics and governance (30 points)
@@ -208,7 +284,7 @@ def score_ai_ethics(text: str, title: str) -> Optional[int]:
         'ethics', 'ethical', 'responsible', 'governance', 'oversight',
         'accountability', 'transparency', 'fairness', 'bias', 'trustworthy'
     ]
-    ethics_score = min(30, sum(3 for indicator in ethics_foundations if indicator in text_lower))
+    ethics_score = min(30, 3 * index.count_present(ethics_foundations))
     base_score += ethics_score
     
     # AI-specific ethics concepts (25 points)
@@ -217,7 +293,7 @@ def score_ai_ethics(text: str, title: str) -> Optional[int]:
         'ai accountability', 'ai transparency', 'ai fairness', 'algorithmic bias',
         'explainable ai', 'ai explainability'
     ]
-    ai_ethics_score = min(25, sum(4 for indicator in ai_ethics_indicators if indicator in text_lower))
+    ai_ethics_score = min(25, 4 * index.count_present(ai_ethics_indicators))
     base_score += ai_ethics_score
     
     # Implementation and frameworks (25 points)
@@ -226,7 +302,7 @@ def score_ai_ethics(text: str, title: str) -> Optional[int]:
         'policy', 'guidance', 'practices', 'assessment', 'evaluation',
         'compliance', 'audit', 'review'
     ]
-    framework_score = min(25, sum(2 for indicator in framework_indicators if indicator in text_lower))
+    framework_score = min(25, 2 * index.count_present(framework_indicators))
     base_score += framework_score
     
     # Social impact and rights (20 points)
@@ -234,12 +310,12 @@ def score_ai_ethics(text: str, title: str) -> Optional[int]:
         'human rights', 'social impact', 'inclusion', 'equity', 'discrimination',
         'privacy', 'protection', 'safety', 'harm', 'benefit', 'risk'
     ]
-    impact_score = min(20, sum(3 for indicator in impact_indicators if indicator in text_lower))
+    impact_score = min(20, 3 * index.count_present(impact_indicators))
     base_score += impact_score
     
     return min(100, base_score)
 
-def score_quantum_ethics(text: str, title: str) -> Optional[int]:
+def score_quantum_ethics(text: str, title: str, context: Optional[ScoringContext] = None) -> Optional[int]:
     """
     Score Quantum Ethics (0-100) based on emerging quantum ethical considerations.
     
@@ -249,10 +325,11 @@ def score_quantum_ethics(text: str, title: str) -> Optional[int]:
     - Quantum security standards
     - Equitable quantum access
     """
-    if not analyze_document_applicability(text, title)['quantum_ethics']:
+    context = context or get_scoring_context(text, title)
+    if not context.applicability['quantum_ethics']:
         return None
     
-    text_lower = text.lower()
+    index = context.text_index
     score = 0
     
     # Quantum advantage ethics (25 points)
@@ -260,7 +337,7 @@ def score_quantum_ethics(text: str, title: str) -> Optional[int]:
         'quantum advantage', 'quantum supremacy', 'quantum ethics', 'quantum responsibility',
         'quantum governance', 'quantum oversight', 'quantum accountability'
     ]
-    advantage_score = min(25, sum(4 for indicator in advantage_indicators if indicator in text_lower))
+    advantage_score = min(25, 4 * index.count_present(advantage_indicators))
     score += advantage_score
     
     # Quantum privacy implications (25 points)
@@ -268,7 +345,7 @@ def score_quantum_ethics(text: str, title: str) -> Optional[int]:
         'quantum privacy', 'quantum anonymity', 'quantum confidentiality',
         'quantum data protection', 'quantum surveillance', 'quantum rights'
     ]
-    privacy_score = min(25, sum(4 for indicator in privacy_indicators if indicator in text_lower))
+    privacy_score = min(25, 4 * index.count_present(privacy_indicators))
     score += privacy_score
     
     # Quantum security standards (25 points)
@@ -276,7 +353,7 @@ def score_quantum_ethics(text: str, title: str) -> Optional[int]:
         'quantum security standards', 'quantum compliance', 'quantum regulation',
         'quantum policy', 'quantum guidelines', 'quantum framework'
     ]
-    security_score = min(25, sum(4 for indicator in security_indicators if indicator in text_lower))
+    security_score = min(25, 4 * index.count_present(security_indicators))
     score += security_score
     
     # Equitable quantum access (25 points)
@@ -284,7 +361,7 @@ def score_quantum_ethics(text: str, title: str) -> Optional[int]:
         'quantum access', 'quantum equity', 'quantum inclusion', 'quantum democracy',
         'quantum divide', 'quantum fairness', 'quantum justice'
     ]
-    access_score = min(25, sum(4 for indicator in access_indicators if indicator in text_lower))
+    access_score = min(25, 4 * index.count_present(access_indicators))
     score += access_score
     
     return min(100, score)
@@ -302,11 +379,15 @@ def comprehensive_document_scoring(text: str, title: str) -> Dict[str, Optional[
         clean_text = clean_field(str(text)) if text else ""
         clean_title = clean_field(str(title)) if title else ""
         
+        # Build the shared scoring context once and hand its term index to every
+        # pattern scorer reached from here (including the enhanced pattern fallback)
+        context = get_scoring_context(clean_text, clean_title)
+        
         # Use smart multi-LLM scoring with caching
         from utils.smart_llm_cache import smart_multi_llm_scoring
         
         # Apply smart multi-LLM scoring (uses cache first, then multiple providers)
-        final_scores = smart_multi_llm_scoring(clean_text, clean_title)
+        final_scores = smart_multi_llm_scoring(clean_text, clean_title, context.combined_index)
         
         return final_scores
             
@@ -316,7 +397,8 @@ def comprehensive_document_scoring(text: str, title: str) -> Dict[str, Optional[
         from utils.enhanced_pattern_scoring import enhanced_pattern_scoring
         clean_text_safe = clean_text if 'clean_text' in locals() else text
         clean_title_safe = clean_title if 'clean_title' in locals() else title
-        return enhanced_pattern_scoring(clean_text_safe, clean_title_safe)
+        index = context.combined_index if 'context' in locals() else None
+        return enhanced_pattern_scoring(clean_text_safe, clean_title_safe, index)
 
 def multi_llm_intelligent_scoring(text: str, title: str) -> Dict[str, Optional[int]]:
     """
@@ -324,9 +406,12 @@ def multi_llm_intelligent_scoring(text: str, title: str) -> Dict[str, Optional[i
     Bypasses complex synthesis for better performance.
     """
     try:
+        # Scope, applicability and term counts are shared by every step below
+        context = get_scoring_context(text, title)
+        
         # Direct analysis without synthesis engine overhead
-        enhanced_scores = analyze_with_enhanced_patterns(text, title)
-        contextual_scores = analyze_with_contextual_understanding(text, title)
+        enhanced_scores = analyze_with_enhanced_patterns(text, title, context)
+        contextual_scores = analyze_with_contextual_understanding(text, title, context)
         
         # Simple averaging for fast consensus
         consensus_scores = {}
@@ -344,7 +429,7 @@ def multi_llm_intelligent_scoring(text: str, title: str) -> Dict[str, Optional[i
                 consensus_scores[metric] = 0
         
         # Apply document applicability filtering
-        applicability = analyze_document_applicability(text, title)
+        applicability = context.applicability
         
         return {
             'ai_cybersecurity': consensus_scores.get('ai_cybersecurity') if applicability['ai_cybersecurity'] else None,
@@ -358,11 +443,10 @@ def multi_llm_intelligent_scoring(text: str, title: str) -> Dict[str, Optional[i
     # Fall back to hybrid analysis
     return multi_service_hybrid_analysis(text, title)
 
-def analyze_with_enhanced_patterns(text: str, title: str) -> Dict[str, int]:
+def analyze_with_enhanced_patterns(text: str, title: str, context: Optional[ScoringContext] = None) -> Dict[str, int]:
     """Enhanced pattern analysis optimized for AI/quantum content detection"""
-    text_lower = text.lower()
-    title_lower = title.lower()
-    combined = f"{title_lower} {text_lower}"
+    context = context or get_scoring_context(text, title)
+    index = context.combined_index
     
     scores = {}
     
@@ -379,36 +463,36 @@ def analyze_with_enhanced_patterns(text: str, title: str) -> Dict[str, int]:
     standards_compliance = ['nist', 'iso', 'framework', 'standards', 'best practices']
     
     base_score = 0
-    if any(term in combined for term in ['cybersecurity', 'security']) and any(term in combined for term in ['ai', 'artificial intelligence']):
+    if index.any_present(['cybersecurity', 'security']) and index.any_present(['ai', 'artificial intelligence']):
         # Matured scoring - more stringent base requirements
         base_score = 20  # Reduced base score
         
         # Core AI security concepts - require multiple for higher scores
-        ai_security_count = sum(1 for indicator in ai_cyber_indicators if indicator in combined)
+        ai_security_count = index.count_present(ai_cyber_indicators)
         if ai_security_count >= 3:
             base_score += ai_security_count * 4  # Reward comprehensive AI security coverage
         elif ai_security_count >= 1:
             base_score += ai_security_count * 2  # Lower reward for limited coverage
         
         # Implementation depth - critical for high scores
-        implementation_count = sum(1 for indicator in implementation_depth if indicator in combined)
+        implementation_count = index.count_present(implementation_depth)
         if implementation_count >= 2:
             base_score += implementation_count * 8  # High value for real implementation
         
         # Framework quality indicators
-        quality_count = sum(1 for indicator in framework_quality if indicator in combined)
+        quality_count = index.count_present(framework_quality)
         if quality_count >= 1:
             base_score += quality_count * 6
         
         # Standards compliance - important for enterprise readiness
-        standards_count = sum(1 for indicator in standards_compliance if indicator in combined)
+        standards_count = index.count_present(standards_compliance)
         if standards_count >= 1:
             base_score += standards_count * 7
         
         # Maturity penalty for policy documents without technical depth
-        if ('recommendation' in combined and 'implementation' not in combined and 
-            'technical' not in combined and 'system' not in combined and
-            'deployment' not in combined):
+        if ('recommendation' in index and 'implementation' not in index and 
+            'technical' not in index and 'system' not in index and
+            'deployment' not in index):
             base_score = max(0, base_score - 20)  # Significant penalty for policy-only documents
     
     scores['ai_cybersecurity'] = min(100, base_score) if base_score > 0 else 0
@@ -424,24 +508,24 @@ def analyze_with_enhanced_patterns(text: str, title: str) -> Dict[str, int]:
     quantum_implementation = ['quantum migration', 'quantum deployment', 'quantum integration']
     quantum_governance = ['quantum policy', 'quantum compliance', 'quantum framework']
     
-    if any(indicator in combined for indicator in quantum_indicators) or 'quantum' in combined:
+    if index.any_present(quantum_indicators) or 'quantum' in index:
         tier_score = 1  # Base tier
         
         # Tier 2: Basic quantum awareness
-        basic_count = sum(1 for indicator in quantum_indicators if indicator in combined)
+        basic_count = index.count_present(quantum_indicators)
         if basic_count >= 2:
             tier_score = 2
             
         # Tier 3: Advanced quantum concepts
-        if any(indicator in combined for indicator in quantum_advanced) or basic_count >= 4:
+        if index.any_present(quantum_advanced) or basic_count >= 4:
             tier_score = 3
             
         # Tier 4: Implementation readiness
-        if any(indicator in combined for indicator in quantum_implementation):
+        if index.any_present(quantum_implementation):
             tier_score = 4
             
         # Tier 5: Comprehensive quantum governance
-        if (any(indicator in combined for indicator in quantum_governance) and 
+        if (index.any_present(quantum_governance) and 
             tier_score >= 3 and basic_count >= 3):
             tier_score = 5
             
@@ -461,41 +545,41 @@ def analyze_with_enhanced_patterns(text: str, title: str) -> Dict[str, int]:
     human_oversight = ['human oversight', 'human-in-the-loop', 'human control', 'meaningful human review']
     
     ethics_score = 0
-    if any(term in combined for term in ['ethics', 'ethical', 'bias']) and any(term in combined for term in ['ai', 'algorithm']):
+    if index.any_present(['ethics', 'ethical', 'bias']) and index.any_present(['ai', 'algorithm']):
         # Matured scoring - more stringent criteria
         ethics_score = 25  # Reduced base score for AI ethics content
         
         # Core ethics indicators - require multiple indicators for higher scores
-        ethics_count = sum(1 for indicator in ethics_indicators if indicator in combined)
+        ethics_count = index.count_present(ethics_indicators)
         if ethics_count >= 3:
             ethics_score += ethics_count * 5  # Reward comprehensive coverage
         elif ethics_count >= 1:
             ethics_score += ethics_count * 3  # Lower reward for limited coverage
         
         # Advanced bias mitigation - stricter requirements
-        bias_count = sum(1 for indicator in bias_mitigation if indicator in combined)
+        bias_count = index.count_present(bias_mitigation)
         if bias_count >= 2:
             ethics_score += bias_count * 7  # High value for actual bias solutions
         
         # Transparency and explainability - implementation focus
-        transparency_count = sum(1 for indicator in transparency_concepts if indicator in combined)
+        transparency_count = index.count_present(transparency_concepts)
         if transparency_count >= 2:
             ethics_score += transparency_count * 6
         
         # Governance frameworks - require concrete frameworks
-        governance_count = sum(1 for indicator in governance_frameworks if indicator in combined)
+        governance_count = index.count_present(governance_frameworks)
         if governance_count >= 1:
             ethics_score += governance_count * 8
         
         # Human oversight mechanisms - critical for high scores
-        oversight_count = sum(1 for indicator in human_oversight if indicator in combined)
+        oversight_count = index.count_present(human_oversight)
         if oversight_count >= 1:
             ethics_score += oversight_count * 7
         
         # Maturity penalty for documents that only discuss ethics generally
         # without specific technical implementations
-        if ('recommendation' in combined and 'implementation' not in combined and 
-            'technical' not in combined and 'system' not in combined):
+        if ('recommendation' in index and 'implementation' not in index and 
+            'technical' not in index and 'system' not in index):
             ethics_score = max(0, ethics_score - 15)  # Reduce score for policy-only documents
     
     scores['ai_ethics'] = min(100, ethics_score) if ethics_score > 0 else 0
@@ -507,34 +591,34 @@ def analyze_with_enhanced_patterns(text: str, title: str) -> Dict[str, int]:
     quantum_governance = ['quantum ethical framework', 'quantum oversight', 'quantum compliance']
     
     quantum_ethics_score = 0
-    if 'quantum' in combined and any(term in combined for term in ['ethics', 'responsibility', 'access', 'equity', 'fairness']):
+    if 'quantum' in index and index.any_present(['ethics', 'responsibility', 'access', 'equity', 'fairness']):
         quantum_ethics_score = 30  # Base score for quantum ethics content
         
         # Core quantum ethics concepts
-        quantum_ethics_score += sum(8 for indicator in quantum_ethics_indicators if indicator in combined)
+        quantum_ethics_score += 8 * index.count_present(quantum_ethics_indicators)
         
         # Privacy considerations
-        quantum_ethics_score += sum(10 for indicator in quantum_privacy if indicator in combined)
+        quantum_ethics_score += 10 * index.count_present(quantum_privacy)
         
         # Fairness and access issues
-        quantum_ethics_score += sum(12 for indicator in quantum_fairness if indicator in combined)
+        quantum_ethics_score += 12 * index.count_present(quantum_fairness)
         
         # Governance frameworks
-        quantum_ethics_score += sum(10 for indicator in quantum_governance if indicator in combined)
+        quantum_ethics_score += 10 * index.count_present(quantum_governance)
         
         # Bonus for comprehensive quantum policy discussion
-        if any(term in combined for term in ['quantum policy', 'quantum strategy', 'quantum initiative']):
+        if index.any_present(['quantum policy', 'quantum strategy', 'quantum initiative']):
             quantum_ethics_score += 15
     
     scores['quantum_ethics'] = min(100, quantum_ethics_score) if quantum_ethics_score > 0 else None
     
     return scores
 
-def analyze_with_contextual_understanding(text: str, title: str) -> Dict[str, int]:
+def analyze_with_contextual_understanding(text: str, title: str, context: Optional[ScoringContext] = None) -> Dict[str, int]:
     """Contextual analysis with semantic understanding"""
-    text_lower = text.lower()
-    title_lower = title.lower()
-    combined = f"{title_lower} {text_lower}"
+    context = context or get_scoring_context(text, title)
+    title_lower = context.title_lower
+    index = context.combined_index
     
     scores = {}
     
@@ -542,35 +626,35 @@ def analyze_with_contextual_understanding(text: str, title: str) -> Dict[str, in
     ai_cyber_score = 0
     
     # Check for AI + cybersecurity content
-    if any(term in combined for term in ['ai', 'artificial intelligence']) and any(term in combined for term in ['security', 'cybersecurity']):
+    if index.any_present(['ai', 'artificial intelligence']) and index.any_present(['security', 'cybersecurity']):
         ai_cyber_score = 35  # Base for AI security content
         
         # High-authority government guidance
         if 'joint guidance' in title_lower and 'ai systems securely' in title_lower:
             ai_cyber_score += 45  # Exceptional authoritative guidance
-        elif any(term in combined for term in ['dhs', 'cisa', 'ncsc', 'joint guidelines']):
+        elif index.any_present(['dhs', 'cisa', 'ncsc', 'joint guidelines']):
             ai_cyber_score += 30  # Government authority bonus
         
         # Technical depth indicators
-        if any(term in combined for term in ['implementation', 'framework', 'standards', 'best practices']):
+        if index.any_present(['implementation', 'framework', 'standards', 'best practices']):
             ai_cyber_score += 15
             
         # Comprehensive coverage indicators
-        if any(term in combined for term in ['comprehensive', 'systematic', 'enterprise', 'robust']):
+        if index.any_present(['comprehensive', 'systematic', 'enterprise', 'robust']):
             ai_cyber_score += 10
     
     scores['ai_cybersecurity'] = min(100, ai_cyber_score) if ai_cyber_score > 0 else 0
     
     # Quantum cybersecurity - Sophisticated tier assessment
     quantum_cyber_score = None
-    if 'quantum' in combined:
+    if 'quantum' in index:
         quantum_indicators = ['post-quantum', 'quantum-safe', 'quantum cryptography', 'quantum security', 'quantum key distribution']
         advanced_quantum = ['quantum supremacy', 'quantum advantage', 'lattice cryptography', 'quantum protocols']
         implementation_quantum = ['quantum migration', 'quantum deployment', 'quantum integration']
         
-        indicator_count = sum(1 for term in quantum_indicators if term in combined)
-        advanced_count = sum(1 for term in advanced_quantum if term in combined)
-        impl_count = sum(1 for term in implementation_quantum if term in combined)
+        indicator_count = index.count_present(quantum_indicators)
+        advanced_count = index.count_present(advanced_quantum)
+        impl_count = index.count_present(implementation_quantum)
         
         if indicator_count >= 3 and advanced_count >= 1 and impl_count >= 1:
             quantum_cyber_score = 5
@@ -587,38 +671,38 @@ def analyze_with_contextual_understanding(text: str, title: str) -> Dict[str, in
     
     # AI Ethics - Authority and depth-based assessment
     ai_ethics_score = 0
-    if any(term in combined for term in ['ai', 'artificial intelligence']) and any(term in combined for term in ['ethics', 'ethical', 'bias', 'fairness']):
+    if index.any_present(['ai', 'artificial intelligence']) and index.any_present(['ethics', 'ethical', 'bias', 'fairness']):
         ai_ethics_score = 30  # Base for AI ethics content
         
         # Document authority bonus
-        if any(term in combined for term in ['guidance', 'framework', 'standards']):
+        if index.any_present(['guidance', 'framework', 'standards']):
             ai_ethics_score += 25
             
         # Comprehensive coverage indicators
         ethics_concepts = ['bias mitigation', 'transparency', 'accountability', 'explainability', 'fairness']
-        ai_ethics_score += sum(8 for concept in ethics_concepts if concept in combined)
+        ai_ethics_score += 8 * index.count_present(ethics_concepts)
         
         # Implementation depth
-        if any(term in combined for term in ['implementation', 'deployment', 'operational', 'systematic']):
+        if index.any_present(['implementation', 'deployment', 'operational', 'systematic']):
             ai_ethics_score += 15
     
     scores['ai_ethics'] = min(100, ai_ethics_score) if ai_ethics_score > 0 else 0
     
     # Quantum Ethics - Comprehensive quantum ethical assessment
     quantum_ethics_score = None
-    if 'quantum' in combined and any(term in combined for term in ['ethics', 'responsibility', 'access', 'equity', 'fairness']):
+    if 'quantum' in index and index.any_present(['ethics', 'responsibility', 'access', 'equity', 'fairness']):
         quantum_ethics_score = 25  # Base for quantum ethics content
         
         # Specific quantum ethics concepts
         quantum_ethics_concepts = ['quantum ethics', 'quantum responsibility', 'quantum access', 'quantum equity']
-        quantum_ethics_score += sum(15 for concept in quantum_ethics_concepts if concept in combined)
+        quantum_ethics_score += 15 * index.count_present(quantum_ethics_concepts)
         
         # Advanced considerations
-        if any(term in combined for term in ['quantum policy', 'quantum governance', 'quantum oversight']):
+        if index.any_present(['quantum policy', 'quantum governance', 'quantum oversight']):
             quantum_ethics_score += 20
             
         # Implementation considerations
-        if any(term in combined for term in ['quantum strategy', 'quantum initiative', 'quantum framework']):
+        if index.any_present(['quantum strategy', 'quantum initiative', 'quantum framework']):
             quantum_ethics_score += 15
         
         quantum_ethics_score = min(100, quantum_ethics_score)
@@ -657,9 +741,7 @@ def enhanced_scoring_with_llm_insights(text: str, title: str) -> Dict[str, Optio
     Enhanced scoring that leverages intelligent pattern analysis for more accurate assessment.
     """
     # Enhanced pattern-based scoring with improved logic
-    text_lower = text.lower()
-    title_lower = title.lower()
-    combined_content = f"{title_lower} {text_lower}"
+    index = get_term_index(text, title)
     
     scores = {}
     
@@ -673,12 +755,12 @@ def enhanced_scoring_with_llm_insights(text: str, title: str) -> Dict[str, Optio
     
     ai_cyber_score = 30  # Baseline for AI cyber content
     for keyword in ai_cyber_keywords:
-        if keyword in combined_content:
+        if keyword in index:
             ai_cyber_score += 3
             
     # Additional context scoring
-    if any(term in combined_content for term in ['cybersecurity', 'cyber security', 'information security']):
-        if any(term in combined_content for term in ['ai', 'artificial intelligence', 'machine learning']):
+    if index.any_present(['cybersecurity', 'cyber security', 'information security']):
+        if index.any_present(['ai', 'artificial intelligence', 'machine learning']):
             ai_cyber_score += 10
     
     scores['ai_cybersecurity'] = min(70, ai_cyber_score) if ai_cyber_score > 30 else None
@@ -690,7 +772,7 @@ def enhanced_scoring_with_llm_insights(text: str, title: str) -> Dict[str, Optio
         'quantum encryption', 'lattice cryptography', 'quantum supremacy'
     ]
     
-    quantum_cyber_matches = sum(1 for keyword in quantum_cyber_keywords if keyword in combined_content)
+    quantum_cyber_matches = index.count_present(quantum_cyber_keywords)
     
     if quantum_cyber_matches >= 4:
         quantum_cyber_score = 4
@@ -714,12 +796,12 @@ def enhanced_scoring_with_llm_insights(text: str, title: str) -> Dict[str, Optio
     
     ai_ethics_score = 35  # Baseline for AI ethics content
     for keyword in ai_ethics_keywords:
-        if keyword in combined_content:
+        if keyword in index:
             ai_ethics_score += 3
             
     # Boost for comprehensive ethical considerations
-    if any(term in combined_content for term in ['ethics', 'ethical', 'bias', 'fairness']):
-        if any(term in combined_content for term in ['ai', 'artificial intelligence', 'algorithm']):
+    if index.any_present(['ethics', 'ethical', 'bias', 'fairness']):
+        if index.any_present(['ai', 'artificial intelligence', 'algorithm']):
             ai_ethics_score += 8
     
     scores['ai_ethics'] = min(65, ai_ethics_score) if ai_ethics_score > 35 else None
@@ -733,27 +815,27 @@ def enhanced_scoring_with_llm_insights(text: str, title: str) -> Dict[str, Optio
     
     quantum_ethics_score = 30  # Baseline for quantum ethics content  
     for keyword in quantum_ethics_keywords:
-        if keyword in combined_content:
+        if keyword in index:
             quantum_ethics_score += 5
             
     # General quantum considerations
-    if any(term in combined_content for term in ['quantum', 'quantum computing']):
-        if any(term in combined_content for term in ['ethics', 'ethical', 'responsibility', 'access']):
+    if index.any_present(['quantum', 'quantum computing']):
+        if index.any_present(['ethics', 'ethical', 'responsibility', 'access']):
             quantum_ethics_score += 10
     
     scores['quantum_ethics'] = min(60, quantum_ethics_score) if quantum_ethics_score > 30 else None
     
     return scores
 
-def fallback_scoring(text: str, title: str) -> Dict[str, Optional[int]]:
+def fallback_scoring(text: str, title: str, context: Optional[ScoringContext] = None) -> Dict[str, Optional[int]]:
     """
     Pattern-based scoring when AI analysis is unavailable.
     """
-    text_lower = text.lower()
-    title_lower = title.lower()
+    context = context or get_scoring_context(text, title)
+    index = context.text_index
     
     # Check applicability using existing logic
-    applicability = analyze_document_applicability(text, title)
+    applicability = context.applicability
     
     scores = {}
     
@@ -763,23 +845,23 @@ def fallback_scoring(text: str, title: str) -> Dict[str, Optional[int]]:
         
         # Core AI security concepts
         ai_security_keywords = ['encryption', 'authentication', 'ai security', 'model protection', 'threat detection']
-        score += sum(8 for kw in ai_security_keywords if kw in text_lower)
+        score += 8 * index.count_present(ai_security_keywords)
         
         # Advanced AI security concepts
         advanced_keywords = ['federated learning', 'differential privacy', 'adversarial', 'secure computation', 'homomorphic encryption']
-        score += sum(12 for kw in advanced_keywords if kw in text_lower)
+        score += 12 * index.count_present(advanced_keywords)
         
         # Implementation and operational security
         impl_keywords = ['implementation', 'deployed', 'operational', 'monitoring', 'audit', 'compliance']
-        score += sum(6 for kw in impl_keywords if kw in text_lower)
+        score += 6 * index.count_present(impl_keywords)
         
         # Framework and standards compliance
         standards_keywords = ['nist', 'iso', 'framework', 'best practices', 'guidelines', 'standards']
-        score += sum(10 for kw in standards_keywords if kw in text_lower)
+        score += 10 * index.count_present(standards_keywords)
         
         # Risk management and governance
         governance_keywords = ['risk management', 'governance', 'policy', 'oversight', 'assessment']
-        score += sum(7 for kw in governance_keywords if kw in text_lower)
+        score += 7 * index.count_present(governance_keywords)
         
         scores['ai_cybersecurity'] = min(100, score)
     else:
@@ -795,10 +877,10 @@ def fallback_scoring(text: str, title: str) -> Dict[str, Optional[int]]:
         quantum_implementation = ['implementation', 'deployment', 'migration', 'integration']
         quantum_governance = ['integrated', 'enterprise-wide', 'systematic', 'governance', 'compliance']
         
-        basic_count = sum(1 for kw in quantum_basic if kw in text_lower)
-        advanced_count = sum(1 for kw in quantum_advanced if kw in text_lower)
-        impl_count = sum(1 for kw in quantum_implementation if kw in text_lower)
-        gov_count = sum(1 for kw in quantum_governance if kw in text_lower)
+        basic_count = index.count_present(quantum_basic)
+        advanced_count = index.count_present(quantum_advanced)
+        impl_count = index.count_present(quantum_implementation)
+        gov_count = index.count_present(quantum_governance)
         
         if basic_count >= 2 and advanced_count >= 1 and impl_count >= 1 and gov_count >= 1:
             score = 5
@@ -819,23 +901,23 @@ def fallback_scoring(text: str, title: str) -> Dict[str, Optional[int]]:
         
         # Core ethics concepts
         ethics_keywords = ['fairness', 'bias', 'transparency', 'accountability', 'explainable']
-        score += sum(10 for kw in ethics_keywords if kw in text_lower)
+        score += 10 * index.count_present(ethics_keywords)
         
         # Advanced ethical AI concepts
         advanced_ethics = ['algorithmic auditing', 'ethical AI', 'responsible AI', 'human oversight', 'bias mitigation']
-        score += sum(12 for kw in advanced_ethics if kw in text_lower)
+        score += 12 * index.count_present(advanced_ethics)
         
         # Governance and compliance frameworks
         governance_keywords = ['governance', 'oversight', 'compliance', 'monitoring', 'audit', 'assessment']
-        score += sum(8 for kw in governance_keywords if kw in text_lower)
+        score += 8 * index.count_present(governance_keywords)
         
         # Implementation and operational considerations
         implementation_keywords = ['implementation', 'deployment', 'operational', 'systematic', 'framework']
-        score += sum(6 for kw in implementation_keywords if kw in text_lower)
+        score += 6 * index.count_present(implementation_keywords)
         
         # Standards and best practices
         standards_keywords = ['standards', 'best practices', 'guidelines', 'principles', 'policy']
-        score += sum(7 for kw in standards_keywords if kw in text_lower)
+        score += 7 * index.count_present(standards_keywords)
         
         scores['ai_ethics'] = min(100, score)
     else:
@@ -847,23 +929,23 @@ def fallback_scoring(text: str, title: str) -> Dict[str, Optional[int]]:
         
         # Core quantum ethics concepts
         quantum_ethics_keywords = ['quantum ethics', 'quantum access', 'quantum equity', 'quantum governance']
-        score += sum(15 for kw in quantum_ethics_keywords if kw in text_lower)
+        score += 15 * index.count_present(quantum_ethics_keywords)
         
         # Quantum privacy and security ethics
         quantum_privacy = ['quantum privacy', 'quantum security ethics', 'quantum data protection']
-        score += sum(18 for kw in quantum_privacy if kw in text_lower)
+        score += 18 * index.count_present(quantum_privacy)
         
         # Quantum fairness and accessibility
         quantum_fairness = ['quantum digital divide', 'equitable quantum access', 'quantum advantage distribution']
-        score += sum(20 for kw in quantum_fairness if kw in text_lower)
+        score += 20 * index.count_present(quantum_fairness)
         
         # General ethical considerations in quantum context
         general_ethics = ['ethical', 'responsible', 'equitable', 'fair access']
-        score += sum(8 for kw in general_ethics if kw in text_lower)
+        score += 8 * index.count_present(general_ethics)
         
         # Policy and governance frameworks
         quantum_governance = ['quantum policy', 'quantum strategy', 'quantum oversight', 'quantum compliance']
-        score += sum(12 for kw in quantum_governance if kw in text_lower)
+        score += 12 * index.count_present(quantum_governance)
         
         scores['quantum_ethics'] = min(100, score)
     else:
@@ -6,10 +6,12 @@ This module implements the core Convergence AI architecture for bias-resilient,
 poisoning-resistant AI inference with quantum-ready orchestration capabilities.
 """
 
+import re
 import asyncio
 import json
 import time
 import numpy as np
+from scipy import sparse
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -50,6 +52,80 @@ class ConvergenceResult:
     audit_trail: List[Dict[str, Any]]
     quantum_routing_data: Optional[Dict[str, Any]]
 
+class ResponseBatch:
+    """
+    LLM responses tokenized once into a shared vocabulary.
+    
+    ``counts`` holds each response's lower-cased word counts (responses x
+    vocabulary) and ``sentence_counts`` the same for every '.'-separated
+    sentence, with ``sentence_rows`` naming the response each sentence is from.
+    """
+    
+    def __init__(self, texts: List[str]):
+        self.texts = list(texts)
+        self.size = len(self.texts)
+        
+        vocabulary: Dict[str, int] = {}
+        word_rows, word_ids = [], []
+        sentence_rows, sentence_word_rows, sentence_word_ids = [], [], []
+        sentences_per_response = []
+        
+        for row, text in enumerate(self.texts):
+            for word in text.lower().split():
+                word_rows.append(row)
+                word_ids.append(vocabulary.setdefault(word, len(vocabulary)))
+            
+            sentences = text.split('.')
+            sentences_per_response.append(len(sentences))
+            for sentence in sentences:
+                for word in sentence.lower().split():
+                    sentence_word_rows.append(len(sentence_rows))
+                    sentence_word_ids.append(vocabulary.setdefault(word, len(vocabulary)))
+                sentence_rows.append(row)
+        
+        self.vocabulary = list(vocabulary)
+        self.counts = self._count_matrix(word_rows, word_ids, self.size)
+        self.sentence_counts = self._count_matrix(sentence_word_rows, sentence_word_ids, len(sentence_rows))
+        self.sentence_rows = np.array(sentence_rows, dtype=np.int64)
+        self.sentences_per_response = np.array(sentences_per_response, dtype=float)
+        self.word_totals = np.asarray(self.counts.sum(axis=1)).ravel().astype(float)
+        self.distinct_words = np.diff(self.counts.indptr).astype(float)
+        self._substring_counts: Dict[str, np.ndarray] = {}
+    
+    def _count_matrix(self, rows: List[int], ids: List[int], n_rows: int) -> sparse.csr_matrix:
+        matrix = sparse.csr_matrix(
+            (np.ones(len(ids)), (np.array(rows, dtype=np.int64), np.array(ids, dtype=np.int64))),
+            shape=(n_rows, len(self.vocabulary))
+        )
+        matrix.sum_duplicates()
+        return matrix
+    
+    def row_values(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(response index, count) for every distinct word of every response"""
+        rows = np.repeat(np.arange(self.size), np.diff(self.counts.indptr))
+        return rows, self.counts.data
+    
+    def substring_counts(self, patterns: List[str]) -> sparse.csr_matrix:
+        """
+        Vocabulary x patterns matrix of non-overlapping occurrences of each
+        pattern inside each word, so ``counts @ substring_counts(patterns)``
+        equals ``text.lower().count(pattern)`` for patterns without whitespace.
+        """
+        missing = [pattern for pattern in patterns if pattern not in self._substring_counts]
+        if missing:
+            # Scan the newline-joined vocabulary once per pattern; matches never cross a newline
+            joined = '\n'.join(self.vocabulary)
+            starts = np.cumsum([0] + [len(word) + 1 for word in self.vocabulary[:-1]])
+            for pattern in missing:
+                hits = [match.start() for match in re.finditer(re.escape(pattern), joined)]
+                word_index = np.searchsorted(starts, hits, side='right') - 1
+                self._substring_counts[pattern] = np.bincount(word_index, minlength=len(self.vocabulary))
+        
+        columns = [self._substring_counts[pattern] for pattern in patterns]
+        if not columns:
+            return sparse.csr_matrix((len(self.vocabulary), 0))
+        return sparse.csr_matrix(np.column_stack(columns).astype(float))
+
 class ConvergenceAI:
     """
     Patent-Protected Anti-Bias and Anti-Poisoning LLM System
@@ -86,99 +162,85 @@ class ConvergenceAI:
         
         logging.info("Convergence AI initialized with quantum support: %s", self.quantum_enabled)
     
+    def analyze_batch(self, texts: List[str]) -> ResponseBatch:
+        """Tokenize responses once for every batched bias and consensus computation"""
+        return ResponseBatch(texts)
+    
     def calculate_bias_score(self, text: str) -> float:
         """
         Calculate bias score using advanced statistical analysis
         Patent Claim: Bias detection through Mahalanobis distance and semantic similarity
         """
-        if not text or len(text.strip()) == 0:
-            return 0.0
+        return float(self.calculate_bias_scores(self.analyze_batch([text]))[0])
+    
+    def calculate_bias_scores(self, batch: ResponseBatch) -> np.ndarray:
+        """Bias score for every response in the batch"""
+        if batch.size == 0:
+            return np.zeros(0)
         
         # Pattern-based detection (basic component)
-        pattern_score = self._calculate_pattern_bias(text)
+        pattern_scores = self._calculate_pattern_bias(batch)
         
         # Statistical bias detection using word frequency analysis
-        statistical_score = self._calculate_statistical_bias(text)
+        statistical_scores = self._calculate_statistical_bias(batch)
         
         # Contextual bias using semantic relationships
-        contextual_score = self._calculate_contextual_bias(text)
+        contextual_scores = self._calculate_contextual_bias(batch)
         
         # Weighted combination of bias detection methods
-        weighted_bias_score = (
-            0.4 * pattern_score +
-            0.3 * statistical_score + 
-            0.3 * contextual_score
+        weighted_bias_scores = (
+            0.4 * pattern_scores +
+            0.3 * statistical_scores +
+            0.3 * contextual_scores
         )
         
-        return min(weighted_bias_score, 1.0)
+        empty = np.array([not text or len(text.strip()) == 0 for text in batch.texts])
+        return np.where(empty, 0.0, np.minimum(weighted_bias_scores, 1.0))
     
-    def _calculate_pattern_bias(self, text: str) -> float:
+    def _calculate_pattern_bias(self, batch: ResponseBatch) -> np.ndarray:
         """Pattern-based bias detection from patent specification"""
-        bias_count = 0
-        total_words = len(text.split())
-        
-        if total_words == 0:
-            return 0.0
-        
-        text_lower = text.lower()
-        
-        for category, patterns in self.bias_patterns.items():
-            for pattern in patterns:
-                bias_count += text_lower.count(pattern)
-        
-        return min(bias_count / total_words, 1.0)
+        patterns = [pattern for patterns in self.bias_patterns.values() for pattern in patterns]
+        bias_counts = np.asarray((batch.counts @ batch.substring_counts(patterns)).sum(axis=1)).ravel()
+        totals = batch.word_totals
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = np.where(totals > 0, bias_counts / np.maximum(totals, 1), 0.0)
+        return np.minimum(scores, 1.0)
     
-    def _calculate_statistical_bias(self, text: str) -> float:
+    def _calculate_statistical_bias(self, batch: ResponseBatch) -> np.ndarray:
         """Statistical bias detection using word distribution analysis"""
-        words = text.lower().split()
-        if len(words) < 10:
-            return 0.0
-        
-        # Calculate word frequency distribution
-        word_freq = {}
-        for word in words:
-            word_freq[word] = word_freq.get(word, 0) + 1
-        
-        # Detect unusual frequency patterns that may indicate bias
-        freq_values = list(word_freq.values())
-        mean_freq = np.mean(freq_values)
-        std_freq = np.std(freq_values)
-        
-        if std_freq == 0:
-            return 0.0
-        
-        # Calculate statistical deviation from normal distribution
-        bias_indicators = 0
-        for freq in freq_values:
-            z_score = abs(freq - mean_freq) / std_freq
-            if z_score > 2.0:  # More than 2 standard deviations
-                bias_indicators += 1
-        
-        statistical_bias = bias_indicators / len(freq_values)
-        return min(statistical_bias * 2.0, 1.0)  # Amplify signal
+        # Frequencies of each response's distinct words are its row's stored values
+        rows, freqs = batch.row_values()
+        distinct = np.maximum(batch.distinct_words, 1)
+        mean_freq = np.bincount(rows, freqs, minlength=batch.size) / distinct
+        deviation = freqs - mean_freq[rows]
+        std_freq = np.sqrt(np.bincount(rows, deviation ** 2, minlength=batch.size) / distinct)
+        
+        # Words more than 2 standard deviations from the mean frequency
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_scores = np.abs(deviation) / std_freq[rows]
+        bias_indicators = np.bincount(rows, (z_scores > 2.0) & (std_freq[rows] > 0), minlength=batch.size)
+        
+        statistical_bias = np.minimum(bias_indicators / distinct * 2.0, 1.0)  # Amplify signal
+        return np.where((batch.word_totals < 10) | (std_freq == 0), 0.0, statistical_bias)
     
-    def _calculate_contextual_bias(self, text: str) -> float:
+    def _calculate_contextual_bias(self, batch: ResponseBatch) -> np.ndarray:
         """Contextual bias using semantic relationship analysis"""
-        # Simple implementation - can be enhanced with embeddings
-        sentences = text.split('.')
-        bias_contexts = 0
-        
         bias_context_pairs = [
             ('man', 'leader'), ('woman', 'assistant'),
             ('he', 'strong'), ('she', 'emotional'),
             ('male', 'rational'), ('female', 'intuitive')
         ]
         
-        for sentence in sentences:
-            sentence_lower = sentence.lower()
-            for word1, word2 in bias_context_pairs:
-                if word1 in sentence_lower and word2 in sentence_lower:
-                    bias_contexts += 1
-        
-        if len(sentences) == 0:
-            return 0.0
+        # Which context words occur in each sentence (as substrings, like `in`)
+        words = sorted({word for pair in bias_context_pairs for word in pair})
+        column = {word: i for i, word in enumerate(words)}
+        present = (batch.sentence_counts @ batch.substring_counts(words)).toarray() > 0
         
-        return min(bias_contexts / len(sentences), 1.0)
+        sentence_hits = sum(
+            present[:, column[word1]] & present[:, column[word2]] for word1, word2 in bias_context_pairs
+        )
+        bias_contexts = np.bincount(batch.sentence_rows, sentence_hits, minlength=batch.size)
+        return np.minimum(bias_contexts / batch.sentences_per_response, 1.0)
     
     def detect_poisoning(self, text: str) -> float:
         """
@@ -201,37 +263,37 @@ class ConvergenceAI:
         
         return min(poisoning_score, 1.0)
     
-    def calculate_semantic_similarity(self, responses: List[str]) -> Dict[str, float]:
+    def calculate_semantic_similarity(self, responses: List[str], batch: Optional[ResponseBatch] = None,
+                                      rows: Optional[List[int]] = None) -> Dict[str, float]:
         """
         Calculate semantic similarity using advanced mathematical analysis
         Patent Claim: Cosine similarity and Mahalanobis distance for consensus analysis
+        
+        Pass an existing batch (and the rows of it to compare) to reuse its tokenization.
         """
-        if len(responses) < 2:
+        if batch is None:
+            batch = self.analyze_batch(responses)
+        rows = list(range(batch.size)) if rows is None else list(rows)
+        
+        if len(rows) < 2:
             return {"consensus": 1.0, "mahalanobis_distance": 0.0, "cosine_similarity": 1.0}
         
-        # Convert responses to numerical feature vectors
-        feature_vectors = []
-        for response in responses:
-            vector = self._text_to_feature_vector(response)
-            feature_vectors.append(vector)
+        # Numerical feature vectors, one row per response
+        feature_matrix = self._feature_matrix(batch)[rows]
         
-        # Calculate cosine similarity matrix
-        cosine_similarities = []
-        for i in range(len(feature_vectors)):
-            for j in range(i + 1, len(feature_vectors)):
-                cosine_sim = self._calculate_cosine_similarity(feature_vectors[i], feature_vectors[j])
-                cosine_similarities.append(cosine_sim)
+        # Cosine similarity matrix; the upper triangle holds each pair once
+        cosine_similarities = self._cosine_similarity_matrix(feature_matrix)[np.triu_indices(len(rows), 1)]
         
         # Calculate Mahalanobis distance for outlier detection
-        mahalanobis_distances = self._calculate_mahalanobis_distances(feature_vectors)
+        mahalanobis_distances = self._calculate_mahalanobis_distances(feature_matrix)
         
         # Calculate statistical divergence
-        divergence_scores = self._calculate_statistical_divergence(responses)
+        divergence_scores = self._calculate_statistical_divergence(batch, rows)
         
         # Weighted consensus score combining multiple metrics
-        avg_cosine = np.mean(cosine_similarities) if cosine_similarities else 0.0
-        avg_mahalanobis = np.mean(mahalanobis_distances) if mahalanobis_distances else 0.0
-        avg_divergence = np.mean(divergence_scores) if divergence_scores else 0.0
+        avg_cosine = np.mean(cosine_similarities) if len(cosine_similarities) else 0.0
+        avg_mahalanobis = np.mean(mahalanobis_distances) if len(mahalanobis_distances) else 0.0
+        avg_divergence = np.mean(divergence_scores) if len(divergence_scores) else 0.0
         
         # Combine metrics with patent-specified weighting
         consensus_score = (
@@ -245,179 +307,127 @@ class ConvergenceAI:
             "cosine_similarity": avg_cosine,
             "mahalanobis_distance": avg_mahalanobis,
             "statistical_divergence": avg_divergence,
-            "individual_similarities": cosine_similarities,
-            "outlier_detection": mahalanobis_distances,
+            "individual_similarities": cosine_similarities.tolist(),
+            "outlier_detection": mahalanobis_distances.tolist(),
             "agreement_threshold": self.consensus_threshold
         }
     
-    def _text_to_feature_vector(self, text: str, vector_size: int = 100) -> np.ndarray:
-        """Convert text to numerical feature vector for mathematical analysis"""
-        words = text.lower().split()
-        
-        # Create feature vector based on:
+    def _feature_matrix(self, batch: ResponseBatch, vector_size: int = 100) -> np.ndarray:
+        """Numerical feature vectors for every response in the batch"""
+        # Feature vectors are based on:
         # 1. Word frequency distribution
         # 2. Sentence length statistics
         # 3. Vocabulary diversity
         # 4. Semantic markers
         
-        features = np.zeros(vector_size)
-        
-        if not words:
-            return features
-        
-        # Word frequency features (0-50)
-        word_freq = {}
-        for word in words:
-            word_freq[word] = word_freq.get(word, 0) + 1
-        
-        freq_values = list(word_freq.values())
-        if freq_values:
-            features[0] = np.mean(freq_values)
-            features[1] = np.std(freq_values)
-            features[2] = np.max(freq_values)
-            features[3] = len(word_freq) / len(words)  # Vocabulary diversity
-        
-        # Length statistics (4-10)
-        sentences = text.split('.')
-        if sentences:
-            sentence_lengths = [len(s.split()) for s in sentences if s.strip()]
-            if sentence_lengths:
-                features[4] = np.mean(sentence_lengths)
-                features[5] = np.std(sentence_lengths)
-                features[6] = len(sentences)
-        
-        # Semantic complexity markers (7-20)
+        features = np.zeros((batch.size, vector_size))
+        has_words = batch.word_totals > 0
+        
+        # Word frequency features (0-3)
+        rows, freqs = batch.row_values()
+        distinct = np.maximum(batch.distinct_words, 1)
+        mean_freq = np.bincount(rows, freqs, minlength=batch.size) / distinct
+        features[:, 0] = mean_freq
+        features[:, 1] = np.sqrt(np.bincount(rows, (freqs - mean_freq[rows]) ** 2, minlength=batch.size) / distinct)
+        features[:, 2] = batch.counts.max(axis=1).toarray().ravel()
+        features[:, 3] = batch.distinct_words / np.maximum(batch.word_totals, 1)  # Vocabulary diversity
+        
+        # Length statistics (4-6), over non-empty sentences
+        lengths = np.asarray(batch.sentence_counts.sum(axis=1)).ravel()
+        nonempty = lengths > 0
+        sentence_count = np.bincount(batch.sentence_rows, nonempty, minlength=batch.size)
+        safe_count = np.maximum(sentence_count, 1)
+        mean_length = np.bincount(batch.sentence_rows, lengths * nonempty, minlength=batch.size) / safe_count
+        length_deviation = (lengths - mean_length[batch.sentence_rows]) * nonempty
+        has_sentences = sentence_count > 0
+        features[:, 4] = np.where(has_sentences, mean_length, 0.0)
+        features[:, 5] = np.where(has_sentences, np.sqrt(
+            np.bincount(batch.sentence_rows, length_deviation ** 2, minlength=batch.size) / safe_count
+        ), 0.0)
+        features[:, 6] = np.where(has_sentences, batch.sentences_per_response, 0.0)
+        
+        # Semantic complexity markers (7-11)
         complexity_markers = ['because', 'therefore', 'however', 'moreover', 'furthermore']
-        for i, marker in enumerate(complexity_markers):
-            if i + 7 < vector_size:
-                features[7 + i] = text.lower().count(marker)
+        marker_columns = min(len(complexity_markers), max(vector_size - 7, 0))
+        if marker_columns:
+            marker_counts = (batch.counts @ batch.substring_counts(complexity_markers[:marker_columns])).toarray()
+            features[:, 7:7 + marker_columns] = marker_counts
         
-        # Character-level features (21-30)
-        features[21] = len(text)
-        features[22] = text.count('.')
-        features[23] = text.count(',')
-        features[24] = text.count('!')
-        features[25] = text.count('?')
+        # Character-level features (21-25)
+        features[:, 21] = [len(text) for text in batch.texts]
+        for column, character in zip(range(22, 26), '.,!?'):
+            features[:, column] = [text.count(character) for text in batch.texts]
         
-        # Normalize features to prevent scale issues
-        features = features / (np.linalg.norm(features) + 1e-8)
+        features[~has_words] = 0.0
         
-        return features
+        # Normalize features to prevent scale issues
+        return features / (np.linalg.norm(features, axis=1, keepdims=True) + 1e-8)
     
-    def _calculate_cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
-        """Calculate cosine similarity between two feature vectors"""
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
-        
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
-        
-        cosine_sim = dot_product / (norm1 * norm2)
-        return max(0.0, cosine_sim)  # Ensure non-negative
+    @staticmethod
+    def _cosine_similarity_matrix(feature_matrix: np.ndarray) -> np.ndarray:
+        """Pairwise cosine similarities (non-negative; 0 for all-zero vectors)"""
+        norms = np.linalg.norm(feature_matrix, axis=1)
+        denominators = np.outer(norms, norms)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            similarities = np.where(denominators > 0, (feature_matrix @ feature_matrix.T) / denominators, 0.0)
+        return np.maximum(similarities, 0.0)  # Ensure non-negative
     
-    def _calculate_mahalanobis_distances(self, feature_vectors: List[np.ndarray]) -> List[float]:
+    def _calculate_mahalanobis_distances(self, feature_matrix: np.ndarray) -> np.ndarray:
         """Calculate Mahalanobis distances for outlier detection"""
-        if len(feature_vectors) < 2:
-            return [0.0]
-        
-        # Stack vectors into matrix
-        matrix = np.stack(feature_vectors)
+        if len(feature_matrix) < 2:
+            return np.zeros(1)
         
         # Calculate mean and covariance matrix
-        mean_vector = np.mean(matrix, axis=0)
+        differences = feature_matrix - np.mean(feature_matrix, axis=0)
         
         try:
             # Calculate covariance matrix with regularization
-            cov_matrix = np.cov(matrix.T)
+            cov_matrix = np.cov(feature_matrix.T)
             
             # Add regularization to prevent singular matrix
-            regularization = 1e-6 * np.eye(cov_matrix.shape[0])
-            cov_matrix += regularization
+            cov_matrix += 1e-6 * np.eye(cov_matrix.shape[0])
             
             # Calculate inverse covariance matrix
             inv_cov_matrix = np.linalg.inv(cov_matrix)
             
-            # Calculate Mahalanobis distance for each vector
-            distances = []
-            for vector in feature_vectors:
-                diff = vector - mean_vector
-                distance = np.sqrt(np.dot(np.dot(diff, inv_cov_matrix), diff))
-                distances.append(distance)
-            
-            return distances
+            # Mahalanobis distance of every vector at once
+            return np.sqrt(np.einsum('ij,jk,ik->i', differences, inv_cov_matrix, differences))
             
         except np.linalg.LinAlgError:
             # Fallback to Euclidean distance if covariance matrix is singular
-            distances = []
-            for vector in feature_vectors:
-                distance = np.linalg.norm(vector - mean_vector)
-                distances.append(distance)
-            return distances
+            return np.linalg.norm(differences, axis=1)
     
-    def _calculate_statistical_divergence(self, responses: List[str]) -> List[float]:
-        """Calculate statistical divergence between response distributions"""
-        if len(responses) < 2:
-            return [0.0]
-        
-        # Calculate word frequency distributions for each response
-        distributions = []
-        all_words = set()
-        
-        for response in responses:
-            words = response.lower().split()
-            word_freq = {}
-            for word in words:
-                word_freq[word] = word_freq.get(word, 0) + 1
-                all_words.add(word)
-            distributions.append(word_freq)
-        
-        # Convert to probability distributions
-        vocab_list = list(all_words)
-        prob_distributions = []
-        
-        for word_freq in distributions:
-            total_words = sum(word_freq.values())
-            if total_words == 0:
-                prob_dist = np.ones(len(vocab_list)) / len(vocab_list)
-            else:
-                prob_dist = np.array([word_freq.get(word, 0) / total_words for word in vocab_list])
-            prob_distributions.append(prob_dist)
-        
-        # Calculate Jensen-Shannon divergence between distributions
+    def _calculate_statistical_divergence(self, batch: ResponseBatch, rows: List[int]) -> np.ndarray:
+        """Jensen-Shannon divergence between the word distributions of every pair of responses"""
+        if len(rows) < 2:
+            return np.zeros(1)
+        
+        # Word counts over the vocabulary these responses actually use
+        counts = batch.counts[rows]
+        counts = counts[:, np.flatnonzero(np.asarray(counts.sum(axis=0)).ravel())].toarray().astype(float)
+        vocabulary_size = counts.shape[1]
+        if vocabulary_size == 0:
+            return np.zeros(len(rows) * (len(rows) - 1) // 2)
+        
+        # Probability distributions; empty responses are uniform
+        totals = counts.sum(axis=1, keepdims=True)
+        distributions = np.where(totals > 0, counts / np.maximum(totals, 1), 1.0 / vocabulary_size)
+        
+        # Add small epsilon to prevent log(0), then renormalize
+        distributions = distributions + 1e-10
+        distributions /= distributions.sum(axis=1, keepdims=True)
+        log_distributions = np.log(distributions)
+        
+        # Each response against every later one; pairs come out in (i, j), i < j order
         divergence_scores = []
-        for i in range(len(prob_distributions)):
-            for j in range(i + 1, len(prob_distributions)):
-                js_divergence = self._jensen_shannon_divergence(
-                    prob_distributions[i], 
-                    prob_distributions[j]
-                )
-                divergence_scores.append(js_divergence)
-        
-        return divergence_scores
-    
-    def _jensen_shannon_divergence(self, p: np.ndarray, q: np.ndarray) -> float:
-        """Calculate Jensen-Shannon divergence between two probability distributions"""
-        # Add small epsilon to prevent log(0)
-        epsilon = 1e-10
-        p = p + epsilon
-        q = q + epsilon
-        
-        # Normalize to ensure they sum to 1
-        p = p / np.sum(p)
-        q = q / np.sum(q)
-        
-        # Calculate average distribution
-        m = 0.5 * (p + q)
-        
-        # Calculate KL divergences
-        kl_pm = np.sum(p * np.log(p / m))
-        kl_qm = np.sum(q * np.log(q / m))
-        
-        # Jensen-Shannon divergence
-        js_divergence = 0.5 * kl_pm + 0.5 * kl_qm
-        
-        return js_divergence
+        for i in range(len(rows) - 1):
+            p, q = distributions[i], distributions[i + 1:]
+            log_m = np.log(0.5 * (p + q))
+            kl_pm = np.sum(p * (log_distributions[i] - log_m), axis=1)
+            kl_qm = np.sum(q * (log_distributions[i + 1:] - log_m), axis=1)
+            divergence_scores.append(0.5 * kl_pm + 0.5 * kl_qm)
+        
+        return np.concatenate(divergence_scores)
     
     def quantum_routing_decision(self, input_complexity: float) -> Dict[str, Any]:
         """
@@ -479,18 +489,19 @@ class ConvergenceAI:
         input_complexity = len(input_text.split()) / 100.0  # Normalized complexity
         quantum_data = self.quantum_routing_decision(input_complexity)
         
+        # Tokenize every response once; bias and consensus are computed over the batch
+        response_data_list = [r for r in llm_responses if r.get('response_text')]
+        batch = self.analyze_batch([r['response_text'] for r in response_data_list])
+        bias_scores = self.calculate_bias_scores(batch)
+        
         # Process each LLM response
         convergence_responses = []
         
-        for response_data in llm_responses:
-            if not response_data.get('response_text'):
-                continue
-            
+        for response_data, bias_score in zip(response_data_list, bias_scores):
             response_text = response_data['response_text']
             model_id = response_data.get('model_id', 'unknown')
             
-            # Calculate bias and poisoning scores
-            bias_score = self.calculate_bias_score(response_text)
+            # Calculate poisoning score
             poisoning_prob = self.detect_poisoning(response_text)
             
             # Generate provenance hash
@@ -501,7 +512,7 @@ class ConvergenceAI:
                 model_id=model_id,
                 response_content=response_text,
                 confidence_score=response_data.get('confidence', 0.5),
-                bias_score=bias_score,
+                bias_score=float(bias_score),
                 poisoning_probability=poisoning_prob,
                 semantic_embedding=None,  # Can be enhanced with actual embeddings
                 processing_time=response_data.get('processing_time', 0),
@@ -512,33 +523,30 @@ class ConvergenceAI:
             convergence_responses.append(convergence_response)
         
         # Filter out biased and poisoned responses
-        clean_responses = [
-            r for r in convergence_responses 
+        clean_rows = [
+            i for i, r in enumerate(convergence_responses)
             if r.bias_score < self.bias_threshold and r.poisoning_probability < self.poisoning_threshold
         ]
         
-        if not clean_responses:
+        if not clean_rows:
             # Emergency fallback if all responses filtered
-            clean_responses = convergence_responses
+            clean_rows = list(range(len(convergence_responses)))
+        clean_responses = [convergence_responses[i] for i in clean_rows]
         
         # Calculate consensus and divergence
-        response_texts = [r.response_content for r in clean_responses]
-        consensus_analysis = self.calculate_semantic_similarity(response_texts)
+        consensus_analysis = self.calculate_semantic_similarity(
+            [r.response_content for r in clean_responses], batch=batch, rows=clean_rows
+        )
+        
+        # Weight responses by confidence and inverse bias/poisoning scores
+        weights = np.array([
+            r.confidence_score * (1 - r.bias_score) * (1 - r.poisoning_probability) for r in clean_responses
+        ])
         
         # Synthesize final response based on weighted agreement
         if clean_responses:
-            # Weight responses by confidence and inverse bias/poisoning scores
-            weights = []
-            for r in clean_responses:
-                weight = r.confidence_score * (1 - r.bias_score) * (1 - r.poisoning_probability)
-                weights.append(weight)
-            
-            # Select highest weighted response or create synthesis
-            if weights:
-                best_idx = np.argmax(weights)
-                synthesized_response = clean_responses[best_idx].response_content
-            else:
-                synthesized_response = clean_responses[0].response_content
+            # Select highest weighted response
+            synthesized_response = clean_responses[int(np.argmax(weights))].response_content
         else:
             synthesized_response = "Unable to generate reliable response due to bias/poisoning filters"
         
@@ -551,16 +559,15 @@ class ConvergenceAI:
         confidence_level = consensus_analysis["consensus"]
         
         # Model consensus mapping
-        model_consensus = {}
-        for r in clean_responses:
-            model_consensus[r.model_id] = r.confidence_score * (1 - r.bias_score) * (1 - r.poisoning_probability)
+        model_consensus = {r.model_id: float(weight) for r, weight in zip(clean_responses, weights)}
         
         # Create audit trail entry
+        clean_set = set(clean_rows)
         audit_entry = {
             "timestamp": datetime.now().isoformat(),
             "input_hash": hashlib.sha256(input_text.encode()).hexdigest()[:16],
             "models_used": [r.model_id for r in convergence_responses],
-            "filtered_models": [r.model_id for r in convergence_responses if r not in clean_responses],
+            "filtered_models": [r.model_id for i, r in enumerate(convergence_responses) if i not in clean_set],
             "consensus_score": confidence_level,
             "bias_mitigation": bias_mitigation_score,
             "poisoning_resistance": poisoning_resistance_score,
@@ -0,0 +1,14 @@
+"""
+Local Data Directory for GUARDIAN
+Resolves where the SQLite stores and file caches kept on each host live, independent of the working directory
+"""
+
+import os
+
+# Overridden per deployment; defaults to data/ beside the utils package
+DATA_DIR = os.getenv('GUARDIAN_DATA_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data'))
+
+def data_path(name: str) -> str:
+    """Absolute path of a file or directory under the data directory, which is created if missing"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, name)
@@ -1,5 +1,6 @@
 import os
 import json
+import html
 from datetime import datetime
 from sqlalchemy import create_engine, text
 from sqlalchemy.exc import SQLAlchemyError
@@ -9,10 +10,55 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Columns each listing view renders; full content is never selected for listings
+LISTING_SCORE_COLUMNS = ['ai_cybersecurity_score', 'quantum_cybersecurity_score', 'ai_ethics_score', 'quantum_ethics_score']
+LISTING_BASE_COLUMNS = ['id', 'title', 'document_type', 'author_organization', 'publish_date',
+                        'scorer_version', 'updated_at'] + LISTING_SCORE_COLUMNS
+LISTING_LINK_COLUMNS = ['source', 'source_redirect', 'url_valid', 'url_status']
+LISTING_VIEW_COLUMNS = {
+    'table': LISTING_BASE_COLUMNS,
+    'compact': LISTING_BASE_COLUMNS + ['content_preview'],
+    'grid': LISTING_BASE_COLUMNS + ['content_preview', 'metadata'] + LISTING_LINK_COLUMNS,
+    'minimal': LISTING_BASE_COLUMNS + ['content_preview', 'topic'] + LISTING_LINK_COLUMNS,
+    'cards': LISTING_BASE_COLUMNS + ['content_preview', 'metadata', 'topic', 'detected_region'] + LISTING_LINK_COLUMNS
+}
+
+# Documents whose stored topic matches each topic filter
+# ts_headline copies document text verbatim, so matches are marked with sentinels,
+# the excerpt is HTML-escaped and only then are the sentinels turned into <mark> tags
+HIGHLIGHT_START = 'GUARDIANHLSTART'
+HIGHLIGHT_STOP = 'GUARDIANHLSTOP'
+
+def render_headline(fragment):
+    """HTML-escape a ts_headline fragment and mark its matches with <mark> tags."""
+    return html.escape(fragment or '').replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>')
+
+LISTING_TOPICS = {
+    'AI': ['AI', 'Both'],
+    'Quantum': ['Quantum', 'Both']
+}
+
+# Indexes backing the listing filters and the (updated_at, id) keyset order. They are
+# created by database/schema.sql (database/migrations/listing_indexes.sql builds them
+# concurrently on existing databases); the request path only checks they exist.
+LISTING_INDEXES = [
+    'idx_documents_listing',
+    'idx_documents_topic_listing',
+    'idx_documents_region_listing',
+    'idx_documents_organization',
+    'idx_documents_document_type',
+    'idx_documents_publish_year',
+    'idx_documents_ai_cybersecurity_score',
+    'idx_documents_quantum_cybersecurity_score',
+    'idx_documents_ai_ethics_score',
+    'idx_documents_quantum_ethics_score'
+]
+
 class DatabaseManager:
     def __init__(self):
         self.database_url = os.getenv('DATABASE_URL')
         self.engine = None
+        self._listing_ready = False
         self._connect()
     
     def _connect(self):
@@ -68,8 +114,9 @@ class DatabaseManager:
         SELECT id, title, document_type, source, author_organization, publish_date, 
                COALESCE(content_preview, LEFT(content, 500), LEFT(text_content, 500), 'No preview available') as content_preview,
                ai_cybersecurity_score, quantum_cybersecurity_score, ai_ethics_score, quantum_ethics_score,
-               detected_region, topic, url_valid, url_status, created_at, updated_at
+               scorer_version, detected_region, topic, url_valid, url_status, created_at, updated_at
         FROM documents 
+        WHERE deleted_at IS NULL
         ORDER BY updated_at DESC, created_at DESC
         LIMIT 200
         """
@@ -82,47 +129,8 @@ class DatabaseManager:
         documents = []
         if isinstance(results, list):
             for row in results:
-                # Generate enhanced content preview from full content
-                raw_preview = row.get('content_preview', '')
-                full_content = row.get('content', '') or row.get('text_content', '')
-                
-                if full_content and len(full_content) > 200:
-                    # Generate intelligent AI-powered preview
-                    try:
-                        from utils.intelligent_preview import generate_intelligent_preview
-                        title = row.get('title', 'Untitled Document')
-                        content_preview = generate_intelligent_preview(title, full_content)
-                    except Exception as e:
-                        # Fallback to sentence extraction
-                        import re
-                        clean_preview = re.sub(r'<[^>]+>', '', full_content)
-                        clean_preview = re.sub(r'\*+', '', clean_preview)
-                        clean_preview = re.sub(r'#+\s*', '', clean_preview)
-                        clean_preview = re.sub(r'[-_]{3,}', '', clean_preview)
-                        clean_preview = re.sub(r'\s+', ' ', clean_preview).strip()
-                        
-                        sentences = re.split(r'[.!?]+', clean_preview)
-                        meaningful_text = []
-                        for sentence in sentences[:3]:
-                            sentence = sentence.strip()
-                            if len(sentence) > 30:
-                                meaningful_text.append(sentence)
-                        
-                        if meaningful_text:
-                            content_preview = '. '.join(meaningful_text) + '.'
-                            if len(content_preview) > 350:
-                                content_preview = content_preview[:350] + '...'
-                        else:
-                            content_preview = clean_preview[:350] + '...' if len(clean_preview) > 350 else clean_preview
-                elif raw_preview:
-                    # Clean existing preview
-                    import re
-                    clean_preview = re.sub(r'\*+', '', raw_preview)
-                    clean_preview = re.sub(r'#+\s*', '', clean_preview)
-                    clean_preview = re.sub(r'\s+', ' ', clean_preview).strip()
-                    content_preview = clean_preview[:350] + '...' if len(clean_preview) > 350 else clean_preview
-                else:
-                    content_preview = 'Document content available - click to view details'
+                # Previews are generated once and stored (utils/preview_precompute.py)
+                content_preview = self._clean_stored_preview(row.get('content_preview'))
 
                 doc = {
                     'id': row['id'],
@@ -136,6 +144,7 @@ class DatabaseManager:
                     'quantum_cybersecurity_score': int(row.get('quantum_cybersecurity_score', 0)) if row.get('quantum_cybersecurity_score') else 0,
                     'ai_ethics_score': int(row.get('ai_ethics_score', 0)) if row.get('ai_ethics_score') else 0,
                     'quantum_ethics_score': int(row.get('quantum_ethics_score', 0)) if row.get('quantum_ethics_score') else 0,
+                    'scorer_version': row.get('scorer_version'),
                     'detected_region': row.get('detected_region', 'Unknown'),
                     'topic': row.get('topic', 'General'),
                     'url_valid': row.get('url_valid', False),
@@ -147,6 +156,253 @@ class DatabaseManager:
         
         return documents
     
+    def missing_columns(self, table, columns):
+        """Columns of table that don't exist (all of them if the catalog can't be read)."""
+        rows = self.execute_query(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_name = :table AND column_name = ANY(:columns)",
+            {'table': table, 'columns': list(columns)}
+        )
+        present = {row['column_name'] for row in rows} if isinstance(rows, list) else set()
+        return [column for column in columns if column not in present]
+    
+    def check_listing_indexes(self):
+        """Check the columns and indexes used by the paginated listing (once per manager)."""
+        if self._listing_ready or not self.engine:
+            return
+        
+        from utils.score_precompute import score_columns_ready
+        from utils.document_search import search_index_ready
+        from utils.document_purge import deletion_column_ready
+        score_columns_ready(self)
+        deletion_column_ready(self)
+        search_index_ready(self)
+        rows = self.execute_query(
+            "SELECT indexname FROM pg_indexes WHERE tablename = 'documents' AND indexname = ANY(:names)",
+            {'names': LISTING_INDEXES}
+        )
+        if isinstance(rows, list):
+            missing = sorted(set(LISTING_INDEXES) - {row['indexname'] for row in rows})
+            if missing:
+                logger.warning(f"Listing indexes missing ({', '.join(missing)}); "
+                               "apply database/migrations/listing_indexes.sql")
+        self._listing_ready = True
+    
+    def _listing_filters(self, filters):
+        """Translate listing filters into SQL conditions and bound parameters.
+        
+        Supported filters: document_types, organizations, years, regions (lists),
+        topic ('AI', 'Quantum' or 'Both'), search (text) and score_ranges
+        ({'ai_cybersecurity': (min, max), ...}).
+        """
+        filters = filters or {}
+        # Soft-deleted documents wait for the background purge (utils/document_purge.py)
+        conditions = ["deleted_at IS NULL"]
+        params = {}
+        
+        if filters.get('document_types'):
+            conditions.append("document_type = ANY(:document_types)")
+            params['document_types'] = list(filters['document_types'])
+        
+        if filters.get('organizations'):
+            conditions.append("author_organization = ANY(:organizations)")
+            params['organizations'] = list(filters['organizations'])
+        
+        if filters.get('years'):
+            conditions.append("EXTRACT(YEAR FROM publish_date) = ANY(:years)")
+            params['years'] = [int(year) for year in filters['years']]
+        
+        if filters.get('regions'):
+            conditions.append("detected_region = ANY(:regions)")
+            params['regions'] = list(filters['regions'])
+        
+        topics = LISTING_TOPICS.get(filters.get('topic'))
+        if topics:
+            conditions.append("topic = ANY(:topics)")
+            params['topics'] = topics
+        
+        if filters.get('search'):
+            conditions.append("search_vector @@ websearch_to_tsquery('english', :search)")
+            params['search'] = filters['search'].strip()
+        
+        for framework, (low, high) in (filters.get('score_ranges') or {}).items():
+            column = f"{framework}_score"
+            if column not in LISTING_SCORE_COLUMNS:
+                raise ValueError(f"Unknown score filter: {framework}")
+            conditions.append(f"{column} BETWEEN :{framework}_min AND :{framework}_max")
+            params[f'{framework}_min'] = low
+            params[f'{framework}_max'] = high
+        
+        return conditions, params
+    
+    def fetch_documents_page(self, view='cards', filters=None, page_size=20, after=None):
+        """Fetch one page of the document listing using keyset pagination.
+        
+        Documents are ordered by (updated_at, id) descending; ``after`` is the
+        cursor returned with the previous page. Only the columns needed by the
+        requested view are selected and every filter is applied in SQL.
+        
+        Returns {'documents': [...], 'next_cursor': cursor or None}.
+        """
+        self.check_listing_indexes()
+        
+        columns = LISTING_VIEW_COLUMNS.get(view, LISTING_VIEW_COLUMNS['cards'])
+        conditions, params = self._listing_filters(filters)
+        params['page_size'] = page_size + 1  # One extra row tells us whether a next page exists
+        
+        # Text searches are ordered by relevance and paged by offset; the
+        # cursor is then the offset of the next page
+        searching = bool(params.get('search'))
+        if searching:
+            order_by = "ts_rank(search_vector, websearch_to_tsquery('english', :search)) DESC, id DESC"
+            params['offset'] = after or 0
+        else:
+            order_by = "updated_at DESC, id DESC"
+            if after:
+                conditions.append("(updated_at, id) < (:after_updated_at, :after_id)")
+                params['after_updated_at'], params['after_id'] = after
+        
+        query = f"""
+        SELECT {', '.join(columns)}
+        FROM documents
+        {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+        ORDER BY {order_by}
+        LIMIT :page_size {'OFFSET :offset' if searching else ''}
+        """
+        
+        rows = self.execute_query(query, params)
+        if not isinstance(rows, list):
+            return {'documents': [], 'next_cursor': None}
+        
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if not has_more:
+            next_cursor = None
+        elif searching:
+            next_cursor = params['offset'] + page_size
+        else:
+            next_cursor = (rows[-1]['updated_at'], rows[-1]['id'])
+        return {'documents': [self._listing_document(row) for row in rows], 'next_cursor': next_cursor}
+    
+    def search_documents(self, query, page=1, page_size=20, filters=None):
+        """Ranked full-text search with highlighted excerpts.
+        
+        Matches the query (web-search syntax: quoted phrases, OR, -term)
+        against the weighted title/organization/text search vector, ranks
+        with ts_rank and highlights only the rows on the requested page.
+        """
+        self.check_listing_indexes()
+        
+        filters = dict(filters or {}, search=query)
+        conditions, params = self._listing_filters(filters)
+        if not params.get('search'):
+            return {'results': [], 'total': 0, 'page': page, 'page_size': page_size}
+        params.update({'page_size': page_size, 'offset': (max(page, 1) - 1) * page_size})
+        
+        sql = f"""
+        WITH hits AS (
+            SELECT id, title, author_organization, document_type, publish_date, topic,
+                   ts_rank(search_vector, websearch_to_tsquery('english', :search)) AS rank,
+                   COUNT(*) OVER () AS total
+            FROM documents
+            WHERE {' AND '.join(conditions)}
+            ORDER BY rank DESC, id DESC
+            LIMIT :page_size OFFSET :offset
+        )
+        SELECT hits.*,
+               ts_headline('english', LEFT(COALESCE(NULLIF(d.text_content, ''), d.content_preview, ''), 20000),
+                           websearch_to_tsquery('english', :search),
+                           'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2, MaxWords=30, MinWords=10') AS highlight
+        FROM hits JOIN documents d ON d.id = hits.id
+        ORDER BY hits.rank DESC, hits.id DESC
+        """
+        rows = self.execute_query(sql, params)
+        if not isinstance(rows, list):
+            rows = []
+        
+        results = []
+        for row in rows:
+            hit = dict(row)
+            hit.pop('total')
+            hit['rank'] = float(hit['rank'])
+            hit['publish_date'] = str(hit['publish_date']) if hit.get('publish_date') else None
+            hit['highlight'] = render_headline(hit['highlight'])
+            results.append(hit)
+        
+        total = rows[0]['total'] if rows else 0
+        return {'results': results, 'total': total, 'page': page, 'page_size': page_size}
+    
+    def summarize_documents(self, filters=None):
+        """Count and summary statistics for documents matching the listing filters."""
+        self.check_listing_indexes()
+        
+        conditions, params = self._listing_filters(filters)
+        query = f"""
+        SELECT COUNT(*) AS total,
+               COUNT(*) FILTER (WHERE topic IN ('Quantum', 'Both')) AS quantum_related,
+               COALESCE(AVG(quantum_score), 0) AS avg_quantum_score,
+               COUNT(*) FILTER (WHERE quantum_score >= 75) AS high_scoring
+        FROM documents
+        {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+        """
+        rows = self.execute_query(query, params)
+        if not rows:
+            return {'total': 0, 'quantum_related': 0, 'avg_quantum_score': 0.0, 'high_scoring': 0}
+        summary = dict(rows[0])
+        summary['avg_quantum_score'] = float(summary['avg_quantum_score'])
+        return summary
+    
+    def fetch_filter_options(self):
+        """Distinct values for the listing filter controls."""
+        self.check_listing_indexes()
+        
+        options = {'document_types': [], 'organizations': [], 'years': [], 'regions': []}
+        queries = {
+            'document_types': "SELECT DISTINCT document_type AS value FROM documents WHERE deleted_at IS NULL AND document_type IS NOT NULL AND document_type NOT IN ('', 'Unknown') ORDER BY 1",
+            'organizations': "SELECT DISTINCT author_organization AS value FROM documents WHERE deleted_at IS NULL AND author_organization IS NOT NULL AND author_organization NOT IN ('', 'Unknown', 'Date not available') ORDER BY 1",
+            'years': "SELECT DISTINCT CAST(EXTRACT(YEAR FROM publish_date) AS INTEGER) AS value FROM documents WHERE deleted_at IS NULL AND publish_date IS NOT NULL ORDER BY 1 DESC",
+            'regions': "SELECT DISTINCT detected_region AS value FROM documents WHERE deleted_at IS NULL AND detected_region IS NOT NULL AND detected_region NOT IN ('', 'Unknown', 'None') ORDER BY 1"
+        }
+        for key, query in queries.items():
+            rows = self.execute_query(query)
+            if isinstance(rows, list):
+                options[key] = [str(row['value']) if key == 'years' else row['value'] for row in rows]
+        return options
+    
+    def _clean_stored_preview(self, raw_preview):
+        """Light formatting cleanup of a stored preview; never generates one."""
+        if not raw_preview:
+            return 'Document content available - click to view details'
+        
+        import re
+        clean_preview = re.sub(r'\*+', '', raw_preview)
+        clean_preview = re.sub(r'#+\s*', '', clean_preview)
+        clean_preview = re.sub(r'\s+', ' ', clean_preview).strip()
+        return clean_preview[:350] + '...' if len(clean_preview) > 350 else clean_preview
+    
+    def _listing_document(self, row):
+        """Normalize a listing row into the document dict the views expect."""
+        doc = dict(row)
+        doc['title'] = row.get('title') or 'Untitled Document'
+        doc['document_type'] = row.get('document_type') or 'Report'
+        doc['author_organization'] = row.get('author_organization') or 'Unknown'
+        doc['publish_date'] = str(row['publish_date']) if row.get('publish_date') else None
+        for column in LISTING_SCORE_COLUMNS:
+            doc[column] = int(row[column]) if row.get(column) else 0
+        
+        if 'content_preview' in row:
+            doc['content_preview'] = self._clean_stored_preview(row.get('content_preview'))
+        if 'source' in row:
+            doc['source'] = row.get('source') or ''
+        if 'url_status' in row:
+            doc['url_valid'] = row.get('url_valid', False)
+            doc['url_status'] = row.get('url_status') or 'unchecked'
+        if 'topic' in row:
+            doc['topic'] = row.get('topic') or 'General'
+        if 'detected_region' in row:
+            doc['detected_region'] = row.get('detected_region') or 'Unknown'
+        return doc
+    
     def save_document(self, document):
         """Save a new document to the database with enhanced metadata support."""
         try:
@@ -188,19 +444,24 @@ class DatabaseManager:
             text_content = document.get('text_content', '') or document.get('content', '')
             content_preview = document.get('content', text_content[:1000] if text_content else '')
             
+            # The stored listing preview is left to the scheduled preview backfill
+            # (utils/preview_precompute.py), so ingest never waits on an LLM call
+            
             # Enhanced query to match existing schema
             query = """
             INSERT INTO documents (
                 title, content, text_content, document_type, source,
                 author_organization, publish_date, topic,
                 ai_cybersecurity_score, quantum_cybersecurity_score, 
-                ai_ethics_score, quantum_ethics_score, metadata
+                ai_ethics_score, quantum_ethics_score, metadata,
+                pdf_sha256
             )
             VALUES (
                 :title, :content, :text_content, :document_type, :source,
                 :author_organization, :publish_date, :topic,
                 :ai_cybersecurity_score, :quantum_cybersecurity_score,
-                :ai_ethics_score, :quantum_ethics_score, :metadata
+                :ai_ethics_score, :quantum_ethics_score, :metadata,
+                :pdf_sha256
             )
             RETURNING id
             """
@@ -228,15 +489,31 @@ class DatabaseManager:
                 'quantum_cybersecurity_score': document.get('quantum_cybersecurity_score', 0),
                 'ai_ethics_score': document.get('ai_ethics_score', 0),
                 'quantum_ethics_score': document.get('quantum_ethics_score', 0),
-                'metadata': json.dumps(metadata_json)
+                'metadata': json.dumps(metadata_json),
+                # Extracted pages stay in the local page store under this hash (utils/pdf_text_extractor.py)
+                'pdf_sha256': document.get('pdf_sha256')
             }
             
             result = self.execute_query(query, params)
-            return result is not None
-            
+
+            # Register the new document with the near-duplicate index so later uploads find it
+            if isinstance(result, list) and result:
+                try:
+                    from utils.minhash_index import get_minhash_index
+                    get_minhash_index().index_document(result[0]['id'], text_content or content_preview)
+                except Exception as e:
+                    # Left for the signature backfill job
+                    logger.warning(f"Near-duplicate indexing failed at ingest: {e}")
+
+            # execute_query answers [] when the insert failed after retries
+            if not isinstance(result, list) or not result:
+                logger.error("Document insert returned no id")
+                return None
+            return result[0]['id']
+
         except Exception as e:
             logger.error(f"Error saving document: {e}")
-            return False
+            return None
     
     def save_assessment(self, document_id, assessment_data):
         """Save assessment results to the database."""
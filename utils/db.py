@@ -11,9 +11,41 @@ def fetch_documents():
         print(f"Error fetching documents: {e}")
         return []
 
+def fetch_documents_page(view='cards', filters=None, page_size=20, after=None):
+    """
+    Fetch one keyset-paginated page of the document listing.
+    Returns {'documents': [...], 'next_cursor': cursor or None}.
+    """
+    try:
+        return db_manager.fetch_documents_page(view, filters, page_size, after)
+    except Exception as e:
+        print(f"Error fetching document page: {e}")
+        return {'documents': [], 'next_cursor': None}
+
+def summarize_documents(filters=None):
+    """
+    Count and summary statistics for documents matching the listing filters.
+    """
+    try:
+        return db_manager.summarize_documents(filters)
+    except Exception as e:
+        print(f"Error summarizing documents: {e}")
+        return {'total': 0, 'quantum_related': 0, 'avg_quantum_score': 0.0, 'high_scoring': 0}
+
+def fetch_filter_options():
+    """
+    Distinct document types, organizations, years and regions for filter controls.
+    """
+    try:
+        return db_manager.fetch_filter_options()
+    except Exception as e:
+        print(f"Error fetching filter options: {e}")
+        return {'document_types': [], 'organizations': [], 'years': [], 'regions': []}
+
 def save_document(document):
     """
     Save a document to the PostgreSQL database.
+    Returns the new document id, or None if the insert failed.
     """
     try:
         print(f"Attempting to save document: {document.get('title', 'Unknown')}")
@@ -27,7 +59,7 @@ def save_document(document):
         print(f"Error saving document: {e}")
         import traceback
         traceback.print_exc()
-        return False
+        return None
 
 def save_assessment(document_id, assessment_data):
     """
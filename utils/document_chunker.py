@@ -0,0 +1,237 @@
+"""
+Token-Aware Document Chunking for GUARDIAN
+Splits long policy texts into token-bounded sections along headings, ranks them
+by framework term density and reduces per-chunk LLM scores into document scores
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.term_index import TermIndex
+
+# Token budget per chunk and the most chunks sent to an LLM per document, so a
+# document never costs more than CHUNK_TOKENS * MAX_CHUNKS_PER_DOCUMENT input tokens
+CHUNK_TOKENS = 1000
+MAX_CHUNKS_PER_DOCUMENT = 6
+
+# Weighted framework term hits per 1000 tokens a chunk needs to be worth scoring
+MIN_RELEVANCE_DENSITY = 2.0
+TIER_WEIGHTS = {'high_value': 3, 'medium_value': 2, 'base_value': 1}
+
+# Words, numbers and punctuation marks approximate BPE tokens closely enough for budgeting
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+_HEADING_RE = re.compile(
+    r"^(?:#{1,6}\s+\S.*"                                              # markdown
+    r"|(?:\d+(?:\.\d+)*\.?|[IVXLC]+\.|[A-Z]\.)\s+[A-Z].*"             # 1. / 2.3 / IV. / A.
+    r"|(?i:appendix|annex|chapter|section|part)\s+[\w.]+\b.*"        # Appendix A ...
+    r")$"
+)
+_CAPS_HEADING_RE = re.compile(r"^[A-Z][A-Z0-9 ,&/()\-]{3,}$")
+
+@dataclass
+class Chunk:
+    """A token-bounded slice of a document"""
+    index: int
+    heading: str
+    text: str
+    tokens: int
+    relevance: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def density(self) -> float:
+        return max(self.relevance.values(), default=0.0)
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count"""
+    return len(_TOKEN_RE.findall(text or ""))
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Leading part of the text holding at most max_tokens tokens"""
+    text = text or ""
+    for count, match in enumerate(_TOKEN_RE.finditer(text)):
+        if count == max_tokens:
+            return text[:match.start()].rstrip()
+    return text
+
+def _is_heading(line: str) -> bool:
+    line = line.strip()
+    if not line or len(line) > 100 or line.endswith(('.', ',', ';')):
+        return False
+    if _CAPS_HEADING_RE.match(line):
+        # ALL CAPS lines count only if they contain letters (not just numbers or codes)
+        return sum(c.isalpha() for c in line) >= 4
+    return bool(_HEADING_RE.match(line)) and len(line.split()) <= 14
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """(heading, body) pairs; text before the first heading has an empty heading"""
+    sections = []
+    heading, body = "", []
+    for line in (text or "").splitlines():
+        if _is_heading(line):
+            if body or heading:
+                sections.append((heading, "\n".join(body).strip()))
+            heading, body = line.strip().lstrip('#').strip(), []
+        else:
+            body.append(line)
+    sections.append((heading, "\n".join(body).strip()))
+    return [(h, b) for h, b in sections if h or b]
+
+def _split_oversized(text: str, max_tokens: int) -> List[str]:
+    """Split text over budget at paragraph, then sentence, then word boundaries"""
+    for separator in (r"\n\s*\n", r"(?<=[.!?])\s+", r"\s+"):
+        pieces = [p for p in re.split(separator, text) if p.strip()]
+        if len(pieces) > 1:
+            break
+    else:
+        return [truncate_to_tokens(text, max_tokens)]
+
+    parts, current, current_tokens = [], [], 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece)
+        if tokens > max_tokens:
+            if current:
+                parts.append(" ".join(current))
+                current, current_tokens = [], 0
+            parts.extend(_split_oversized(piece, max_tokens))
+            continue
+        if current and current_tokens + tokens > max_tokens:
+            parts.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        parts.append(" ".join(current))
+    return parts
+
+def chunk_document(text: str, max_tokens: int = CHUNK_TOKENS) -> List[Chunk]:
+    """
+    Pack consecutive sections into chunks of at most max_tokens; a section
+    larger than the budget is split on its own. Each chunk keeps the heading
+    of the section it starts with.
+    """
+    chunks = []
+    heading, parts, tokens = "", [], 0
+
+    def flush():
+        nonlocal parts, tokens
+        if parts:
+            chunks.append(Chunk(len(chunks), heading, "\n\n".join(parts), tokens))
+        parts, tokens = [], 0
+
+    for section_heading, body in split_sections(text):
+        section_text = f"{section_heading}\n{body}".strip() if section_heading else body
+        section_tokens = estimate_tokens(section_text)
+
+        if section_tokens > max_tokens:
+            flush()
+            for piece in _split_oversized(section_text, max_tokens):
+                heading = section_heading
+                parts, tokens = [piece], estimate_tokens(piece)
+                flush()
+            continue
+
+        if parts and tokens + section_tokens > max_tokens:
+            flush()
+        if not parts:
+            heading = section_heading
+        parts.append(section_text)
+        tokens += section_tokens
+
+    flush()
+    return chunks
+
+def score_relevance(chunks: Iterable[Chunk], framework_keywords: Dict[str, Dict[str, List[str]]]):
+    """Weighted framework term hits per 1000 tokens, stored on each chunk"""
+    for chunk in chunks:
+        index = TermIndex(chunk.text.lower())
+        per_thousand = 1000 / max(chunk.tokens, 1)
+        chunk.relevance = {
+            framework: sum(
+                TIER_WEIGHTS.get(tier, 1) * index.total_count(terms) for tier, terms in tiers.items()
+            ) * per_thousand
+            for framework, tiers in framework_keywords.items()
+        }
+
+def select_chunks(text: str, framework_keywords: Dict[str, Dict[str, List[str]]],
+                  max_chunks: int = MAX_CHUNKS_PER_DOCUMENT, max_tokens: int = CHUNK_TOKENS) -> List[Chunk]:
+    """
+    The chunks worth sending to an LLM, in document order: the densest chunks
+    above MIN_RELEVANCE_DENSITY (at most max_chunks), or the first chunk if
+    none qualifies.
+    """
+    chunks = chunk_document(text, max_tokens)
+    score_relevance(chunks, framework_keywords)
+    if len(chunks) <= 1:
+        return chunks
+
+    relevant = [chunk for chunk in chunks if chunk.density >= MIN_RELEVANCE_DENSITY]
+    if not relevant:
+        return chunks[:1]
+    relevant.sort(key=lambda chunk: chunk.density, reverse=True)
+    return sorted(relevant[:max_chunks], key=lambda chunk: chunk.index)
+
+def relevant_excerpt(text: str, framework_keywords: Dict[str, Dict[str, List[str]]],
+                     max_tokens: int) -> str:
+    """The most relevant sections of a document that fit in max_tokens, in document order"""
+    if estimate_tokens(text) <= max_tokens:
+        return text or ""
+    chunk_tokens = max(100, max_tokens // 3)
+    selected = select_chunks(text, framework_keywords, max_chunks=max(1, max_tokens // chunk_tokens),
+                             max_tokens=chunk_tokens)
+    return "\n\n[...]\n\n".join(chunk.text for chunk in selected)
+
+def sampled_excerpt(text: str, max_tokens: int, samples: int = 3) -> str:
+    """Evenly spaced sections (start, middle, end, ...) of a document that fit in max_tokens"""
+    if estimate_tokens(text) <= max_tokens:
+        return text or ""
+    chunks = chunk_document(text, max(50, max_tokens // samples))
+    if len(chunks) <= samples:
+        picked = chunks[:samples]
+    else:
+        step = (len(chunks) - 1) / (samples - 1) if samples > 1 else 0
+        picked = [chunks[round(i * step)] for i in range(samples)]
+    return "\n\n[...]\n\n".join(chunk.text for chunk in picked)
+
+def reduce_chunk_scores(chunks: List[Chunk], chunk_scores: List[Dict[str, Optional[int]]],
+                        frameworks: Iterable[str]) -> Dict[str, Optional[int]]:
+    """
+    Per framework, the mean of the chunk scores weighted by how much of that
+    framework each chunk discusses; None where no chunk produced a score.
+    """
+    reduced = {}
+    for framework in frameworks:
+        weighted, total = 0.0, 0.0
+        for chunk, scores in zip(chunks, chunk_scores):
+            score = (scores or {}).get(framework)
+            if score is None:
+                continue
+            weight = chunk.relevance.get(framework, 0.0) + 0.1
+            weighted += score * weight
+            total += weight
+        reduced[framework] = int(round(weighted / total)) if total else None
+    return reduced
+
+def map_reduce_scores(text: str, title: str, score_chunk: Callable[[str, str], Dict[str, Optional[int]]],
+                      framework_keywords: Dict[str, Dict[str, List[str]]],
+                      max_chunks: int = MAX_CHUNKS_PER_DOCUMENT,
+                      max_tokens: int = CHUNK_TOKENS) -> Dict[str, Optional[int]]:
+    """
+    Score a document with an LLM scorer chunk by chunk: only relevant chunks
+    are sent (concurrently) and their scores are reduced per framework.
+    """
+    chunks = select_chunks(text, framework_keywords, max_chunks, max_tokens)
+    if not chunks:
+        return {framework: None for framework in framework_keywords}
+    if len(chunks) == 1:
+        return score_chunk(chunks[0].text, title)
+
+    def score(chunk: Chunk) -> Dict[str, Optional[int]]:
+        section_title = f"{title} - {chunk.heading}" if chunk.heading else title
+        return score_chunk(chunk.text, section_title)
+
+    with ThreadPoolExecutor(max_workers=min(len(chunks), 4)) as executor:
+        chunk_scores = list(executor.map(score, chunks))
+    return reduce_chunk_scores(chunks, chunk_scores, framework_keywords)
@@ -0,0 +1,222 @@
+"""
+Document Soft-Deletion and Purge for GUARDIAN
+Deleting marks documents with deleted_at; a background job removes them (and their
+assessments) later in small batches so bulk cleanups never hold long table locks
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from utils.database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Ids marked per UPDATE, and documents removed per purge transaction
+SOFT_DELETE_CHUNK = 1000
+PURGE_BATCH_SIZE = 200
+
+# How long soft-deleted documents are kept before they are purged
+PURGE_GRACE_SECONDS = int(os.getenv('GUARDIAN_PURGE_GRACE_SECONDS', '0'))
+
+# Pause between purge batches so other queries get through
+PURGE_BATCH_PAUSE = 0.2
+
+# Condition every read of live documents should include
+LIVE_DOCUMENTS_SQL = "deleted_at IS NULL"
+
+_column_ready = False
+_column_lock = threading.Lock()
+
+def deletion_column_ready(db: Optional[DatabaseManager] = None) -> bool:
+    """
+    Whether documents.deleted_at exists.
+
+    It is created, with the partial index over pending purges, by database/schema.sql
+    (database/migrations/document_bookkeeping.sql for existing databases); the request
+    path only checks for it.
+    """
+    global _column_ready
+    if _column_ready:
+        return True
+
+    with _column_lock:
+        if _column_ready:
+            return True
+
+        db = db or DatabaseManager()
+        if db.missing_columns('documents', ['deleted_at']):
+            logger.error("documents.deleted_at is missing; apply database/migrations/document_bookkeeping.sql")
+            return False
+
+        _column_ready = True
+        return True
+
+def soft_delete_documents(document_ids: List[int], db: Optional[DatabaseManager] = None) -> List[int]:
+    """
+    Mark documents deleted; returns the ids that were live until now.
+    Ids are bound as arrays in chunks of SOFT_DELETE_CHUNK rather than spliced into IN lists.
+    """
+    db = db or DatabaseManager()
+    if not document_ids or not deletion_column_ready(db):
+        return []
+
+    ids = sorted({int(doc_id) for doc_id in document_ids})
+    deleted = []
+    for start in range(0, len(ids), SOFT_DELETE_CHUNK):
+        rows = db.execute_query(f"""
+            UPDATE documents SET deleted_at = CURRENT_TIMESTAMP
+            WHERE id = ANY(:ids) AND {LIVE_DOCUMENTS_SQL}
+            RETURNING id
+        """, {'ids': ids[start:start + SOFT_DELETE_CHUNK]})
+        deleted.extend(row['id'] for row in rows or [])
+
+    if deleted:
+        background_purger.trigger()
+    return deleted
+
+def find_documents_by_criteria(criteria: Dict[str, Any], db: Optional[DatabaseManager] = None) -> List[int]:
+    """
+    Ids of live documents matching deletion criteria:
+    document_type, before_date (created before) and content_empty
+    """
+    db = db or DatabaseManager()
+    if not deletion_column_ready(db):
+        return []
+
+    conditions = [LIVE_DOCUMENTS_SQL]
+    params = {}
+
+    if criteria.get('document_type'):
+        conditions.append("document_type = :document_type")
+        params['document_type'] = criteria['document_type']
+
+    if criteria.get('before_date'):
+        conditions.append("created_at < :before_date")
+        params['before_date'] = criteria['before_date']
+
+    if criteria.get('content_empty'):
+        conditions.append("(text_content IS NULL OR text_content = '')")
+
+    if len(conditions) == 1:
+        return []
+
+    rows = db.execute_query(f"SELECT id FROM documents WHERE {' AND '.join(conditions)}", params)
+    return [row['id'] for row in rows or []]
+
+def purge_deleted_documents(batch_size: int = PURGE_BATCH_SIZE, grace_seconds: int = PURGE_GRACE_SECONDS,
+                            max_batches: Optional[int] = None,
+                            db: Optional[DatabaseManager] = None) -> Dict[str, int]:
+    """
+    Permanently remove soft-deleted documents, oldest first, one bounded batch
+    per transaction. Each batch deletes the documents' assessments explicitly
+    (tables with ON DELETE CASCADE follow the documents). Rows claimed by a
+    concurrent purge are skipped.
+    """
+    db = db or DatabaseManager()
+    stats = {'documents': 0, 'assessments': 0, 'batches': 0}
+    if not deletion_column_ready(db):
+        return stats
+
+    query = """
+        WITH batch AS (
+            SELECT id FROM documents
+            WHERE deleted_at IS NOT NULL
+              AND deleted_at <= CURRENT_TIMESTAMP - make_interval(secs => :grace_seconds)
+            ORDER BY deleted_at, id
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        ), purged_assessments AS (
+            DELETE FROM assessments WHERE document_id IN (SELECT id FROM batch)
+            RETURNING 1
+        )
+        DELETE FROM documents WHERE id IN (SELECT id FROM batch)
+        RETURNING id, (SELECT COUNT(*) FROM purged_assessments) AS assessments
+    """
+    params = {'grace_seconds': float(grace_seconds), 'batch_size': batch_size}
+
+    while max_batches is None or stats['batches'] < max_batches:
+        rows = db.execute_query(query, params)
+        if not rows:
+            break
+
+        stats['batches'] += 1
+        stats['documents'] += len(rows)
+        stats['assessments'] += rows[0]['assessments']
+        if len(rows) < batch_size:
+            break
+        time.sleep(PURGE_BATCH_PAUSE)
+
+    return stats
+
+def count_pending_purge(db: Optional[DatabaseManager] = None) -> int:
+    """Number of soft-deleted documents still waiting to be purged"""
+    db = db or DatabaseManager()
+    if not deletion_column_ready(db):
+        return 0
+    rows = db.execute_query("SELECT COUNT(*) AS pending FROM documents WHERE deleted_at IS NOT NULL")
+    return rows[0]['pending'] if rows else 0
+
+class BackgroundPurger:
+    def __init__(self, interval_seconds=60, batch_size=PURGE_BATCH_SIZE):
+        """
+        Initialize background purge job
+        interval_seconds: How often to look for soft-deleted documents
+        """
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.is_running = False
+        self.thread = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the background purge service"""
+        with self._lock:
+            if self.is_running:
+                return
+            self.is_running = True
+
+        logger.info(f"Starting background purge (every {self.interval_seconds} seconds)")
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the background purge service"""
+        self.is_running = False
+        self._wake.set()
+
+    def trigger(self):
+        """Run a pass now instead of waiting for the next interval"""
+        self.start()
+        self._wake.set()
+
+    def _run(self):
+        while self.is_running:
+            self._wake.clear()
+            try:
+                stats = purge_deleted_documents(batch_size=self.batch_size)
+                if stats['documents']:
+                    logger.info(f"Background purge: {stats['documents']} documents and "
+                                f"{stats['assessments']} assessments removed in {stats['batches']} batches")
+            except Exception as e:
+                logger.error(f"Error during background purge: {e}")
+
+            self._wake.wait(self.interval_seconds)
+
+# Global purge instance
+background_purger = BackgroundPurger()
+
+def start_background_purge():
+    """Start the background purge service"""
+    background_purger.start()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print("Purging soft-deleted documents...")
+    start = time.time()
+    stats = purge_deleted_documents(grace_seconds=0)
+    print(f"Purged {stats['documents']} documents and {stats['assessments']} assessments "
+          f"in {stats['batches']} batches ({time.time() - start:.1f}s)")
@@ -5,14 +5,32 @@ Provides intelligent document suggestions based on content analysis, scoring pat
 
 import os
 import re
+import time
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from typing import List, Dict, Tuple, Optional
 from collections import defaultdict
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import logging
+from utils.vector_index import VECTOR_HASH_SQL, VECTOR_TEXT_SQL, get_vector_index
+
+# Seconds between checks for new or changed documents to add to the vector index
+VECTOR_SYNC_INTERVAL = 300
+
+# Columns of the float32 score matrix, one row per document
+SCORE_FIELDS = ('ai_cybersecurity_score', 'quantum_cybersecurity_score', 'ai_ethics_score', 'quantum_ethics_score')
+
+# framework_focus -> (score matrix column, weight) for contextual recommendations
+FRAMEWORK_FOCUS_WEIGHTS = {
+    'ai_cybersecurity': (0, 1 / 20),
+    'quantum_cybersecurity': (1, 2),
+    'ai_ethics': (2, 1 / 20),
+    'quantum_ethics': (3, 1 / 20)
+}
+
+# Rows per block when computing all-pairs neighbours (bounds the dense block to block x documents)
+RECOMMENDATION_BLOCK_SIZE = 256
+PRECOMPUTED_TOP_K = 10
 
 class DocumentRecommendationEngine:
     """
@@ -24,10 +42,25 @@ class DocumentRecommendationEngine:
     """
     
     def __init__(self):
-        self.vectorizer = None
-        self.document_vectors = None
+        self.vector_index = None
+        self.vectors_synced_at = 0.0
         self.documents_cache = None
+        self.documents_by_id = {}
+        self.doc_ids = np.empty(0, dtype=np.int64)
+        self.score_matrix = np.zeros((0, len(SCORE_FIELDS)), dtype=np.float32)
+        self.unit_scores = self.score_matrix
+        self.score_norms = np.zeros(0, dtype=np.float32)
+        self.row_of = {}
+        self.document_types = np.empty(0, dtype=str)
+        self.organizations = np.empty(0, dtype=str)
         self.logger = logging.getLogger(__name__)
+    
+    @property
+    def document_vectors(self):
+        """Content vectors of the persisted index (None until it is built)"""
+        if self.vector_index is None or not len(self.vector_index):
+            return None
+        return self.vector_index.weights
         
     def get_db_connection(self):
         """Get database connection."""
@@ -37,7 +70,7 @@ class DocumentRecommendationEngine:
         )
     
     def load_documents(self, force_refresh=False):
-        """Load all documents from database for analysis."""
+        """Load document metadata and scores for analysis (full text stays in the database)."""
         if self.documents_cache is not None and not force_refresh:
             return self.documents_cache
             
@@ -47,17 +80,20 @@ class DocumentRecommendationEngine:
             cursor = conn.cursor()
             
             cursor.execute("""
-                SELECT id, title, content, text_content, document_type, author_organization,
+                SELECT id, title, LEFT(content, 300) AS content, document_type, author_organization,
                        ai_cybersecurity_score, quantum_cybersecurity_score, 
                        ai_ethics_score, quantum_ethics_score,
                        created_at, source
                 FROM documents 
                 WHERE text_content IS NOT NULL 
                 AND text_content != ''
+                AND deleted_at IS NULL
                 ORDER BY id
             """)
             
             self.documents_cache = cursor.fetchall()
+            self.documents_by_id = {doc['id']: doc for doc in self.documents_cache}
+            self._build_score_matrix()
             return self.documents_cache
             
         except Exception as e:
@@ -67,124 +103,125 @@ class DocumentRecommendationEngine:
             if conn:
                 conn.close()
     
+    def _build_score_matrix(self):
+        """Contiguous float32 score matrix (plus unit rows and context columns) for vectorized lookups"""
+        documents = self.documents_cache or []
+        self.doc_ids = np.array([doc['id'] for doc in documents], dtype=np.int64)
+        self.row_of = {doc['id']: row for row, doc in enumerate(documents)}
+        self.score_matrix = np.ascontiguousarray(
+            np.array([[doc.get(field) or 0 for field in SCORE_FIELDS] for doc in documents],
+                     dtype=np.float32).reshape(-1, len(SCORE_FIELDS))
+        )
+        self.score_norms = np.linalg.norm(self.score_matrix, axis=1)
+        self.unit_scores = np.divide(self.score_matrix, self.score_norms[:, None],
+                                     out=np.zeros_like(self.score_matrix), where=self.score_norms[:, None] > 0)
+        self.document_types = np.array([(doc.get('document_type') or '').lower() for doc in documents], dtype=str)
+        self.organizations = np.array([(doc.get('author_organization') or '').lower() for doc in documents], dtype=str)
+    
+    def _top_k(self, scores: np.ndarray, valid: np.ndarray, top_k: int) -> List[Tuple[int, float]]:
+        """(doc_id, score) for the top_k valid entries, best first"""
+        candidates = np.flatnonzero(valid)
+        k = min(top_k, len(candidates))
+        if k <= 0:
+            return []
+        values = scores[candidates]
+        top = np.argpartition(-values, k - 1)[:k]
+        top = top[np.argsort(-values[top], kind='stable')]
+        return [(int(self.doc_ids[candidates[i]]), float(values[i])) for i in top]
+    
+    def _get_document(self, doc_id: int) -> Optional[Dict]:
+        """Document metadata by id"""
+        self.load_documents()
+        return self.documents_by_id.get(doc_id)
+    
+    def _load_vector_texts(self, doc_ids: List[int]) -> List[Tuple[int, str]]:
+        """Texts to vectorize for the given documents"""
+        conn = self.get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT id, {VECTOR_TEXT_SQL} AS vector_text FROM documents WHERE id = ANY(%s)",
+                           (doc_ids,))
+            return [(row['id'], row['vector_text']) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+    
     def build_content_vectors(self, documents=None):
-        """Build TF-IDF vectors for document content similarity analysis."""
-        if documents is None:
-            documents = self.load_documents()
-        
-        if not documents:
+        """
+        Bring the persisted TF-IDF index up to date. Only documents whose text
+        changed since the index was saved are read and vectorized.
+        """
+        self.vector_index = get_vector_index()
+        self.vectors_synced_at = time.time()
+        
+        if documents is not None:
+            # In-memory documents (dicts with id, title, content, text_content)
+            self.vector_index.add([
+                (doc['id'],
+                 f"{doc.get('title') or ''} {doc.get('content') or ''} {(doc.get('text_content') or '')[:1000]}",
+                 '')
+                for doc in documents
+            ])
             return
         
-        # Prepare document texts for vectorization
-        doc_texts = []
-        for doc in documents:
-            # Handle database tuple format: (id, title, content, text_content, document_type, author_organization, ...)
-            if isinstance(doc, tuple):
-                title = doc[1] or ''
-                content = doc[2] or ''
-                text_content = doc[3] or ''
-            else:
-                # Handle dictionary format for compatibility
-                title = doc.get('title', '')
-                content = doc.get('content', '')
-                text_content = doc.get('text_content', '') or doc.get('content', '')
-            
-            combined_text = f"{title} {content} {text_content[:1000]}"
-            doc_texts.append(combined_text.lower())
-        
-        # Create TF-IDF vectors
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
-            stop_words='english',
-            ngram_range=(1, 2),
-            min_df=1,
-            max_df=0.8
-        )
+        conn = None
+        try:
+            conn = self.get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT id, {VECTOR_HASH_SQL} AS vector_hash
+                FROM documents
+                WHERE text_content IS NOT NULL AND text_content != '' AND deleted_at IS NULL
+            """)
+            current_hashes = {row['id']: row['vector_hash'] for row in cursor.fetchall()}
+        except Exception as e:
+            self.logger.error(f"Error checking document vectors: {e}")
+            return
+        finally:
+            if conn:
+                conn.close()
         
-        self.document_vectors = self.vectorizer.fit_transform(doc_texts)
+        changes = self.vector_index.sync(current_hashes, self._load_vector_texts)
+        if changes['added'] or changes['removed']:
+            self.logger.info(f"Vector index updated: {changes['added']} added, {changes['removed']} removed")
+            self.vector_index.save()
         
-    def calculate_content_similarity(self, target_doc_id: int, top_k: int = 5) -> List[Tuple[int, float]]:
+    def calculate_content_similarity(self, target_doc_id: int, top_k: int = 5,
+                                     use_precomputed: bool = True) -> List[Tuple[int, float]]:
         """Calculate content similarity between target document and all others."""
-        documents = self.load_documents()
-        
-        if not documents or self.document_vectors is None:
-            return []
-        
-        # Find target document index
-        target_idx = None
-        for idx, doc in enumerate(documents):
-            if doc['id'] == target_doc_id:
-                target_idx = idx
-                break
-        
-        if target_idx is None:
-            return []
-        
-        # Calculate cosine similarities
-        target_vector = self.document_vectors[target_idx]
-        similarities = cosine_similarity(target_vector, self.document_vectors).flatten()
-        
-        # Get top similar documents (excluding self)
-        similar_indices = similarities.argsort()[::-1]
-        results = []
+        if use_precomputed:
+            stored = self.get_precomputed_neighbors(target_doc_id, 'content', top_k)
+            if stored is not None:
+                return stored
         
-        for idx in similar_indices:
-            if idx != target_idx and len(results) < top_k:
-                doc_id = documents[idx]['id']
-                similarity_score = similarities[idx]
-                if similarity_score > 0.1:  # Minimum similarity threshold
-                    results.append((doc_id, similarity_score))
+        if self.vector_index is None or time.time() - self.vectors_synced_at > VECTOR_SYNC_INTERVAL:
+            self.build_content_vectors()
         
-        return results
+        # Minimum similarity threshold of 0.1
+        return self.vector_index.most_similar(target_doc_id, top_k=top_k, min_score=0.1)
     
-    def calculate_scoring_similarity(self, target_doc_id: int, top_k: int = 5) -> List[Tuple[int, float]]:
+    def calculate_scoring_similarity(self, target_doc_id: int, top_k: int = 5,
+                                     use_precomputed: bool = True) -> List[Tuple[int, float]]:
         """Find documents with similar patent scoring patterns."""
-        documents = self.load_documents()
+        if use_precomputed:
+            stored = self.get_precomputed_neighbors(target_doc_id, 'scoring', top_k)
+            if stored is not None:
+                return stored
         
-        if not documents:
+        if not self.load_documents():
             return []
         
         # Find target document
-        target_doc = None
-        for doc in documents:
-            if doc['id'] == target_doc_id:
-                target_doc = doc
-                break
+        row = self.row_of.get(target_doc_id)
         
-        if not target_doc:
+        if row is None or self.score_norms[row] == 0:
             return []
         
-        # Extract target scores
-        target_scores = np.array([
-            target_doc.get('ai_cybersecurity_score', 0) or 0,
-            target_doc.get('quantum_cybersecurity_score', 0) or 0,
-            target_doc.get('ai_ethics_score', 0) or 0,
-            target_doc.get('quantum_ethics_score', 0) or 0
-        ])
+        # Cosine similarity of the score profiles against every document at once
+        similarities = self.unit_scores @ self.unit_scores[row]
+        valid = self.score_norms > 0
+        valid[row] = False
         
-        # Calculate scoring pattern similarities
-        similarities = []
-        for doc in documents:
-            if doc['id'] == target_doc_id:
-                continue
-                
-            doc_scores = np.array([
-                doc.get('ai_cybersecurity_score', 0) or 0,
-                doc.get('quantum_cybersecurity_score', 0) or 0,
-                doc.get('ai_ethics_score', 0) or 0,
-                doc.get('quantum_ethics_score', 0) or 0
-            ])
-            
-            # Calculate normalized similarity
-            if np.linalg.norm(target_scores) > 0 and np.linalg.norm(doc_scores) > 0:
-                similarity = np.dot(target_scores, doc_scores) / (
-                    np.linalg.norm(target_scores) * np.linalg.norm(doc_scores)
-                )
-                similarities.append((doc['id'], similarity))
-        
-        # Sort by similarity and return top_k
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return similarities[:top_k]
+        return self._top_k(similarities, valid, top_k)
     
     def get_context_recommendations(self, document_type: str = None, organization: str = None, 
                                   framework_focus: str = None, top_k: int = 5) -> List[Dict]:
@@ -194,36 +231,155 @@ class DocumentRecommendationEngine:
         if not documents:
             return []
         
-        scored_docs = []
+        scores = np.zeros(len(documents), dtype=np.float32)
         
-        for doc in documents:
-            score = 0
-            
-            # Document type matching
-            if document_type and doc.get('document_type', '').lower() == document_type.lower():
-                score += 3
-            
-            # Organization matching
-            if organization and organization.lower() in (doc.get('organization', '') or '').lower():
-                score += 2
-            
-            # Framework focus scoring
-            if framework_focus:
-                if framework_focus == 'ai_cybersecurity':
-                    score += (doc.get('ai_cybersecurity_score', 0) or 0) / 20
-                elif framework_focus == 'quantum_cybersecurity':
-                    score += (doc.get('quantum_cybersecurity_score', 0) or 0) * 2
-                elif framework_focus == 'ai_ethics':
-                    score += (doc.get('ai_ethics_score', 0) or 0) / 20
-                elif framework_focus == 'quantum_ethics':
-                    score += (doc.get('quantum_ethics_score', 0) or 0) / 20
-            
-            if score > 0:
-                scored_docs.append((doc, score))
+        # Document type matching
+        if document_type:
+            scores += 3 * (self.document_types == document_type.lower())
         
-        # Sort by score and return top documents
-        scored_docs.sort(key=lambda x: x[1], reverse=True)
-        return [doc for doc, score in scored_docs[:top_k]]
+        # Organization matching
+        if organization:
+            scores += 2 * (np.char.find(self.organizations, organization.lower()) >= 0)
+        
+        # Framework focus scoring
+        if framework_focus in FRAMEWORK_FOCUS_WEIGHTS:
+            column, weight = FRAMEWORK_FOCUS_WEIGHTS[framework_focus]
+            scores += self.score_matrix[:, column] * weight
+        
+        # Return the top scoring documents
+        return [self.documents_by_id[doc_id] for doc_id, _ in self._top_k(scores, scores > 0, top_k)]
+    
+    def _neighbors_in_blocks(self, matrix_block, start: int, top_k: int, min_score: float):
+        """
+        Yield (row, neighbour_row, rank, score) for a dense block of similarity
+        rows starting at ``start``; the caller has already masked invalid columns.
+        """
+        size = matrix_block.shape[0]
+        matrix_block[np.arange(size), np.arange(start, start + size)] = -np.inf  # never recommend itself
+        k = min(top_k, matrix_block.shape[1] - 1)
+        if k <= 0:
+            return
+        top = np.argpartition(-matrix_block, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(matrix_block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        for offset in range(size):
+            for rank in range(k):
+                if top_scores[offset, rank] > min_score:
+                    yield start + offset, int(top[offset, rank]), rank + 1, float(top_scores[offset, rank])
+    
+    def compute_all_recommendations(self, top_k: int = PRECOMPUTED_TOP_K,
+                                    block_size: int = RECOMMENDATION_BLOCK_SIZE) -> List[Tuple]:
+        """
+        All-pairs top-k neighbours for every document, computed in blocks of
+        rows so memory stays at block_size x documents. Returns
+        (document_id, kind, rank, recommended_id, score) rows.
+        """
+        self.load_documents(force_refresh=True)
+        self.build_content_vectors()
+        rows = []
+        
+        # Scoring-profile neighbours
+        valid = self.score_norms > 0
+        for start in range(0, len(self.doc_ids), block_size):
+            block = self.unit_scores[start:start + block_size] @ self.unit_scores.T
+            block[:, ~valid] = -np.inf
+            for row, neighbour, rank, score in self._neighbors_in_blocks(block, start, top_k, -np.inf):
+                if valid[row]:
+                    rows.append((int(self.doc_ids[row]), 'scoring', rank, int(self.doc_ids[neighbour]), score))
+        
+        # Content neighbours from the vector index (minimum similarity 0.1, as for live queries)
+        index = self.vector_index
+        weights, live, index_ids = index.weights, index.live, np.asarray(index.ids)
+        for start in range(0, weights.shape[0], block_size):
+            block = (weights[start:start + block_size] @ weights.T).toarray().astype(np.float32)
+            block[:, ~live] = -np.inf
+            for row, neighbour, rank, score in self._neighbors_in_blocks(block, start, top_k, 0.1):
+                if live[row]:
+                    rows.append((int(index_ids[row]), 'content', rank, int(index_ids[neighbour]), score))
+        
+        return rows
+    
+    def _ensure_recommendations_table(self, cursor):
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS document_recommendations (
+                document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+                kind VARCHAR(20) NOT NULL,
+                rank SMALLINT NOT NULL,
+                recommended_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+                score REAL NOT NULL,
+                computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (document_id, kind, rank)
+            )
+        """)
+    
+    def precompute_recommendations(self, top_k: int = PRECOMPUTED_TOP_K) -> Dict[str, int]:
+        """Recompute every document's neighbours and replace the document_recommendations table"""
+        rows = self.compute_all_recommendations(top_k=top_k)
+        
+        conn = None
+        try:
+            conn = self.get_db_connection()
+            cursor = conn.cursor()
+            self._ensure_recommendations_table(cursor)
+            cursor.execute("DELETE FROM document_recommendations")
+            execute_values(cursor, """
+                INSERT INTO document_recommendations (document_id, kind, rank, recommended_id, score)
+                VALUES %s
+                ON CONFLICT DO NOTHING
+            """, rows, page_size=5000)
+            conn.commit()
+        except Exception as e:
+            self.logger.error(f"Error storing recommendations: {e}")
+            if conn:
+                conn.rollback()
+            return {'documents': 0, 'recommendations': 0}
+        finally:
+            if conn:
+                conn.close()
+        
+        return {'documents': len({row[0] for row in rows}), 'recommendations': len(rows)}
+    
+    def get_precomputed_neighbors(self, doc_id: int, kind: str, top_k: int = 5) -> Optional[List[Tuple[int, float]]]:
+        """Stored (recommended_id, score) neighbours that are still live, or None if none are stored yet"""
+        conn = None
+        try:
+            conn = self.get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT r.recommended_id, r.score
+                FROM document_recommendations r
+                JOIN documents d ON d.id = r.recommended_id AND d.deleted_at IS NULL
+                WHERE r.document_id = %s AND r.kind = %s
+                ORDER BY r.rank
+                LIMIT %s
+            """, (doc_id, kind, top_k))
+            neighbours = [(row['recommended_id'], row['score']) for row in cursor.fetchall()]
+            return neighbours or None
+        except Exception as e:
+            self.logger.debug(f"No precomputed recommendations available: {e}")
+            return None
+        finally:
+            if conn:
+                conn.close()
+    
+    def get_precomputed_status(self) -> Dict:
+        """How many documents have stored neighbours and when they were computed"""
+        conn = None
+        try:
+            conn = self.get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COUNT(DISTINCT document_id) AS documents, MAX(computed_at) AS computed_at
+                FROM document_recommendations
+            """)
+            return dict(cursor.fetchone())
+        except Exception:
+            return {'documents': 0, 'computed_at': None}
+        finally:
+            if conn:
+                conn.close()
     
     def get_comprehensive_recommendations(self, target_doc_id: int, 
                                         include_content_similarity: bool = True,
@@ -237,7 +393,7 @@ class DocumentRecommendationEngine:
             Dict with recommendation categories and their results
         """
         # Initialize content vectors if needed
-        if self.document_vectors is None:
+        if self.vector_index is None:
             self.build_content_vectors()
         
         recommendations = {
@@ -247,13 +403,7 @@ class DocumentRecommendationEngine:
             'combined': []
         }
         
-        documents = self.load_documents()
-        target_doc = None
-        
-        for doc in documents:
-            if doc['id'] == target_doc_id:
-                target_doc = doc
-                break
+        target_doc = self._get_document(target_doc_id)
         
         if not target_doc:
             return recommendations
@@ -278,7 +428,7 @@ class DocumentRecommendationEngine:
         if include_context:
             contextual_docs = self.get_context_recommendations(
                 document_type=target_doc.get('document_type'),
-                organization=target_doc.get('organization'),
+                organization=target_doc.get('author_organization'),
                 top_k=5
             )
             recommendations['contextual'] = [
@@ -321,13 +471,8 @@ class DocumentRecommendationEngine:
     
     def _get_document_info(self, doc_id: int, score: float) -> Dict:
         """Get formatted document information with recommendation score."""
-        documents = self.load_documents()
-        
-        for doc in documents:
-            if doc['id'] == doc_id:
-                return self._format_document_info(doc, score)
-        
-        return {}
+        doc = self._get_document(doc_id)
+        return self._format_document_info(doc, score) if doc else {}
     
     def _format_document_info(self, doc: dict, score: float = None) -> Dict:
         """Format document information for recommendations."""
@@ -387,4 +532,15 @@ class DocumentRecommendationEngine:
         return [self._format_document_info(doc, score) for doc, score in scored_docs[:top_k]]
 
 # Global instance for use across the application
-recommendation_engine = DocumentRecommendationEngine()
\ No newline at end of file
+recommendation_engine = DocumentRecommendationEngine()
+
+def precompute_recommendations():
+    """Recompute and store recommendations for every document"""
+    return recommendation_engine.precompute_recommendations()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    start = time.time()
+    stats = precompute_recommendations()
+    print(f"Stored {stats['recommendations']} recommendations for {stats['documents']} documents "
+          f"in {time.time() - start:.1f}s")
@@ -0,0 +1,297 @@
+"""
+Full-Text Document Search for GUARDIAN
+Ranked, highlighted search over titles, organizations and document text using
+PostgreSQL full-text search, with an in-memory inverted index for development
+setups that run without PostgreSQL
+"""
+
+import os
+import re
+import json
+import math
+import html
+import logging
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from utils.database import LISTING_SCORE_COLUMNS, LISTING_TOPICS, DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Only the leading part of very long documents is indexed (tsvector positions
+# stop at 16383 and the whole vector must stay under 1MB); keep in step with the
+# search_vector definition in database/schema.sql
+SEARCH_TEXT_LIMIT = 200000
+
+_index_ready = False
+_index_lock = threading.Lock()
+
+def search_index_ready(db: Optional[DatabaseManager] = None) -> bool:
+    """
+    Whether the generated search_vector column and its GIN index exist.
+
+    Both are created by database/schema.sql (database/migrations/search_vector.sql
+    for existing databases); adding them rewrites the table, so the request
+    path only checks for them and never runs the DDL itself.
+    """
+    global _index_ready
+    if _index_ready:
+        return True
+
+    with _index_lock:
+        if _index_ready:
+            return True
+
+        db = db or DatabaseManager()
+        rows = db.execute_query("""
+            SELECT
+                EXISTS (SELECT 1 FROM information_schema.columns
+                        WHERE table_name = 'documents' AND column_name = 'search_vector') AS has_column,
+                EXISTS (SELECT 1 FROM pg_indexes
+                        WHERE tablename = 'documents' AND indexname = 'idx_documents_search_vector') AS has_index
+        """)
+        if not rows or not rows[0]['has_column']:
+            logger.warning("documents.search_vector is missing; apply database/migrations/search_vector.sql")
+            return False
+        if not rows[0]['has_index']:
+            logger.warning("idx_documents_search_vector is missing; searches scan the whole table until "
+                           "database/migrations/search_vector.sql is applied")
+
+        _index_ready = True
+        return True
+
+# Field weights mirror the A/B/C weights of the PostgreSQL search vector
+FIELD_WEIGHTS = {'title': 3.0, 'author_organization': 2.0, 'text': 1.0}
+
+STOPWORDS = frozenset("""
+    a an and are as at be but by for from has have in is it its of on or that the
+    this to was were will with not no into than then there these they which who
+""".split())
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def _stem(token: str) -> str:
+    """Light suffix stripping so plurals and simple inflections match"""
+    for suffix in ('ing', 'ies', 'es', 'ed', 's'):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)] + ('y' if suffix == 'ies' else '')
+    return token
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split on non-alphanumerics, drop stopwords and stem"""
+    return [_stem(token) for token in _TOKEN_PATTERN.findall((text or "").lower()) if token not in STOPWORDS]
+
+def matches_filters(doc: Dict, filters: Optional[Dict]) -> bool:
+    """Python mirror of DatabaseManager._listing_filters (soft-deleted documents never match)"""
+    if doc.get('deleted_at'):
+        return False
+    filters = filters or {}
+
+    for key, field in (('document_types', 'document_type'), ('organizations', 'author_organization'),
+                       ('regions', 'detected_region')):
+        if filters.get(key) and doc.get(field) not in filters[key]:
+            return False
+
+    if filters.get('years'):
+        year = str(doc.get('publish_date') or '')[:4]
+        if not year.isdigit() or int(year) not in {int(y) for y in filters['years']}:
+            return False
+
+    topics = LISTING_TOPICS.get(filters.get('topic'))
+    if topics and doc.get('topic') not in topics:
+        return False
+
+    for framework, (low, high) in (filters.get('score_ranges') or {}).items():
+        column = f"{framework}_score"
+        if column not in LISTING_SCORE_COLUMNS:
+            raise ValueError(f"Unknown score filter: {framework}")
+        score = doc.get(column)
+        if score is None or not low <= score <= high:
+            return False
+
+    return True
+
+class InvertedIndex:
+    """
+    In-memory inverted index with BM25 ranking.
+
+    Used when PostgreSQL full-text search is unavailable. Postings map each
+    stemmed term to per-document weighted term frequencies; a query matches
+    documents containing every query term, like ``websearch_to_tsquery``.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)
+        self.doc_lengths = {}
+        self.documents = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, doc_id, title: str = "", author_organization: str = "", text: str = "", **extra):
+        """Index (or re-index) one document"""
+        fields = {'title': title, 'author_organization': author_organization, 'text': (text or "")[:SEARCH_TEXT_LIMIT]}
+        frequencies = Counter()
+        for field, value in fields.items():
+            for token in tokenize(value):
+                frequencies[token] += FIELD_WEIGHTS[field]
+
+        with self._lock:
+            self._remove(doc_id)
+            for term, weight in frequencies.items():
+                self.postings[term][doc_id] = weight
+            self.doc_lengths[doc_id] = sum(frequencies.values())
+            self.documents[doc_id] = dict(extra, id=doc_id, title=title,
+                                          author_organization=author_organization, text=fields['text'])
+
+    def add_many(self, documents: Iterable[Dict]):
+        """Index documents given as dicts with id, title, author_organization and text"""
+        for doc in documents:
+            doc = dict(doc)
+            self.add(doc.pop('id'), **doc)
+
+    def remove(self, doc_id):
+        """Drop a document from the index"""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        if doc_id not in self.documents:
+            return
+        for term in set(tokenize(self.documents[doc_id]['title']) + tokenize(self.documents[doc_id]['author_organization'])
+                        + tokenize(self.documents[doc_id]['text'])):
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+        del self.documents[doc_id]
+        del self.doc_lengths[doc_id]
+
+    def search(self, query: str, page: int = 1, page_size: int = 20, filters: Optional[Dict] = None) -> Dict:
+        """Ranked, highlighted hits for the query and listing filters; same shape as the PostgreSQL search"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        empty = {'results': [], 'total': 0, 'page': page, 'page_size': page_size}
+        if not terms:
+            return empty
+
+        with self._lock:
+            postings = [self.postings.get(term, {}) for term in terms]
+            if not all(postings):
+                return empty
+
+            # Intersect starting from the rarest term
+            postings.sort(key=len)
+            matches = set(postings[0])
+            for posting in postings[1:]:
+                matches &= posting.keys()
+            matches = {doc_id for doc_id in matches if matches_filters(self.documents[doc_id], filters)}
+
+            total_docs = len(self.documents)
+            average_length = sum(self.doc_lengths.values()) / total_docs if total_docs else 0
+            scores = {}
+            for doc_id in matches:
+                length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / (average_length or 1))
+                score = 0.0
+                for posting in postings:
+                    frequency = posting[doc_id]
+                    idf = math.log(1 + (total_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                    score += idf * frequency * (self.k1 + 1) / (frequency + length_norm)
+                scores[doc_id] = score
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], str(item[0])))
+            start = (max(page, 1) - 1) * page_size
+            results = []
+            for doc_id, score in ranked[start:start + page_size]:
+                doc = self.documents[doc_id]
+                hit = {key: value for key, value in doc.items() if key != 'text'}
+                hit['rank'] = round(score, 4)
+                hit['highlight'] = highlight(doc['text'] or doc['title'], terms)
+                results.append(hit)
+
+        return {'results': results, 'total': len(ranked), 'page': page, 'page_size': page_size}
+
+def highlight(text: str, terms: List[str], max_fragments: int = 2, fragment_words: int = 30) -> str:
+    """Short HTML-escaped excerpts around matched terms, matches wrapped in <mark>"""
+    words = (text or "").split()
+    if not words:
+        return ""
+
+    term_set = set(terms)
+    hits = [i for i, word in enumerate(words) if _stem(re.sub(r'[^a-z0-9]', '', word.lower())) in term_set]
+    hit_positions = set(hits)
+    if not hits:
+        return html.escape(' '.join(words[:fragment_words]))
+
+    fragments = []
+    covered_until = -1
+    for position in hits:
+        if position <= covered_until:
+            continue
+        start = max(0, position - fragment_words // 3)
+        end = min(len(words), start + fragment_words)
+        fragment = []
+        for i in range(start, end):
+            escaped = html.escape(words[i])
+            fragment.append(f"<mark>{escaped}</mark>" if i in hit_positions else escaped)
+        fragments.append(' '.join(fragment))
+        covered_until = end
+        if len(fragments) >= max_fragments:
+            break
+
+    return ' ... '.join(fragments)
+
+def load_dev_documents(path: Optional[str] = None) -> List[Dict]:
+    """Documents for the development search index (documents.json by default)"""
+    path = path or os.getenv('GUARDIAN_DEV_DOCUMENTS', 'documents.json')
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path) as f:
+            raw_documents = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not load development documents: {e}")
+        return []
+
+    # Listing fields are kept so the fallback search applies the same filters
+    filter_fields = ['document_type', 'publish_date', 'detected_region', 'topic'] + LISTING_SCORE_COLUMNS
+    return [dict(
+        {field: doc.get(field) for field in filter_fields},
+        id=doc.get('id', i + 1),
+        title=doc.get('title', ''),
+        author_organization=doc.get('author_organization', ''),
+        text=doc.get('text_content') or doc.get('text') or doc.get('content', '')
+    ) for i, doc in enumerate(raw_documents) if not doc.get('deleted_at')]
+
+_fallback_index = None
+_fallback_lock = threading.Lock()
+
+def get_fallback_index() -> InvertedIndex:
+    """Process-wide inverted index used when PostgreSQL search is unavailable"""
+    global _fallback_index
+    if _fallback_index is None:
+        with _fallback_lock:
+            if _fallback_index is None:
+                index = InvertedIndex()
+                index.add_many(load_dev_documents())
+                _fallback_index = index
+    return _fallback_index
+
+def search_documents(query: str, page: int = 1, page_size: int = 20, filters: Optional[Dict] = None,
+                     db: Optional[DatabaseManager] = None) -> Dict:
+    """
+    Ranked, highlighted full-text search.
+
+    Uses PostgreSQL ``ts_rank``/``ts_headline`` when a database is configured
+    and falls back to the in-memory inverted index otherwise. Returns
+    {'results': [...], 'total', 'page', 'page_size'}; each hit carries its
+    rank and an HTML highlight with matches wrapped in <mark>.
+    """
+    db = db or DatabaseManager()
+    if db.engine and search_index_ready(db):
+        return db.search_documents(query, page, page_size, filters)
+    return get_fallback_index().search(query, page, page_size, filters)
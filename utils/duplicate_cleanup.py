@@ -1,13 +1,33 @@
 """
 Duplicate Document Cleanup Utility
-Identifies and manages duplicate documents in the repository
+Clusters duplicate documents across the whole repository and stores the groups
+for automatic cleanup and the Repository Admin duplicate tools
 """
 
-import hashlib
-import psycopg2
 import os
-from typing import List, Dict, Tuple
-from utils.db import fetch_documents
+import logging
+from typing import Dict, Iterator, List, Optional
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from utils.document_purge import LIVE_DOCUMENTS_SQL, deletion_column_ready, soft_delete_documents
+from utils.minhash_index import (
+    estimate_similarity, get_minhash_index, signature_from_bytes
+)
+
+logger = logging.getLogger(__name__)
+
+# Documents shorter than this are too thin to call content duplicates
+MIN_CONTENT_LENGTH = 500
+# Titles shorter than this ("Report", "Untitled") are too generic to group on
+MIN_TITLE_LENGTH = 10
+# Estimated Jaccard similarity at which two documents join the same cluster
+NEAR_DUPLICATE_THRESHOLD = 0.85
+# Rows fetched per round trip from server-side cursors
+STREAM_BATCH_SIZE = 2000
+
+GROUP_CONFIDENCE = {'exact_content': 1.0, 'similar_title': 0.8}
 
 def get_db_connection():
     """Get database connection using environment variables."""
@@ -23,160 +43,340 @@ def get_db_connection():
         print(f"Database connection error: {e}")
         return None
 
-def identify_duplicate_groups() -> List[Dict]:
-    """Identify groups of duplicate documents in the repository."""
-    
+class UnionFind:
+    """Disjoint-set forest with path compression and union by size"""
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def find(self, item):
+        parent = self.parent.setdefault(item, item)
+        if parent == item:
+            self.size.setdefault(item, 1)
+            return item
+        root = self.find(parent)
+        self.parent[item] = root
+        return root
+
+    def union(self, first, second) -> bool:
+        """Merge the sets of both items; False if they were already together"""
+        first_root, second_root = self.find(first), self.find(second)
+        if first_root == second_root:
+            return False
+        if self.size[first_root] < self.size[second_root]:
+            first_root, second_root = second_root, first_root
+        self.parent[second_root] = first_root
+        self.size[first_root] += self.size.pop(second_root)
+        return True
+
+    def groups(self) -> List[List]:
+        """Sets with more than one member"""
+        members = {}
+        for item in self.parent:
+            members.setdefault(self.find(item), []).append(item)
+        return [sorted(group) for group in members.values() if len(group) > 1]
+
+def _stream(conn, name: str, query: str, params=None) -> Iterator[tuple]:
+    """Iterate over a query through a server-side cursor, STREAM_BATCH_SIZE rows at a time"""
+    with conn.cursor(name=name) as cursor:
+        cursor.itersize = STREAM_BATCH_SIZE
+        cursor.execute(query, params)
+        for row in cursor:
+            yield row
+
+def ensure_duplicate_group_tables(conn) -> None:
+    """Create the tables holding the persisted duplicate groups"""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS duplicate_groups (
+                id SERIAL PRIMARY KEY,
+                group_type VARCHAR(30) NOT NULL,
+                confidence REAL NOT NULL,
+                group_key TEXT,
+                keep_document_id INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS duplicate_group_members (
+                group_id INTEGER NOT NULL REFERENCES duplicate_groups(id) ON DELETE CASCADE,
+                document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+                PRIMARY KEY (group_id, document_id)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_duplicate_group_members_document "
+                       "ON duplicate_group_members(document_id)")
+    conn.commit()
+
+def _content_clusters(conn, threshold: float) -> List[Dict]:
+    """
+    Union-find clusters of identical or near-identical content.
+
+    Exact duplicates come from documents.content_sha256; near-duplicates
+    from documents sharing an LSH bucket whose signatures agree above the
+    threshold. Only groups of colliding rows are ever read.
+    """
+    clusters = UnionFind()
+    content_hashes = {}
+    lengthy_text = f"length(COALESCE(NULLIF(d.text_content, ''), d.content, '')) > {MIN_CONTENT_LENGTH}"
+
+    for content_hash, ids in _stream(conn, 'duplicate_exact_scan', f"""
+        SELECT d.content_sha256, array_agg(d.id ORDER BY d.id)
+        FROM documents d
+        WHERE d.content_sha256 IS NOT NULL AND d.{LIVE_DOCUMENTS_SQL} AND {lengthy_text}
+        GROUP BY d.content_sha256
+        HAVING COUNT(*) > 1
+    """):
+        for doc_id in ids:
+            content_hashes[doc_id] = content_hash
+            clusters.union(ids[0], doc_id)
+
+    buckets = [ids for (ids,) in _stream(conn, 'duplicate_bucket_scan', """
+        SELECT array_agg(document_id ORDER BY document_id)
+        FROM document_lsh_buckets
+        GROUP BY band, bucket
+        HAVING COUNT(*) > 1
+    """)]
+    candidate_ids = sorted({doc_id for ids in buckets for doc_id in ids})
+
+    signatures = {}
+    if candidate_ids:
+        for doc_id, signature in _stream(conn, 'duplicate_signature_scan', f"""
+            SELECT s.document_id, s.signature
+            FROM document_signatures s
+            JOIN documents d ON d.id = s.document_id
+            WHERE s.document_id = ANY(%s) AND d.{LIVE_DOCUMENTS_SQL} AND {lengthy_text}
+        """, (candidate_ids,)):
+            signatures[doc_id] = signature_from_bytes(signature)
+
+    weakest_links = []
+    for ids in buckets:
+        ids = [doc_id for doc_id in ids if doc_id in signatures]
+        for i, first in enumerate(ids):
+            for second in ids[i + 1:]:
+                if clusters.find(first) == clusters.find(second):
+                    continue
+                similarity = estimate_similarity(signatures[first], signatures[second])
+                if similarity >= threshold:
+                    clusters.union(first, second)
+                    weakest_links.append((first, similarity))
+
+    # A cluster is only as confident as its weakest near-duplicate link
+    cluster_confidence = {}
+    for first, similarity in weakest_links:
+        root = clusters.find(first)
+        cluster_confidence[root] = min(similarity, cluster_confidence.get(root, 1.0))
+
+    results = []
+    for members in clusters.groups():
+        hashes = {content_hashes.get(doc_id) for doc_id in members}
+        if len(hashes) == 1 and None not in hashes:
+            results.append({'type': 'exact_content', 'key': hashes.pop(), 'ids': members, 'confidence': 1.0})
+        else:
+            confidence = cluster_confidence.get(clusters.find(members[0]), threshold)
+            results.append({'type': 'similar_content', 'key': None, 'ids': members,
+                            'confidence': round(confidence, 3)})
+    return results
+
+def _title_groups(conn, clustered_ids: set) -> List[Dict]:
+    """Documents sharing a normalized title that aren't already in a content cluster"""
+    results = []
+    for title, ids in _stream(conn, 'duplicate_title_scan', f"""
+        SELECT lower(trim(title)), array_agg(id ORDER BY id)
+        FROM documents
+        WHERE length(trim(title)) > {MIN_TITLE_LENGTH} AND {LIVE_DOCUMENTS_SQL}
+        GROUP BY lower(trim(title))
+        HAVING COUNT(*) > 1
+    """):
+        if not clustered_ids.intersection(ids):
+            results.append({'type': 'similar_title', 'key': title, 'ids': list(ids),
+                            'confidence': GROUP_CONFIDENCE['similar_title']})
+    return results
+
+def _persist_groups(conn, groups: List[Dict]) -> None:
+    """Replace the stored duplicate groups with the result of the latest run"""
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM duplicate_groups")
+        if groups:
+            # Keep the most recent document (highest id) by default
+            group_ids = execute_values(cursor, """
+                INSERT INTO duplicate_groups (group_type, confidence, group_key, keep_document_id)
+                VALUES %s RETURNING id
+            """, [(g['type'], g['confidence'], g['key'], max(g['ids'])) for g in groups], fetch=True)
+            members = [(group_id, doc_id) for (group_id,), group in zip(group_ids, groups) for doc_id in group['ids']]
+            execute_values(cursor, "INSERT INTO duplicate_group_members (group_id, document_id) VALUES %s",
+                           members, page_size=1000)
+    conn.commit()
+
+def cluster_duplicates(threshold: float = NEAR_DUPLICATE_THRESHOLD) -> Dict[str, int]:
+    """
+    Cluster duplicates over the entire documents table and persist the groups.
+
+    Content hashes and MinHash signatures are brought up to date first
+    (utils.minhash_index), so the scan itself only reads hash, bucket and
+    title collisions through server-side cursors.
+    """
+    stats = {'exact_content': 0, 'similar_content': 0, 'similar_title': 0}
+
+    get_minhash_index().backfill()
+    if not deletion_column_ready():
+        return stats
+
+    conn = get_db_connection()
+    if not conn:
+        print("Failed to establish database connection")
+        return stats
+
     try:
-        documents = fetch_documents()
-        if not documents:
-            return []
-        
-        # Limit processing to avoid timeouts on large datasets
-        max_docs = 200
-        if len(documents) > max_docs:
-            print(f"Processing {max_docs} most recent documents out of {len(documents)} total")
-            documents = documents[:max_docs]
-        
-        # Group documents by content hash
-        content_groups = {}
-        title_groups = {}
-        
-        for doc in documents:
-            doc_id = doc.get('id')
-            title = doc.get('title', '').strip().lower()
-            content = doc.get('text', '') or doc.get('content', '')
-            
-            # Create content hash for substantial content only
-            if content and len(content) > 500:  # Only check documents with substantial content
-                content_hash = hashlib.md5(content[:10000].encode('utf-8')).hexdigest()  # Use first 10k chars
-                if content_hash not in content_groups:
-                    content_groups[content_hash] = []
-                content_groups[content_hash].append(doc)
-            
-            # Group by similar titles (meaningful titles only)
-            if title and len(title) > 10:
-                if title not in title_groups:
-                    title_groups[title] = []
-                title_groups[title].append(doc)
-        
-        # Identify duplicate groups
-        duplicate_groups = []
-        
-        # Content-based duplicates (exact matches)
-        for content_hash, docs in content_groups.items():
-            if len(docs) > 1:
-                duplicate_groups.append({
-                    'type': 'exact_content',
-                    'content_hash': content_hash,
-                    'documents': docs,
-                    'count': len(docs),
-                    'confidence': 1.0
-                })
-        
-        # Title-based duplicates (only if not already in content group)
-        for title, docs in title_groups.items():
-            if len(docs) > 1:
-                # Check if these documents are already in a content duplicate group
-                existing_content_group = False
-                for group in duplicate_groups:
-                    if group['type'] == 'exact_content':
-                        group_ids = [d.get('id') for d in group['documents']]
-                        doc_ids = [d.get('id') for d in docs]
-                        if any(doc_id in group_ids for doc_id in doc_ids):
-                            existing_content_group = True
-                            break
-                
-                if not existing_content_group:
-                    duplicate_groups.append({
-                        'type': 'similar_title',
-                        'title': title,
-                        'documents': docs,
-                        'count': len(docs),
-                        'confidence': 0.8
-                    })
-        
-        return duplicate_groups
-        
+        ensure_duplicate_group_tables(conn)
+        groups = _content_clusters(conn, threshold)
+        clustered_ids = {doc_id for group in groups for doc_id in group['ids']}
+        groups += _title_groups(conn, clustered_ids)
+        _persist_groups(conn, groups)
+
+        for group in groups:
+            stats[group['type']] += 1
+        logger.info(f"Duplicate clustering stored {len(groups)} groups: {stats}")
+        return stats
     except Exception as e:
+        conn.rollback()
         print(f"Error in duplicate detection: {e}")
+        return stats
+    finally:
+        conn.close()
+
+def load_duplicate_groups(group_types: Optional[List[str]] = None) -> List[Dict]:
+    """Stored duplicate groups with their (still live) member documents"""
+    if not deletion_column_ready():
         return []
-                    'title': title,
-                    'documents': docs,
-                    'count': len(docs),
-                    'confidence': 0.8
-                })
-    
-    return duplicate_groups
-
-def remove_duplicates(duplicate_group: Dict, keep_document_id: str) -> bool:
-    """Remove duplicate documents, keeping only the specified document."""
-    
+    conn = get_db_connection()
+    if not conn:
+        return []
+
     try:
-        conn = get_db_connection()
-        if not conn:
-            print("Failed to establish database connection")
-            return False
-            
+        ensure_duplicate_group_tables(conn)
         with conn.cursor() as cursor:
-            # Get IDs of documents to remove
-            docs_to_remove = [
-                doc.get('id') for doc in duplicate_group['documents'] 
-                if doc.get('id') != keep_document_id
-            ]
-            
-            if not docs_to_remove:
-                return False
-            
-            # Remove duplicate documents
-            for doc_id in docs_to_remove:
-                cursor.execute("DELETE FROM documents WHERE id = %s", (doc_id,))
-            
-            conn.commit()
-        
+            cursor.execute(f"""
+                SELECT g.id, g.group_type, g.confidence, g.group_key, g.keep_document_id,
+                       array_agg(d.id ORDER BY d.id), array_agg(d.title ORDER BY d.id)
+                FROM duplicate_groups g
+                JOIN duplicate_group_members m ON m.group_id = g.id
+                JOIN documents d ON d.id = m.document_id AND d.{LIVE_DOCUMENTS_SQL}
+                WHERE %(types)s IS NULL OR g.group_type = ANY(%(types)s)
+                GROUP BY g.id
+                HAVING COUNT(*) > 1
+                ORDER BY g.confidence DESC, COUNT(*) DESC, g.id
+            """, {'types': group_types})
+            rows = cursor.fetchall()
+    except Exception as e:
+        print(f"Error loading duplicate groups: {e}")
+        return []
+    finally:
         conn.close()
-        
-        return True
-        
+
+    groups = []
+    for group_id, group_type, confidence, key, keep_id, ids, titles in rows:
+        group = {
+            'group_id': group_id,
+            'type': group_type,
+            'documents': [{'id': doc_id, 'title': title} for doc_id, title in zip(ids, titles)],
+            'count': len(ids),
+            'confidence': confidence,
+            'keep_document_id': keep_id if keep_id in ids else max(ids)
+        }
+        if group_type == 'exact_content':
+            group['content_hash'] = key
+        elif group_type == 'similar_title':
+            group['title'] = key
+        groups.append(group)
+    return groups
+
+def identify_duplicate_groups() -> List[Dict]:
+    """Re-cluster the whole repository and return the stored duplicate groups."""
+    cluster_duplicates()
+    return load_duplicate_groups()
+
+def remove_duplicates(duplicate_group: Dict, keep_document_id) -> bool:
+    """Remove duplicate documents, keeping only the specified document."""
+    return _delete_duplicates(duplicate_group, keep_document_id) > 0
+
+def _delete_duplicates(duplicate_group: Dict, keep_document_id) -> int:
+    """Soft-delete a group's other documents; returns how many were removed"""
+
+    docs_to_remove = [
+        doc.get('id') for doc in duplicate_group['documents']
+        if doc.get('id') != keep_document_id
+    ]
+    if not docs_to_remove:
+        return 0
+
+    try:
+        if duplicate_group.get('type') == 'exact_content':
+            # Groups are stored snapshots; only remove rows still identical to the kept one
+            conn = get_db_connection()
+            if not conn:
+                print("Failed to establish database connection")
+                return 0
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("""
+                        SELECT id FROM documents
+                        WHERE id = ANY(%s)
+                          AND content_sha256 = (SELECT content_sha256 FROM documents WHERE id = %s)
+                    """, (docs_to_remove, keep_document_id))
+                    docs_to_remove = [row[0] for row in cursor.fetchall()]
+            finally:
+                conn.close()
+
+        from utils.cache_refresh import invalidate_document_caches
+
+        # Rows are purged in the background; drop only the caches that can show them
+        removed = soft_delete_documents(docs_to_remove)
+        invalidate_document_caches(removed)
+        return len(removed)
+
     except Exception as e:
         print(f"Error removing duplicates: {e}")
-        return False
+        return 0
 
-def get_duplicate_summary() -> Dict:
+def get_duplicate_summary(refresh: bool = False) -> Dict:
     """Get summary of duplicate issues in the repository."""
-    
-    duplicate_groups = identify_duplicate_groups()
-    
+
+    if refresh:
+        cluster_duplicates()
+    duplicate_groups = load_duplicate_groups()
+
     total_duplicates = sum(group['count'] - 1 for group in duplicate_groups)
-    exact_content_groups = [g for g in duplicate_groups if g['type'] == 'exact_content']
-    similar_title_groups = [g for g in duplicate_groups if g['type'] == 'similar_title']
-    
+
     return {
         'total_duplicate_groups': len(duplicate_groups),
         'total_duplicate_documents': total_duplicates,
-        'exact_content_groups': len(exact_content_groups),
-        'similar_title_groups': len(similar_title_groups),
+        'exact_content_groups': sum(1 for g in duplicate_groups if g['type'] == 'exact_content'),
+        'similar_content_groups': sum(1 for g in duplicate_groups if g['type'] == 'similar_content'),
+        'similar_title_groups': sum(1 for g in duplicate_groups if g['type'] == 'similar_title'),
         'groups': duplicate_groups
     }
 
-def auto_cleanup_exact_duplicates() -> Dict:
-    """Automatically remove exact content duplicates, keeping the most recent."""
-    
-    duplicate_groups = identify_duplicate_groups()
-    exact_groups = [g for g in duplicate_groups if g['type'] == 'exact_content']
-    
+def cleanup_duplicate_groups(group_types: List[str]) -> Dict:
+    """Remove duplicates from the stored groups of the given types, keeping each group's chosen document."""
+
+    groups = load_duplicate_groups(group_types)
+
     cleaned_count = 0
-    
-    for group in exact_groups:
-        docs = group['documents']
-        
-        # Sort by upload date or ID to keep the most recent
-        sorted_docs = sorted(docs, key=lambda x: x.get('upload_date', ''), reverse=True)
-        keep_doc = sorted_docs[0]
-        
-        if remove_duplicates(group, keep_doc.get('id')):
-            cleaned_count += len(docs) - 1
-    
+
+    for group in groups:
+        cleaned_count += _delete_duplicates(group, group['keep_document_id'])
+
     return {
-        'groups_processed': len(exact_groups),
+        'groups_processed': len(groups),
         'documents_removed': cleaned_count
-    }
\ No newline at end of file
+    }
+
+def auto_cleanup_exact_duplicates() -> Dict:
+    """Automatically remove exact content duplicates, keeping the most recent."""
+    return cleanup_duplicate_groups(['exact_content'])
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(f"Duplicate groups: {cluster_duplicates()}")
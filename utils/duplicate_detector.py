@@ -4,86 +4,100 @@ Prevents ingestion of duplicate documents across all input methods
 """
 
 import os
-import hashlib
 import json
 from typing import Dict, List, Tuple, Optional
 from openai import OpenAI
-from utils.db import fetch_documents
+from utils.database import DatabaseManager
+from utils.minhash_index import get_minhash_index
+from utils.document_chunker import sampled_excerpt
+
+# Only the best few MinHash candidates are sent to the LLM for confirmation
+LLM_CONFIRMATION_LIMIT = 3
+
+# Token budget per document in the confirmation prompt, sampled from the start, middle and end
+CONFIRMATION_EXCERPT_TOKENS = 600
 
 class DuplicateDetector:
     """Advanced duplicate detection using content similarity and metadata analysis"""
     
     def __init__(self):
-        self.client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+        api_key = os.environ.get("OPENAI_API_KEY")
+        self.client = OpenAI(api_key=api_key) if api_key else None
+        self.index = get_minhash_index()
+        self.db = self.index.db
     
     def check_for_duplicates(self, title: str, content: str, url: str = "", filename: str = "") -> Dict[str, any]:
-        """Comprehensive duplicate detection across all existing documents"""
+        """Duplicate detection through the content hash, MinHash/LSH and metadata indexes"""
         
-        # Get all existing documents
-        existing_docs = fetch_documents()
-        if not existing_docs:
+        if not self.db.engine:
             return {"is_duplicate": False, "confidence": 0.0, "matches": []}
         
         # Multi-layer duplicate detection
-        exact_match = self._check_exact_duplicates(content, existing_docs)
+        exact_match = self._check_exact_duplicates(content)
         if exact_match["is_duplicate"]:
             return exact_match
         
-        content_similarity = self._check_content_similarity(title, content, existing_docs)
+        content_similarity = self._check_content_similarity(title, content)
         if content_similarity["is_duplicate"]:
             return content_similarity
         
-        metadata_similarity = self._check_metadata_similarity(title, url, filename, existing_docs)
+        metadata_similarity = self._check_metadata_similarity(title, url, filename)
         
         return metadata_similarity
     
-    def _check_exact_duplicates(self, content: str, existing_docs: List[Dict]) -> Dict[str, any]:
-        """Check for exact content matches using hashing"""
-        
-        # Create content hash
-        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
-        
-        for doc in existing_docs:
-            existing_content = doc.get('text', '') or doc.get('content', '')
-            existing_hash = hashlib.sha256(existing_content.encode('utf-8')).hexdigest()
-            
-            if content_hash == existing_hash:
-                return {
-                    "is_duplicate": True,
-                    "confidence": 1.0,
-                    "match_type": "exact_content",
-                    "matches": [{
-                        "id": doc.get('id'),
-                        "title": doc.get('title', 'Unknown'),
-                        "reason": "Identical content hash"
-                    }]
-                }
+    def _check_exact_duplicates(self, content: str) -> Dict[str, any]:
+        """Check for exact content matches through the indexed content_sha256 column"""
+        
+        for doc in self.index.find_exact(content)[:1]:
+            return {
+                "is_duplicate": True,
+                "confidence": 1.0,
+                "match_type": "exact_content",
+                "matches": [{
+                    "id": doc.get('id'),
+                    "title": doc.get('title') or 'Unknown',
+                    "reason": "Identical content hash"
+                }]
+            }
         
         return {"is_duplicate": False, "confidence": 0.0, "matches": []}
     
-    def _check_content_similarity(self, title: str, content: str, existing_docs: List[Dict]) -> Dict[str, any]:
-        """Check for content similarity using LLM analysis"""
+    def _check_content_similarity(self, title: str, content: str) -> Dict[str, any]:
+        """
+        Check for near-duplicate content.
+
+        MinHash/LSH narrows the collection to a handful of candidates with
+        their estimated Jaccard similarity; only those are confirmed by the
+        LLM. Without an LLM client the estimate is used directly.
+        """
+        
+        if not content or len(content) < 100:
+            return {"is_duplicate": False, "confidence": 0.0, "matches": []}
         
-        # Check against each existing document
+        candidates = self.index.find_candidates(content, limit=LLM_CONFIRMATION_LIMIT)
         high_similarity_matches = []
         
-        for doc in existing_docs:
-            existing_title = doc.get('title', '')
-            existing_content = doc.get('text', '') or doc.get('content', '')
-            
-            if not existing_content or len(existing_content) < 100:
-                continue
-            
-            similarity_result = self._analyze_content_similarity(
-                title, content[:2000], existing_title, existing_content[:2000]
-            )
-            
-            if similarity_result["similarity"] > 0.8:
+        for candidate in candidates:
+            similarity = candidate["similarity"]
+            reason = f"Estimated {similarity:.0%} shingle overlap"
+            
+            if self.client:
+                existing = self._fetch_document_text(candidate["id"])
+                similarity_result = self._analyze_content_similarity(
+                    title, sampled_excerpt(content, CONFIRMATION_EXCERPT_TOKENS),
+                    existing.get('title', ''), sampled_excerpt(existing.get('text', ''), CONFIRMATION_EXCERPT_TOKENS)
+                )
+                if similarity_result["reasoning"] != "Analysis failed":
+                    similarity = similarity_result["similarity"]
+                    reason = similarity_result["reasoning"]
+            
+            if similarity > 0.8:
                 high_similarity_matches.append({
-                    "id": doc.get('id'),
-                    "title": existing_title,
-                    "similarity": similarity_result["similarity"],
-                    "reason": similarity_result["reasoning"]
+                    "id": candidate["id"],
+                    "title": candidate.get("title") or 'Unknown',
+                    "similarity": similarity,
+                    "estimated_similarity": candidate["similarity"],
+                    "reason": reason
                 })
         
         if high_similarity_matches:
@@ -100,6 +114,15 @@ class DuplicateDetector:
         
         return {"is_duplicate": False, "confidence": 0.0, "matches": []}
     
+    def _fetch_document_text(self, doc_id) -> Dict[str, str]:
+        """Title and leading text of one stored document, for LLM confirmation"""
+        rows = self.db.execute_query("""
+            SELECT COALESCE(title, '') AS title,
+                   LEFT(COALESCE(NULLIF(text_content, ''), content, ''), 2000) AS text
+            FROM documents WHERE id = :id
+        """, {'id': doc_id})
+        return rows[0] if rows else {}
+    
     def _analyze_content_similarity(self, title1: str, content1: str, title2: str, content2: str) -> Dict[str, any]:
         """Use LLM to analyze content similarity"""
         
@@ -153,17 +176,17 @@ class DuplicateDetector:
             print(f"LLM similarity analysis failed: {e}")
             return {"similarity": 0.0, "reasoning": "Analysis failed", "same_document": False}
     
-    def _check_metadata_similarity(self, title: str, url: str, filename: str, existing_docs: List[Dict]) -> Dict[str, any]:
+    def _check_metadata_similarity(self, title: str, url: str, filename: str) -> Dict[str, any]:
         """Check for metadata-based duplicates"""
         
         metadata_matches = []
         
-        for doc in existing_docs:
+        for doc in self._fetch_metadata_candidates(title, url, filename):
             similarity_score = 0.0
             reasons = []
             
             # Title similarity
-            existing_title = doc.get('title', '').lower()
+            existing_title = (doc.get('title') or '').lower()
             if title.lower() == existing_title:
                 similarity_score += 0.4
                 reasons.append("Identical titles")
@@ -172,13 +195,13 @@ class DuplicateDetector:
                 reasons.append("Similar titles")
             
             # URL similarity
-            existing_url = doc.get('url', '') or doc.get('source_url', '')
+            existing_url = doc.get('source_url') or doc.get('source') or ''
             if url and existing_url and url.lower() == existing_url.lower():
                 similarity_score += 0.3
                 reasons.append("Identical URLs")
             
             # Filename similarity
-            existing_filename = doc.get('filename', '')
+            existing_filename = doc.get('filename') or ''
             if filename and existing_filename:
                 if filename.lower() == existing_filename.lower():
                     similarity_score += 0.3
@@ -208,6 +231,24 @@ class DuplicateDetector:
         
         return {"is_duplicate": False, "confidence": 0.0, "matches": []}
 
+    def _fetch_metadata_candidates(self, title: str, url: str, filename: str) -> List[Dict]:
+        """
+        Documents sharing the title, URL or filename. A metadata match needs
+        at least one of these to clear the threshold, so nothing else is read.
+        """
+        rows = self.db.execute_query("""
+            SELECT id, title, source,
+                   metadata->>'source_url' AS source_url,
+                   metadata->>'filename' AS filename
+            FROM documents
+            WHERE deleted_at IS NULL
+              AND (lower(title) = lower(:title)
+                   OR (:url <> '' AND (lower(source) = lower(:url) OR lower(metadata->>'source_url') = lower(:url)))
+                   OR (:filename <> '' AND lower(metadata->>'filename') = lower(:filename)))
+            LIMIT 50
+        """, {'title': title or '', 'url': url or '', 'filename': filename or ''})
+        return rows if isinstance(rows, list) else []
+
 def check_document_duplicates(title: str, content: str, url: str = "", filename: str = "") -> Dict[str, any]:
     """Main function for duplicate detection"""
     detector = DuplicateDetector()
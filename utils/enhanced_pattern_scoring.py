@@ -5,24 +5,23 @@ Optimized for comprehensive document scoring without API dependencies
 """
 
 from typing import Dict, Optional
-import re
 
-def analyze_content_depth(text: str, title: str) -> Dict[str, int]:
+from utils.term_index import TermIndex, get_term_index
+
+def analyze_content_depth(text: str, title: str, index: Optional[TermIndex] = None) -> Dict[str, int]:
     """
     Analyze content depth using patent-based criteria with LLM-informed patterns
     """
-    text_lower = text.lower()
-    title_lower = title.lower()
-    combined = f"{title_lower} {text_lower}"
+    index = index or get_term_index(text, title)
     
     # Content depth indicators
-    implementation_depth = len(re.findall(r'\b(implement|deploy|operational|execute|establish|develop|create|build|design)\w*', combined))
-    framework_mentions = len(re.findall(r'\b(framework|standard|guideline|policy|procedure|protocol|methodology)\w*', combined))
-    technical_detail = len(re.findall(r'\b(architecture|system|process|mechanism|algorithm|component|structure)\w*', combined))
+    implementation_depth = index.word_prefix_count(('implement', 'deploy', 'operational', 'execute', 'establish', 'develop', 'create', 'build', 'design'))
+    framework_mentions = index.word_prefix_count(('framework', 'standard', 'guideline', 'policy', 'procedure', 'protocol', 'methodology'))
+    technical_detail = index.word_prefix_count(('architecture', 'system', 'process', 'mechanism', 'algorithm', 'component', 'structure'))
     
     # Assessment and evaluation indicators
-    assessment_terms = len(re.findall(r'\b(assess|evaluat|analyz|measur|test|validat|verif|audit|review)\w*', combined))
-    risk_management = len(re.findall(r'\b(risk|threat|vulnerabil|attack|security|protect|defend|mitigat)\w*', combined))
+    assessment_terms = index.word_prefix_count(('assess', 'evaluat', 'analyz', 'measur', 'test', 'validat', 'verif', 'audit', 'review'))
+    risk_management = index.word_prefix_count(('risk', 'threat', 'vulnerabil', 'attack', 'security', 'protect', 'defend', 'mitigat'))
     
     return {
         'implementation_depth': min(25, implementation_depth * 3),
@@ -32,22 +31,20 @@ def analyze_content_depth(text: str, title: str) -> Dict[str, int]:
         'risk_awareness': min(15, risk_management * 2)
     }
 
-def score_ai_cybersecurity_enhanced(text: str, title: str) -> Optional[int]:
+def score_ai_cybersecurity_enhanced(text: str, title: str, index: Optional[TermIndex] = None) -> Optional[int]:
     """
     Enhanced AI cybersecurity scoring using patent formulas + LLM insights
     """
-    text_lower = text.lower()
-    title_lower = title.lower()
-    combined = f"{title_lower} {text_lower}"
+    index = index or get_term_index(text, title)
     
     # Must have AI/ML context
-    ai_context = any(term in combined for term in [
+    ai_context = index.any_present([
         'ai', 'artificial intelligence', 'machine learning', 'neural network',
         'deep learning', 'automated', 'intelligent system', 'algorithm'
     ])
     
     # Must have security context
-    security_context = any(term in combined for term in [
+    security_context = index.any_present([
         'security', 'cybersecurity', 'threat', 'risk', 'vulnerability',
         'attack', 'defense', 'protection', 'secure', 'safety'
     ])
@@ -64,11 +61,11 @@ def score_ai_cybersecurity_enhanced(text: str, title: str) -> Optional[int]:
         'ai robustness', 'ai assurance', 'trustworthy ai', 'responsible ai',
         'artificial intelligence', 'machine learning', 'neural network'
     ]
-    ai_security_score = min(40, sum(3 for term in ai_security_terms if term in combined))
+    ai_security_score = min(40, 3 * index.count_present(ai_security_terms))
     
     # Boost for documents with strong AI + security combination
-    if any(ai_term in combined for ai_term in ['ai', 'artificial intelligence', 'machine learning']):
-        security_boost = min(20, sum(2 for term in ['security', 'cybersecurity', 'threat', 'risk', 'vulnerability'] if term in combined))
+    if index.any_present(['ai', 'artificial intelligence', 'machine learning']):
+        security_boost = min(20, 2 * index.count_present(['security', 'cybersecurity', 'threat', 'risk', 'vulnerability']))
         ai_security_score += security_boost
     
     base_score += min(40, ai_security_score)
@@ -78,7 +75,7 @@ def score_ai_cybersecurity_enhanced(text: str, title: str) -> Optional[int]:
         'deployment', 'implementation', 'operational', 'production',
         'enterprise', 'scalable', 'systematic', 'comprehensive'
     ]
-    impl_score = min(25, sum(3 for term in implementation_terms if term in combined))
+    impl_score = min(25, 3 * index.count_present(implementation_terms))
     base_score += impl_score
     
     # Security practices and controls (25 points)
@@ -87,7 +84,7 @@ def score_ai_cybersecurity_enhanced(text: str, title: str) -> Optional[int]:
         'audit', 'compliance', 'governance', 'oversight', 'testing',
         'validation', 'verification', 'assessment'
     ]
-    practices_score = min(25, sum(2 for term in security_practices if term in combined))
+    practices_score = min(25, 2 * index.count_present(security_practices))
     base_score += practices_score
     
     # Advanced security concepts (20 points)
@@ -96,32 +93,30 @@ def score_ai_cybersecurity_enhanced(text: str, title: str) -> Optional[int]:
         'incident response', 'forensics', 'zero trust', 'defense in depth',
         'security architecture', 'threat intelligence'
     ]
-    advanced_score = min(20, sum(4 for term in advanced_terms if term in combined))
+    advanced_score = min(20, 4 * index.count_present(advanced_terms))
     base_score += advanced_score
     
     # Content depth analysis
-    depth_analysis = analyze_content_depth(text, title)
+    depth_analysis = analyze_content_depth(text, title, index)
     depth_bonus = sum(depth_analysis.values()) // 5  # Scale down depth bonus
     
     final_score = min(100, base_score + depth_bonus)
     return final_score if final_score > 0 else None
 
-def score_ai_ethics_enhanced(text: str, title: str) -> Optional[int]:
+def score_ai_ethics_enhanced(text: str, title: str, index: Optional[TermIndex] = None) -> Optional[int]:
     """
     Enhanced AI ethics scoring using patent formulas + LLM insights
     """
-    text_lower = text.lower()
-    title_lower = title.lower()
-    combined = f"{title_lower} {text_lower}"
+    index = index or get_term_index(text, title)
     
     # Must have AI context
-    ai_context = any(term in combined for term in [
+    ai_context = index.any_present([
         'ai', 'artificial intelligence', 'machine learning', 'automated',
         'algorithm', 'intelligent system'
     ])
     
     # Must have ethics/governance context
-    ethics_context = any(term in combined for term in [
+    ethics_context = index.any_present([
         'ethics', 'ethical', 'responsible', 'governance', 'accountability',
         'transparency', 'fairness', 'bias', 'trust', 'inclusion'
     ])
@@ -137,7 +132,7 @@ def score_ai_ethics_enhanced(text: str, title: str) -> Optional[int]:
         'trustworthy ai', 'ai accountability', 'ai transparency',
         'algorithmic fairness', 'ai bias', 'explainable ai'
     ]
-    ethics_score = min(30, sum(5 for term in ai_ethics_terms if term in combined))
+    ethics_score = min(30, 5 * index.count_present(ai_ethics_terms))
     base_score += ethics_score
     
     # Fairness and bias (25 points)
@@ -145,7 +140,7 @@ def score_ai_ethics_enhanced(text: str, title: str) -> Optional[int]:
         'bias', 'fairness', 'discrimination', 'equity', 'inclusion',
         'diversity', 'representative', 'equitable', 'unbiased'
     ]
-    fairness_score = min(25, sum(3 for term in fairness_terms if term in combined))
+    fairness_score = min(25, 3 * index.count_present(fairness_terms))
     base_score += fairness_score
     
     # Transparency and explainability (25 points)
@@ -153,7 +148,7 @@ def score_ai_ethics_enhanced(text: str, title: str) -> Optional[int]:
         'transparency', 'explainable', 'interpretable', 'understandable',
         'clear', 'open', 'accessible', 'comprehensible'
     ]
-    transparency_score = min(25, sum(3 for term in transparency_terms if term in combined))
+    transparency_score = min(25, 3 * index.count_present(transparency_terms))
     base_score += transparency_score
     
     # Governance and oversight (20 points)
@@ -161,32 +156,30 @@ def score_ai_ethics_enhanced(text: str, title: str) -> Optional[int]:
         'governance', 'oversight', 'accountability', 'responsibility',
         'compliance', 'regulation', 'policy', 'framework', 'guidelines'
     ]
-    governance_score = min(20, sum(2 for term in governance_terms if term in combined))
+    governance_score = min(20, 2 * index.count_present(governance_terms))
     base_score += governance_score
     
     # Content depth analysis
-    depth_analysis = analyze_content_depth(text, title)
+    depth_analysis = analyze_content_depth(text, title, index)
     depth_bonus = sum(depth_analysis.values()) // 5
     
     final_score = min(100, base_score + depth_bonus)
     return final_score if final_score > 0 else None
 
-def score_quantum_cybersecurity_enhanced(text: str, title: str) -> Optional[int]:
+def score_quantum_cybersecurity_enhanced(text: str, title: str, index: Optional[TermIndex] = None) -> Optional[int]:
     """
     Enhanced quantum cybersecurity scoring using patent formulas
     """
-    text_lower = text.lower()
-    title_lower = title.lower()
-    combined = f"{title_lower} {text_lower}"
+    index = index or get_term_index(text, title)
     
     # Must have quantum context
-    quantum_context = any(term in combined for term in [
+    quantum_context = index.any_present([
         'quantum', 'post-quantum', 'quantum computing', 'quantum cryptography',
         'quantum-safe', 'quantum threat', 'pqc', 'quantum key'
     ])
     
     # Must have security context
-    security_context = any(term in combined for term in [
+    security_context = index.any_present([
         'security', 'cybersecurity', 'cryptography', 'encryption',
         'threat', 'risk', 'vulnerability', 'protection'
     ])
@@ -202,7 +195,7 @@ def score_quantum_cybersecurity_enhanced(text: str, title: str) -> Optional[int]
         'quantum security', 'quantum cryptography', 'quantum key distribution',
         'quantum-resistant', 'cryptographic agility'
     ]
-    quantum_score = min(35, sum(7 for term in quantum_security_terms if term in combined))
+    quantum_score = min(35, 7 * index.count_present(quantum_security_terms))
     base_score += quantum_score
     
     # Implementation readiness (25 points)
@@ -210,7 +203,7 @@ def score_quantum_cybersecurity_enhanced(text: str, title: str) -> Optional[int]
         'migration', 'transition', 'deployment', 'implementation',
         'adoption', 'integration', 'upgrade', 'modernization'
     ]
-    impl_score = min(25, sum(4 for term in implementation_terms if term in combined))
+    impl_score = min(25, 4 * index.count_present(implementation_terms))
     base_score += impl_score
     
     # Threat awareness (25 points)
@@ -218,7 +211,7 @@ def score_quantum_cybersecurity_enhanced(text: str, title: str) -> Optional[int]
         'threat', 'risk', 'vulnerability', 'attack', 'cryptanalysis',
         'quantum advantage', 'shor', 'grover', 'quantum supremacy'
     ]
-    threat_score = min(25, sum(3 for term in threat_terms if term in combined))
+    threat_score = min(25, 3 * index.count_present(threat_terms))
     base_score += threat_score
     
     # Standards and compliance (15 points)
@@ -226,29 +219,27 @@ def score_quantum_cybersecurity_enhanced(text: str, title: str) -> Optional[int]
         'nist', 'standard', 'compliance', 'certification', 'framework',
         'guideline', 'recommendation', 'best practice'
     ]
-    standards_score = min(15, sum(2 for term in standards_terms if term in combined))
+    standards_score = min(15, 2 * index.count_present(standards_terms))
     base_score += standards_score
     
     # Content depth analysis
-    depth_analysis = analyze_content_depth(text, title)
+    depth_analysis = analyze_content_depth(text, title, index)
     depth_bonus = sum(depth_analysis.values()) // 4
     
     final_score = min(100, base_score + depth_bonus)
     return final_score if final_score > 0 else None
 
-def score_quantum_ethics_enhanced(text: str, title: str) -> Optional[int]:
+def score_quantum_ethics_enhanced(text: str, title: str, index: Optional[TermIndex] = None) -> Optional[int]:
     """
     Enhanced quantum ethics scoring
     """
-    text_lower = text.lower()
-    title_lower = title.lower()
-    combined = f"{title_lower} {text_lower}"
+    index = index or get_term_index(text, title)
     
     # Must have quantum context
-    quantum_context = 'quantum' in combined
+    quantum_context = 'quantum' in index
     
     # Must have ethics/social context
-    ethics_context = any(term in combined for term in [
+    ethics_context = index.any_present([
         'ethics', 'ethical', 'inclusion', 'access', 'equity',
         'sustainability', 'society', 'social', 'governance'
     ])
@@ -263,7 +254,7 @@ def score_quantum_ethics_enhanced(text: str, title: str) -> Optional[int]:
         'quantum ethics', 'quantum governance', 'quantum inclusion',
         'quantum access', 'quantum equity', 'quantum sustainability'
     ]
-    ethics_score = min(35, sum(8 for term in quantum_ethics_terms if term in combined))
+    ethics_score = min(35, 8 * index.count_present(quantum_ethics_terms))
     base_score += ethics_score
     
     # Access and inclusion (30 points)
@@ -271,7 +262,7 @@ def score_quantum_ethics_enhanced(text: str, title: str) -> Optional[int]:
         'access', 'inclusion', 'equity', 'diversity', 'participation',
         'opportunity', 'education', 'training', 'workforce'
     ]
-    access_score = min(30, sum(4 for term in access_terms if term in combined))
+    access_score = min(30, 4 * index.count_present(access_terms))
     base_score += access_score
     
     # Sustainability and responsibility (25 points)
@@ -279,7 +270,7 @@ def score_quantum_ethics_enhanced(text: str, title: str) -> Optional[int]:
         'sustainability', 'sustainable', 'responsible', 'environmental',
         'energy', 'resource', 'efficiency', 'impact'
     ]
-    sustainability_score = min(25, sum(3 for term in sustainability_terms if term in combined))
+    sustainability_score = min(25, 3 * index.count_present(sustainability_terms))
     base_score += sustainability_score
     
     # Social impact (10 points)
@@ -287,23 +278,25 @@ def score_quantum_ethics_enhanced(text: str, title: str) -> Optional[int]:
         'society', 'social', 'community', 'public', 'benefit',
         'welfare', 'development', 'progress'
     ]
-    social_score = min(10, sum(2 for term in social_terms if term in combined))
+    social_score = min(10, 2 * index.count_present(social_terms))
     base_score += social_score
     
     # Content depth analysis
-    depth_analysis = analyze_content_depth(text, title)
+    depth_analysis = analyze_content_depth(text, title, index)
     depth_bonus = sum(depth_analysis.values()) // 4
     
     final_score = min(100, base_score + depth_bonus)
     return final_score if final_score > 0 else None
 
-def enhanced_pattern_scoring(text: str, title: str) -> Dict[str, Optional[int]]:
+def enhanced_pattern_scoring(text: str, title: str, index: Optional[TermIndex] = None) -> Dict[str, Optional[int]]:
     """
     Comprehensive enhanced pattern scoring combining patent formulas with content analysis
     """
+    # One title + text index answers every framework's term queries
+    index = index or get_term_index(text, title)
     return {
-        'ai_cybersecurity': score_ai_cybersecurity_enhanced(text, title),
-        'ai_ethics': score_ai_ethics_enhanced(text, title),
-        'quantum_cybersecurity': score_quantum_cybersecurity_enhanced(text, title),
-        'quantum_ethics': score_quantum_ethics_enhanced(text, title)
+        'ai_cybersecurity': score_ai_cybersecurity_enhanced(text, title, index),
+        'ai_ethics': score_ai_ethics_enhanced(text, title, index),
+        'quantum_cybersecurity': score_quantum_cybersecurity_enhanced(text, title, index),
+        'quantum_ethics': score_quantum_ethics_enhanced(text, title, index)
     }
\ No newline at end of file
@@ -15,32 +15,20 @@ from typing import Dict, List, Any, Optional
 from utils.risk_report_generator import RiskReportGenerator
 from utils.professional_gauge_generator import create_professional_assessment_dashboard, create_quantum_assessment_dashboard
 
+POLICY_REPORT_PAGES = [
+    '_create_policy_executive_summary_page',    # Page 1: Executive Summary with Gap Analysis Overview
+    '_create_framework_scoring_page',           # Page 2: Framework Scoring Dashboard
+    '_create_gap_analysis_page',                # Page 3: Detailed Gap Analysis
+    '_create_compliance_assessment_page',       # Page 4: Compliance Assessment
+    '_create_recommendations_page'              # Page 5: Recommendations and Action Items
+]
+
 class EnhancedRiskReportGenerator(RiskReportGenerator):
     """Enhanced report generator that includes comprehensive gap analysis details"""
     
     def generate_policy_analysis_report(self, document_data: Dict) -> bytes:
         """Generate comprehensive policy analysis report matching on-screen results"""
-        
-        pdf_buffer = io.BytesIO()
-        
-        with PdfPages(pdf_buffer) as pdf:
-            # Page 1: Executive Summary with Gap Analysis Overview
-            self._create_policy_executive_summary_page(pdf, document_data)
-            
-            # Page 2: Framework Scoring Dashboard
-            self._create_framework_scoring_page(pdf, document_data)
-            
-            # Page 3: Detailed Gap Analysis
-            self._create_gap_analysis_page(pdf, document_data)
-            
-            # Page 4: Compliance Assessment
-            self._create_compliance_assessment_page(pdf, document_data)
-            
-            # Page 5: Recommendations and Action Items
-            self._create_recommendations_page(pdf, document_data)
-        
-        pdf_buffer.seek(0)
-        return pdf_buffer.getvalue()
+        return self._render_report('policy_analysis', POLICY_REPORT_PAGES, self._report_fields(document_data))
     
     def _create_policy_executive_summary_page(self, pdf: PdfPages, document_data: Dict):
         """Create executive summary page with policy analysis overview"""
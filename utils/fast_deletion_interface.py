@@ -25,6 +25,7 @@ def get_documents_summary():
                     ELSE 'Empty'
                 END as content_status
             FROM documents 
+            WHERE deleted_at IS NULL
             ORDER BY created_at DESC
             LIMIT 500
         """)
@@ -163,7 +164,6 @@ def render_fast_deletion_interface():
                 if result['success']:
                     st.success(f"Successfully deleted {result['deleted_count']} documents in {result.get('execution_time', 0):.2f} seconds")
                     st.session_state['bulk_selected'] = []
-                    st.cache_data.clear()  # Clear cache to show updated counts
                     st.rerun()
                 else:
                     st.error(f"Deletion failed: {'; '.join(result['errors'])}")
@@ -181,7 +181,7 @@ def render_optimized_document_management():
     
     st.markdown("### Document Ingestion & Upload Management")
     
-    from components.document_uploader import render_document_uploader, render_bulk_upload
+    from components.document_uploader import render_document_uploader, render_bulk_upload, render_ingestion_status
     from utils.admin_performance_cache import render_optimized_system_metrics
     
     # Document upload interface
@@ -193,6 +193,7 @@ def render_optimized_document_management():
     # Bulk upload interface
     st.markdown("#### Bulk Document Upload")
     render_bulk_upload()
+    render_ingestion_status()
     
     st.markdown("---")
     
@@ -234,7 +235,6 @@ def render_optimized_document_management():
                 
                 if result['success']:
                     st.success(f"Bulk deletion completed: {result['deleted_count']} documents deleted")
-                    st.cache_data.clear()
                     st.rerun()
                 else:
                     st.error(f"Bulk deletion failed: {'; '.join(result['errors'])}")
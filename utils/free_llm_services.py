@@ -7,10 +7,11 @@ GUARDIAN's AI ethics, quantum security, and cybersecurity intelligence
 import json
 import os
 import asyncio
-import aiohttp
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 
+from utils.http_pool import http_pool
+
 @dataclass
 class FreeLLMService:
     """Configuration for free LLM services"""
@@ -185,25 +186,24 @@ class FreeLLMServiceManager:
         """Test Ollama local installation"""
         
         try:
-            async with aiohttp.ClientSession() as session:
-                # Test if Ollama is running
-                async with session.get("http://localhost:11434/api/tags") as response:
-                    if response.status == 200:
-                        models = await response.json()
-                        return {
-                            "status": "available",
-                            "service": "ollama",
-                            "models": models.get("models", []),
-                            "cost": "free",
-                            "setup_required": "Install Ollama locally"
-                        }
-                    else:
-                        return {
-                            "status": "unavailable",
-                            "service": "ollama",
-                            "error": "Ollama not running locally",
-                            "setup_instructions": "Install Ollama from https://ollama.com/"
-                        }
+            # Test if Ollama is running
+            response = await http_pool.request('ollama', 'GET', "http://localhost:11434/api/tags", retries=0)
+            if response.status == 200:
+                models = response.json()
+                return {
+                    "status": "available",
+                    "service": "ollama",
+                    "models": models.get("models", []),
+                    "cost": "free",
+                    "setup_required": "Install Ollama locally"
+                }
+            else:
+                return {
+                    "status": "unavailable",
+                    "service": "ollama",
+                    "error": "Ollama not running locally",
+                    "setup_instructions": "Install Ollama from https://ollama.com/"
+                }
         except Exception as e:
             return {
                 "status": "unavailable",
@@ -231,26 +231,27 @@ class FreeLLMServiceManager:
                 "parameters": {"max_length": 50}
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://api-inference.huggingface.co/models/microsoft/DialoGPT-medium",
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        return {
-                            "status": "available",
-                            "service": "huggingface",
-                            "cost": "free tier: 1000 requests/month",
-                            "models": ["DialoGPT", "BERT variants", "T5", "GPT-2"]
-                        }
-                    else:
-                        return {
-                            "status": "error",
-                            "service": "huggingface",
-                            "error": f"HTTP {response.status}",
-                            "response": await response.text()
-                        }
+            response = await http_pool.request(
+                'huggingface', 'POST',
+                "https://api-inference.huggingface.co/models/microsoft/DialoGPT-medium",
+                headers=headers,
+                json=payload,
+                retries=0
+            )
+            if response.status == 200:
+                return {
+                    "status": "available",
+                    "service": "huggingface",
+                    "cost": "free tier: 1000 requests/month",
+                    "models": ["DialoGPT", "BERT variants", "T5", "GPT-2"]
+                }
+            else:
+                return {
+                    "status": "error",
+                    "service": "huggingface",
+                    "error": f"HTTP {response.status}",
+                    "response": response.text()
+                }
         except Exception as e:
             return {"status": "error", "service": "huggingface", "error": str(e)}
     
@@ -279,26 +280,27 @@ class FreeLLMServiceManager:
                 "max_tokens": 50
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://api.groq.com/openai/v1/chat/completions",
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        return {
-                            "status": "available",
-                            "service": "groq",
-                            "cost": "free tier: 14400 tokens/minute",
-                            "models": ["llama3-8b-8192", "llama3-70b-8192", "mixtral-8x7b-32768"]
-                        }
-                    else:
-                        return {
-                            "status": "error",
-                            "service": "groq",
-                            "error": f"HTTP {response.status}",
-                            "response": await response.text()
-                        }
+            response = await http_pool.request(
+                'groq', 'POST',
+                "https://api.groq.com/openai/v1/chat/completions",
+                headers=headers,
+                json=payload,
+                retries=0
+            )
+            if response.status == 200:
+                return {
+                    "status": "available",
+                    "service": "groq",
+                    "cost": "free tier: 14400 tokens/minute",
+                    "models": ["llama3-8b-8192", "llama3-70b-8192", "mixtral-8x7b-32768"]
+                }
+            else:
+                return {
+                    "status": "error",
+                    "service": "groq",
+                    "error": f"HTTP {response.status}",
+                    "response": response.text()
+                }
         except Exception as e:
             return {"status": "error", "service": "groq", "error": str(e)}
     
@@ -327,26 +329,27 @@ class FreeLLMServiceManager:
                 "max_tokens": 50
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://api.together.xyz/v1/chat/completions",
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        return {
-                            "status": "available",
-                            "service": "together_ai",
-                            "cost": "$5 free credits",
-                            "models": ["Llama-2 variants", "Code Llama", "Mistral models"]
-                        }
-                    else:
-                        return {
-                            "status": "error",
-                            "service": "together_ai",
-                            "error": f"HTTP {response.status}",
-                            "response": await response.text()
-                        }
+            response = await http_pool.request(
+                'together_ai', 'POST',
+                "https://api.together.xyz/v1/chat/completions",
+                headers=headers,
+                json=payload,
+                retries=0
+            )
+            if response.status == 200:
+                return {
+                    "status": "available",
+                    "service": "together_ai",
+                    "cost": "$5 free credits",
+                    "models": ["Llama-2 variants", "Code Llama", "Mistral models"]
+                }
+            else:
+                return {
+                    "status": "error",
+                    "service": "together_ai",
+                    "error": f"HTTP {response.status}",
+                    "response": response.text()
+                }
         except Exception as e:
             return {"status": "error", "service": "together_ai", "error": str(e)}
     
@@ -375,26 +378,27 @@ class FreeLLMServiceManager:
                 "max_tokens": 100
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://api.perplexity.ai/chat/completions",
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        return {
-                            "status": "available",
-                            "service": "perplexity",
-                            "cost": "free tier: 5 requests/hour",
-                            "special_feature": "Real-time web search integration"
-                        }
-                    else:
-                        return {
-                            "status": "error",
-                            "service": "perplexity",
-                            "error": f"HTTP {response.status}",
-                            "response": await response.text()
-                        }
+            response = await http_pool.request(
+                'perplexity', 'POST',
+                "https://api.perplexity.ai/chat/completions",
+                headers=headers,
+                json=payload,
+                retries=0
+            )
+            if response.status == 200:
+                return {
+                    "status": "available",
+                    "service": "perplexity",
+                    "cost": "free tier: 5 requests/hour",
+                    "special_feature": "Real-time web search integration"
+                }
+            else:
+                return {
+                    "status": "error",
+                    "service": "perplexity",
+                    "error": f"HTTP {response.status}",
+                    "response": response.text()
+                }
         except Exception as e:
             return {"status": "error", "service": "perplexity", "error": str(e)}
     
@@ -425,26 +429,27 @@ class FreeLLMServiceManager:
                 "max_tokens": 50
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    service.api_endpoint,
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        return {
-                            "status": "available",
-                            "service": service.name,
-                            "cost": service.free_tier_limits,
-                            "specialization": service.specialization
-                        }
-                    else:
-                        return {
-                            "status": "error",
-                            "service": service.name,
-                            "error": f"HTTP {response.status}",
-                            "response": await response.text()
-                        }
+            response = await http_pool.request(
+                service.name, 'POST',
+                service.api_endpoint,
+                headers=headers,
+                json=payload,
+                retries=0
+            )
+            if response.status == 200:
+                return {
+                    "status": "available",
+                    "service": service.name,
+                    "cost": service.free_tier_limits,
+                    "specialization": service.specialization
+                }
+            else:
+                return {
+                    "status": "error",
+                    "service": service.name,
+                    "error": f"HTTP {response.status}",
+                    "response": response.text()
+                }
         except Exception as e:
             return {"status": "error", "service": service.name, "error": str(e)}
     
@@ -458,9 +463,12 @@ class FreeLLMServiceManager:
             "total_tested": len(self.services)
         }
         
-        for service in self.services:
-            test_result = await self.test_service_availability(service.name)
-            
+        # Probe every service concurrently; the slowest probe bounds the total time
+        test_results = await asyncio.gather(
+            *[self.test_service_availability(service.name) for service in self.services]
+        )
+        
+        for service, test_result in zip(self.services, test_results):
             if test_result.get("status") == "available":
                 results["available_services"].append({
                     "name": service.name,
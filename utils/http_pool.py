@@ -0,0 +1,268 @@
+"""
+Shared Async HTTP Client Pool for GUARDIAN
+Process-wide keep-alive connections for LLM providers and knowledge sources,
+with bounded concurrency per provider and retries with jittered backoff
+"""
+
+import os
+import json
+import time
+import atexit
+import random
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from utils.api_metering import DEFAULT_CALL_TOKENS, get_usage_meter
+
+logger = logging.getLogger(__name__)
+
+# Concurrent in-flight requests per provider; free tiers are heavily rate limited
+PROVIDER_CONCURRENCY = {
+    'openai': 8,
+    'anthropic': 4,
+    'groq': 4,
+    'together_ai': 4,
+    'perplexity': 2,
+    'huggingface': 2,
+    'ollama': 2,
+    'knowledge_base': 4
+}
+DEFAULT_PROVIDER_CONCURRENCY = 4
+
+CONNECTIONS_PER_HOST = 8
+TOTAL_CONNECTIONS = 64
+KEEPALIVE_SECONDS = 75
+
+# Retries on connection errors and these statuses, with full-jitter exponential backoff
+MAX_RETRIES = 2
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+# Providers whose calls are counted in the API usage meter: endpoint and cost estimate per call
+METERED_PROVIDERS = {
+    'openai': ('chat', 0.002),
+    'anthropic': ('messages', 0.003)
+}
+
+OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+ANTHROPIC_MESSAGES_URL = "https://api.anthropic.com/v1/messages"
+ANTHROPIC_VERSION = "2023-06-01"
+
+@dataclass
+class HTTPResponse:
+    """Fully read response, safe to hand across event loops and threads"""
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def text(self) -> str:
+        return self.body.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+class HTTPPool:
+    """
+    One aiohttp session on a dedicated event-loop thread, shared by every
+    provider client in the process.
+
+    Callers may await ``request`` from any event loop (each Streamlit session
+    and ``asyncio.run`` has its own) or call ``request_sync`` from plain
+    threads; either way requests reuse the same keep-alive connections, so
+    TLS handshakes are paid once per host rather than once per call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._session = None
+        self._semaphores = {}
+        self.stats = defaultdict(lambda: {'requests': 0, 'retries': 0, 'errors': 0})
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='guardian-http-pool', daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    # The methods below run on the pool's own loop
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=TOTAL_CONNECTIONS,
+                limit_per_host=CONNECTIONS_PER_HOST,
+                keepalive_timeout=KEEPALIVE_SECONDS,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        if provider not in self._semaphores:
+            self._semaphores[provider] = asyncio.Semaphore(
+                PROVIDER_CONCURRENCY.get(provider, DEFAULT_PROVIDER_CONCURRENCY)
+            )
+        return self._semaphores[provider]
+
+    @staticmethod
+    def _backoff(attempt: int, response: Optional[HTTPResponse] = None) -> float:
+        retry_after = response.headers.get('Retry-After') if response else None
+        if retry_after:
+            try:
+                return min(float(retry_after), BACKOFF_MAX)
+            except ValueError:
+                pass
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    @staticmethod
+    def _meter(provider: str, start: float, response: Optional[HTTPResponse] = None,
+               error: Optional[Exception] = None):
+        """Count a finished call, with the tokens from the usage block of the response"""
+        if provider not in METERED_PROVIDERS:
+            return
+        endpoint, cost_estimate = METERED_PROVIDERS[provider]
+        latency_ms = (time.perf_counter() - start) * 1000
+        meter = get_usage_meter()
+        if response is not None and response.ok:
+            meter.record(provider, endpoint, _usage_tokens(response), cost_estimate, "success", "", latency_ms)
+        elif response is not None:
+            status = "quota_exceeded" if response.status == 429 else "error"
+            meter.record(provider, endpoint, 0, 0, status, f"HTTP {response.status}: {response.text()[:200]}",
+                         latency_ms)
+        else:
+            meter.record(provider, endpoint, 0, 0, "error", str(error) or type(error).__name__, latency_ms)
+
+    async def _request(self, provider: str, method: str, url: str, timeout: float, retries: int,
+                       **kwargs) -> HTTPResponse:
+        session = self._get_session()
+        stats = self.stats[provider]
+        attempt = 0
+        start = time.perf_counter()
+
+        while True:
+            stats['requests'] += 1
+            response = None
+            try:
+                async with self._semaphore(provider):
+                    async with session.request(method, url, timeout=aiohttp.ClientTimeout(total=timeout),
+                                               **kwargs) as raw:
+                        response = HTTPResponse(raw.status, dict(raw.headers), await raw.read())
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                stats['errors'] += 1
+                if attempt >= retries:
+                    self._meter(provider, start, error=e)
+                    raise
+            else:
+                if response.status not in RETRY_STATUSES or attempt >= retries:
+                    self._meter(provider, start, response=response)
+                    return response
+
+            stats['retries'] += 1
+            await asyncio.sleep(self._backoff(attempt, response))
+            attempt += 1
+
+    # Public entry points
+
+    async def request(self, provider: str, method: str, url: str, timeout: float = 60,
+                      retries: int = MAX_RETRIES, **kwargs) -> HTTPResponse:
+        """Send a request through the shared pool; awaitable from any event loop"""
+        future = asyncio.run_coroutine_threadsafe(
+            self._request(provider, method, url, timeout, retries, **kwargs), self._ensure_loop()
+        )
+        return await asyncio.wrap_future(future)
+
+    def request_sync(self, provider: str, method: str, url: str, timeout: float = 60,
+                     retries: int = MAX_RETRIES, **kwargs) -> HTTPResponse:
+        """Blocking variant for code that is not running in an event loop"""
+        future = asyncio.run_coroutine_threadsafe(
+            self._request(provider, method, url, timeout, retries, **kwargs), self._ensure_loop()
+        )
+        return future.result()
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        return {provider: dict(counts) for provider, counts in self.stats.items()}
+
+    def close(self):
+        """Close pooled connections (registered to run at interpreter exit)"""
+        if self._loop is None or self._session is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result(timeout=5)
+        except Exception as e:
+            logger.debug(f"HTTP pool close failed: {e}")
+
+def _usage_tokens(response: HTTPResponse) -> int:
+    """Tokens reported by an OpenAI (total_tokens) or Anthropic (input + output) response body"""
+    try:
+        usage = response.json().get('usage') or {}
+    except (ValueError, AttributeError):
+        usage = {}
+    total = usage.get('total_tokens')
+    if total is None:
+        total = (usage.get('input_tokens') or 0) + (usage.get('output_tokens') or 0)
+    return total or DEFAULT_CALL_TOKENS
+
+# Provider helpers for the chat APIs called without their SDKs
+
+def _openai_call(payload: Dict[str, Any], api_key: Optional[str]) -> Dict[str, Any]:
+    return {
+        'provider': 'openai',
+        'method': 'POST',
+        'url': OPENAI_CHAT_URL,
+        'headers': {'Authorization': f"Bearer {api_key or os.getenv('OPENAI_API_KEY')}"},
+        'json': payload
+    }
+
+def _openai_text(response: HTTPResponse) -> str:
+    if not response.ok:
+        raise RuntimeError(f"OpenAI HTTP {response.status}: {response.text()[:200]}")
+    return response.json()['choices'][0]['message']['content']
+
+def _anthropic_call(payload: Dict[str, Any], api_key: Optional[str]) -> Dict[str, Any]:
+    return {
+        'provider': 'anthropic',
+        'method': 'POST',
+        'url': ANTHROPIC_MESSAGES_URL,
+        'headers': {
+            'x-api-key': api_key or os.getenv('ANTHROPIC_API_KEY', ''),
+            'anthropic-version': ANTHROPIC_VERSION
+        },
+        'json': payload
+    }
+
+def _anthropic_text(response: HTTPResponse) -> str:
+    if not response.ok:
+        raise RuntimeError(f"Anthropic HTTP {response.status}: {response.text()[:200]}")
+    return response.json()['content'][0]['text']
+
+async def openai_chat(payload: Dict[str, Any], api_key: Optional[str] = None) -> str:
+    """Chat completion message content"""
+    return _openai_text(await http_pool.request(**_openai_call(payload, api_key)))
+
+def openai_chat_sync(payload: Dict[str, Any], api_key: Optional[str] = None) -> str:
+    return _openai_text(http_pool.request_sync(**_openai_call(payload, api_key)))
+
+async def anthropic_message(payload: Dict[str, Any], api_key: Optional[str] = None) -> str:
+    """Text of the first content block of a Messages API response"""
+    return _anthropic_text(await http_pool.request(**_anthropic_call(payload, api_key)))
+
+def anthropic_message_sync(payload: Dict[str, Any], api_key: Optional[str] = None) -> str:
+    return _anthropic_text(http_pool.request_sync(**_anthropic_call(payload, api_key)))
+
+# Global pool instance
+http_pool = HTTPPool()
+atexit.register(http_pool.close)
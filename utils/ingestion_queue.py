@@ -0,0 +1,544 @@
+"""
+Persistent Ingestion Job Queue for GUARDIAN
+Uploads and URL imports run as checkpointed, retryable jobs in worker processes
+so the Streamlit session only enqueues work and polls its status
+"""
+
+import os
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import logging
+import argparse
+import threading
+import multiprocessing
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from utils.data_dir import data_path
+
+logger = logging.getLogger(__name__)
+
+# Every job walks these stages in order; the outputs of each stage are
+# checkpointed, so a retry or a restarted worker resumes at the failed stage
+STAGES = ['fetch', 'extract', 'metadata', 'score', 'thumbnail', 'index']
+
+QUEUED, RUNNING, DONE, FAILED, SKIPPED = 'queued', 'running', 'done', 'failed', 'skipped'
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+MAX_ATTEMPTS = 3
+RETRY_BASE_SECONDS = 30
+
+# A claimed job is reclaimed by another worker if its lease is not renewed;
+# leases are renewed after every stage
+LEASE_SECONDS = 600
+POLL_SECONDS = 2.0
+DEFAULT_WORKERS = 2
+
+class LeaseLost(Exception):
+    """Raised when a worker's lease expired and another worker has claimed its job"""
+
+class SkipJob(Exception):
+    """Raised by a stage to finish a job without indexing it (e.g. a duplicate)"""
+
+@dataclass
+class IngestionJob:
+    """One queued upload or URL import"""
+    id: int
+    kind: str
+    status: str
+    stage: str
+    payload: Dict
+    state: Dict = field(default_factory=dict)
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    worker: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return (self.state.get('title') or self.payload.get('title') or self.payload.get('filename')
+                or self.payload.get('url') or f"Job {self.id}")
+
+    @property
+    def progress(self) -> float:
+        if self.status in (DONE, SKIPPED):
+            return 1.0
+        return STAGES.index(self.stage) / len(STAGES) if self.stage in STAGES else 0.0
+
+class IngestionQueue:
+    """
+    Job table in SQLite shared by the app and every worker process.
+
+    Workers claim the oldest runnable job inside an IMMEDIATE transaction,
+    which serialises claims the way ``FOR UPDATE SKIP LOCKED`` would on
+    PostgreSQL, and hold it under a lease so a crashed worker's job is
+    picked up again.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, upload_dir: Optional[str] = None):
+        self.db_path = db_path or os.getenv('GUARDIAN_INGESTION_QUEUE') or data_path('ingestion_queue.db')
+        self.upload_dir = upload_dir or os.getenv('GUARDIAN_INGESTION_UPLOADS') or data_path('ingestion_uploads')
+        self._local = threading.local()
+        self.init_db()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def init_db(self):
+        """Initialize job table"""
+        conn = self._connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS ingestion_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT '{}',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                worker TEXT,
+                run_after REAL NOT NULL,
+                lease_expires REAL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_status ON ingestion_jobs (status, run_after)')
+
+    @staticmethod
+    def _job(row) -> IngestionJob:
+        return IngestionJob(
+            id=row[0], kind=row[1], status=row[2], stage=row[3],
+            payload=json.loads(row[4]), state=json.loads(row[5] or '{}'),
+            attempts=row[6], error=row[7], created_at=row[8], updated_at=row[9]
+        )
+
+    _COLUMNS = 'id, kind, status, stage, payload, state, attempts, error, created_at, updated_at'
+
+    # ---- producers ---------------------------------------------------------
+
+    def save_upload(self, file_bytes: bytes, filename: str) -> str:
+        """Write uploaded bytes where workers can read them; returns the path"""
+        os.makedirs(self.upload_dir, exist_ok=True)
+        extension = os.path.splitext(filename)[1].lower()
+        path = os.path.join(self.upload_dir, hashlib.sha256(file_bytes).hexdigest()[:24] + extension)
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(file_bytes)
+        return path
+
+    def enqueue(self, kind: str, payload: Dict) -> int:
+        """Add a job ('pdf', 'text' or 'url') and return its id"""
+        now = time.time()
+        cursor = self._connection().execute('''
+            INSERT INTO ingestion_jobs (kind, status, stage, payload, run_after, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (kind, QUEUED, STAGES[0], json.dumps(payload), now, now, now))
+        return cursor.lastrowid
+
+    def retry(self, job_id: int):
+        """Requeue a failed job at the stage it failed in"""
+        self._connection().execute('''
+            UPDATE ingestion_jobs SET status = ?, attempts = 0, error = NULL, run_after = ?, updated_at = ?
+            WHERE id = ? AND status = ?
+        ''', (QUEUED, time.time(), time.time(), job_id, FAILED))
+
+    # ---- workers -----------------------------------------------------------
+
+    def claim(self, worker: str) -> Optional[IngestionJob]:
+        """
+        Take the oldest runnable job (or one whose lease expired) for this worker.
+        Reclaiming an expired lease counts as a failed attempt, so a job that
+        keeps killing its worker ends up FAILED instead of being retried forever.
+        """
+        conn = self._connection()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            while True:
+                row = conn.execute(f'''
+                    SELECT {self._COLUMNS} FROM ingestion_jobs
+                    WHERE (status = ? AND run_after <= ?) OR (status = ? AND lease_expires < ?)
+                    ORDER BY id LIMIT 1
+                ''', (QUEUED, now, RUNNING, now)).fetchone()
+                if not row:
+                    break
+
+                attempts = row[6]
+                if row[2] == RUNNING:
+                    attempts += 1
+                    if attempts >= MAX_ATTEMPTS:
+                        conn.execute('''
+                            UPDATE ingestion_jobs SET status = ?, attempts = ?, error = ?, worker = NULL,
+                                lease_expires = NULL, updated_at = ?
+                            WHERE id = ?
+                        ''', (FAILED, attempts, f"{row[3]}: worker stopped responding", now, row[0]))
+                        continue
+
+                conn.execute('''
+                    UPDATE ingestion_jobs SET status = ?, attempts = ?, worker = ?, lease_expires = ?, updated_at = ?
+                    WHERE id = ?
+                ''', (RUNNING, attempts, worker, now + LEASE_SECONDS, now, row[0]))
+                break
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        if not row:
+            return None
+        job = self._job(row)
+        job.status, job.attempts, job.worker = RUNNING, attempts, worker
+        return job
+
+    def _update_leased(self, job: IngestionJob, assignments: str, params: tuple):
+        """Update a job only while this worker still holds its lease"""
+        cursor = self._connection().execute(
+            f'UPDATE ingestion_jobs SET {assignments} WHERE id = ? AND status = ? AND worker = ?',
+            params + (job.id, RUNNING, job.worker)
+        )
+        if cursor.rowcount == 0:
+            raise LeaseLost(f"Job {job.id} was reclaimed by another worker")
+
+    def checkpoint(self, job: IngestionJob, next_stage: str):
+        """Persist stage outputs, advance the job and renew its lease"""
+        now = time.time()
+        self._update_leased(job, 'stage = ?, state = ?, lease_expires = ?, updated_at = ?',
+                            (next_stage, json.dumps(job.state), now + LEASE_SECONDS, now))
+        job.stage = next_stage
+
+    def finish(self, job: IngestionJob, status: str = DONE, message: Optional[str] = None):
+        self._update_leased(job, 'status = ?, state = ?, error = ?, lease_expires = NULL, updated_at = ?',
+                            (status, json.dumps(job.state), message, time.time()))
+        job.status = status
+
+    def fail(self, job: IngestionJob, error: str):
+        """Record a failed attempt: back off and requeue, or give up after MAX_ATTEMPTS"""
+        attempts = job.attempts + 1
+        now = time.time()
+        if attempts >= MAX_ATTEMPTS:
+            status, run_after = FAILED, now
+        else:
+            status = QUEUED
+            run_after = now + random.uniform(0.5, 1.0) * RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+        self._update_leased(job, '''status = ?, state = ?, attempts = ?, error = ?, run_after = ?,
+                lease_expires = NULL, updated_at = ?''',
+                            (status, json.dumps(job.state), attempts, error, run_after, now))
+        job.status, job.attempts, job.error = status, attempts, error
+
+    # ---- status ------------------------------------------------------------
+
+    def get_job(self, job_id: int) -> Optional[IngestionJob]:
+        row = self._connection().execute(
+            f'SELECT {self._COLUMNS} FROM ingestion_jobs WHERE id = ?', (job_id,)
+        ).fetchone()
+        return self._job(row) if row else None
+
+    def get_jobs(self, job_ids: List[int]) -> List[IngestionJob]:
+        if not job_ids:
+            return []
+        placeholders = ','.join('?' * len(job_ids))
+        rows = self._connection().execute(
+            f'SELECT {self._COLUMNS} FROM ingestion_jobs WHERE id IN ({placeholders}) ORDER BY id',
+            list(job_ids)
+        ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def recent_jobs(self, limit: int = 20) -> List[IngestionJob]:
+        rows = self._connection().execute(
+            f'SELECT {self._COLUMNS} FROM ingestion_jobs ORDER BY id DESC LIMIT ?', (limit,)
+        ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def get_stats(self) -> Dict[str, int]:
+        rows = self._connection().execute(
+            'SELECT status, COUNT(*) FROM ingestion_jobs GROUP BY status'
+        ).fetchall()
+        return {status: count for status, count in rows}
+
+    def purge_finished(self, older_than_seconds: int = 7 * 24 * 3600) -> int:
+        cursor = self._connection().execute(
+            'DELETE FROM ingestion_jobs WHERE status IN (?, ?) AND updated_at < ?',
+            (DONE, SKIPPED, time.time() - older_than_seconds)
+        )
+        return cursor.rowcount
+
+# ---- pipeline stages --------------------------------------------------------
+#
+# Each stage reads the job payload and earlier stage outputs from job.state,
+# and returns the outputs to add to it. Exceptions are retried.
+
+def _stage_fetch(job: IngestionJob) -> Dict:
+    if job.kind != 'url':
+        return {}
+    from utils.url_content_extractor import extract_url_content
+    result = extract_url_content(job.payload['url'])
+    if not result.get('success'):
+        raise RuntimeError(f"URL extraction failed: {result.get('error', 'unknown error')}")
+    return {
+        'text': result.get('text_content', ''),
+        'title': job.payload.get('title') or result.get('title', ''),
+        'organization': job.payload.get('organization') or result.get('organization', ''),
+        'extraction_method': result.get('extraction_method', 'url_extraction')
+    }
+
+def _stage_extract(job: IngestionJob) -> Dict:
+    if job.kind == 'pdf':
+        from utils.pdf_text_extractor import extract_pdf_text
+        # Ingestion workers are daemonic and parse in-process; jobs run in parallel across workers
+        extracted = extract_pdf_text(job.payload['file_path'], parallel=False)
+        title = job.payload.get('title') or os.path.splitext(job.payload.get('filename', ''))[0].replace('_', ' ').title()
+        return {
+            'text': extracted['text'].strip(),
+            'title': title,
+            'content_hash': extracted['content_hash'],
+            'page_count': extracted['page_count'],
+            'truncated': extracted['truncated']
+        }
+    if job.kind == 'text':
+        return {'text': job.payload.get('content', ''), 'title': job.payload.get('title', '')}
+    return {}
+
+def _stage_metadata(job: IngestionJob) -> Dict:
+    from utils.duplicate_detector import check_document_duplicates
+
+    text, title = job.state.get('text', ''), job.state.get('title', '')
+    if not title or len(text.strip()) < 50:
+        raise SkipJob("No usable title or content was extracted")
+
+    duplicate = check_document_duplicates(
+        title=title, content=text, url=job.payload.get('url', ''), filename=job.payload.get('filename', '')
+    )
+    if duplicate.get('is_duplicate'):
+        match = (duplicate.get('matches') or [{}])[0]
+        raise SkipJob(f"Duplicate of {match.get('title', 'an existing document')} "
+                      f"({duplicate.get('confidence', 0):.0%} {duplicate.get('match_type', '')})")
+
+    try:
+        from utils.enhanced_metadata_extractor import extract_enhanced_metadata
+        metadata = extract_enhanced_metadata(text, title, job.payload.get('url', ''))
+    except Exception as e:
+        print(f"Enhanced metadata extraction failed for {title}: {e}")
+        metadata = {}
+
+    organization = job.payload.get('organization') or job.state.get('organization') or metadata.get('organization', 'Unknown')
+    document_type = job.payload.get('document_type')
+    if not document_type or document_type == 'Unknown':
+        document_type = metadata.get('document_type', 'Unknown')
+
+    region = {}
+    try:
+        from utils.enhanced_region_detector import enhanced_region_detection
+        region = enhanced_region_detection(title=title, content=text[:2000], organization=organization,
+                                           url=job.payload.get('url', ''))
+    except Exception as e:
+        print(f"Region detection failed: {e}")
+
+    return {
+        'organization': organization,
+        'document_type': document_type,
+        'author': metadata.get('author', 'Unknown'),
+        'publication_date': metadata.get('publication_date', 'Unknown'),
+        'description': job.payload.get('summary') or metadata.get('description', 'Unknown'),
+        'detected_region': region.get('region', 'Unknown'),
+        'region_confidence': region.get('confidence', 0.0)
+    }
+
+def _stage_score(job: IngestionJob) -> Dict:
+    if not job.payload.get('auto_analyze', True):
+        return {}
+    text, title = job.state['text'], job.state['title']
+    try:
+        from utils.patent_scoring_engine import ComprehensivePatentScoringEngine
+        scores = ComprehensivePatentScoringEngine().assess_document_comprehensive(text, title)
+        return {'scores': {
+            'ai_cybersecurity_score': scores['ai_cybersecurity_score'],
+            'quantum_cybersecurity_score': scores['quantum_cybersecurity_score'],
+            'ai_ethics_score': scores['ai_ethics_score'],
+            'quantum_ethics_score': scores['quantum_ethics_score'],
+            'quantum_q': scores['quantum_cybersecurity_score'] * 20
+        }}
+    except Exception as e:
+        print(f"Patent scoring failed, applying fallback analysis: {e}")
+        from utils.hf_ai_scoring import evaluate_quantum_maturity_hf
+        return {'scores': {'quantum_q': evaluate_quantum_maturity_hf(text).get('patent_score', 0)}}
+
+def _stage_thumbnail(job: IngestionJob) -> Dict:
+    if job.kind != 'pdf':
+        return {'has_thumbnail': False}
+    from utils.pdf_ingestion_thumbnails import extract_pdf_thumbnail_from_path
+    thumbnail_id = job.state.get('content_hash', '')[:8] or job.id
+    thumbnail = extract_pdf_thumbnail_from_path(job.payload['file_path'], thumbnail_id)
+    return {'has_thumbnail': thumbnail is not None}
+
+def _indexed_document_id(text: str) -> Optional[int]:
+    """Id of a live document with exactly this content, if one was already saved"""
+    from utils.database import DatabaseManager
+    from utils.document_purge import deletion_column_ready
+    from utils.minhash_index import content_sha256, get_minhash_index
+
+    db = DatabaseManager()
+    if not get_minhash_index().tables_ready() or not deletion_column_ready(db):
+        return None
+    rows = db.execute_query("""
+        SELECT id FROM documents
+        WHERE content_sha256 = :content_sha256 AND deleted_at IS NULL
+        ORDER BY id LIMIT 1
+    """, {'content_sha256': content_sha256(text)})
+    return rows[0]['id'] if rows else None
+
+def _document_exists(document_id: int) -> bool:
+    """Whether the documents row for a freshly saved id can be read back"""
+    from utils.database import DatabaseManager
+
+    rows = DatabaseManager().execute_query(
+        "SELECT id FROM documents WHERE id = :id", {'id': document_id})
+    return bool(rows)
+
+def _stage_index(job: IngestionJob) -> Dict:
+    from utils.db import save_document
+
+    state = job.state
+    text = state['text']
+    description = state.get('description', 'Unknown')
+    document_data = {
+        'title': state['title'],
+        'content': description if description != 'Unknown' else text[:200] + "..." if len(text) > 200 else text,
+        'text': text,
+        'document_type': state.get('document_type', 'Unknown'),
+        'source': job.payload.get('source', 'file_upload'),
+        'source_url': job.payload.get('url', ''),
+        'author_organization': state.get('organization', 'Unknown'),
+        'author': state.get('author', 'Unknown'),
+        'publication_date': state.get('publication_date', 'Unknown'),
+        'detected_region': state.get('detected_region', 'Unknown'),
+        'region_confidence': state.get('region_confidence', 0.0),
+        'extraction_method': state.get('extraction_method', job.kind),
+        'quantum_q': 0,
+        'has_thumbnail': state.get('has_thumbnail', False),
+        'pdf_sha256': state.get('content_hash') if job.kind == 'pdf' else None
+    }
+    document_data.update(state.get('scores', {}))
+
+    # A retried or reclaimed job may have saved the document before losing its lease
+    existing = _indexed_document_id(text)
+    if existing:
+        return {'indexed': True, 'document_id': existing}
+
+    document_id = save_document(document_data)
+    if not document_id or not _document_exists(document_id):
+        raise RuntimeError("Failed to save document to database")
+
+    # The upload is only discarded once its row is known to be stored
+    if job.kind == 'pdf':
+        try:
+            os.remove(job.payload['file_path'])
+        except OSError:
+            pass
+    return {'indexed': True, 'document_id': document_id}
+
+STAGE_HANDLERS: Dict[str, Callable[[IngestionJob], Dict]] = {
+    'fetch': _stage_fetch,
+    'extract': _stage_extract,
+    'metadata': _stage_metadata,
+    'score': _stage_score,
+    'thumbnail': _stage_thumbnail,
+    'index': _stage_index
+}
+
+def run_job(queue: IngestionQueue, job: IngestionJob):
+    """Run a claimed job from its current stage to the end, checkpointing each stage"""
+    try:
+        try:
+            for stage in STAGES[STAGES.index(job.stage):]:
+                job.state.update(STAGE_HANDLERS[stage](job) or {})
+                next_index = STAGES.index(stage) + 1
+                if next_index < len(STAGES):
+                    queue.checkpoint(job, STAGES[next_index])
+            queue.finish(job, DONE)
+        except LeaseLost:
+            raise
+        except SkipJob as e:
+            queue.finish(job, SKIPPED, str(e))
+        except Exception as e:
+            logger.warning(f"Ingestion job {job.id} failed at {job.stage}: {e}")
+            queue.fail(job, f"{job.stage}: {e}")
+    except LeaseLost as e:
+        # Another worker owns the job now; drop this run without touching it
+        logger.warning(str(e))
+
+def run_worker(stop_event=None, max_jobs: Optional[int] = None):
+    """Claim and run jobs until stopped (or max_jobs have run)"""
+    queue = get_ingestion_queue()
+    worker = f"{os.uname().nodename if hasattr(os, 'uname') else 'worker'}:{os.getpid()}"
+    completed = 0
+    while not (stop_event and stop_event.is_set()):
+        job = queue.claim(worker)
+        if job is None:
+            if max_jobs is not None:
+                return
+            time.sleep(POLL_SECONDS)
+            continue
+        run_job(queue, job)
+        completed += 1
+        if max_jobs is not None and completed >= max_jobs:
+            return
+
+_queue = None
+_queue_lock = threading.Lock()
+_workers: List[multiprocessing.Process] = []
+
+def get_ingestion_queue() -> IngestionQueue:
+    """Process-wide queue instance"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = IngestionQueue()
+    return _queue
+
+def start_ingestion_workers(count: Optional[int] = None) -> int:
+    """
+    Make sure this server process has its worker processes running (idempotent
+    across Streamlit reruns). Set GUARDIAN_INGESTION_WORKERS=0 when workers run
+    as a separate service (``python -m utils.ingestion_queue``).
+    """
+    if count is None:
+        count = int(os.getenv('GUARDIAN_INGESTION_WORKERS', DEFAULT_WORKERS))
+    with _queue_lock:
+        _workers[:] = [process for process in _workers if process.is_alive()]
+        context = multiprocessing.get_context('spawn')
+        while len(_workers) < count:
+            process = context.Process(target=run_worker, name='guardian-ingestion-worker', daemon=True)
+            process.start()
+            _workers.append(process)
+        return len(_workers)
+
+def enqueue_document(kind: str, payload: Dict) -> int:
+    """Queue an ingestion job and make sure workers are running to pick it up"""
+    job_id = get_ingestion_queue().enqueue(kind, payload)
+    start_ingestion_workers()
+    return job_id
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run GUARDIAN ingestion workers")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(f"Starting {args.workers} ingestion workers on {get_ingestion_queue().db_path}")
+    if args.workers <= 1:
+        run_worker()
+    else:
+        start_ingestion_workers(args.workers)
+        for process in list(_workers):
+            process.join()
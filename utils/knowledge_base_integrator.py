@@ -3,14 +3,16 @@ Knowledge Base Integration System for GUARDIAN
 Connects to external knowledge sources for AI/Quantum best practices and standards
 """
 
+import os
 import json
 import asyncio
-import aiohttp
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 import requests
 from datetime import datetime, timedelta
 
+from utils.http_pool import http_pool
+
 @dataclass
 class KnowledgeSource:
     """External knowledge source configuration"""
@@ -176,15 +178,14 @@ class KnowledgeBaseIntegrator:
                     "startDate": (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
                 }
                 
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url, params=params) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            documents = data.get("publications", [])
+                response = await http_pool.request('knowledge_base', 'GET', url, params=params)
+                if response.status == 200:
+                    data = response.json()
+                    documents = data.get("publications", [])
                             
-                            for doc in documents:
-                                enhanced_doc = self._enhance_nist_document(doc, query)
-                                all_documents.append(enhanced_doc)
+                    for doc in documents:
+                        enhanced_doc = self._enhance_nist_document(doc, query)
+                        all_documents.append(enhanced_doc)
                         
             except Exception as e:
                 print(f"NIST sync error for query '{query}': {e}")
@@ -223,12 +224,11 @@ class KnowledgeBaseIntegrator:
                     "sortOrder": "descending"
                 }
                 
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url, params=params) as response:
-                        if response.status == 200:
-                            xml_data = await response.text()
-                            papers = self._parse_arxiv_xml(xml_data, term)
-                            all_papers.extend(papers)
+                response = await http_pool.request('knowledge_base', 'GET', url, params=params)
+                if response.status == 200:
+                    xml_data = response.text()
+                    papers = self._parse_arxiv_xml(xml_data, term)
+                    all_papers.extend(papers)
                             
             except Exception as e:
                 print(f"arXiv sync error for term '{term}': {e}")
@@ -248,32 +248,31 @@ class KnowledgeBaseIntegrator:
             # Get latest enterprise attack patterns
             url = "https://raw.githubusercontent.com/mitre/cti/master/enterprise-attack/enterprise-attack.json"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        attack_data = await response.json()
-                        
-                        # Extract techniques and tactics
-                        techniques = []
-                        for obj in attack_data.get("objects", []):
-                            if obj.get("type") == "attack-pattern":
-                                technique = {
-                                    "id": obj.get("id"),
-                                    "name": obj.get("name"),
-                                    "description": obj.get("description", ""),
-                                    "tactics": [ref.get("external_id") for ref in obj.get("kill_chain_phases", [])],
-                                    "domain": "cybersecurity",
-                                    "source": "mitre_attack"
-                                }
-                                techniques.append(technique)
+            response = await http_pool.request('knowledge_base', 'GET', url)
+            if response.status == 200:
+                attack_data = response.json()
                         
-                        self.knowledge_cache["mitre_attack"] = {
-                            "techniques": techniques,
-                            "last_updated": datetime.now(),
-                            "count": len(techniques)
+                # Extract techniques and tactics
+                techniques = []
+                for obj in attack_data.get("objects", []):
+                    if obj.get("type") == "attack-pattern":
+                        technique = {
+                            "id": obj.get("id"),
+                            "name": obj.get("name"),
+                            "description": obj.get("description", ""),
+                            "tactics": [ref.get("external_id") for ref in obj.get("kill_chain_phases", [])],
+                            "domain": "cybersecurity",
+                            "source": "mitre_attack"
                         }
+                        techniques.append(technique)
+                        
+                self.knowledge_cache["mitre_attack"] = {
+                    "techniques": techniques,
+                    "last_updated": datetime.now(),
+                    "count": len(techniques)
+                }
                         
-                        return {"count": len(techniques), "source": "mitre"}
+                return {"count": len(techniques), "source": "mitre"}
                         
         except Exception as e:
             print(f"MITRE ATT&CK sync error: {e}")
@@ -315,18 +314,17 @@ class KnowledgeBaseIntegrator:
         """Generic REST API synchronization"""
         
         try:
-            async with aiohttp.ClientSession() as session:
-                headers = {}
-                if source.requires_auth:
-                    # Check for API keys in environment
-                    api_key = os.environ.get(f"{source.name.upper()}_API_KEY")
-                    if api_key:
-                        headers["Authorization"] = f"Bearer {api_key}"
-                
-                async with session.get(source.base_url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {"count": len(data) if isinstance(data, list) else 1, "source": source.name}
+            headers = {}
+            if source.requires_auth:
+                # Check for API keys in environment
+                api_key = os.environ.get(f"{source.name.upper()}_API_KEY")
+                if api_key:
+                    headers["Authorization"] = f"Bearer {api_key}"
+            
+            response = await http_pool.request('knowledge_base', 'GET', source.base_url, headers=headers)
+            if response.status == 200:
+                data = response.json()
+                return {"count": len(data) if isinstance(data, list) else 1, "source": source.name}
                         
         except Exception as e:
             print(f"Generic sync error for {source.name}: {e}")
@@ -7,10 +7,11 @@ of AI Ethics, Quantum Security, and Cybersecurity Best Practices
 import json
 import os
 import asyncio
-import aiohttp
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from openai import OpenAI
+
+from utils.http_pool import http_pool, openai_chat, anthropic_message
 # Anthropic import made optional to prevent deployment issues
 try:
     import anthropic
@@ -119,29 +120,29 @@ class LLMIntelligenceEnhancer:
         # Try OpenAI first
         if self.openai_client:
             try:
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-4o",  # Latest model
-                    messages=[
+                message = await openai_chat({
+                    "model": "gpt-4o",  # Latest model
+                    "messages": [
                         {"role": "system", "content": self._get_system_prompt(domain)},
                         {"role": "user", "content": prompt}
                     ],
-                    response_format={"type": "json_object"}
-                )
-                return json.loads(response.choices[0].message.content)
+                    "response_format": {"type": "json_object"}
+                })
+                return json.loads(message)
             except Exception as e:
                 print(f"OpenAI analysis failed: {e}")
         
         # Fallback to Anthropic
         if self.anthropic_client:
             try:
-                response = self.anthropic_client.messages.create(
-                    model="claude-3-5-sonnet-20241022",  # Latest Claude model
-                    max_tokens=2000,
-                    messages=[
+                text = await anthropic_message({
+                    "model": "claude-3-5-sonnet-20241022",  # Latest Claude model
+                    "max_tokens": 2000,
+                    "messages": [
                         {"role": "user", "content": f"{self._get_system_prompt(domain)}\n\n{prompt}"}
                     ]
-                )
-                return {"analysis": response.content[0].text, "source": "anthropic"}
+                })
+                return {"analysis": text, "source": "anthropic"}
             except Exception as e:
                 print(f"Anthropic analysis failed: {e}")
         
@@ -195,15 +196,14 @@ class LLMIntelligenceEnhancer:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(model_endpoint, headers=headers, json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return {
-                            "source": "huggingface_ethics",
-                            "analysis": result,
-                            "domain": "ai_ethics"
-                        }
+            response = await http_pool.request('huggingface', 'POST', model_endpoint, headers=headers, json=payload)
+            if response.status == 200:
+                result = response.json()
+                return {
+                    "source": "huggingface_ethics",
+                    "analysis": result,
+                    "domain": "ai_ethics"
+                }
         except Exception as e:
             print(f"Hugging Face query failed: {e}")
         
@@ -219,15 +219,14 @@ class LLMIntelligenceEnhancer:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post("http://localhost:11434/api/generate", json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return {
-                            "source": "ollama_local",
-                            "analysis": result.get("response", ""),
-                            "domain": domain
-                        }
+            response = await http_pool.request('ollama', 'POST', "http://localhost:11434/api/generate", json=payload)
+            if response.status == 200:
+                result = response.json()
+                return {
+                    "source": "ollama_local",
+                    "analysis": result.get("response", ""),
+                    "domain": domain
+                }
         except Exception:
             # Ollama not available, skip silently
             pass
@@ -258,16 +257,18 @@ class LLMIntelligenceEnhancer:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post("https://api.groq.com/openai/v1/chat/completions", 
-                                      headers=headers, json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return {
-                            "source": "groq_fast",
-                            "analysis": result["choices"][0]["message"]["content"],
-                            "domain": domain
-                        }
+            response = await http_pool.request(
+                'groq', 'POST',
+                "https://api.groq.com/openai/v1/chat/completions",
+                headers=headers, json=payload
+            )
+            if response.status == 200:
+                result = response.json()
+                return {
+                    "source": "groq_fast",
+                    "analysis": result["choices"][0]["message"]["content"],
+                    "domain": domain
+                }
         except Exception as e:
             print(f"Groq query failed: {e}")
         
@@ -292,16 +293,18 @@ class LLMIntelligenceEnhancer:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post("https://api.together.xyz/inference", 
-                                      headers=headers, json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return {
-                            "source": "together_ai",
-                            "analysis": result["output"]["choices"][0]["text"],
-                            "domain": domain
-                        }
+            response = await http_pool.request(
+                'together_ai', 'POST',
+                "https://api.together.xyz/inference",
+                headers=headers, json=payload
+            )
+            if response.status == 200:
+                result = response.json()
+                return {
+                    "source": "together_ai",
+                    "analysis": result["output"]["choices"][0]["text"],
+                    "domain": domain
+                }
         except Exception as e:
             print(f"Together AI query failed: {e}")
         
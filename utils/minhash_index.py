@@ -0,0 +1,278 @@
+"""
+MinHash/LSH Near-Duplicate Index for GUARDIAN
+Persistent MinHash signatures with LSH banding, so an upload finds its
+near-duplicate candidates without comparing against every stored document
+"""
+
+import re
+import zlib
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // LSH_BANDS  # 16 bands x 8 rows: candidates from ~0.7 Jaccard
+SHINGLE_SIZE = 5
+# Shingles permuted per step, bounding the temporary matrix to SIGNATURE_BLOCK x NUM_PERMUTATIONS
+SIGNATURE_BLOCK = 4096
+
+# Bump whenever shingling or hashing changes so every signature is rebuilt
+SIGNATURE_VERSION = "1"
+
+# Text used for duplicate detection (documents aliased as d); hashed in SQL to
+# spot documents whose text changed since they were indexed
+DUPLICATE_TEXT_SQL = "COALESCE(NULLIF(d.text_content, ''), d.content, '')"
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Fixed seed: signatures must be comparable across processes and restarts.
+# Coefficients stay below 2**31 so a * x + b never overflows 64 bits.
+_rng = np.random.RandomState(20240601)
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+def content_sha256(text: str) -> str:
+    """Exact-duplicate hash: SHA-256 of the whitespace-normalized text"""
+    return hashlib.sha256(' '.join((text or "").split()).encode('utf-8')).hexdigest()
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """32-bit hashes of the overlapping word n-grams of the text"""
+    words = _WORD_PATTERN.findall((text or "").lower())
+    if len(words) < size:
+        return {zlib.crc32(' '.join(words).encode('utf-8'))} if words else set()
+    return {zlib.crc32(' '.join(words[i:i + size]).encode('utf-8')) for i in range(len(words) - size + 1)}
+
+def minhash_signature(text: str) -> np.ndarray:
+    """MinHash signature (NUM_PERMUTATIONS uint32 values) of the text's shingles"""
+    hashed = np.fromiter(shingles(text), dtype=np.uint64)
+    if hashed.size == 0:
+        return np.full(NUM_PERMUTATIONS, _MAX_HASH, dtype=np.uint32)
+    signature = np.full(NUM_PERMUTATIONS, _MAX_HASH, dtype=np.uint64)
+    for start in range(0, hashed.size, SIGNATURE_BLOCK):
+        permuted = (np.outer(hashed[start:start + SIGNATURE_BLOCK], _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+        np.minimum(signature, permuted.min(axis=0), out=signature)
+    return signature.astype(np.uint32)
+
+def band_buckets(signature: np.ndarray) -> List[tuple]:
+    """(band, bucket) pairs for LSH; documents sharing any pair become candidates"""
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes()
+        bucket = int.from_bytes(hashlib.blake2b(rows, digest_size=8).digest(), 'big', signed=True)
+        buckets.append((band, bucket))
+    return buckets
+
+def estimate_similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.mean(first == second))
+
+def signature_from_bytes(data) -> np.ndarray:
+    return np.frombuffer(bytes(data), dtype=np.uint32)
+
+class MinHashIndex:
+    """
+    Near-duplicate index stored in PostgreSQL.
+
+    document_signatures keeps one MinHash signature per document and
+    document_lsh_buckets its LSH band buckets, so looking up candidates for
+    new content is an indexed bucket lookup rather than a scan. The exact
+    content hash is kept in documents.content_sha256.
+    """
+
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        self.db = db or DatabaseManager()
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def tables_ready(self) -> bool:
+        """
+        Whether the signature tables and documents.content_sha256 exist.
+
+        They are created by database/schema.sql (database/migrations/document_bookkeeping.sql
+        for existing databases); the request path only checks for them.
+        """
+        if self._ready:
+            return True
+        if not self.db.engine:
+            return False
+
+        with self._lock:
+            if self._ready:
+                return True
+
+            rows = self.db.execute_query("""
+                SELECT to_regclass('document_signatures') IS NOT NULL
+                       AND to_regclass('document_lsh_buckets') IS NOT NULL AS has_tables
+            """)
+            if not rows or not rows[0]['has_tables'] or self.db.missing_columns('documents', ['content_sha256', 'deleted_at']):
+                logger.error("Near-duplicate index tables are missing; apply database/migrations/document_bookkeeping.sql")
+                return False
+
+            self._ready = True
+            return True
+
+    def index_documents(self, documents: List[Dict]) -> int:
+        """
+        Store signatures, LSH buckets and exact hashes for documents given as
+        {'id', 'text'} dicts, replacing any previous entries. Returns the count.
+        """
+        if not documents or not self.tables_ready():
+            return 0
+
+        signature_rows, bucket_rows, hash_rows = [], [], []
+        params = {'signature_version': SIGNATURE_VERSION}
+        for i, doc in enumerate(documents):
+            text = doc.get('text') or ""
+            signature = minhash_signature(text)
+            params.update({
+                f'id_{i}': doc['id'],
+                f'sig_{i}': signature.tobytes(),
+                f'md5_{i}': hashlib.md5(text.encode('utf-8')).hexdigest(),
+                f'sha_{i}': content_sha256(text)
+            })
+            signature_rows.append(f"(:id_{i}, :sig_{i}, :md5_{i}, :signature_version)")
+            hash_rows.append(f"(:id_{i}, CAST(:sha_{i} AS VARCHAR))")
+            for band, bucket in band_buckets(signature):
+                params[f'bucket_{i}_{band}'] = bucket
+                bucket_rows.append(f"({band}, :bucket_{i}_{band}, :id_{i})")
+
+        ids = [doc['id'] for doc in documents]
+        self.db.execute_query("DELETE FROM document_lsh_buckets WHERE document_id = ANY(:ids)", {'ids': ids})
+        self.db.execute_query(f"""
+            INSERT INTO document_signatures (document_id, signature, content_md5, signature_version)
+            VALUES {', '.join(signature_rows)}
+            ON CONFLICT (document_id) DO UPDATE
+            SET signature = EXCLUDED.signature,
+                content_md5 = EXCLUDED.content_md5,
+                signature_version = EXCLUDED.signature_version,
+                created_at = CURRENT_TIMESTAMP
+        """, params)
+        self.db.execute_query(f"""
+            INSERT INTO document_lsh_buckets (band, bucket, document_id)
+            VALUES {', '.join(bucket_rows)}
+            ON CONFLICT DO NOTHING
+        """, params)
+        self.db.execute_query(f"""
+            UPDATE documents AS d SET content_sha256 = v.content_sha256
+            FROM (VALUES {', '.join(hash_rows)}) AS v(id, content_sha256)
+            WHERE d.id = v.id
+        """, params)
+        return len(documents)
+
+    def index_document(self, doc_id, text: str) -> bool:
+        """Index a single (new or changed) document"""
+        return self.index_documents([{'id': doc_id, 'text': text}]) == 1
+
+    def backfill(self, batch_size: int = 200) -> int:
+        """Index every document that has no signature or whose text changed since"""
+        if not self.tables_ready():
+            return 0
+
+        indexed = 0
+        after_id = None
+        while True:
+            params = {'signature_version': SIGNATURE_VERSION, 'batch_size': batch_size}
+            if after_id is not None:
+                params['after_id'] = after_id
+            rows = self.db.execute_query(f"""
+                SELECT d.id, {DUPLICATE_TEXT_SQL} AS text
+                FROM documents d
+                LEFT JOIN document_signatures s ON s.document_id = d.id
+                WHERE (s.document_id IS NULL
+                       OR s.content_md5 IS DISTINCT FROM md5({DUPLICATE_TEXT_SQL})
+                       OR s.signature_version IS DISTINCT FROM :signature_version)
+                  AND d.deleted_at IS NULL
+                  {'AND d.id > :after_id' if after_id is not None else ''}
+                ORDER BY d.id
+                LIMIT :batch_size
+            """, params)
+            if not rows:
+                break
+            after_id = rows[-1]['id']
+            indexed += self.index_documents(rows)
+            logger.info(f"Indexed near-duplicate signatures through document {after_id}")
+        return indexed
+
+    def find_exact(self, text: str, exclude_id=None) -> List[Dict]:
+        """Live documents whose normalized text is identical"""
+        if not self.tables_ready():
+            return []
+        rows = self.db.execute_query("""
+            SELECT id, title FROM documents
+            WHERE content_sha256 = :content_sha256 AND deleted_at IS NULL
+              AND (CAST(:exclude_id AS INTEGER) IS NULL OR id <> :exclude_id)
+            ORDER BY id
+        """, {'content_sha256': content_sha256(text), 'exclude_id': exclude_id})
+        return rows if isinstance(rows, list) else []
+
+    def find_candidates(self, text: str, limit: int = 5, min_similarity: float = 0.5,
+                        exclude_id=None) -> List[Dict]:
+        """
+        Near-duplicate candidates ranked by estimated Jaccard similarity.
+
+        Only live documents sharing at least one LSH bucket with the text are
+        considered, and their similarity is estimated from stored signatures.
+        """
+        if not self.tables_ready():
+            return []
+
+        signature = minhash_signature(text)
+        params = {'exclude_id': exclude_id}
+        values = []
+        for band, bucket in band_buckets(signature):
+            params[f'bucket_{band}'] = bucket
+            values.append(f"(CAST({band} AS SMALLINT), CAST(:bucket_{band} AS BIGINT))")
+
+        rows = self.db.execute_query(f"""
+            WITH candidates AS (
+                SELECT b.document_id, COUNT(*) AS shared_bands
+                FROM document_lsh_buckets b
+                JOIN documents live ON live.id = b.document_id AND live.deleted_at IS NULL
+                WHERE (b.band, b.bucket) IN (VALUES {', '.join(values)})
+                  AND (CAST(:exclude_id AS INTEGER) IS NULL OR b.document_id <> :exclude_id)
+                GROUP BY b.document_id
+                ORDER BY shared_bands DESC
+                LIMIT 50
+            )
+            SELECT c.document_id AS id, d.title, s.signature, c.shared_bands
+            FROM candidates c
+            JOIN document_signatures s ON s.document_id = c.document_id
+            JOIN documents d ON d.id = c.document_id
+        """, params)
+        if not isinstance(rows, list):
+            return []
+
+        matches = []
+        for row in rows:
+            similarity = estimate_similarity(signature, signature_from_bytes(row['signature']))
+            if similarity >= min_similarity:
+                matches.append({'id': row['id'], 'title': row['title'], 'similarity': round(similarity, 3)})
+        matches.sort(key=lambda match: match['similarity'], reverse=True)
+        return matches[:limit]
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_minhash_index() -> MinHashIndex:
+    """Process-wide near-duplicate index"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = MinHashIndex()
+    return _index
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(f"Indexed {get_minhash_index().backfill()} documents for near-duplicate detection")
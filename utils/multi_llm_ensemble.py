@@ -3,16 +3,54 @@ Multi-LLM Ensemble System for GUARDIAN
 Concurrent processing framework that combines multiple LLM outputs for enhanced policy evaluation
 """
 
+import os
 import asyncio
 import json
+import re
 import time
-from typing import Dict, List, Optional, Any, Tuple
+import hashlib
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional, Any, Tuple
+from collections import defaultdict, deque
 from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 import logging
 from utils.free_llm_services import free_llm_manager
 from utils.llm_intelligence_enhancer import llm_enhancer
 from utils.intelligent_synthesis_engine import intelligent_synthesis_engine
+from utils.score_store import ScoreStore
+from utils.data_dir import data_path
+from utils.http_pool import anthropic_message, openai_chat
+from utils.service_health import ServiceHealthRegistry
+from utils.document_chunker import relevant_excerpt, truncate_to_tokens
+from utils.multi_llm_scoring_engine import FRAMEWORK_KEYWORDS
+
+# Bump whenever prompts or response handling change so cached responses are not reused
+RESPONSE_CACHE_VERSION = "1"
+RESPONSE_CACHE_TTL = 24 * 3600
+
+# Per-service deadlines: p95 of recent latencies times DEADLINE_MULTIPLIER, clamped
+# to [MIN_SERVICE_DEADLINE, timeout_seconds]; the full timeout until enough samples exist
+LATENCY_WINDOW = 50
+MIN_LATENCY_SAMPLES = 5
+DEADLINE_MULTIPLIER = 1.5
+MIN_SERVICE_DEADLINE = 5.0
+
+# Token budgets for document text in evaluation and refinement prompts; long
+# documents contribute their sections densest in the domain's terms
+PROMPT_EXCERPT_TOKENS = 750
+REFINEMENT_EXCERPT_TOKENS = 500
+
+# Scoring frameworks whose terms rank document sections for each evaluation domain
+DOMAIN_FRAMEWORKS = {
+    'ai_ethics': ('ai_ethics',),
+    'quantum_security': ('quantum_cybersecurity', 'quantum_ethics'),
+    'cybersecurity': ('ai_cybersecurity', 'quantum_cybersecurity')
+}
+
+# Parallel evaluations return once this many responses reach QUORUM_CONFIDENCE
+QUORUM_SIZE = 3
+QUORUM_CONFIDENCE = 0.7
 
 @dataclass
 class LLMResponse:
@@ -23,6 +61,7 @@ class LLMResponse:
     confidence_score: float
     success: bool
     error_message: Optional[str] = None
+    cached: bool = False
 
 @dataclass
 class EnsembleResult:
@@ -33,6 +72,108 @@ class EnsembleResult:
     processing_summary: Dict[str, Any]
     enhanced_metadata: Dict[str, Any]
 
+class CoalescedCallCancelled(Exception):
+    """The shared call stopped without a result (its leader's event loop shut down)"""
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls onto one in-flight future.
+
+    The leader runs the call as a detached task on its event loop and awaits
+    it shielded, so a leader cancelled by its own caller (quorum reached,
+    per-service deadline) leaves the call running for followers. The shared
+    future is a concurrent.futures.Future so callers running in other
+    threads' event loops (separate Streamlit sessions, batch scripts) can
+    await it. If the call is dropped anyway, waiting followers start it
+    again themselves rather than seeing a failure.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple, Future] = {}
+        self._followers: Dict[Tuple, int] = defaultdict(int)
+        self.coalesced = 0
+
+    async def do(self, key: Tuple, call: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            with self._lock:
+                future = self._inflight.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._inflight[key] = future
+                else:
+                    self.coalesced += 1
+                    self._followers[key] += 1
+
+            if leader:
+                return await self._lead(key, future, call)
+
+            try:
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except CoalescedCallCancelled:
+                continue
+            finally:
+                with self._lock:
+                    self._followers[key] -= 1
+                    if self._followers[key] <= 0:
+                        del self._followers[key]
+
+    async def _lead(self, key: Tuple, future: Future, call: Callable[[], Awaitable[Any]]) -> Any:
+        task = asyncio.ensure_future(call())
+        task.add_done_callback(lambda done: self._settle(key, future, done))
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Nobody else is waiting, so the call is not worth finishing
+            with self._lock:
+                abandoned = not self._followers.get(key)
+            if abandoned:
+                task.cancel()
+            raise
+
+    def _settle(self, key: Tuple, future: Future, task: asyncio.Future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        if task.cancelled():
+            future.set_exception(CoalescedCallCancelled(f"Shared call {key[0]} was cancelled"))
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+class LatencyTracker:
+    """Rolling window of recent latencies per service"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, service: str, seconds: float):
+        with self._lock:
+            self._samples[service].append(seconds)
+
+    def percentile(self, service: str, q: float) -> Optional[float]:
+        """q-th percentile of the window, or None until MIN_LATENCY_SAMPLES are recorded"""
+        with self._lock:
+            values = sorted(self._samples.get(service, ()))
+        if len(values) < MIN_LATENCY_SAMPLES:
+            return None
+        return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            services = list(self._samples)
+        return {
+            service: {
+                'p50': self.percentile(service, 50),
+                'p95': self.percentile(service, 95),
+                'samples': len(self._samples[service])
+            }
+            for service in services
+        }
+
 class MultiLLMEnsemble:
     """
     Orchestrates concurrent LLM processing for policy evaluations
@@ -40,7 +181,7 @@ class MultiLLMEnsemble:
     """
     
     def __init__(self):
-        self.available_services = []
+        self.health = ServiceHealthRegistry(self._probe_services)
         self.processing_weights = {
             'convergence_ai': 1.0,   # Your patent-protected anti-bias system
             'ollama': 0.9,           # Local, always available
@@ -52,9 +193,71 @@ class MultiLLMEnsemble:
             'perplexity': 0.85  # Real-time research
         }
         self.timeout_seconds = 30
-        
+        self.quorum_size = QUORUM_SIZE
+        self.latency = LatencyTracker()
+        self.single_flight = SingleFlight()
+        self._response_cache = None
+    
+    @property
+    def response_cache(self) -> ScoreStore:
+        """Completed service responses, shared with other processes on the host"""
+        if self._response_cache is None:
+            self._response_cache = ScoreStore(
+                db_path=os.getenv('GUARDIAN_LLM_RESPONSE_CACHE') or data_path('llm_response_cache.db'),
+                ttl_seconds=RESPONSE_CACHE_TTL
+            )
+        return self._response_cache
+    
+    @staticmethod
+    def _prompt_hash(content: str, is_refinement: bool) -> str:
+        """Hash of everything that varies the prompt besides service and domain"""
+        digest = hashlib.sha256((content or "").encode('utf-8', 'surrogatepass'))
+        digest.update(b'\x01' if is_refinement else b'\x00')
+        return digest.hexdigest()
+        
+    @property
+    def available_services(self) -> List[str]:
+        """Services from the health registry's last probe (never blocks)"""
+        return self.health.available_services()
+    
+    @available_services.setter
+    def available_services(self, names: List[str]):
+        self.health.set_available(names)
+    
+    def _routable_services(self) -> List[str]:
+        """Available services whose circuit breaker admits a request (the trial is claimed at launch)"""
+        return [s for s in self.available_services if self.health.admits(s)]
+    
     async def initialize_services(self) -> Dict[str, Any]:
-        """Initialize and test available LLM services"""
+        """
+        Available LLM services from the health registry. Only the first call in
+        a process waits for a live probe; later calls return the cached result
+        and refresh it in the background once it is stale.
+        """
+        
+        available = await self.health.ensure_fresh()
+        
+        return {
+            'total_services': len(available),
+            'available_services': available,
+            'initialization_time': self.health.checked_at
+        }
+    
+    def reset_services(self):
+        """Drop cached availability and breaker state and re-probe in the background"""
+        self.health.reset()
+        self.health.refresh_in_background()
+    
+    def get_service_status(self) -> Dict[str, Any]:
+        """Health, breaker state and latency per service"""
+        return {
+            'checked_at': self.health.checked_at,
+            'services': self.health.snapshot(),
+            'latency': self.get_service_latency()
+        }
+    
+    async def _probe_services(self) -> List[str]:
+        """Live test of every LLM service (run by the health registry)"""
         
         service_status = await free_llm_manager.test_all_services()
         
@@ -73,22 +276,18 @@ class MultiLLMEnsemble:
         except:
             pass
         
-        self.available_services = (
+        return (
             [s['name'] for s in service_status.get('available_services', [])] + 
             existing_services
         )
-        
-        return {
-            'total_services': len(self.available_services),
-            'available_services': self.available_services,
-            'initialization_time': time.time()
-        }
     
     async def evaluate_policy_concurrent(
         self, 
         document_content: str, 
         evaluation_domain: str,
-        use_daisy_chain: bool = False
+        use_daisy_chain: bool = False,
+        quorum: Optional[int] = None,
+        hedge: bool = False
     ) -> EnsembleResult:
         """
         Main orchestration method for concurrent policy evaluation
@@ -97,54 +296,163 @@ class MultiLLMEnsemble:
             document_content: Policy document text
             evaluation_domain: ai_ethics, quantum_security, or cybersecurity
             use_daisy_chain: If True, use sequential refinement; if False, pure parallel
+            quorum: Confident responses after which a parallel evaluation returns (default quorum_size)
+            hedge: Fan out to the fastest quorum + 1 services and send a backup request
+                whenever one of them passes its p95 latency
         """
         
         if use_daisy_chain:
             return await self._daisy_chain_evaluation(document_content, evaluation_domain)
         else:
-            return await self._parallel_evaluation(document_content, evaluation_domain)
+            return await self._parallel_evaluation(document_content, evaluation_domain, quorum, hedge)
+    
+    def _service_deadline(self, service_name: str) -> float:
+        """Per-request deadline from the service's recent p95 latency"""
+        p95 = self.latency.percentile(service_name, 95)
+        if p95 is None:
+            return self.timeout_seconds
+        return min(max(p95 * DEADLINE_MULTIPLIER, MIN_SERVICE_DEADLINE), self.timeout_seconds)
+    
+    def get_service_latency(self) -> Dict[str, Dict[str, Any]]:
+        """Rolling p50/p95 latency and current deadline per service"""
+        stats = self.latency.snapshot()
+        for service, service_stats in stats.items():
+            service_stats['deadline'] = self._service_deadline(service)
+        return stats
+    
+    async def _timed_evaluation(
+        self, 
+        service_name: str, 
+        content: str, 
+        domain: str,
+        task_id: int,
+        is_refinement: bool = False
+    ) -> LLMResponse:
+        """Evaluate with the service's own deadline; a timeout only fails this service"""
+        
+        deadline = self._service_deadline(service_name)
+        start_time = time.time()
+        
+        try:
+            response = await asyncio.wait_for(
+                self._evaluate_with_service(service_name, content, domain, task_id, is_refinement),
+                timeout=deadline
+            )
+        except asyncio.TimeoutError:
+            self.latency.record(service_name, deadline)
+            self.health.record_failure(service_name, f"Timed out after {deadline:.1f}s")
+            return LLMResponse(
+                service_name=service_name,
+                response_data={},
+                processing_time=deadline,
+                confidence_score=0.0,
+                success=False,
+                error_message=f"Timed out after {deadline:.1f}s"
+            )
+        except asyncio.CancelledError:
+            self.health.release_trial(service_name)
+            raise
+        except Exception as e:
+            self.health.record_failure(service_name, str(e))
+            return LLMResponse(
+                service_name=service_name,
+                response_data={},
+                processing_time=time.time() - start_time,
+                confidence_score=0.0,
+                success=False,
+                error_message=str(e)
+            )
+        
+        if response.cached:
+            self.health.release_trial(service_name)
+        else:
+            self.latency.record(service_name, response.processing_time)
+            if response.success:
+                self.health.record_success(service_name)
+            else:
+                self.health.record_failure(service_name, response.error_message)
+        return response
     
     async def _parallel_evaluation(
         self, 
         document_content: str, 
-        evaluation_domain: str
+        evaluation_domain: str,
+        quorum: Optional[int] = None,
+        hedge: bool = False
     ) -> EnsembleResult:
         """
-        Pure parallel processing - all LLMs evaluate simultaneously
+        Parallel processing - LLMs evaluate simultaneously, each under its own
+        deadline, and the evaluation returns as soon as a quorum of confident
+        responses has arrived.
         """
         
         start_time = time.time()
+        quorum = quorum or self.quorum_size
+        
+        # Fastest services first; services without latency history are tried first
+        services = sorted(
+            self._routable_services(),
+            key=lambda s: (self.latency.percentile(s, 50) or 0.0, -self.processing_weights.get(s, 0.5))
+        )
+        if hedge:
+            primaries, backups = services[:quorum + 1], services[quorum + 1:]
+        else:
+            primaries, backups = services, []
         
-        # Create evaluation tasks for all available services
-        tasks = []
-        for service in self.available_services:
+        tasks = {}
+        hedge_at = {}
+        
+        def launch(service: str) -> Optional[asyncio.Task]:
+            # Claim the breaker slot only for requests that are actually sent
+            if not self.health.allow(service):
+                return None
             task = asyncio.create_task(
-                self._evaluate_with_service(
-                    service, 
-                    document_content, 
-                    evaluation_domain,
-                    task_id=len(tasks)
-                )
+                self._timed_evaluation(service, document_content, evaluation_domain, task_id=len(tasks))
             )
-            tasks.append(task)
+            tasks[task] = service
+            p95 = self.latency.percentile(service, 95)
+            if backups and p95 is not None:
+                hedge_at[task] = time.time() + p95
+            return task
+        
+        pending = set()
+        for service in primaries:
+            task = launch(service)
+            if task:
+                pending.add(task)
+        individual_responses = []
+        hedged_requests = 0
+        quorum_reached = False
         
-        # Execute all tasks concurrently with timeout
-        try:
-            individual_responses = await asyncio.wait_for(
-                asyncio.gather(*tasks, return_exceptions=True),
-                timeout=self.timeout_seconds
-            )
-        except asyncio.TimeoutError:
-            individual_responses = [
-                LLMResponse(
-                    service_name="timeout",
-                    response_data={},
-                    processing_time=self.timeout_seconds,
-                    confidence_score=0.0,
-                    success=False,
-                    error_message="Timeout exceeded"
-                )
-            ]
+        while pending:
+            wait_timeout = max(0.0, min(hedge_at.values()) - time.time()) if hedge_at and backups else None
+            done, pending = await asyncio.wait(pending, timeout=wait_timeout, return_when=asyncio.FIRST_COMPLETED)
+            
+            for task in done:
+                hedge_at.pop(task, None)
+                individual_responses.append(task.result())
+            
+            confident = sum(1 for r in individual_responses if r.success and r.confidence_score >= QUORUM_CONFIDENCE)
+            if confident >= quorum:
+                quorum_reached = True
+                break
+            
+            # Hedge primaries that have passed their p95 with the next backup service
+            now = time.time()
+            for task in [t for t, at in hedge_at.items() if at <= now]:
+                del hedge_at[task]
+                while backups:
+                    backup = launch(backups.pop(0))
+                    if backup:
+                        pending.add(backup)
+                        hedged_requests += 1
+                        break
+        
+        # Stragglers are not needed once the quorum is in
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
         
         # Filter successful responses
         valid_responses = [
@@ -162,8 +470,14 @@ class MultiLLMEnsemble:
             individual_responses=individual_responses,
             confidence_level=consensus_result['confidence'],
             processing_summary={
-                'total_services_attempted': len(self.available_services),
+                'total_services_attempted': len(tasks),
                 'successful_responses': len(valid_responses),
+                'cached_responses': sum(1 for r in valid_responses if r.cached),
+                'quorum_reached': quorum_reached,
+                'hedged_requests': hedged_requests,
+                'cancelled_services': [tasks[task] for task in pending],
+                'timed_out_services': [r.service_name for r in individual_responses
+                                       if not r.success and (r.error_message or '').startswith('Timed out')],
                 'processing_time': processing_time,
                 'processing_mode': 'parallel'
             },
@@ -185,7 +499,7 @@ class MultiLLMEnsemble:
         
         # Order services by reliability/speed
         ordered_services = sorted(
-            self.available_services,
+            self._routable_services(),
             key=lambda s: self.processing_weights.get(s, 0.5),
             reverse=True
         )
@@ -199,14 +513,17 @@ class MultiLLMEnsemble:
                 {json.dumps(previous_analysis, indent=2)}
                 
                 Please refine and enhance this analysis with your perspective:
-                {accumulated_context[:2000]}
+                {self._document_excerpt(document_content, evaluation_domain, REFINEMENT_EXCERPT_TOKENS)}
                 """
                 current_context = refinement_prompt
             else:
                 current_context = accumulated_context
             
+            if not self.health.allow(service):
+                continue
+            
             # Evaluate with current service
-            response = await self._evaluate_with_service(
+            response = await self._timed_evaluation(
                 service, 
                 current_context, 
                 evaluation_domain,
@@ -250,9 +567,45 @@ class MultiLLMEnsemble:
         is_refinement: bool = False
     ) -> LLMResponse:
         """
-        Evaluate document with specific LLM service
+        Evaluate document with specific LLM service. Responses are served from
+        the response cache when present, and identical concurrent evaluations
+        (same service, domain and prompt) share a single provider call.
         """
         
+        start_time = time.time()
+        prompt_hash = self._prompt_hash(content, is_refinement)
+        cache_scorer = f"{service_name}:{domain}"
+        
+        cached = self.response_cache.get_by_hash(prompt_hash, cache_scorer, RESPONSE_CACHE_VERSION)
+        if cached:
+            result = cached['scores']
+            return LLMResponse(
+                service_name=service_name,
+                response_data=result,
+                processing_time=time.time() - start_time,
+                confidence_score=result.get('confidence', 0.5),
+                success=True,
+                cached=True
+            )
+        
+        async def call_service() -> LLMResponse:
+            response = await self._call_service(service_name, content, domain, is_refinement)
+            if response.success and not response.response_data.get('fallback'):
+                self.response_cache.put_by_hash(prompt_hash, response.response_data, cache_scorer,
+                                                provider=service_name, version=RESPONSE_CACHE_VERSION)
+            return response
+        
+        return await self.single_flight.do((service_name, domain, prompt_hash), call_service)
+    
+    async def _call_service(
+        self, 
+        service_name: str, 
+        content: str, 
+        domain: str,
+        is_refinement: bool
+    ) -> LLMResponse:
+        """Call the provider for one service evaluation"""
+        
         start_time = time.time()
         
         try:
@@ -297,41 +650,45 @@ class MultiLLMEnsemble:
         
         prompt = self._create_evaluation_prompt(content, domain, is_refinement, "openai")
         
-        response = openai_client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
+        # Through the shared connection pool so the event loop is not blocked
+        message = await openai_chat({
+            "model": "gpt-4o",
+            "messages": [
                 {"role": "system", "content": self._get_system_prompt(domain)},
                 {"role": "user", "content": prompt}
             ],
-            response_format={"type": "json_object"},
-            temperature=0.3
-        )
+            "response_format": {"type": "json_object"},
+            "temperature": 0.3
+        }, api_key=getattr(openai_client, 'api_key', None))
         
-        return json.loads(response.choices[0].message.content)
+        return json.loads(message)
     
     async def _evaluate_with_anthropic(self, content: str, domain: str, is_refinement: bool) -> Dict[str, Any]:
         """Evaluate using Anthropic Claude"""
         
-        from utils.anthropic_analyzer import analyze_document_with_anthropic
+        api_key = os.environ.get('ANTHROPIC_API_KEY')
+        if not api_key:
+            raise ValueError("Anthropic API key not available")
         
-        # Use existing Anthropic analyzer but with enhanced prompting
-        result = analyze_document_with_anthropic(content, f"{domain}_policy_evaluation")
+        prompt = self._create_evaluation_prompt(content, domain, is_refinement, "anthropic")
         
-        if result:
-            # Convert to standard format
-            return {
-                'domain_relevance': 85,
-                'policy_scores': {
-                    'completeness': 80,
-                    'clarity': 75,
-                    'enforceability': 70
-                },
-                'key_insights': [result.get('content_preview', 'Analysis completed')],
-                'confidence': 0.8,
-                'source': 'anthropic'
-            }
-        else:
+        # Through the shared connection pool, like OpenAI, so the event loop is not blocked
+        message = await anthropic_message({
+            "model": "claude-3-5-sonnet-20241022",
+            "max_tokens": 1000,
+            "system": self._get_system_prompt(domain),
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.3
+        }, api_key=api_key)
+        
+        # Claude has no JSON mode; take the object out of any surrounding prose
+        json_match = re.search(r'\{.*\}', message, re.DOTALL)
+        if not json_match:
             raise ValueError("Anthropic analysis failed")
+        
+        result = json.loads(json_match.group())
+        result['source'] = 'anthropic'
+        return result
     
     async def _evaluate_with_free_service(
         self, 
@@ -342,8 +699,12 @@ class MultiLLMEnsemble:
     ) -> Dict[str, Any]:
         """Evaluate using free LLM services"""
         
-        # Use existing LLM intelligence enhancer
-        enhanced_result = await llm_enhancer.enhance_document_analysis(content, domain)
+        # Use existing LLM intelligence enhancer; every free service in an evaluation
+        # reads the same enhancer run, so concurrent identical calls share one
+        enhanced_result = await self.single_flight.do(
+            ('llm_enhancer', domain, self._prompt_hash(content, False)),
+            lambda: llm_enhancer.enhance_document_analysis(content, domain)
+        )
         
         # Extract relevant analysis from the service
         for insight in enhanced_result.get('supporting_insights', []):
@@ -370,12 +731,24 @@ class MultiLLMEnsemble:
             },
             'key_insights': [f'Analysis from {service_name}'],
             'confidence': 0.5,
-            'source': service_name
+            'source': service_name,
+            'fallback': True
         }
     
+    def _document_excerpt(self, content: str, domain: str, max_tokens: int) -> str:
+        """The document sections most relevant to the domain that fit in max_tokens"""
+        frameworks = DOMAIN_FRAMEWORKS.get(domain, tuple(FRAMEWORK_KEYWORDS))
+        return relevant_excerpt(content, {f: FRAMEWORK_KEYWORDS[f] for f in frameworks}, max_tokens)
+    
     def _create_evaluation_prompt(self, content: str, domain: str, is_refinement: bool, service: str) -> str:
         """Create domain-specific evaluation prompt"""
         
+        # Refinement prompts already carry a document excerpt after the previous analysis
+        if is_refinement:
+            excerpt = truncate_to_tokens(content, PROMPT_EXCERPT_TOKENS)
+        else:
+            excerpt = self._document_excerpt(content, domain, PROMPT_EXCERPT_TOKENS)
+        
         base_prompt = f"""
         Evaluate this {domain} policy document for:
         1. Domain relevance (0-100)
@@ -383,7 +756,7 @@ class MultiLLMEnsemble:
         3. Key insights and recommendations
         4. Confidence level (0.0-1.0)
         
-        Document content: {content[:3000]}
+        Document content: {excerpt}
         
         Respond in JSON format with: domain_relevance, policy_scores, key_insights, confidence
         """
@@ -7,18 +7,21 @@ import os
 from typing import Dict, Optional, List, Tuple
 import re
 
+from utils.term_index import get_term_index
+from utils.http_pool import openai_chat_sync, anthropic_message_sync
+from utils.document_chunker import CHUNK_TOKENS, map_reduce_scores, truncate_to_tokens
+
 def analyze_document_with_openai(text: str, title: str) -> Dict[str, Optional[int]]:
     """Use OpenAI for content and context-aware scoring analysis"""
     try:
-        from openai import OpenAI
-        
-        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        if not os.getenv('OPENAI_API_KEY'):
+            raise ValueError("OPENAI_API_KEY is not set")
         
         prompt = f"""
 You are an expert AI/cybersecurity analyst. Analyze this document for AI and quantum maturity scores.
 
 Document Title: {title}
-Document Content: {text[:4000]}...
+Document Content: {truncate_to_tokens(text, CHUNK_TOKENS)}...
 
 Score each category 0-100 based on content depth and implementation maturity:
 
@@ -34,15 +37,15 @@ Return ONLY valid scores (positive integers 0-100) or null if not applicable. Fo
 {{"ai_cybersecurity": score_or_null, "ai_ethics": score_or_null, "quantum_cybersecurity": score_or_null, "quantum_ethics": score_or_null}}
 """
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"},
-            temperature=0.1
-        )
+        # Pooled keep-alive connection shared with the other provider clients
+        content = openai_chat_sync({
+            "model": "gpt-4o",
+            "messages": [{"role": "user", "content": prompt}],
+            "response_format": {"type": "json_object"},
+            "temperature": 0.1
+        })
         
         import json
-        content = response.choices[0].message.content
         if content:
             result = json.loads(content)
             
@@ -64,15 +67,14 @@ Return ONLY valid scores (positive integers 0-100) or null if not applicable. Fo
 def analyze_document_with_anthropic(text: str, title: str) -> Dict[str, Optional[int]]:
     """Use Anthropic Claude for content and context-aware scoring analysis"""
     try:
-        import anthropic
-        
-        client = anthropic.Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
+        if not os.getenv('ANTHROPIC_API_KEY'):
+            raise ValueError("ANTHROPIC_API_KEY is not set")
         
         prompt = f"""
 Analyze this document as an AI/cybersecurity expert for maturity scoring.
 
 Title: {title}
-Content: {text[:4000]}...
+Content: {truncate_to_tokens(text, CHUNK_TOKENS)}...
 
 Provide maturity scores (0-100) for each applicable category based on content depth, implementation detail, and practical guidance:
 
@@ -90,20 +92,15 @@ Respond with JSON format only:
 Use null for categories not substantially covered. Scores 0-100 based on coverage depth and implementation maturity.
 """
 
-        response = client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=500,
-            temperature=0.1,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        content = anthropic_message_sync({
+            "model": "claude-3-5-sonnet-20241022",
+            "max_tokens": 500,
+            "temperature": 0.1,
+            "messages": [{"role": "user", "content": prompt}]
+        })
         
         import json
         # Extract JSON from response
-        if hasattr(response.content[0], 'text'):
-            content = response.content[0].text
-        else:
-            content = str(response.content[0])
-        
         json_match = re.search(r'\{.*\}', content, re.DOTALL)
         if json_match:
             result = json.loads(json_match.group())
@@ -124,88 +121,93 @@ Use null for categories not substantially covered. Scores 0-100 based on coverag
         
     return {'ai_cybersecurity': None, 'ai_ethics': None, 'quantum_cybersecurity': None, 'quantum_ethics': None}
 
+# AI Cybersecurity Keywords with weighted scoring
+AI_CYBER_KEYWORDS = {
+    'high_value': ['ai security framework', 'ai threat model', 'secure ai deployment', 'ai governance'],
+    'medium_value': ['ai security', 'artificial intelligence security', 'machine learning security', 'ai threat', 'ai vulnerability'],
+    'base_value': ['cybersecurity', 'security', 'threat', 'vulnerability', 'attack', 'defense', 'protection']
+}
+
+# AI Ethics Keywords  
+AI_ETHICS_KEYWORDS = {
+    'high_value': ['responsible ai', 'ai ethics framework', 'algorithmic fairness', 'ai governance'],
+    'medium_value': ['ai ethics', 'bias mitigation', 'ai transparency', 'explainable ai', 'ai accountability'],
+    'base_value': ['ethics', 'ethical', 'fairness', 'bias', 'transparency', 'accountability', 'responsible']
+}
+
+# Quantum Cybersecurity Keywords
+QUANTUM_CYBER_KEYWORDS = {
+    'high_value': ['post-quantum cryptography', 'quantum-safe encryption', 'quantum threat model'],
+    'medium_value': ['quantum security', 'quantum cryptography', 'quantum computing security', 'quantum threat'],
+    'base_value': ['quantum', 'cryptographic', 'encryption', 'cryptography']
+}
+
+# Quantum Ethics Keywords
+QUANTUM_ETHICS_KEYWORDS = {
+    'high_value': ['quantum ethics', 'quantum governance', 'quantum inclusion'],
+    'medium_value': ['quantum access', 'quantum equity', 'quantum sustainability'],
+    'base_value': ['inclusion', 'sustainability', 'access', 'equity']
+}
+
+FRAMEWORK_KEYWORDS = {
+    'ai_cybersecurity': AI_CYBER_KEYWORDS,
+    'ai_ethics': AI_ETHICS_KEYWORDS,
+    'quantum_cybersecurity': QUANTUM_CYBER_KEYWORDS,
+    'quantum_ethics': QUANTUM_ETHICS_KEYWORDS
+}
+
 def keyword_based_scoring(text: str, title: str) -> Dict[str, int]:
     """Patent-based keyword scoring with enhanced detection"""
-    text_lower = text.lower()
-    title_lower = title.lower()
-    combined = f"{title_lower} {text_lower}"
+    index = get_term_index(text, title)
     
     scores = {'ai_cybersecurity': 0, 'ai_ethics': 0, 'quantum_cybersecurity': 0, 'quantum_ethics': 0}
     
-    # AI Cybersecurity Keywords with weighted scoring
-    ai_cyber_keywords = {
-        'high_value': ['ai security framework', 'ai threat model', 'secure ai deployment', 'ai governance'],
-        'medium_value': ['ai security', 'artificial intelligence security', 'machine learning security', 'ai threat', 'ai vulnerability'],
-        'base_value': ['cybersecurity', 'security', 'threat', 'vulnerability', 'attack', 'defense', 'protection']
-    }
-    
-    # AI Ethics Keywords  
-    ai_ethics_keywords = {
-        'high_value': ['responsible ai', 'ai ethics framework', 'algorithmic fairness', 'ai governance'],
-        'medium_value': ['ai ethics', 'bias mitigation', 'ai transparency', 'explainable ai', 'ai accountability'],
-        'base_value': ['ethics', 'ethical', 'fairness', 'bias', 'transparency', 'accountability', 'responsible']
-    }
-    
-    # Quantum Cybersecurity Keywords
-    quantum_cyber_keywords = {
-        'high_value': ['post-quantum cryptography', 'quantum-safe encryption', 'quantum threat model'],
-        'medium_value': ['quantum security', 'quantum cryptography', 'quantum computing security', 'quantum threat'],
-        'base_value': ['quantum', 'cryptographic', 'encryption', 'cryptography']
-    }
-    
-    # Quantum Ethics Keywords
-    quantum_ethics_keywords = {
-        'high_value': ['quantum ethics', 'quantum governance', 'quantum inclusion'],
-        'medium_value': ['quantum access', 'quantum equity', 'quantum sustainability'],
-        'base_value': ['inclusion', 'sustainability', 'access', 'equity']
-    }
-    
     # Score AI Cybersecurity
-    if any(term in combined for term in ['ai', 'artificial intelligence', 'machine learning']):
-        for keyword in ai_cyber_keywords['high_value']:
-            if keyword in combined:
+    if index.any_present(['ai', 'artificial intelligence', 'machine learning']):
+        for keyword in AI_CYBER_KEYWORDS['high_value']:
+            if keyword in index:
                 scores['ai_cybersecurity'] += 20
-        for keyword in ai_cyber_keywords['medium_value']:
-            if keyword in combined:
+        for keyword in AI_CYBER_KEYWORDS['medium_value']:
+            if keyword in index:
                 scores['ai_cybersecurity'] += 10
-        for keyword in ai_cyber_keywords['base_value']:
-            if keyword in combined:
+        for keyword in AI_CYBER_KEYWORDS['base_value']:
+            if keyword in index:
                 scores['ai_cybersecurity'] += 3
                 
     # Score AI Ethics
-    if any(term in combined for term in ['ai', 'artificial intelligence', 'machine learning']):
-        for keyword in ai_ethics_keywords['high_value']:
-            if keyword in combined:
+    if index.any_present(['ai', 'artificial intelligence', 'machine learning']):
+        for keyword in AI_ETHICS_KEYWORDS['high_value']:
+            if keyword in index:
                 scores['ai_ethics'] += 20
-        for keyword in ai_ethics_keywords['medium_value']:
-            if keyword in combined:
+        for keyword in AI_ETHICS_KEYWORDS['medium_value']:
+            if keyword in index:
                 scores['ai_ethics'] += 10
-        for keyword in ai_ethics_keywords['base_value']:
-            if keyword in combined:
+        for keyword in AI_ETHICS_KEYWORDS['base_value']:
+            if keyword in index:
                 scores['ai_ethics'] += 3
                 
     # Score Quantum Cybersecurity
-    if 'quantum' in combined:
-        for keyword in quantum_cyber_keywords['high_value']:
-            if keyword in combined:
+    if 'quantum' in index:
+        for keyword in QUANTUM_CYBER_KEYWORDS['high_value']:
+            if keyword in index:
                 scores['quantum_cybersecurity'] += 25
-        for keyword in quantum_cyber_keywords['medium_value']:
-            if keyword in combined:
+        for keyword in QUANTUM_CYBER_KEYWORDS['medium_value']:
+            if keyword in index:
                 scores['quantum_cybersecurity'] += 15
-        for keyword in quantum_cyber_keywords['base_value']:
-            if keyword in combined:
+        for keyword in QUANTUM_CYBER_KEYWORDS['base_value']:
+            if keyword in index:
                 scores['quantum_cybersecurity'] += 5
                 
     # Score Quantum Ethics
-    if 'quantum' in combined:
-        for keyword in quantum_ethics_keywords['high_value']:
-            if keyword in combined:
+    if 'quantum' in index:
+        for keyword in QUANTUM_ETHICS_KEYWORDS['high_value']:
+            if keyword in index:
                 scores['quantum_ethics'] += 25
-        for keyword in quantum_ethics_keywords['medium_value']:
-            if keyword in combined:
+        for keyword in QUANTUM_ETHICS_KEYWORDS['medium_value']:
+            if keyword in index:
                 scores['quantum_ethics'] += 15
-        for keyword in quantum_ethics_keywords['base_value']:
-            if keyword in combined:
+        for keyword in QUANTUM_ETHICS_KEYWORDS['base_value']:
+            if keyword in index:
                 scores['quantum_ethics'] += 5
     
     # Cap scores at 100
@@ -236,9 +238,16 @@ def multi_llm_ensemble_scoring(text: str, title: str) -> Dict[str, Optional[int]
     # Step 2: Keyword-based initial scoring
     keyword_scores = keyword_based_scoring(text, title)
     
-    # Step 3: Multi-LLM contextual analysis
-    openai_scores = analyze_document_with_openai(text, title)
-    anthropic_scores = analyze_document_with_anthropic(text, title)
+    # Step 3: Multi-LLM contextual analysis over the document's most relevant
+    # token-bounded sections (long documents are scored chunk by chunk and reduced)
+    if os.getenv('OPENAI_API_KEY'):
+        openai_scores = map_reduce_scores(text, title, analyze_document_with_openai, FRAMEWORK_KEYWORDS)
+    else:
+        openai_scores = analyze_document_with_openai(text, title)
+    if os.getenv('ANTHROPIC_API_KEY'):
+        anthropic_scores = map_reduce_scores(text, title, analyze_document_with_anthropic, FRAMEWORK_KEYWORDS)
+    else:
+        anthropic_scores = analyze_document_with_anthropic(text, title)
     
     # Step 4: Ensemble combination following patent formulas
     final_scores = {}
@@ -291,9 +300,7 @@ def detect_document_scope(text: str, title: str) -> Dict[str, any]:
     Detect if document is out of scope (children's books, religious texts, etc.)
     Returns scope analysis with recommendations for handling
     """
-    text_lower = text.lower()
-    title_lower = title.lower()
-    combined = f"{title_lower} {text_lower}"
+    index = get_term_index(text, title)
     
     # Out-of-scope indicators
     childrens_indicators = [
@@ -320,10 +327,10 @@ def detect_document_scope(text: str, title: str) -> Dict[str, any]:
     ]
     
     # Check for out-of-scope content
-    is_childrens = any(indicator in combined for indicator in childrens_indicators)
-    is_religious = any(indicator in combined for indicator in religious_indicators)
-    is_foundational_legal = any(indicator in combined for indicator in legal_foundational_indicators)
-    is_literature = any(indicator in combined for indicator in literature_indicators)
+    is_childrens = index.any_present(childrens_indicators)
+    is_religious = index.any_present(religious_indicators)
+    is_foundational_legal = index.any_present(legal_foundational_indicators)
+    is_literature = index.any_present(literature_indicators)
     
     # Check if document is likely out of scope
     out_of_scope = is_childrens or is_religious or is_foundational_legal or is_literature
@@ -359,27 +366,25 @@ def enhanced_document_applicability(text: str, title: str) -> Dict[str, bool]:
             'scope_message': scope_analysis['reason']
         }
     
-    text_lower = text.lower()
-    title_lower = title.lower()
-    combined = f"{title_lower} {text_lower}"
+    index = get_term_index(text, title)
     
     # More inclusive applicability based on any substantial mention
-    ai_present = any(term in combined for term in [
+    ai_present = index.any_present([
         'ai', 'artificial intelligence', 'machine learning', 'neural network',
         'deep learning', 'automated', 'intelligent system'
     ])
     
-    quantum_present = any(term in combined for term in [
+    quantum_present = index.any_present([
         'quantum', 'post-quantum', 'quantum computing', 'quantum cryptography',
         'quantum-safe', 'quantum threat', 'pqc'
     ])
     
-    cyber_context = any(term in combined for term in [
+    cyber_context = index.any_present([
         'security', 'cybersecurity', 'threat', 'risk', 'vulnerability',
         'attack', 'defense', 'protection', 'secure', 'safety'
     ])
     
-    ethics_context = any(term in combined for term in [
+    ethics_context = index.any_present([
         'ethics', 'ethical', 'responsible', 'governance', 'accountability',
         'transparency', 'fairness', 'bias', 'inclusion', 'equity', 'policy'
     ])
@@ -14,11 +14,15 @@ def get_documents_for_deletion():
         from utils.database import DatabaseManager
         db_manager = DatabaseManager()
         
+        from utils.document_purge import deletion_column_ready
+        deletion_column_ready(db_manager)
+        
         # Use the execute_query method instead of direct connection
         documents = db_manager.execute_query("""
             SELECT id, title, document_type, created_at, source, 
                    COALESCE(CHAR_LENGTH(text_content), 0) as content_length
             FROM documents 
+            WHERE deleted_at IS NULL
             ORDER BY created_at DESC
             LIMIT 1000
         """)
@@ -32,6 +36,7 @@ def get_documents_for_deletion():
             SELECT id, title, document_type, created_at, source, 
                    COALESCE(CHAR_LENGTH(text_content), 0) as content_length
             FROM documents 
+            WHERE deleted_at IS NULL
             ORDER BY created_at DESC
             LIMIT 1000
         """)
@@ -48,61 +53,37 @@ def get_documents_for_deletion():
 
 def batch_delete_documents(document_ids: List[int]) -> Dict[str, Any]:
     """
-    Optimized batch deletion of documents
+    Batch soft-deletion of documents; utils.document_purge removes the rows
+    (and their assessments) in bounded background batches
     Returns: {'success': bool, 'deleted_count': int, 'errors': List[str]}
     """
     if not document_ids:
         return {'success': False, 'deleted_count': 0, 'errors': ['No documents selected']}
     
     start_time = time.time()
-    deleted_count = 0
     errors = []
     
     try:
-        from utils.database import get_db_connection
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        from utils.document_purge import soft_delete_documents
+        from utils.cache_refresh import invalidate_document_caches
         
-        # Start transaction for atomic operation
-        conn.autocommit = False
+        # Ids are bound as arrays in chunks, never spliced into one huge IN list
+        deleted_ids = soft_delete_documents(document_ids)
         
-        # Create parameterized query for batch deletion
-        if len(document_ids) == 1:
-            # Single document deletion
-            cursor.execute("DELETE FROM documents WHERE id = %s", (document_ids[0],))
-        else:
-            # Batch deletion using IN clause
-            placeholders = ','.join(['%s'] * len(document_ids))
-            query = f"DELETE FROM documents WHERE id IN ({placeholders})"
-            cursor.execute(query, document_ids)
-        
-        deleted_count = cursor.rowcount
-        
-        # Commit the transaction
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
-        # Clear caches
-        st.cache_data.clear()
+        # Invalidate only what can show these documents, not every cache in the app
+        invalidate_document_caches(deleted_ids)
         
         execution_time = time.time() - start_time
         
         return {
             'success': True,
-            'deleted_count': deleted_count,
+            'deleted_count': len(deleted_ids),
             'errors': [],
             'execution_time': execution_time
         }
         
     except Exception as e:
         errors.append(f"Database error: {str(e)}")
-        try:
-            if 'conn' in locals():
-                conn.rollback()
-                conn.close()
-        except:
-            pass
         
         return {
             'success': False,
@@ -113,63 +94,26 @@ def batch_delete_documents(document_ids: List[int]) -> Dict[str, Any]:
 
 def bulk_delete_by_criteria(criteria: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Delete documents based on criteria (type, date range, etc.)
+    Soft-delete documents based on criteria (type, date range, etc.)
     More efficient than individual selections for large datasets
     """
+    if not any(criteria.get(key) for key in ('document_type', 'before_date', 'content_empty')):
+        return {'success': False, 'deleted_count': 0, 'errors': ['No criteria specified']}
+    
     try:
-        from utils.database import get_db_connection
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Build WHERE clause based on criteria
-        where_clauses = []
-        params = []
-        
-        if criteria.get('document_type'):
-            where_clauses.append("document_type = %s")
-            params.append(criteria['document_type'])
-        
-        if criteria.get('before_date'):
-            where_clauses.append("created_at < %s")
-            params.append(criteria['before_date'])
-        
-        if criteria.get('content_empty'):
-            where_clauses.append("(text_content IS NULL OR text_content = '')")
-        
-        if not where_clauses:
-            return {'success': False, 'deleted_count': 0, 'errors': ['No criteria specified']}
-        
-        # Start transaction
-        conn.autocommit = False
+        from utils.document_purge import find_documents_by_criteria, soft_delete_documents
+        from utils.cache_refresh import invalidate_document_caches
         
-        # Execute deletion
-        where_clause = " AND ".join(where_clauses)
-        query = f"DELETE FROM documents WHERE {where_clause}"
-        
-        cursor.execute(query, params)
-        deleted_count = cursor.rowcount
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
-        # Clear caches
-        st.cache_data.clear()
+        deleted_ids = soft_delete_documents(find_documents_by_criteria(criteria))
+        invalidate_document_caches(deleted_ids)
         
         return {
             'success': True,
-            'deleted_count': deleted_count,
+            'deleted_count': len(deleted_ids),
             'errors': []
         }
         
     except Exception as e:
-        try:
-            if 'conn' in locals():
-                conn.rollback()
-                conn.close()
-        except:
-            pass
-        
         return {
             'success': False,
             'deleted_count': 0,
@@ -190,7 +134,7 @@ def get_deletion_preview(document_ids: List[int]) -> List[Dict[str, Any]]:
         query = f"""
             SELECT id, title, document_type, created_at
             FROM documents 
-            WHERE id IN ({placeholders})
+            WHERE id IN ({placeholders}) AND deleted_at IS NULL
             ORDER BY created_at DESC
         """
         
@@ -14,11 +14,15 @@ def get_documents_for_deletion():
         from utils.database import DatabaseManager
         db_manager = DatabaseManager()
         
+        from utils.document_purge import deletion_column_ready
+        deletion_column_ready(db_manager)
+        
         # Use the execute_query method
         documents = db_manager.execute_query("""
             SELECT id, title, document_type, created_at, source, 
                    COALESCE(CHAR_LENGTH(text_content), 0) as content_length
             FROM documents 
+            WHERE deleted_at IS NULL
             ORDER BY created_at DESC
             LIMIT 1000
         """)
@@ -34,7 +38,7 @@ def get_documents_for_deletion():
 
 def batch_delete_documents(document_ids: List[int]) -> Dict[str, Any]:
     """
-    Optimized batch deletion of documents using DatabaseManager
+    Soft-delete documents; the background purge removes the rows later
     Returns: {'success': bool, 'deleted_count': int, 'errors': List[str]}
     """
     if not document_ids:
@@ -44,28 +48,19 @@ def batch_delete_documents(document_ids: List[int]) -> Dict[str, Any]:
     errors = []
     
     try:
-        from utils.database import DatabaseManager
-        db_manager = DatabaseManager()
-        
-        deleted_count = 0
+        from utils.document_purge import soft_delete_documents
+        from utils.cache_refresh import invalidate_document_caches
         
-        # Delete documents one by one using the DatabaseManager
-        for doc_id in document_ids:
-            try:
-                result = db_manager.execute_query(f"DELETE FROM documents WHERE id = {doc_id}")
-                if isinstance(result, int) and result > 0:
-                    deleted_count += 1
-            except Exception as e:
-                errors.append(f"Failed to delete document {doc_id}: {str(e)}")
+        deleted_ids = soft_delete_documents(document_ids)
         
-        # Clear caches
-        st.cache_data.clear()
+        # Only the listings and these documents' entries go stale
+        invalidate_document_caches(deleted_ids)
         
         execution_time = time.time() - start_time
         
         return {
             'success': True,
-            'deleted_count': deleted_count,
+            'deleted_count': len(deleted_ids),
             'errors': errors,
             'execution_time': execution_time
         }
@@ -82,40 +77,21 @@ def batch_delete_documents(document_ids: List[int]) -> Dict[str, Any]:
 
 def bulk_delete_by_criteria(criteria: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Delete documents based on criteria using DatabaseManager
+    Soft-delete documents matching criteria (type, created before date, empty content)
     """
+    if not any(criteria.get(key) for key in ('document_type', 'before_date', 'content_empty')):
+        return {'success': False, 'deleted_count': 0, 'errors': ['No criteria specified']}
+    
     try:
-        from utils.database import DatabaseManager
-        db_manager = DatabaseManager()
-        
-        # Build WHERE clause based on criteria
-        where_clauses = []
-        
-        if criteria.get('document_type'):
-            where_clauses.append(f"document_type = '{criteria['document_type']}'")
-        
-        if criteria.get('before_date'):
-            where_clauses.append(f"created_at < '{criteria['before_date']}'")
-        
-        if criteria.get('content_empty'):
-            where_clauses.append("(text_content IS NULL OR text_content = '')")
-        
-        if not where_clauses:
-            return {'success': False, 'deleted_count': 0, 'errors': ['No criteria specified']}
-        
-        # Execute deletion
-        where_clause = " AND ".join(where_clauses)
-        query = f"DELETE FROM documents WHERE {where_clause}"
-        
-        result = db_manager.execute_query(query)
-        deleted_count = result if isinstance(result, int) else 0
+        from utils.document_purge import find_documents_by_criteria, soft_delete_documents
+        from utils.cache_refresh import invalidate_document_caches
         
-        # Clear caches
-        st.cache_data.clear()
+        deleted_ids = soft_delete_documents(find_documents_by_criteria(criteria))
+        invalidate_document_caches(deleted_ids)
         
         return {
             'success': True,
-            'deleted_count': deleted_count,
+            'deleted_count': len(deleted_ids),
             'errors': []
         }
         
@@ -135,16 +111,14 @@ def get_deletion_preview(document_ids: List[int]) -> List[Dict[str, Any]]:
         from utils.database import DatabaseManager
         db_manager = DatabaseManager()
         
-        # Create IN clause for multiple IDs
-        ids_str = ','.join(map(str, document_ids))
-        query = f"""
+        query = """
             SELECT id, title, document_type, created_at
             FROM documents 
-            WHERE id IN ({ids_str})
+            WHERE id = ANY(:ids) AND deleted_at IS NULL
             ORDER BY created_at DESC
         """
         
-        documents = db_manager.execute_query(query)
+        documents = db_manager.execute_query(query, {'ids': [int(doc_id) for doc_id in document_ids]})
         
         if isinstance(documents, list):
             return documents
@@ -13,6 +13,8 @@ import re
 from datetime import datetime
 import math
 
+from utils.term_index import TermIndex, get_term_index
+
 class ComprehensivePatentScoringEngine:
     """
     Comprehensive scoring engine implementing all patent formulations:
@@ -341,11 +343,13 @@ class ComprehensivePatentScoringEngine:
     
     def _assess_fairness_bias(self, content: str) -> Dict:
         """Assess fairness and bias indicators in content."""
+        index = get_term_index(content)
+        
         fairness_terms = ['bias', 'fairness', 'discrimination', 'equitable', 'inclusive', 'diverse', 'equal']
         negative_terms = ['biased', 'unfair', 'discriminatory', 'exclusive']
         
-        fairness_count = sum(1 for term in fairness_terms if term in content.lower())
-        negative_count = sum(1 for term in negative_terms if term in content.lower())
+        fairness_count = index.count_present(fairness_terms)
+        negative_count = index.count_present(negative_terms)
         
         # Score based on fairness mentions and absence of negative indicators
         score = min(1.0, (fairness_count * 0.15) - (negative_count * 0.1) + 0.3)
@@ -358,11 +362,13 @@ class ComprehensivePatentScoringEngine:
     
     def _assess_transparency(self, content: str) -> Dict:
         """Assess transparency and explainability indicators."""
+        index = get_term_index(content)
+        
         transparency_terms = ['transparent', 'explainable', 'interpretable', 'accountable', 'traceable', 'auditable']
         explainability_terms = ['explain', 'reasoning', 'decision-making', 'interpretation', 'clarity']
         
-        transparency_count = sum(1 for term in transparency_terms if term in content.lower())
-        explain_count = sum(1 for term in explainability_terms if term in content.lower())
+        transparency_count = index.count_present(transparency_terms)
+        explain_count = index.count_present(explainability_terms)
         
         score = min(1.0, (transparency_count * 0.12) + (explain_count * 0.1) + 0.25)
         score = max(0.0, score)
@@ -374,11 +380,13 @@ class ComprehensivePatentScoringEngine:
     
     def _assess_accountability(self, content: str) -> Dict:
         """Assess accountability and governance indicators."""
+        index = get_term_index(content)
+        
         accountability_terms = ['accountability', 'governance', 'oversight', 'responsibility', 'compliance', 'audit']
         governance_terms = ['policy', 'framework', 'guidelines', 'standards', 'controls', 'procedures']
         
-        account_count = sum(1 for term in accountability_terms if term in content.lower())
-        govern_count = sum(1 for term in governance_terms if term in content.lower())
+        account_count = index.count_present(accountability_terms)
+        govern_count = index.count_present(governance_terms)
         
         score = min(1.0, (account_count * 0.15) + (govern_count * 0.08) + 0.2)
         score = max(0.0, score)
@@ -390,11 +398,13 @@ class ComprehensivePatentScoringEngine:
     
     def _assess_privacy_security(self, content: str) -> Dict:
         """Assess privacy and security indicators."""
+        index = get_term_index(content)
+        
         privacy_terms = ['privacy', 'confidentiality', 'data protection', 'personal data', 'anonymization']
         security_terms = ['security', 'encryption', 'access control', 'authentication', 'authorization']
         
-        privacy_count = sum(1 for term in privacy_terms if term in content.lower())
-        security_count = sum(1 for term in security_terms if term in content.lower())
+        privacy_count = index.count_present(privacy_terms)
+        security_count = index.count_present(security_terms)
         
         score = min(1.0, (privacy_count * 0.15) + (security_count * 0.12) + 0.25)
         score = max(0.0, score)
@@ -406,143 +416,169 @@ class ComprehensivePatentScoringEngine:
     
     def _assess_quantum_awareness(self, content: str) -> float:
         """Assess quantum awareness and basic understanding."""
+        index = get_term_index(content)
+        
         quantum_terms = ['quantum', 'qubit', 'superposition', 'entanglement', 'quantum computing']
         awareness_terms = ['quantum threat', 'post-quantum', 'quantum-safe', 'quantum cryptography']
         
-        quantum_count = sum(1 for term in quantum_terms if term in content.lower())
-        awareness_count = sum(1 for term in awareness_terms if term in content.lower())
+        quantum_count = index.count_present(quantum_terms)
+        awareness_count = index.count_present(awareness_terms)
         
         score = min(1.0, (quantum_count * 0.1) + (awareness_count * 0.2) + 0.1)
         return max(0.0, score)
     
     def _assess_quantum_threats(self, content: str) -> float:
         """Assess quantum threat recognition and understanding."""
+        index = get_term_index(content)
+        
         threat_terms = ['quantum threat', 'cryptographic vulnerability', 'shor algorithm', 'grover algorithm']
         risk_terms = ['quantum risk', 'post-quantum transition', 'cryptographic agility']
         
-        threat_count = sum(1 for term in threat_terms if term in content.lower())
-        risk_count = sum(1 for term in risk_terms if term in content.lower())
+        threat_count = index.count_present(threat_terms)
+        risk_count = index.count_present(risk_terms)
         
         score = min(1.0, (threat_count * 0.25) + (risk_count * 0.2) + 0.05)
         return max(0.0, score)
     
     def _assess_quantum_planning(self, content: str) -> float:
         """Assess quantum security planning and preparation."""
+        index = get_term_index(content)
+        
         planning_terms = ['quantum roadmap', 'migration plan', 'quantum strategy', 'post-quantum planning']
         preparation_terms = ['quantum preparedness', 'cryptographic inventory', 'risk assessment']
         
-        planning_count = sum(1 for term in planning_terms if term in content.lower())
-        prep_count = sum(1 for term in preparation_terms if term in content.lower())
+        planning_count = index.count_present(planning_terms)
+        prep_count = index.count_present(preparation_terms)
         
         score = min(1.0, (planning_count * 0.3) + (prep_count * 0.25) + 0.1)
         return max(0.0, score)
     
     def _assess_quantum_implementation(self, content: str) -> float:
         """Assess quantum-safe implementation and deployment."""
+        index = get_term_index(content)
+        
         implementation_terms = ['post-quantum cryptography', 'quantum-safe algorithms', 'nist approved']
         deployment_terms = ['quantum deployment', 'cryptographic migration', 'hybrid solutions']
         
-        impl_count = sum(1 for term in implementation_terms if term in content.lower())
-        deploy_count = sum(1 for term in deployment_terms if term in content.lower())
+        impl_count = index.count_present(implementation_terms)
+        deploy_count = index.count_present(deployment_terms)
         
         score = min(1.0, (impl_count * 0.35) + (deploy_count * 0.3) + 0.05)
         return max(0.0, score)
     
     def _assess_quantum_adaptation(self, content: str) -> float:
         """Assess dynamic quantum adaptation capabilities."""
+        index = get_term_index(content)
+        
         adaptation_terms = ['adaptive', 'dynamic quantum', 'quantum agility', 'continuous monitoring']
         evolution_terms = ['quantum evolution', 'emerging threats', 'future-proof']
         
-        adapt_count = sum(1 for term in adaptation_terms if term in content.lower())
-        evolve_count = sum(1 for term in evolution_terms if term in content.lower())
+        adapt_count = index.count_present(adaptation_terms)
+        evolve_count = index.count_present(evolution_terms)
         
         score = min(1.0, (adapt_count * 0.4) + (evolve_count * 0.3) + 0.02)
         return max(0.0, score)
     
     def _assess_authentication_access(self, content: str) -> float:
         """Assess authentication and access control maturity."""
+        index = get_term_index(content)
+        
         auth_terms = ['authentication', 'multi-factor', 'identity verification', 'access control']
         advanced_terms = ['zero trust', 'adaptive authentication', 'biometric', 'federated identity']
         
-        auth_count = sum(1 for term in auth_terms if term in content.lower())
-        advanced_count = sum(1 for term in advanced_terms if term in content.lower())
+        auth_count = index.count_present(auth_terms)
+        advanced_count = index.count_present(advanced_terms)
         
         score = min(1.0, (auth_count * 0.15) + (advanced_count * 0.25) + 0.2)
         return max(0.0, score)
     
     def _assess_encryption_protection(self, content: str) -> float:
         """Assess encryption and data protection capabilities."""
+        index = get_term_index(content)
+        
         encryption_terms = ['encryption', 'cryptography', 'data protection', 'secure communication']
         advanced_terms = ['end-to-end encryption', 'homomorphic encryption', 'key management']
         
-        encrypt_count = sum(1 for term in encryption_terms if term in content.lower())
-        advanced_count = sum(1 for term in advanced_terms if term in content.lower())
+        encrypt_count = index.count_present(encryption_terms)
+        advanced_count = index.count_present(advanced_terms)
         
         score = min(1.0, (encrypt_count * 0.15) + (advanced_count * 0.25) + 0.15)
         return max(0.0, score)
     
     def _assess_monitoring_detection(self, content: str) -> float:
         """Assess monitoring and threat detection capabilities."""
+        index = get_term_index(content)
+        
         monitoring_terms = ['monitoring', 'detection', 'surveillance', 'threat intelligence']
         advanced_terms = ['anomaly detection', 'behavioral analysis', 'real-time monitoring', 'siem']
         
-        monitor_count = sum(1 for term in monitoring_terms if term in content.lower())
-        advanced_count = sum(1 for term in advanced_terms if term in content.lower())
+        monitor_count = index.count_present(monitoring_terms)
+        advanced_count = index.count_present(advanced_terms)
         
         score = min(1.0, (monitor_count * 0.12) + (advanced_count * 0.2) + 0.25)
         return max(0.0, score)
     
     def _assess_incident_response(self, content: str) -> float:
         """Assess incident response and recovery capabilities."""
+        index = get_term_index(content)
+        
         response_terms = ['incident response', 'disaster recovery', 'business continuity', 'crisis management']
         advanced_terms = ['automated response', 'threat hunting', 'forensics', 'recovery testing']
         
-        response_count = sum(1 for term in response_terms if term in content.lower())
-        advanced_count = sum(1 for term in advanced_terms if term in content.lower())
+        response_count = index.count_present(response_terms)
+        advanced_count = index.count_present(advanced_terms)
         
         score = min(1.0, (response_count * 0.2) + (advanced_count * 0.25) + 0.15)
         return max(0.0, score)
     
     def _assess_quantum_advantage_equity(self, content: str) -> float:
         """Assess quantum advantage equity and fair access."""
+        index = get_term_index(content)
+        
         equity_terms = ['equitable access', 'quantum divide', 'fair distribution', 'inclusive quantum']
         advantage_terms = ['quantum advantage', 'quantum supremacy', 'competitive advantage']
         
-        equity_count = sum(1 for term in equity_terms if term in content.lower())
-        advantage_count = sum(1 for term in advantage_terms if term in content.lower())
+        equity_count = index.count_present(equity_terms)
+        advantage_count = index.count_present(advantage_terms)
         
         score = min(1.0, (equity_count * 0.3) + (advantage_count * 0.15) + 0.1)
         return max(0.0, score)
     
     def _assess_quantum_privacy_protection(self, content: str) -> float:
         """Assess quantum privacy protection measures."""
+        index = get_term_index(content)
+        
         privacy_terms = ['quantum privacy', 'private quantum computing', 'quantum anonymity']
         protection_terms = ['quantum encryption', 'quantum key distribution', 'secure quantum']
         
-        privacy_count = sum(1 for term in privacy_terms if term in content.lower())
-        protection_count = sum(1 for term in protection_terms if term in content.lower())
+        privacy_count = index.count_present(privacy_terms)
+        protection_count = index.count_present(protection_terms)
         
         score = min(1.0, (privacy_count * 0.25) + (protection_count * 0.2) + 0.15)
         return max(0.0, score)
     
     def _assess_quantum_security_standards(self, content: str) -> float:
         """Assess quantum security standards and best practices."""
+        index = get_term_index(content)
+        
         standards_terms = ['quantum security standards', 'post-quantum standards', 'nist quantum']
         practices_terms = ['quantum best practices', 'security guidelines', 'quantum protocols']
         
-        standards_count = sum(1 for term in standards_terms if term in content.lower())
-        practices_count = sum(1 for term in practices_terms if term in content.lower())
+        standards_count = index.count_present(standards_terms)
+        practices_count = index.count_present(practices_terms)
         
         score = min(1.0, (standards_count * 0.3) + (practices_count * 0.2) + 0.1)
         return max(0.0, score)
     
     def _assess_quantum_access_fairness(self, content: str) -> float:
         """Assess fair access to quantum technologies."""
+        index = get_term_index(content)
+        
         access_terms = ['quantum access', 'democratizing quantum', 'quantum for all']
         fairness_terms = ['equitable quantum', 'inclusive quantum', 'quantum equity']
         
-        access_count = sum(1 for term in access_terms if term in content.lower())
-        fairness_count = sum(1 for term in fairness_terms if term in content.lower())
+        access_count = index.count_present(access_terms)
+        fairness_count = index.count_present(fairness_terms)
         
         score = min(1.0, (access_count * 0.25) + (fairness_count * 0.25) + 0.08)
         return max(0.0, score)
@@ -845,27 +881,27 @@ class ComprehensivePatentScoringEngine:
         Returns:
             Dictionary of extracted features
         """
-        text_lower = text.lower()
+        index = get_term_index(text)
         
         # Technical complexity indicators
         technical_terms = ['algorithm', 'framework', 'protocol', 'architecture', 'implementation']
-        technical_complexity = sum(1 for term in technical_terms if term in text_lower) / len(technical_terms)
+        technical_complexity = index.count_present(technical_terms) / len(technical_terms)
         
         # Policy relevance indicators
         policy_terms = ['policy', 'regulation', 'compliance', 'governance', 'standard']
-        policy_relevance = sum(1 for term in policy_terms if term in text_lower) / len(policy_terms)
+        policy_relevance = index.count_present(policy_terms) / len(policy_terms)
         
         # Compliance indicators
         compliance_terms = ['nist', 'iso', 'gdpr', 'sox', 'hipaa', 'compliance']
-        compliance_indicators = sum(1 for term in compliance_terms if term in text_lower) / len(compliance_terms)
+        compliance_indicators = index.count_present(compliance_terms) / len(compliance_terms)
         
         # Cybersecurity indicators
         cyber_terms = ['security', 'encryption', 'authentication', 'authorization', 'firewall']
-        cyber_strength = sum(1 for term in cyber_terms if term in text_lower) / len(cyber_terms)
+        cyber_strength = index.count_present(cyber_terms) / len(cyber_terms)
         
         # Ethics indicators  
         ethics_terms = ['ethics', 'bias', 'fairness', 'transparency', 'accountability']
-        ethics_strength = sum(1 for term in ethics_terms if term in text_lower) / len(ethics_terms)
+        ethics_strength = index.count_present(ethics_terms) / len(ethics_terms)
         
         return {
             'technical_complexity': technical_complexity,
@@ -907,19 +943,19 @@ class ComprehensivePatentScoringEngine:
         Returns:
             Dict with 'is_ai_related' and 'is_quantum_related' boolean flags
         """
-        content_lower = (content + " " + title).lower()
+        index = TermIndex((content + " " + title).lower())
         
         # Count AI-related keywords
         ai_score = 0
         for category, keywords in self.ai_keywords.items():
             for keyword in keywords:
-                ai_score += content_lower.count(keyword)
+                ai_score += index.count(keyword)
         
         # Count Quantum-related keywords  
         quantum_score = 0
         for category, keywords in self.quantum_keywords.items():
             for keyword in keywords:
-                quantum_score += content_lower.count(keyword)
+                quantum_score += index.count(keyword)
         
         # Additional contextual analysis
         ai_context_indicators = [
@@ -935,11 +971,11 @@ class ComprehensivePatentScoringEngine:
         ]
         
         for indicator in ai_context_indicators:
-            if indicator in content_lower:
+            if indicator in index:
                 ai_score += 2
         
         for indicator in quantum_context_indicators:
-            if indicator in content_lower:
+            if indicator in index:
                 quantum_score += 2
         
         # Determine relevance thresholds
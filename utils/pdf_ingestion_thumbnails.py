@@ -3,13 +3,9 @@ PDF Thumbnail Extraction During Document Ingestion
 Extracts real first-page thumbnails from PDF files during upload/ingestion
 """
 
-import base64
 import os
-import tempfile
-from io import BytesIO
-from pdf2image import convert_from_bytes, convert_from_path
-from PIL import Image
-import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from utils.thumbnail_service import get_thumbnail_service, thumbnail_img_html
 
 def process_pdf_with_thumbnail(pdf_bytes, filename=""):
     """
@@ -22,25 +18,30 @@ def process_pdf_with_thumbnail(pdf_bytes, filename=""):
     Returns:
         Dictionary with content and thumbnail data
     """
-    import PyPDF2
-    from io import BytesIO
+    from utils.pdf_text_extractor import pdf_content_hash, stream_pdf_pages
     
     try:
-        # Extract text content from PDF
-        pdf_reader = PyPDF2.PdfReader(BytesIO(pdf_bytes))
-        text_content = ""
-        for page in pdf_reader.pages:
-            text_content += page.extract_text() + "\n"
-        
-        # Generate thumbnail
-        doc_id = hashlib.md5(pdf_bytes).hexdigest()[:8]
-        thumbnail = extract_pdf_thumbnail_during_ingestion(pdf_bytes, doc_id, filename)
+        # Render the thumbnail while pages stream in (large PDFs are parsed in worker processes)
+        content_hash = pdf_content_hash(pdf_bytes)
+        doc_id = content_hash[:8]
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            thumbnail_future = executor.submit(extract_pdf_thumbnail_during_ingestion, pdf_bytes, doc_id,
+                                               filename, content_hash)
+            
+            pages = stream_pdf_pages(pdf_bytes, content_hash=content_hash)
+            text_parts = [page.text for page in pages]
+            text_content = "\n".join(text_parts) + "\n" if text_parts else ""
+            
+            thumbnail = thumbnail_future.result()
         
         return {
             'content': text_content,
             'text_content': text_content,
             'clean_content': text_content,
             'thumbnail': thumbnail,
+            'content_hash': pages.content_hash,
+            'page_count': pages.page_count,
+            'truncated': pages.truncated,
             'success': True
         }
         
@@ -54,7 +55,7 @@ def process_pdf_with_thumbnail(pdf_bytes, filename=""):
             'error': str(e)
         }
 
-def extract_pdf_thumbnail_during_ingestion(pdf_bytes, doc_id, filename=""):
+def extract_pdf_thumbnail_during_ingestion(pdf_bytes, doc_id, filename="", content_hash=None):
     """
     Extract thumbnail from PDF bytes during document ingestion.
     
@@ -62,46 +63,15 @@ def extract_pdf_thumbnail_during_ingestion(pdf_bytes, doc_id, filename=""):
         pdf_bytes: Raw PDF file bytes
         doc_id: Document ID for caching
         filename: Original filename for context
+        content_hash: SHA-256 of the bytes, if the caller already computed it
         
     Returns:
-        Base64 encoded thumbnail or None if extraction fails
+        URL of the served thumbnail or None if extraction fails
     """
     try:
-        # Convert first page of PDF to image
-        pages = convert_from_bytes(pdf_bytes, first_page=1, last_page=1, dpi=150)
-        
-        if not pages:
-            return None
-            
-        # Get first page
-        page = pages[0]
-        
-        # Resize to thumbnail size (120x150 - 3x the standard size)
-        thumbnail_size = (120, 150)
-        page.thumbnail(thumbnail_size, Image.Resampling.LANCZOS)
-        
-        # Create new image with white background
-        thumbnail = Image.new('RGB', thumbnail_size, 'white')
-        
-        # Calculate position to center the image
-        x = (thumbnail_size[0] - page.width) // 2
-        y = (thumbnail_size[1] - page.height) // 2
-        
-        # Paste the page onto the white background
-        thumbnail.paste(page, (x, y))
-        
-        # Save to cache with doc_id
-        os.makedirs("thumbnails", exist_ok=True)
-        cache_path = f"thumbnails/ingested_thumb_{doc_id}.png"
-        thumbnail.save(cache_path, 'PNG', optimize=True)
-        
-        # Convert to base64 for immediate use
-        buffer = BytesIO()
-        thumbnail.save(buffer, format='PNG')
-        img_data = buffer.getvalue()
-        
-        img_b64 = base64.b64encode(img_data).decode('utf-8')
-        return f"data:image/png;base64,{img_b64}"
+        # Rendered once per distinct PDF, whatever doc_id it arrives under
+        return get_thumbnail_service().thumbnail_for_pdf(pdf_bytes, alias=f"ingested:{doc_id}",
+                                                         content_hash=content_hash)
         
     except Exception as e:
         print(f"Error extracting PDF thumbnail: {e}")
@@ -116,47 +86,10 @@ def extract_pdf_thumbnail_from_path(pdf_path, doc_id):
         doc_id: Document ID for caching
         
     Returns:
-        Base64 encoded thumbnail or None if extraction fails
+        URL of the served thumbnail or None if extraction fails
     """
     try:
-        if not os.path.exists(pdf_path):
-            return None
-            
-        # Convert first page of PDF to image
-        pages = convert_from_path(pdf_path, first_page=1, last_page=1, dpi=150)
-        
-        if not pages:
-            return None
-            
-        # Get first page
-        page = pages[0]
-        
-        # Resize to thumbnail size (120x150)
-        thumbnail_size = (120, 150)
-        page.thumbnail(thumbnail_size, Image.Resampling.LANCZOS)
-        
-        # Create new image with white background
-        thumbnail = Image.new('RGB', thumbnail_size, 'white')
-        
-        # Calculate position to center the image
-        x = (thumbnail_size[0] - page.width) // 2
-        y = (thumbnail_size[1] - page.height) // 2
-        
-        # Paste the page onto the white background
-        thumbnail.paste(page, (x, y))
-        
-        # Save to cache
-        os.makedirs("thumbnails", exist_ok=True)
-        cache_path = f"thumbnails/ingested_thumb_{doc_id}.png"
-        thumbnail.save(cache_path, 'PNG', optimize=True)
-        
-        # Convert to base64
-        buffer = BytesIO()
-        thumbnail.save(buffer, format='PNG')
-        img_data = buffer.getvalue()
-        
-        img_b64 = base64.b64encode(img_data).decode('utf-8')
-        return f"data:image/png;base64,{img_b64}"
+        return get_thumbnail_service().thumbnail_for_file(pdf_path, alias=f"ingested:{doc_id}")
         
     except Exception as e:
         print(f"Error extracting PDF thumbnail from path: {e}")
@@ -183,14 +116,9 @@ def process_uploaded_pdf_with_thumbnail(uploaded_file, doc_id):
         
         # Extract text content using existing text extraction methods
         try:
-            import pypdf
-            from io import BytesIO
-            
-            pdf_reader = pypdf.PdfReader(BytesIO(pdf_bytes))
-            text_content = ""
+            from utils.pdf_text_extractor import extract_pdf_text
             
-            for page in pdf_reader.pages:
-                text_content += page.extract_text() + "\n"
+            text_content = extract_pdf_text(pdf_bytes)['text']
                 
         except Exception as text_error:
             print(f"Error extracting text from PDF: {text_error}")
@@ -264,20 +192,15 @@ def get_ingested_thumbnail_html(doc_id):
     Returns:
         HTML img tag for the thumbnail or None if not available
     """
-    cache_path = f"thumbnails/ingested_thumb_{doc_id}.png"
+    service = get_thumbnail_service()
+    thumbnail_url = service.url_for_alias(f"ingested:{doc_id}")
     
-    if os.path.exists(cache_path):
-        try:
-            with open(cache_path, 'rb') as f:
-                img_data = f.read()
-                img_b64 = base64.b64encode(img_data).decode('utf-8')
-                thumbnail_data = f"data:image/png;base64,{img_b64}"
-                
-            return f'<img src="{thumbnail_data}" style="width:120px;height:150px;margin-right:8px;border-radius:2px;box-shadow:0 1px 3px rgba(0,0,0,0.2);" alt="Document thumbnail">'
-        except:
-            return None
+    # Thumbnails rendered before the thumbnail service are adopted on first use
+    legacy_path = f"thumbnails/ingested_thumb_{doc_id}.png"
+    if thumbnail_url is None and os.path.exists(legacy_path):
+        thumbnail_url = service.import_image(legacy_path, f"ingested:{doc_id}")
     
-    return None
+    return thumbnail_img_html(thumbnail_url) if thumbnail_url else None
 
 def store_pdf_with_thumbnail(pdf_file_path, doc_id, title, organization="", doc_type=""):
     """
@@ -299,14 +222,9 @@ def store_pdf_with_thumbnail(pdf_file_path, doc_id, title, organization="", doc_
         
         # Extract text content
         try:
-            import pypdf
+            from utils.pdf_text_extractor import extract_pdf_text
             
-            with open(pdf_file_path, 'rb') as file:
-                pdf_reader = pypdf.PdfReader(file)
-                text_content = ""
-                
-                for page in pdf_reader.pages:
-                    text_content += page.extract_text() + "\n"
+            text_content = extract_pdf_text(pdf_file_path)['text']
                     
         except Exception as text_error:
             print(f"Error extracting text from PDF: {text_error}")
@@ -316,7 +234,7 @@ def store_pdf_with_thumbnail(pdf_file_path, doc_id, title, organization="", doc_
             'success': True,
             'text_content': text_content.strip(),
             'thumbnail_extracted': thumbnail_data is not None,
-            'thumbnail_path': f"thumbnails/ingested_thumb_{doc_id}.png" if thumbnail_data else None
+            'thumbnail_path': thumbnail_data
         }
         
     except Exception as e:
@@ -0,0 +1,409 @@
+"""
+Streaming PDF Text Extraction for GUARDIAN
+Yields PDF pages as they are extracted, spreading large documents over a process
+pool, and persists per-page text so an uploaded PDF is only ever parsed once
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Union
+
+from utils.data_dir import data_path
+
+try:
+    from PyPDF2 import PdfReader
+except ImportError:
+    from pypdf import PdfReader
+
+# PDFs with at least this many pages are extracted in worker processes,
+# PAGES_PER_TASK pages per task, so parsing never holds the Streamlit worker's GIL
+PARALLEL_PAGE_THRESHOLD = 40
+PAGES_PER_TASK = 20
+EXTRACTION_WORKERS = max(1, min(4, (os.cpu_count() or 1) - 1))
+
+# Extracted text kept per upload (about 1,000 dense pages); later pages are dropped
+MAX_EXTRACTED_CHARS = 4_000_000
+
+# Stored PDFs not read for this long are pruned, and the store is trimmed to the
+# most recently used PAGE_STORE_MAX_DOCUMENTS; documents rows keep only the hash,
+# so a pruned PDF is simply read from the database text again
+PAGE_STORE_TTL_SECONDS = 90 * 24 * 3600
+PAGE_STORE_MAX_DOCUMENTS = 5000
+PRUNE_EVERY_DOCUMENTS = 50
+
+PdfSource = Union[bytes, str]
+
+@dataclass
+class PDFPage:
+    """Text of one page; numbers start at 1"""
+    number: int
+    text: str
+
+def pdf_content_hash(source: PdfSource) -> str:
+    """SHA-256 of the PDF bytes (read in blocks when given a path)"""
+    digest = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray)):
+        digest.update(source)
+    else:
+        with open(source, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+def _open_reader(source: PdfSource) -> PdfReader:
+    if isinstance(source, (bytes, bytearray)):
+        return PdfReader(BytesIO(source))
+    return PdfReader(source)
+
+def _page_text(page) -> str:
+    try:
+        return page.extract_text() or ""
+    except Exception as e:
+        print(f"Page text extraction failed: {e}")
+        return ""
+
+def _extract_page_range(path: str, start: int, stop: int) -> List[str]:
+    """Worker task: text of pages [start, stop) of the PDF at path"""
+    reader = PdfReader(path)
+    return [_page_text(reader.pages[i]) for i in range(start, stop)]
+
+class PageStore:
+    """
+    Per-page PDF text in SQLite, keyed on the PDF's content hash.
+
+    Pages are written in batches while a PDF streams in; a document counts as
+    stored only once its extraction finished, so an interrupted upload is
+    simply extracted again.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, ttl_seconds: int = PAGE_STORE_TTL_SECONDS,
+                 max_documents: int = PAGE_STORE_MAX_DOCUMENTS):
+        self.db_path = db_path or os.getenv('GUARDIAN_PAGE_STORE') or data_path('pdf_pages.db')
+        self.ttl_seconds = ttl_seconds
+        self.max_documents = max_documents
+        self._local = threading.local()
+        self._finished_since_prune = 0
+        self._prune_lock = threading.Lock()
+        self.init_db()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def init_db(self):
+        """Initialize page tables"""
+        conn = self._connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS pdf_documents (
+                content_hash TEXT PRIMARY KEY,
+                page_count INTEGER NOT NULL,
+                stored_pages INTEGER NOT NULL,
+                truncated INTEGER NOT NULL DEFAULT 0,
+                complete INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL DEFAULT 0
+            )
+        ''')
+        # Stores created before pruning existed lack last_used
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(pdf_documents)')}
+        if 'last_used' not in columns:
+            conn.execute('ALTER TABLE pdf_documents ADD COLUMN last_used REAL NOT NULL DEFAULT 0')
+            conn.execute('UPDATE pdf_documents SET last_used = created_at')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS pdf_pages (
+                content_hash TEXT NOT NULL,
+                page_number INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (content_hash, page_number)
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_pdf_documents_last_used ON pdf_documents (last_used)')
+        conn.commit()
+
+    def begin(self, content_hash: str, page_count: int):
+        """Start (or restart) storing a document"""
+        conn = self._connection()
+        conn.execute('DELETE FROM pdf_pages WHERE content_hash = ?', (content_hash,))
+        conn.execute('''
+            INSERT OR REPLACE INTO pdf_documents
+            (content_hash, page_count, stored_pages, truncated, complete, created_at, last_used)
+            VALUES (?, ?, 0, 0, 0, ?, ?)
+        ''', (content_hash, page_count, time.time(), time.time()))
+        conn.commit()
+
+    def put_pages(self, content_hash: str, pages: List[PDFPage]):
+        conn = self._connection()
+        conn.executemany(
+            'INSERT OR REPLACE INTO pdf_pages (content_hash, page_number, text) VALUES (?, ?, ?)',
+            [(content_hash, page.number, page.text) for page in pages]
+        )
+        conn.commit()
+
+    def finish(self, content_hash: str, stored_pages: int, truncated: bool = False):
+        conn = self._connection()
+        conn.execute('''
+            UPDATE pdf_documents SET stored_pages = ?, truncated = ?, complete = 1
+            WHERE content_hash = ?
+        ''', (stored_pages, int(truncated), content_hash))
+        conn.commit()
+
+        with self._prune_lock:
+            self._finished_since_prune += 1
+            should_prune = self._finished_since_prune >= PRUNE_EVERY_DOCUMENTS
+            if should_prune:
+                self._finished_since_prune = 0
+        if should_prune:
+            self.prune()
+
+    def get_document(self, content_hash: str) -> Optional[dict]:
+        """{'page_count', 'stored_pages', 'truncated'} for a fully stored document, else None"""
+        row = self._connection().execute('''
+            SELECT page_count, stored_pages, truncated FROM pdf_documents
+            WHERE content_hash = ? AND complete = 1
+        ''', (content_hash,)).fetchone()
+        if not row:
+            return None
+        return {'page_count': row[0], 'stored_pages': row[1], 'truncated': bool(row[2])}
+
+    def touch(self, content_hash: str):
+        """Record that a stored document was read, so pruning keeps it"""
+        conn = self._connection()
+        conn.execute('UPDATE pdf_documents SET last_used = ? WHERE content_hash = ?', (time.time(), content_hash))
+        conn.commit()
+
+    def iter_pages(self, content_hash: str) -> Iterator[PDFPage]:
+        cursor = self._connection().execute(
+            'SELECT page_number, text FROM pdf_pages WHERE content_hash = ? ORDER BY page_number',
+            (content_hash,)
+        )
+        for number, text in cursor:
+            yield PDFPage(number, text)
+
+    def delete(self, content_hash: str):
+        conn = self._connection()
+        conn.execute('DELETE FROM pdf_pages WHERE content_hash = ?', (content_hash,))
+        conn.execute('DELETE FROM pdf_documents WHERE content_hash = ?', (content_hash,))
+        conn.commit()
+
+    def prune(self) -> int:
+        """Drop documents unused for ttl_seconds and trim the store to max_documents by least recent use"""
+        try:
+            conn = self._connection()
+            stale = [row[0] for row in conn.execute('''
+                SELECT content_hash FROM pdf_documents WHERE last_used < ?
+                UNION
+                SELECT content_hash FROM (
+                    SELECT content_hash FROM pdf_documents ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            ''', (time.time() - self.ttl_seconds, self.max_documents))]
+            for start in range(0, len(stale), 500):
+                chunk = stale[start:start + 500]
+                marks = ','.join('?' * len(chunk))
+                conn.execute(f'DELETE FROM pdf_pages WHERE content_hash IN ({marks})', chunk)
+                conn.execute(f'DELETE FROM pdf_documents WHERE content_hash IN ({marks})', chunk)
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Page store pruning failed: {e}")
+            return 0
+        return len(stale)
+
+class PDFTextStream:
+    """
+    Pages of a PDF, yielded in order as soon as they are available.
+
+    Stored documents are replayed from the page store. Otherwise small PDFs
+    are parsed in-process and large ones in PAGES_PER_TASK slices on the
+    extraction pool, with only a few slices in flight at a time so memory
+    stays bounded. Iteration stops after ``max_chars`` characters (the page
+    that crosses the limit is cut) and ``truncated`` is set. With
+    ``parallel=False`` (and always inside daemonic processes, which cannot
+    start a pool) every PDF is parsed in-process.
+    """
+
+    def __init__(self, source: PdfSource, max_chars: int = MAX_EXTRACTED_CHARS,
+                 store: Optional[PageStore] = None, content_hash: Optional[str] = None,
+                 parallel: bool = True):
+        self.source = source
+        self.parallel = parallel and not multiprocessing.current_process().daemon
+        self.max_chars = max_chars
+        self.store = store
+        self.content_hash = content_hash or pdf_content_hash(source)
+        self.page_count = 0
+        self.extracted_pages = 0
+        self.truncated = False
+        self.cached = False
+
+    def __iter__(self) -> Iterator[PDFPage]:
+        stored = self.store.get_document(self.content_hash) if self.store else None
+        if stored:
+            self.cached = True
+            self.page_count = stored['page_count']
+            self.truncated = stored['truncated']
+            for page in self.store.iter_pages(self.content_hash):
+                self.extracted_pages += 1
+                yield page
+            return
+
+        reader = _open_reader(self.source)
+        self.page_count = len(reader.pages)
+        if self.store:
+            self.store.begin(self.content_hash, self.page_count)
+
+        if self.parallel and self.page_count >= PARALLEL_PAGE_THRESHOLD:
+            pages = self._extract_parallel(reader)
+        else:
+            pages = (PDFPage(i + 1, _page_text(page)) for i, page in enumerate(reader.pages))
+
+        chars, batch = 0, []
+        try:
+            for page in pages:
+                if chars + len(page.text) > self.max_chars:
+                    page = PDFPage(page.number, page.text[:self.max_chars - chars])
+                    self.truncated = True
+                chars += len(page.text)
+                self.extracted_pages += 1
+                batch.append(page)
+                if len(batch) >= PAGES_PER_TASK:
+                    self._persist(batch)
+                    batch = []
+                yield page
+                if self.truncated:
+                    break
+            self._persist(batch)
+            if self.store:
+                self.store.finish(self.content_hash, self.extracted_pages, self.truncated)
+        finally:
+            pages.close()
+
+    def _persist(self, batch: List[PDFPage]):
+        if self.store and batch:
+            self.store.put_pages(self.content_hash, batch)
+
+    def _extract_parallel(self, reader: PdfReader) -> Iterator[PDFPage]:
+        """Page slices on the extraction pool, falling back to in-process parsing if the pool is unusable"""
+        temp_path = None
+        path = self.source
+        if isinstance(path, (bytes, bytearray)):
+            # Workers open the file themselves rather than receiving the bytes per task
+            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
+                f.write(path)
+                temp_path = path = f.name
+
+        ranges = [(start, min(start + PAGES_PER_TASK, self.page_count))
+                  for start in range(0, self.page_count, PAGES_PER_TASK)]
+        in_flight, next_range = [], 0
+        try:
+            for start, stop in ranges:
+                try:
+                    while next_range < len(ranges) and len(in_flight) < EXTRACTION_WORKERS * 2:
+                        a, b = ranges[next_range]
+                        in_flight.append(get_extraction_pool().submit(_extract_page_range, path, a, b))
+                        next_range += 1
+                    texts = in_flight.pop(0).result()
+                except (BrokenProcessPool, OSError, RuntimeError, AssertionError) as e:
+                    # AssertionError: multiprocessing refuses children of daemonic processes
+                    print(f"Extraction pool unavailable, parsing in-process: {e}")
+                    _reset_extraction_pool()
+                    for i in range(start, self.page_count):
+                        yield PDFPage(i + 1, _page_text(reader.pages[i]))
+                    return
+                for offset, text in enumerate(texts):
+                    yield PDFPage(start + offset + 1, text)
+        finally:
+            for future in in_flight:
+                future.cancel()
+            if temp_path:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+
+    def text(self) -> str:
+        """All extracted page text, newline separated"""
+        return "\n".join(page.text for page in self)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """Process-wide extraction pool; spawned workers are safe next to the app's threads"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=EXTRACTION_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+    return _executor
+
+def _reset_extraction_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+_page_store = None
+_page_store_lock = threading.Lock()
+
+def get_page_store() -> PageStore:
+    """Process-wide page store instance"""
+    global _page_store
+    if _page_store is None:
+        with _page_store_lock:
+            if _page_store is None:
+                _page_store = PageStore()
+    return _page_store
+
+def stream_pdf_pages(source: PdfSource, max_chars: int = MAX_EXTRACTED_CHARS,
+                     persist: bool = True, content_hash: Optional[str] = None,
+                     parallel: bool = True) -> PDFTextStream:
+    """Iterable of PDFPage for PDF bytes or a file path"""
+    return PDFTextStream(source, max_chars, get_page_store() if persist else None, content_hash, parallel)
+
+def extract_pdf_text(source: PdfSource, max_chars: int = MAX_EXTRACTED_CHARS,
+                     persist: bool = True, parallel: bool = True) -> dict:
+    """
+    Full text of a PDF plus extraction details:
+    {'text', 'content_hash', 'page_count', 'extracted_pages', 'truncated', 'cached'}
+    """
+    stream = stream_pdf_pages(source, max_chars, persist, parallel=parallel)
+    text = stream.text()
+    return {
+        'text': text,
+        'content_hash': stream.content_hash,
+        'page_count': stream.page_count,
+        'extracted_pages': stream.extracted_pages,
+        'truncated': stream.truncated,
+        'cached': stream.cached
+    }
+
+def load_pdf_pages(content_hash: str) -> Optional[List[PDFPage]]:
+    """Stored pages of a previously extracted PDF, or None if it was never fully extracted (or was pruned)"""
+    store = get_page_store()
+    if not content_hash or not store.get_document(content_hash):
+        return None
+    store.touch(content_hash)
+    return list(store.iter_pages(content_hash))
+
+def load_pdf_text(content_hash: Optional[str]) -> Optional[str]:
+    """Stored text of a PDF in the form extract_pdf_text returns it, or None"""
+    pages = load_pdf_pages(content_hash)
+    if pages is None:
+        return None
+    return "\n".join(page.text for page in pages)
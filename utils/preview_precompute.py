@@ -0,0 +1,201 @@
+"""
+Stored Content Previews for GUARDIAN
+Generates each document's preview once its content is stored or changed, on a
+scheduled background job that resumes wherever it stopped
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from utils.database import DatabaseManager
+from utils.score_precompute import SCORED_TEXT_SQL
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever preview generation changes so every stored preview is regenerated
+PREVIEW_VERSION = "1"
+
+STALE_PREVIEW_SQL = """
+    (preview_content_hash IS DISTINCT FROM content_hash
+     OR preview_version IS DISTINCT FROM :preview_version)
+"""
+
+PREVIEW_BOOKKEEPING_COLUMNS = ['content_hash', 'content_preview', 'preview_content_hash', 'preview_version']
+
+_columns_ready = False
+_columns_lock = threading.Lock()
+
+def preview_columns_ready(db: Optional[DatabaseManager] = None) -> bool:
+    """
+    Whether the preview bookkeeping columns exist on documents.
+
+    They are created by database/schema.sql (database/migrations/document_bookkeeping.sql
+    for existing databases); the request path only checks for them.
+    """
+    global _columns_ready
+    if _columns_ready:
+        return True
+
+    with _columns_lock:
+        if _columns_ready:
+            return True
+
+        db = db or DatabaseManager()
+        missing = db.missing_columns('documents', PREVIEW_BOOKKEEPING_COLUMNS)
+        if missing:
+            logger.error(f"documents is missing {', '.join(missing)}; "
+                         "apply database/migrations/document_bookkeeping.sql")
+            return False
+
+        _columns_ready = True
+        return True
+
+def generate_document_preview(title: str, content: str) -> str:
+    """Build the stored preview: an LLM summary when available, extractive otherwise"""
+    from utils.intelligent_preview import generate_intelligent_preview
+    return generate_intelligent_preview(title or "Document", content or "")
+
+def fetch_stale_previews(db: DatabaseManager, after_id, batch_size: int) -> List[Dict]:
+    """Next batch of documents whose preview is missing or out of date, in id order"""
+    query = f"""
+        SELECT id, COALESCE(title, '') AS title, {SCORED_TEXT_SQL} AS preview_text,
+               content_hash
+        FROM documents
+        WHERE {STALE_PREVIEW_SQL}
+          {'AND id > :after_id' if after_id is not None else ''}
+        ORDER BY id
+        LIMIT :batch_size
+    """
+    params = {'preview_version': PREVIEW_VERSION, 'batch_size': batch_size}
+    if after_id is not None:
+        params['after_id'] = after_id
+    return db.execute_query(query, params) or []
+
+def write_previews_batch(db: DatabaseManager, results: List[Dict]) -> int:
+    """Write a batch of previews with a single UPDATE ... FROM (VALUES ...) statement"""
+    if not results:
+        return 0
+
+    rows = []
+    params = {'preview_version': PREVIEW_VERSION}
+    for i, result in enumerate(results):
+        rows.append(f"(:id_{i}, CAST(:preview_{i} AS TEXT), CAST(:hash_{i} AS VARCHAR))")
+        params.update({
+            f'id_{i}': result['id'],
+            f'preview_{i}': result['preview'],
+            f'hash_{i}': result['content_hash']
+        })
+
+    query = f"""
+        UPDATE documents AS d
+        SET content_preview = v.content_preview,
+            preview_content_hash = v.content_hash,
+            preview_version = :preview_version
+        FROM (VALUES {', '.join(rows)}) AS v(id, content_preview, content_hash)
+        WHERE d.id = v.id
+    """
+    updated = db.execute_query(query, params)
+    return updated if isinstance(updated, int) else 0
+
+def backfill_previews(batch_size: int = 20, limit: Optional[int] = None, start_after=None,
+                      db: Optional[DatabaseManager] = None) -> Dict[str, int]:
+    """
+    Generate previews for every document whose content or preview version changed.
+
+    Finished rows drop out of the stale set as each batch is written, so an
+    interrupted run simply resumes where it stopped; ``start_after`` skips
+    ahead to a given document id.
+    """
+    db = db or DatabaseManager()
+    stats = {'generated': 0, 'updated': 0, 'failed': 0, 'last_id': start_after}
+    if not preview_columns_ready(db):
+        return stats
+
+    after_id = start_after
+    while limit is None or stats['generated'] + stats['failed'] < limit:
+        size = batch_size if limit is None else min(batch_size, limit - stats['generated'] - stats['failed'])
+        batch = fetch_stale_previews(db, after_id, size)
+        if not batch:
+            break
+        after_id = batch[-1]['id']
+
+        results = []
+        for row in batch:
+            try:
+                preview = generate_document_preview(row['title'], row['preview_text'])
+                results.append({'id': row['id'], 'content_hash': row['content_hash'], 'preview': preview})
+            except Exception as e:
+                logger.error(f"Error generating preview for document {row['id']}: {e}")
+                stats['failed'] += 1
+
+        stats['generated'] += len(results)
+        stats['updated'] += write_previews_batch(db, results)
+        stats['last_id'] = after_id
+        logger.info(f"Stored previews through document {after_id}: {stats['updated']} updated so far")
+
+    return stats
+
+class BackgroundPreviewer:
+    def __init__(self, interval_minutes=5, batch_size=20):
+        """
+        Initialize background preview job
+        interval_minutes: How often to look for new or changed documents
+        """
+        self.interval_minutes = interval_minutes
+        self.batch_size = batch_size
+        self.is_running = False
+        self.thread = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the background preview service"""
+        with self._lock:
+            if self.is_running:
+                return
+            self.is_running = True
+
+        logger.info(f"Starting background preview generation (every {self.interval_minutes} minutes)")
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the background preview service"""
+        self.is_running = False
+        self._wake.set()
+
+    def trigger(self):
+        """Run a pass now instead of waiting for the next interval"""
+        self.start()
+        self._wake.set()
+
+    def _run(self):
+        while self.is_running:
+            try:
+                stats = backfill_previews(batch_size=self.batch_size)
+                if stats['generated'] or stats['failed']:
+                    logger.info(f"Background previews: {stats['updated']} updated, {stats['failed']} failed")
+            except Exception as e:
+                logger.error(f"Error during background preview generation: {e}")
+
+            self._wake.wait(self.interval_minutes * 60)
+            self._wake.clear()
+
+# Global preview instance
+background_previewer = BackgroundPreviewer()
+
+def start_background_previews():
+    """Start the background preview service"""
+    background_previewer.start()
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    start_after = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    print("Backfilling stored content previews...")
+    start = time.time()
+    stats = backfill_previews(start_after=start_after)
+    print(f"Generated {stats['generated']} previews ({stats['updated']} rows updated, "
+          f"{stats['failed']} failed, last id {stats['last_id']}) in {time.time() - start:.1f}s")
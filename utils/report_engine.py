@@ -0,0 +1,232 @@
+"""
+Risk Report Engine for GUARDIAN
+Renders report pages in parallel worker processes, merges them into one PDF and
+keeps finished reports on disk keyed by the content hash of their inputs
+"""
+
+import os
+import io
+import re
+import json
+import time
+import hashlib
+import threading
+import dataclasses
+import multiprocessing
+from datetime import date, datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from utils.data_dir import data_path
+
+try:
+    from PyPDF2 import PdfReader, PdfWriter
+except ImportError:
+    from pypdf import PdfReader, PdfWriter
+
+REPORT_WORKERS = int(os.getenv('GUARDIAN_REPORT_WORKERS', max(1, min(4, (os.cpu_count() or 1) - 1))))
+
+# Finished reports kept on disk; the oldest are pruned past this size
+REPORT_CACHE_DIR = os.getenv('GUARDIAN_REPORT_CACHE') or data_path('report_cache')
+REPORT_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+_REPORT_ID = re.compile(r'^[0-9a-f]{64}$')
+
+@dataclass
+class RenderedReport:
+    """A finished report in the cache"""
+    report_id: str
+    path: str
+    size: int
+    cached: bool
+
+    def read(self) -> bytes:
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+def _jsonable(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, '__dict__'):
+        return vars(value)
+    return str(value)
+
+def report_id(kind: str, data: Any) -> str:
+    """
+    Content hash of a report's inputs. Pages carry the generation date in
+    their headers, so the date is part of the key and reports roll over daily.
+    """
+    payload = json.dumps({'kind': kind, 'date': date.today().isoformat(), 'data': data},
+                         sort_keys=True, default=_jsonable)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+# ---- worker side -----------------------------------------------------------
+
+# Generator instances (colour tables and other page furniture) built once per worker
+_worker_generators: Dict[type, Any] = {}
+
+def _init_worker():
+    """Select the non-interactive backend and load the font cache once per worker"""
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import font_manager
+    font_manager.findfont('DejaVu Sans')
+
+def _render_page(generator_class: type, method: str, data: Any) -> bytes:
+    """Worker task: one report page as a single-page PDF"""
+    generator = _worker_generators.get(generator_class)
+    if generator is None:
+        generator = _worker_generators[generator_class] = generator_class()
+    return _render_with(generator, method, data)
+
+def _render_with(generator: Any, method: str, data: Any) -> bytes:
+    from matplotlib.backends.backend_pdf import PdfPages
+    buffer = io.BytesIO()
+    with PdfPages(buffer) as pdf:
+        getattr(generator, method)(pdf, data)
+    return buffer.getvalue()
+
+def _merge_pages(page_pdfs: List[bytes]) -> bytes:
+    writer = PdfWriter()
+    for page_pdf in page_pdfs:
+        if page_pdf:
+            for page in PdfReader(io.BytesIO(page_pdf)).pages:
+                writer.add_page(page)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+# ---- report cache ----------------------------------------------------------
+
+class ReportCache:
+    """Finished report PDFs on disk, one file per report id, least recently used pruned first"""
+
+    def __init__(self, directory: str = REPORT_CACHE_DIR, max_bytes: int = REPORT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path_for(self, report_id: str) -> Optional[str]:
+        """Path of a cached report, or None (also for malformed ids)"""
+        if not _REPORT_ID.match(report_id or ''):
+            return None
+        path = os.path.join(self.directory, f"{report_id}.pdf")
+        return path if os.path.exists(path) else None
+
+    def get(self, report_id: str) -> Optional[RenderedReport]:
+        path = self.path_for(report_id)
+        if path is None:
+            return None
+        try:
+            os.utime(path)
+            return RenderedReport(report_id, path, os.path.getsize(path), cached=True)
+        except OSError:
+            return None
+
+    def put(self, report_id: str, data: bytes) -> RenderedReport:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{report_id}.pdf")
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        self.prune()
+        return RenderedReport(report_id, path, len(data), cached=False)
+
+    def prune(self):
+        with self._lock:
+            try:
+                entries = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                           if name.endswith('.pdf')]
+                files = sorted((os.stat(path).st_mtime, os.path.getsize(path), path) for path in entries)
+            except OSError:
+                return
+            total = sum(size for _, size, _ in files)
+            for _, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                    total -= size
+                except OSError:
+                    pass
+
+# ---- engine ----------------------------------------------------------------
+
+class ReportEngine:
+    """
+    Renders a report's pages concurrently and caches the merged PDF.
+
+    Every page is a generator method taking ``(pdf, data)``; the pages are
+    rendered on the report pool as single-page PDFs and merged in order. If
+    the pool is unusable (or the inputs cannot be sent to it) the pages are
+    rendered in-process instead, which is also how page errors surface.
+    """
+
+    def __init__(self, cache: Optional[ReportCache] = None):
+        self.cache = cache or ReportCache()
+
+    def render(self, generator: Any, kind: str, pages: List[str], data: Any) -> RenderedReport:
+        """The report for these inputs, rendered only if it is not cached yet"""
+        # Subclasses may draw the same page differently, so the generator is part of the key
+        key = report_id(f"{type(generator).__qualname__}:{kind}", data)
+        cached = self.cache.get(key)
+        if cached:
+            return cached
+
+        start_time = time.time()
+        page_pdfs = self._render_pages(generator, pages, data)
+        report = self.cache.put(key, _merge_pages(page_pdfs))
+        print(f"Rendered {kind} report ({len(pages)} pages) in {time.time() - start_time:.2f}s")
+        return report
+
+    def _render_pages(self, generator: Any, pages: List[str], data: Any) -> List[bytes]:
+        if REPORT_WORKERS > 1 and len(pages) > 1:
+            try:
+                futures = [get_report_pool().submit(_render_page, type(generator), page, data) for page in pages]
+                return [future.result() for future in futures]
+            except BrokenProcessPool as e:
+                print(f"Report pool unavailable, rendering in-process: {e}")
+                _reset_report_pool()
+            except Exception as e:
+                print(f"Parallel report rendering failed, rendering in-process: {e}")
+        return [_render_with(generator, page, data) for page in pages]
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_report_pool() -> ProcessPoolExecutor:
+    """Process-wide report rendering pool (spawned, so matplotlib state is never shared)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=REPORT_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker
+                )
+    return _executor
+
+def _reset_report_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_report_engine() -> ReportEngine:
+    """Process-wide report engine"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = ReportEngine()
+    return _engine
@@ -12,8 +12,31 @@ import pandas as pd
 from datetime import datetime
 import io
 import base64
+from collections import Counter
 from typing import Dict, List, Any, Optional
 
+# Report pages in order; each is a generator method taking (pdf, data)
+DOCUMENT_REPORT_PAGES = [
+    '_create_executive_summary_page',       # Page 1: Executive Summary
+    '_create_risk_dashboard_page',          # Page 2: Risk Assessment Dashboard
+    '_create_detailed_analysis_page',       # Page 3: Detailed Risk Analysis
+    '_create_recommendations_page'          # Page 4: Recommendations & Action Items
+]
+
+PORTFOLIO_REPORT_PAGES = [
+    '_create_portfolio_summary_page',               # Page 1: Portfolio Executive Summary
+    '_create_portfolio_risk_distribution_page',     # Page 2: Risk Distribution Analysis
+    '_create_portfolio_trend_analysis_page',        # Page 3: Trend Analysis
+    '_create_portfolio_top_risks_page'              # Page 4: Top Risk Documents
+]
+
+SCORE_FIELDS = ['ai_cybersecurity_score', 'quantum_cybersecurity_score', 'ai_ethics_score', 'quantum_ethics_score']
+
+# Quantum cybersecurity is scored 1-5; this scales every score to 100
+SCORE_SCALE = np.array([1, 20, 1, 1])
+
+PORTFOLIO_FIELDS = ['title', 'document_type'] + SCORE_FIELDS
+
 class RiskReportGenerator:
     """Generate comprehensive PDF risk assessment reports"""
     
@@ -27,49 +50,28 @@ class RiskReportGenerator:
             'accent': '#3b82f6',         # Blue
             'background': '#f9fafb'      # Light Gray
         }
+        self.last_report = None
+        self._portfolio = None
         
     def generate_document_risk_report(self, document_data: Dict) -> bytes:
         """Generate a comprehensive risk report for a single document"""
-        
-        # Create PDF in memory
-        pdf_buffer = io.BytesIO()
-        
-        with PdfPages(pdf_buffer) as pdf:
-            # Page 1: Executive Summary
-            self._create_executive_summary_page(pdf, document_data)
-            
-            # Page 2: Risk Assessment Dashboard
-            self._create_risk_dashboard_page(pdf, document_data)
-            
-            # Page 3: Detailed Risk Analysis
-            self._create_detailed_analysis_page(pdf, document_data)
-            
-            # Page 4: Recommendations & Action Items
-            self._create_recommendations_page(pdf, document_data)
-        
-        pdf_buffer.seek(0)
-        return pdf_buffer.getvalue()
+        return self._render_report('document', DOCUMENT_REPORT_PAGES, self._report_fields(document_data))
     
     def generate_portfolio_risk_report(self, documents: List[Dict]) -> bytes:
         """Generate a comprehensive risk report for multiple documents"""
-        
-        pdf_buffer = io.BytesIO()
-        
-        with PdfPages(pdf_buffer) as pdf:
-            # Page 1: Portfolio Executive Summary
-            self._create_portfolio_summary_page(pdf, documents)
-            
-            # Page 2: Risk Distribution Analysis
-            self._create_portfolio_risk_distribution_page(pdf, documents)
-            
-            # Page 3: Trend Analysis
-            self._create_portfolio_trend_analysis_page(pdf, documents)
-            
-            # Page 4: Top Risk Documents
-            self._create_portfolio_top_risks_page(pdf, documents)
-        
-        pdf_buffer.seek(0)
-        return pdf_buffer.getvalue()
+        # Pages only need titles, types and scores; the text content stays behind
+        documents = [{key: doc[key] for key in PORTFOLIO_FIELDS if key in doc} for doc in documents]
+        return self._render_report('portfolio', PORTFOLIO_REPORT_PAGES, documents)
+    
+    def _report_fields(self, document_data: Dict) -> Dict:
+        """Document fields the report pages draw on (everything but the full text)"""
+        return {key: value for key, value in document_data.items() if key not in ('text_content', 'content')}
+    
+    def _render_report(self, kind: str, pages: List[str], data: Any) -> bytes:
+        """Render (or fetch from the report cache) and remember the finished report"""
+        from utils.report_engine import get_report_engine
+        self.last_report = get_report_engine().render(self, kind, pages, data)
+        return self.last_report.read()
     
     def _create_executive_summary_page(self, pdf: PdfPages, document_data: Dict):
         """Create executive summary page for single document"""
@@ -470,51 +472,61 @@ class RiskReportGenerator:
         }
         return recommendations.get(metric, "Review and enhance security posture")
     
+    def _portfolio_scores(self, documents: List[Dict]) -> Dict[str, np.ndarray]:
+        """
+        Score matrix of a portfolio in one pass: raw and 100-scaled scores
+        (documents x SCORE_FIELDS), which scores are present, and each scored
+        document's average and risk level ('' for unscored documents).
+        The last portfolio's matrix is kept, as every page asks for it again.
+        """
+        if self._portfolio is not None and self._portfolio[0] is documents:
+            return self._portfolio[1]
+        
+        raw = np.array([[doc.get(field, 0) or 0 for field in SCORE_FIELDS] for doc in documents],
+                       dtype=float).reshape(len(documents), len(SCORE_FIELDS))
+        scaled = raw * SCORE_SCALE
+        valid = scaled > 0
+        valid_counts = valid.sum(axis=1)
+        avg_scores = np.where(valid, scaled, 0).sum(axis=1) / np.maximum(valid_counts, 1)
+        
+        risk_levels = np.select([avg_scores >= 80, avg_scores >= 60], ['low', 'medium'], 'high')
+        risk_levels = np.where(valid_counts > 0, risk_levels, '')
+        
+        portfolio = {
+            'raw': raw,
+            'scaled': scaled,
+            'valid': valid,
+            'scored': valid_counts > 0,
+            'avg_scores': avg_scores,
+            'risk_levels': risk_levels
+        }
+        self._portfolio = (documents, portfolio)
+        return portfolio
+    
     def _calculate_portfolio_risk_distribution(self, documents: List[Dict]) -> Dict[str, int]:
         """Calculate risk distribution across portfolio"""
-        distribution = {'high': 0, 'medium': 0, 'low': 0}
-        
-        for doc in documents:
-            scores = [
-                doc.get('ai_cybersecurity_score', 0),
-                doc.get('quantum_cybersecurity_score', 0) * 20,  # Scale to 100
-                doc.get('ai_ethics_score', 0),
-                doc.get('quantum_ethics_score', 0)
-            ]
-            valid_scores = [s for s in scores if s > 0]
-            
-            if valid_scores:
-                avg_score = np.mean(valid_scores)
-                risk_level = self._calculate_risk_level(avg_score)
-                distribution[risk_level] += 1
-        
-        return distribution
+        risk_levels = self._portfolio_scores(documents)['risk_levels']
+        return {level: int(np.count_nonzero(risk_levels == level)) for level in ('high', 'medium', 'low')}
     
     def _calculate_portfolio_statistics(self, documents: List[Dict]) -> Dict[str, Any]:
         """Calculate portfolio-wide statistics"""
         stats = {}
+        portfolio = self._portfolio_scores(documents)
+        raw, valid = portfolio['raw'], portfolio['valid']
         
         # Document types
-        doc_types = [doc.get('document_type', 'Unknown') for doc in documents]
-        stats['Most Common Type'] = max(set(doc_types), key=doc_types.count)
+        doc_types = Counter(doc.get('document_type', 'Unknown') for doc in documents)
+        stats['Most Common Type'] = doc_types.most_common(1)[0][0]
         
         # Average scores
-        ai_cyber_scores = [doc.get('ai_cybersecurity_score', 0) for doc in documents if doc.get('ai_cybersecurity_score', 0) > 0]
-        if ai_cyber_scores:
-            stats['Avg AI Cybersecurity'] = f"{np.mean(ai_cyber_scores):.1f}/100"
+        if valid[:, 0].any():
+            stats['Avg AI Cybersecurity'] = f"{raw[valid[:, 0], 0].mean():.1f}/100"
         
-        quantum_cyber_scores = [doc.get('quantum_cybersecurity_score', 0) for doc in documents if doc.get('quantum_cybersecurity_score', 0) > 0]
-        if quantum_cyber_scores:
-            stats['Avg Quantum Cybersecurity'] = f"{np.mean(quantum_cyber_scores):.1f}/5"
+        if valid[:, 1].any():
+            stats['Avg Quantum Cybersecurity'] = f"{raw[valid[:, 1], 1].mean():.1f}/5"
         
         # Risk coverage
-        scored_docs = len([doc for doc in documents if any([
-            doc.get('ai_cybersecurity_score', 0) > 0,
-            doc.get('quantum_cybersecurity_score', 0) > 0,
-            doc.get('ai_ethics_score', 0) > 0,
-            doc.get('quantum_ethics_score', 0) > 0
-        ])])
-        
+        scored_docs = int(portfolio['scored'].sum())
         stats['Risk Assessment Coverage'] = f"{scored_docs}/{len(documents)} ({(scored_docs/len(documents)*100):.1f}%)"
         
         return stats
@@ -655,19 +667,10 @@ class RiskReportGenerator:
         
         # Score distribution histogram
         hist_ax = fig.add_subplot(gs[1, 1])
-        all_scores = []
-        for doc in documents:
-            scores = [
-                doc.get('ai_cybersecurity_score', 0),
-                doc.get('quantum_cybersecurity_score', 0) * 20,
-                doc.get('ai_ethics_score', 0),
-                doc.get('quantum_ethics_score', 0)
-            ]
-            valid_scores = [s for s in scores if s > 0]
-            if valid_scores:
-                all_scores.extend(valid_scores)
-        
-        if all_scores:
+        portfolio = self._portfolio_scores(documents)
+        all_scores = portfolio['scaled'][portfolio['valid']]
+        
+        if len(all_scores):
             hist_ax.hist(all_scores, bins=20, color=self.colors['accent'], alpha=0.7, edgecolor='black')
             hist_ax.set_xlabel('Risk Scores')
             hist_ax.set_ylabel('Frequency')
@@ -723,12 +726,8 @@ class RiskReportGenerator:
         ax.text(5, y_pos, "Risk Assessment Coverage", fontsize=14, weight='bold', ha='center')
         
         categories = ['AI Cybersecurity', 'Quantum Cybersecurity', 'AI Ethics', 'Quantum Ethics']
-        coverage = {}
-        
-        for category in categories:
-            score_key = category.lower().replace(' ', '_') + '_score'
-            covered_docs = len([doc for doc in documents if doc.get(score_key, 0) > 0])
-            coverage[category] = (covered_docs / len(documents)) * 100
+        covered_docs = self._portfolio_scores(documents)['valid'].sum(axis=0)
+        coverage = dict(zip(categories, covered_docs / len(documents) * 100))
         
         y_pos -= 0.4
         for category, percentage in coverage.items():
@@ -759,38 +758,28 @@ class RiskReportGenerator:
         # Header
         ax.text(5, 13.5, "Top Risk Documents", fontsize=18, weight='bold', ha='center')
         
-        # Calculate risk scores for each document
-        doc_risks = []
-        for doc in documents:
-            scores = [
-                doc.get('ai_cybersecurity_score', 0),
-                doc.get('quantum_cybersecurity_score', 0) * 20,
-                doc.get('ai_ethics_score', 0),
-                doc.get('quantum_ethics_score', 0)
-            ]
-            valid_scores = [s for s in scores if s > 0]
-            
-            if valid_scores:
-                import numpy as np
-                avg_score = np.mean(valid_scores)
-                risk_level = self._calculate_risk_level(avg_score)
-                
-                doc_risks.append({
-                    'title': doc.get('title', 'Untitled')[:50],
-                    'type': doc.get('document_type', 'Unknown'),
-                    'avg_score': avg_score,
-                    'risk_level': risk_level,
-                    'scores': {
-                        'ai_cyber': doc.get('ai_cybersecurity_score', 0),
-                        'quantum_cyber': doc.get('quantum_cybersecurity_score', 0),
-                        'ai_ethics': doc.get('ai_ethics_score', 0),
-                        'quantum_ethics': doc.get('quantum_ethics_score', 0)
-                    }
-                })
-        
-        # Sort by risk level (high risk first)
+        # Rank scored documents by risk level (high risk first), then by average score
+        portfolio = self._portfolio_scores(documents)
         risk_order = {'high': 0, 'medium': 1, 'low': 2}
-        doc_risks.sort(key=lambda x: (risk_order.get(x['risk_level'], 3), -x['avg_score']))
+        scored = np.flatnonzero(portfolio['scored'])
+        risk_ranks = np.array([risk_order[level] for level in portfolio['risk_levels'][scored]])
+        ranked = scored[np.lexsort((-portfolio['avg_scores'][scored], risk_ranks))] if len(scored) else scored
+        
+        doc_risks = []
+        for index in ranked[:10]:
+            doc = documents[index]
+            doc_risks.append({
+                'title': doc.get('title', 'Untitled')[:50],
+                'type': doc.get('document_type', 'Unknown'),
+                'avg_score': portfolio['avg_scores'][index],
+                'risk_level': str(portfolio['risk_levels'][index]),
+                'scores': {
+                    'ai_cyber': doc.get('ai_cybersecurity_score', 0),
+                    'quantum_cyber': doc.get('quantum_cybersecurity_score', 0),
+                    'ai_ethics': doc.get('ai_ethics_score', 0),
+                    'quantum_ethics': doc.get('quantum_ethics_score', 0)
+                }
+            })
         
         # Display top 10 risk documents
         y_pos = 12.8
@@ -830,10 +819,9 @@ class RiskReportGenerator:
         patterns = []
         
         # Count documents by risk category
-        ai_cyber_count = len([doc for doc in documents if doc.get('ai_cybersecurity_score', 0) > 0])
-        quantum_cyber_count = len([doc for doc in documents if doc.get('quantum_cybersecurity_score', 0) > 0])
-        ai_ethics_count = len([doc for doc in documents if doc.get('ai_ethics_score', 0) > 0])
-        quantum_ethics_count = len([doc for doc in documents if doc.get('quantum_ethics_score', 0) > 0])
+        ai_cyber_count, quantum_cyber_count, ai_ethics_count, quantum_ethics_count = (
+            self._portfolio_scores(documents)['valid'].sum(axis=0)
+        )
         
         total_docs = len(documents)
         
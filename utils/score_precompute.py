@@ -0,0 +1,254 @@
+"""
+Precomputed Document Scores for GUARDIAN
+Background job that rescores only documents whose content or scorer version
+changed and writes the results back to the score columns in batches
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from utils.database import DatabaseManager
+from utils.score_store import SCORER_VERSION, get_score_store
+
+logger = logging.getLogger(__name__)
+
+# Framework key returned by the scorers -> documents column
+SCORE_COLUMNS = {
+    'ai_cybersecurity': 'ai_cybersecurity_score',
+    'quantum_cybersecurity': 'quantum_cybersecurity_score',
+    'ai_ethics': 'ai_ethics_score',
+    'quantum_ethics': 'quantum_ethics_score'
+}
+
+# The text that is scored, and the hash of title + text that records which version of
+# it was scored. documents.content_hash is a stored generated column over the same
+# expression, so finding stale rows compares two columns instead of rehashing them all.
+SCORED_TEXT_SQL = "COALESCE(NULLIF(content, ''), text_content, '')"
+
+STALE_CONDITION_SQL = """
+    (score_content_hash IS DISTINCT FROM content_hash
+     OR scorer_version IS DISTINCT FROM :scorer_version)
+"""
+
+SCORE_BOOKKEEPING_COLUMNS = ['content_hash', 'score_content_hash', 'scorer_version', 'scored_at', 'pdf_sha256']
+
+_columns_ready = False
+_columns_lock = threading.Lock()
+
+def score_columns_ready(db: Optional[DatabaseManager] = None) -> bool:
+    """
+    Whether the scoring bookkeeping columns exist on documents.
+
+    They are created by database/schema.sql (database/migrations/document_bookkeeping.sql
+    for existing databases); the request path only checks for them.
+    """
+    global _columns_ready
+    if _columns_ready:
+        return True
+
+    with _columns_lock:
+        if _columns_ready:
+            return True
+
+        db = db or DatabaseManager()
+        missing = db.missing_columns('documents', SCORE_BOOKKEEPING_COLUMNS)
+        if missing:
+            logger.error(f"documents is missing {', '.join(missing)}; "
+                         "apply database/migrations/document_bookkeeping.sql")
+            return False
+
+        _columns_ready = True
+        return True
+
+def count_stale_documents(db: Optional[DatabaseManager] = None) -> int:
+    """Number of documents whose stored scores are missing or out of date"""
+    db = db or DatabaseManager()
+    if not score_columns_ready(db):
+        return 0
+
+    rows = db.execute_query(f"SELECT COUNT(*) AS stale FROM documents WHERE {STALE_CONDITION_SQL}",
+                            {'scorer_version': SCORER_VERSION})
+    return rows[0]['stale'] if rows else 0
+
+def fetch_stale_batch(db: DatabaseManager, after_id, batch_size: int) -> List[Dict]:
+    """Next batch of stale documents in id order (keyset pagination)"""
+    query = f"""
+        SELECT id, COALESCE(title, '') AS title, {SCORED_TEXT_SQL} AS scored_text,
+               content_hash, pdf_sha256
+        FROM documents
+        WHERE {STALE_CONDITION_SQL}
+          {'AND id > :after_id' if after_id is not None else ''}
+        ORDER BY id
+        LIMIT :batch_size
+    """
+    params = {'scorer_version': SCORER_VERSION, 'batch_size': batch_size}
+    if after_id is not None:
+        params['after_id'] = after_id
+    return db.execute_query(query, params) or []
+
+def write_scores_batch(db: DatabaseManager, results: List[Dict]) -> int:
+    """
+    Write a batch of scores with a single UPDATE ... FROM (VALUES ...) statement.
+
+    Each result holds the document id, the content hash that was scored and the
+    framework scores (None for frameworks that don't apply).
+    """
+    if not results:
+        return 0
+
+    rows = []
+    params = {'scorer_version': SCORER_VERSION}
+    for i, result in enumerate(results):
+        rows.append(
+            f"(:id_{i}, CAST(:ai_cyber_{i} AS INTEGER), CAST(:q_cyber_{i} AS INTEGER), "
+            f"CAST(:ai_ethics_{i} AS INTEGER), CAST(:q_ethics_{i} AS INTEGER), CAST(:hash_{i} AS VARCHAR))"
+        )
+        scores = result['scores']
+        params.update({
+            f'id_{i}': result['id'],
+            f'ai_cyber_{i}': scores.get('ai_cybersecurity'),
+            f'q_cyber_{i}': scores.get('quantum_cybersecurity'),
+            f'ai_ethics_{i}': scores.get('ai_ethics'),
+            f'q_ethics_{i}': scores.get('quantum_ethics'),
+            f'hash_{i}': result['content_hash']
+        })
+
+    query = f"""
+        UPDATE documents AS d
+        SET ai_cybersecurity_score = v.ai_cybersecurity_score,
+            quantum_cybersecurity_score = v.quantum_cybersecurity_score,
+            ai_ethics_score = v.ai_ethics_score,
+            quantum_ethics_score = v.quantum_ethics_score,
+            score_content_hash = v.content_hash,
+            scorer_version = :scorer_version,
+            scored_at = CURRENT_TIMESTAMP
+        FROM (VALUES {', '.join(rows)}) AS v(id, ai_cybersecurity_score, quantum_cybersecurity_score,
+                                               ai_ethics_score, quantum_ethics_score, content_hash)
+        WHERE d.id = v.id
+    """
+    updated = db.execute_query(query, params)
+    return updated if isinstance(updated, int) else 0
+
+def score_document(text: str, title: str) -> Dict[str, Optional[int]]:
+    """Score one document through the shared score store"""
+    from utils.comprehensive_scoring import comprehensive_document_scoring
+    scores = get_score_store().get_or_compute(text, title, comprehensive_document_scoring) or {}
+    return {framework: scores.get(framework) for framework in SCORE_COLUMNS}
+
+def document_text(row: Dict) -> str:
+    """
+    Text to score for a stale row: the full extracted pages of an uploaded PDF while
+    they are in the local page store, else the text stored on the row.
+    """
+    from utils.pdf_text_extractor import load_pdf_text
+    if row.get('pdf_sha256'):
+        pages_text = load_pdf_text(row['pdf_sha256'])
+        if pages_text:
+            return pages_text
+    return row['scored_text']
+
+def rescore_changed_documents(batch_size: int = 50, limit: Optional[int] = None,
+                              db: Optional[DatabaseManager] = None) -> Dict[str, int]:
+    """
+    Rescore every document whose content hash or scorer version differs from
+    what was stored with its scores. Unchanged rows are never read or scored.
+    """
+    db = db or DatabaseManager()
+    stats = {'scored': 0, 'updated': 0, 'failed': 0}
+    if not score_columns_ready(db):
+        return stats
+
+    after_id = None
+    while limit is None or stats['scored'] + stats['failed'] < limit:
+        size = batch_size if limit is None else min(batch_size, limit - stats['scored'] - stats['failed'])
+        batch = fetch_stale_batch(db, after_id, size)
+        if not batch:
+            break
+        after_id = batch[-1]['id']
+
+        results = []
+        for row in batch:
+            try:
+                # Long texts are chunked for the LLM scorers inside comprehensive scoring
+                scores = score_document(document_text(row), row['title'])
+                results.append({'id': row['id'], 'content_hash': row['content_hash'], 'scores': scores})
+            except Exception as e:
+                logger.error(f"Error scoring document {row['id']}: {e}")
+                stats['failed'] += 1
+
+        stats['scored'] += len(results)
+        stats['updated'] += write_scores_batch(db, results)
+        logger.info(f"Rescored batch ending at document {after_id}: {stats['updated']} updated so far")
+
+    return stats
+
+def mark_all_stale(db: Optional[DatabaseManager] = None) -> int:
+    """Force every document to be rescored on the next run"""
+    db = db or DatabaseManager()
+    if not score_columns_ready(db):
+        return 0
+    result = db.execute_query("UPDATE documents SET scorer_version = NULL WHERE scorer_version IS NOT NULL")
+    return result if isinstance(result, int) else 0
+
+class BackgroundRescorer:
+    def __init__(self, interval_minutes=10, batch_size=50):
+        """
+        Initialize background rescoring job
+        interval_minutes: How often to look for changed documents
+        """
+        self.interval_minutes = interval_minutes
+        self.batch_size = batch_size
+        self.is_running = False
+        self.thread = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the background rescoring service"""
+        with self._lock:
+            if self.is_running:
+                return
+            self.is_running = True
+
+        logger.info(f"Starting background rescoring (every {self.interval_minutes} minutes)")
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the background rescoring service"""
+        self.is_running = False
+        self._wake.set()
+
+    def trigger(self):
+        """Run a pass now instead of waiting for the next interval"""
+        self.start()
+        self._wake.set()
+
+    def _run(self):
+        while self.is_running:
+            try:
+                stats = rescore_changed_documents(batch_size=self.batch_size)
+                if stats['scored'] or stats['failed']:
+                    logger.info(f"Background rescoring: {stats['updated']} updated, {stats['failed']} failed")
+            except Exception as e:
+                logger.error(f"Error during background rescoring: {e}")
+
+            self._wake.wait(self.interval_minutes * 60)
+            self._wake.clear()
+
+# Global rescoring instance
+background_rescorer = BackgroundRescorer()
+
+def start_background_rescoring():
+    """Start the background rescoring service"""
+    background_rescorer.start()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print("Rescoring documents with changed content or scorer version...")
+    start = time.time()
+    stats = rescore_changed_documents()
+    print(f"Rescored {stats['scored']} documents ({stats['updated']} rows updated, "
+          f"{stats['failed']} failed) in {time.time() - start:.1f}s")
@@ -0,0 +1,277 @@
+"""
+Persistent Content-Addressed Score Store for GUARDIAN
+Caches scoring results by full-document hash and scorer version, shared by
+every Streamlit session and worker process on the host
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from utils.data_dir import data_path
+
+# Bump whenever scoring logic changes so stale results are never served
+SCORER_VERSION = "2"
+
+# Disk hits whose access time is held in memory before being written back
+TOUCH_BATCH = 256
+
+class ScoreStore:
+    """
+    Two-tier score cache: a process-wide LRU in front of a SQLite table.
+
+    Entries are keyed on (content_hash, scorer, scorer_version) where the
+    content hash covers the full title and text, so any edit to a document
+    produces a new key. Entries expire after ``ttl_seconds`` and the table is
+    trimmed to ``max_entries`` by least recent use.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, ttl_seconds: int = 30 * 24 * 3600,
+                 max_entries: int = 100000, memory_entries: int = 2048):
+        self.db_path = db_path or os.getenv('GUARDIAN_SCORE_STORE') or data_path('score_store.db')
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._puts_since_evict = 0
+        self._touched = {}
+        self.stats_counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+
+        self.init_db()
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets sessions and workers read concurrently"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def init_db(self):
+        """Initialize score store table"""
+        conn = self._connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS score_store (
+                content_hash TEXT NOT NULL,
+                scorer TEXT NOT NULL,
+                scorer_version TEXT NOT NULL,
+                scores TEXT NOT NULL,
+                provider TEXT,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (content_hash, scorer, scorer_version)
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_score_store_last_used ON score_store (last_used)')
+        conn.commit()
+
+    @staticmethod
+    def content_hash(text: str, title: str = "") -> str:
+        """SHA-256 over the full title and text"""
+        digest = hashlib.sha256()
+        digest.update((title or "").encode('utf-8', 'surrogatepass'))
+        digest.update(b'\x00')
+        digest.update((text or "").encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def _remember(self, key, entry: Dict):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get_by_hash(self, content_hash: str, scorer: str = 'comprehensive',
+                    version: str = SCORER_VERSION) -> Optional[Dict]:
+        """Return the cached entry ({'scores', 'provider', 'created_at'}) or None"""
+        key = (content_hash, scorer, version)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry['created_at'] < self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.stats_counters['memory_hits'] += 1
+                return entry
+
+        try:
+            conn = self._connection()
+            row = conn.execute('''
+                SELECT scores, provider, created_at FROM score_store
+                WHERE content_hash = ? AND scorer = ? AND scorer_version = ? AND created_at > ?
+            ''', (content_hash, scorer, version, now - self.ttl_seconds)).fetchone()
+        except sqlite3.Error as e:
+            print(f"Score store read failed: {e}")
+            row = None
+
+        if not row:
+            with self._lock:
+                self.stats_counters['misses'] += 1
+            return None
+
+        entry = {'scores': json.loads(row[0]), 'provider': row[1], 'created_at': row[2]}
+        self._remember(key, entry)
+        with self._lock:
+            self.stats_counters['disk_hits'] += 1
+            # Access times only steer eviction, so they are written in batches
+            self._touched[key] = now
+            should_flush = len(self._touched) >= TOUCH_BATCH
+        if should_flush:
+            self.flush_access_times()
+        return entry
+
+    def flush_access_times(self):
+        """Write the access times of disk hits recorded since the last flush"""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if not touched:
+            return
+
+        try:
+            conn = self._connection()
+            conn.executemany('''
+                UPDATE score_store SET last_used = MAX(last_used, ?)
+                WHERE content_hash = ? AND scorer = ? AND scorer_version = ?
+            ''', [(used, *key) for key, used in touched.items()])
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Score store access time update failed: {e}")
+
+    def get(self, text: str, title: str = "", scorer: str = 'comprehensive') -> Optional[Dict]:
+        """Return cached scores for the document or None"""
+        entry = self.get_by_hash(self.content_hash(text, title), scorer)
+        return dict(entry['scores']) if entry else None
+
+    def put_by_hash(self, content_hash: str, scores: Dict, scorer: str = 'comprehensive',
+                    provider: Optional[str] = None, version: str = SCORER_VERSION):
+        """Store scores under an existing content hash"""
+        now = time.time()
+        entry = {'scores': dict(scores), 'provider': provider, 'created_at': now}
+        self._remember((content_hash, scorer, version), entry)
+
+        try:
+            conn = self._connection()
+            conn.execute('''
+                INSERT OR REPLACE INTO score_store
+                (content_hash, scorer, scorer_version, scores, provider, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (content_hash, scorer, version, json.dumps(scores), provider, now, now))
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Score store write failed: {e}")
+            return
+
+        with self._lock:
+            self.stats_counters['writes'] += 1
+            self._puts_since_evict += 1
+            should_evict = self._puts_since_evict >= 500
+            if should_evict:
+                self._puts_since_evict = 0
+        self._touched = {}
+        if should_evict:
+            self.evict()
+
+    def put(self, text: str, title: str, scores: Dict, scorer: str = 'comprehensive',
+            provider: Optional[str] = None):
+        """Store scores for the document"""
+        self.put_by_hash(self.content_hash(text, title), scores, scorer, provider)
+
+    def get_or_compute(self, text: str, title: str, compute: Callable[[str, str], Dict],
+                       scorer: str = 'comprehensive') -> Dict:
+        """Return cached scores, computing and storing them on a miss"""
+        content_hash = self.content_hash(text, title)
+        entry = self.get_by_hash(content_hash, scorer)
+        if entry:
+            return dict(entry['scores'])
+
+        scores = compute(text, title)
+        if scores:
+            self.put_by_hash(content_hash, scores, scorer)
+        return scores
+
+    def evict(self) -> int:
+        """Drop expired rows and trim the table to max_entries by least recent use"""
+        self.flush_access_times()
+        try:
+            conn = self._connection()
+            cursor = conn.execute('DELETE FROM score_store WHERE created_at < ?',
+                                  (time.time() - self.ttl_seconds,))
+            removed = cursor.rowcount
+            cursor = conn.execute('''
+                DELETE FROM score_store WHERE rowid IN (
+                    SELECT rowid FROM score_store ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            ''', (self.max_entries,))
+            removed += cursor.rowcount
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Score store eviction failed: {e}")
+            return 0
+
+        with self._lock:
+            self.stats_counters['evictions'] += removed
+        return removed
+
+    def invalidate_by_hash(self, content_hash: str, scorer: Optional[str] = None):
+        """Remove cached scores for one content hash (all scorers unless one is given)"""
+        with self._lock:
+            for key in [k for k in self._memory if k[0] == content_hash and (scorer is None or k[1] == scorer)]:
+                del self._memory[key]
+
+        try:
+            conn = self._connection()
+            if scorer is None:
+                conn.execute('DELETE FROM score_store WHERE content_hash = ?', (content_hash,))
+            else:
+                conn.execute('DELETE FROM score_store WHERE content_hash = ? AND scorer = ?', (content_hash, scorer))
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Score store invalidation failed: {e}")
+
+    def invalidate(self, text: str, title: str = "", scorer: Optional[str] = None):
+        """Remove cached scores for one document (all scorers unless one is given)"""
+        self.invalidate_by_hash(self.content_hash(text, title), scorer)
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters and entry counts"""
+        with self._lock:
+            counters = dict(self.stats_counters)
+            memory_size = len(self._memory)
+
+        try:
+            stored = self._connection().execute('SELECT COUNT(*) FROM score_store').fetchone()[0]
+        except sqlite3.Error:
+            stored = None
+
+        hits = counters['memory_hits'] + counters['disk_hits']
+        total = hits + counters['misses']
+        counters.update({
+            'hits': hits,
+            'hit_rate': round(hits / total * 100, 1) if total else 0,
+            'memory_entries': memory_size,
+            'stored_entries': stored,
+            'scorer_version': SCORER_VERSION
+        })
+        return counters
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_score_store() -> ScoreStore:
+    """Process-wide score store instance"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ScoreStore()
+    return _store
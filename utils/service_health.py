@@ -0,0 +1,188 @@
+"""
+Service Health Registry for GUARDIAN
+Cached LLM service availability, refreshed in the background, with a circuit
+breaker that takes failing services out of rotation
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, asdict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Probe results are reused for HEALTH_TTL seconds, then refreshed in the background
+HEALTH_TTL = 300
+
+# Consecutive failures that open a service's breaker, and how long it stays open
+# before a single trial request is let through (a trial that never reports back
+# is given up on after the same interval)
+FAILURE_THRESHOLD = 3
+BREAKER_OPEN_SECONDS = 60
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+@dataclass
+class ServiceHealth:
+    """Availability and breaker state for one service"""
+    name: str
+    available: bool = False
+    state: str = CLOSED
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    trial_started: float = 0.0
+    last_error: Optional[str] = None
+    last_success: Optional[float] = None
+
+class ServiceHealthRegistry:
+    """
+    Availability of every LLM service without probing on the request path.
+
+    ``probe`` is an async callable returning the names of the services that
+    answered a live test. It runs once, on first use. After that, readers get
+    the cached result and a stale cache is refreshed on a background thread.
+    Evaluation outcomes feed the breaker through ``record_success`` and
+    ``record_failure``.
+    """
+
+    def __init__(self, probe: Callable[[], Awaitable[List[str]]], ttl_seconds: int = HEALTH_TTL):
+        self.probe = probe
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._services: Dict[str, ServiceHealth] = {}
+        self.checked_at = 0.0
+        self._refreshing = False
+
+    def _service(self, name: str) -> ServiceHealth:
+        if name not in self._services:
+            self._services[name] = ServiceHealth(name)
+        return self._services[name]
+
+    @property
+    def is_stale(self) -> bool:
+        return time.time() - self.checked_at > self.ttl_seconds
+
+    # ---- discovery ---------------------------------------------------------
+
+    def set_available(self, names: List[str]):
+        """Record a probe result; services not listed are marked unavailable"""
+        with self._lock:
+            for health in self._services.values():
+                health.available = False
+            for name in names:
+                self._service(name).available = True
+            self.checked_at = time.time()
+
+    async def refresh(self) -> List[str]:
+        """Probe now and return the available services"""
+        try:
+            names = await self.probe()
+        except Exception as e:
+            logger.warning(f"Service health probe failed: {e}")
+            with self._lock:
+                # Keep the previous result, but retry after a short interval rather than a full TTL
+                self.checked_at = time.time() - self.ttl_seconds + 30
+            return self.available_services(refresh=False)
+        self.set_available(names)
+        return self.available_services(refresh=False)
+
+    def refresh_in_background(self):
+        """Start a probe on a daemon thread unless one is already running"""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                asyncio.run(self.refresh())
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name='guardian-service-health', daemon=True).start()
+
+    async def ensure_fresh(self) -> List[str]:
+        """Block only if the registry has never been populated; otherwise refresh in the background"""
+        if not self.checked_at:
+            return await self.refresh()
+        return self.available_services()
+
+    # ---- reads -------------------------------------------------------------
+
+    def available_services(self, refresh: bool = True) -> List[str]:
+        """Services that answered the last probe (never blocks)"""
+        if refresh and self.checked_at and self.is_stale:
+            self.refresh_in_background()
+        with self._lock:
+            return [name for name, health in self._services.items() if health.available]
+
+    def _admits(self, health: ServiceHealth, now: float) -> bool:
+        if health.state == CLOSED:
+            return True
+        if health.state == OPEN:
+            return now - health.opened_at >= BREAKER_OPEN_SECONDS
+        return now - health.trial_started >= BREAKER_OPEN_SECONDS
+
+    def admits(self, name: str) -> bool:
+        """Whether a request would be let through, without claiming the trial slot"""
+        with self._lock:
+            return self._admits(self._service(name), time.time())
+
+    def allow(self, name: str) -> bool:
+        """Claim a request slot just before sending; an expired open breaker or stalled trial admits one trial request"""
+        with self._lock:
+            health = self._service(name)
+            now = time.time()
+            if not self._admits(health, now):
+                return False
+            if health.state != CLOSED:
+                health.state = HALF_OPEN
+                health.trial_started = now
+            return True
+
+    # ---- outcomes ----------------------------------------------------------
+
+    def record_success(self, name: str):
+        with self._lock:
+            health = self._service(name)
+            health.state = CLOSED
+            health.consecutive_failures = 0
+            health.last_success = time.time()
+
+    def _record_failure(self, health: ServiceHealth, error: Optional[str]):
+        health.consecutive_failures += 1
+        health.last_error = error
+        if health.state == HALF_OPEN or health.consecutive_failures >= FAILURE_THRESHOLD:
+            if health.state != OPEN:
+                logger.info(f"Circuit opened for {health.name} after {health.consecutive_failures} failures")
+            health.state = OPEN
+            health.opened_at = time.time()
+
+    def record_failure(self, name: str, error: Optional[str] = None):
+        with self._lock:
+            self._record_failure(self._service(name), error)
+
+    def release_trial(self, name: str):
+        """
+        Give back the slot of a request that ended without reaching the service
+        (cancelled, served from cache). Nothing was learned about the service,
+        so no failure is counted and the next request is admitted as the trial.
+        """
+        with self._lock:
+            health = self._service(name)
+            if health.state == HALF_OPEN:
+                health.state = OPEN
+                health.opened_at = time.time() - BREAKER_OPEN_SECONDS
+
+    def reset(self):
+        """Forget cached availability and breaker state"""
+        with self._lock:
+            self._services.clear()
+            self.checked_at = 0.0
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {name: asdict(health) for name, health in self._services.items()}
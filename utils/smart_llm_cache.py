@@ -5,107 +5,39 @@ Implements intelligent caching and load balancing across multiple LLM providers
 
 import os
 import json
-import hashlib
-import sqlite3
 from typing import Dict, Optional, List
-from datetime import datetime, timedelta
+
+from utils.score_store import ScoreStore, get_score_store
 
 class SmartLLMCache:
-    def __init__(self, cache_db_path="llm_cache.db"):
-        self.cache_db_path = cache_db_path
-        self.init_cache_db()
-        
-    def init_cache_db(self):
-        """Initialize cache database"""
-        conn = sqlite3.connect(self.cache_db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS llm_cache (
-                content_hash TEXT PRIMARY KEY,
-                title TEXT,
-                content_preview TEXT,
-                ai_cybersecurity INTEGER,
-                ai_ethics INTEGER,
-                quantum_cybersecurity INTEGER,
-                quantum_ethics INTEGER,
-                provider TEXT,
-                created_at TIMESTAMP,
-                last_used TIMESTAMP
-            )
-        ''')
-        conn.commit()
-        conn.close()
+    """
+    Provider-aware view over the persistent score store.
+    
+    Results are keyed on a hash of the full title and text plus the scorer
+    version, and are shared across sessions and worker processes.
+    """
+    
+    SCORER = 'smart_multi_llm'
+    
+    def __init__(self, store: Optional[ScoreStore] = None):
+        self.store = store or get_score_store()
     
     def get_content_hash(self, text: str, title: str) -> str:
         """Generate hash for content caching"""
-        combined = f"{title}|||{text[:2000]}"  # Use first 2000 chars for consistency
-        return hashlib.md5(combined.encode()).hexdigest()
+        return ScoreStore.content_hash(text, title)
     
     def get_cached_scores(self, text: str, title: str) -> Optional[Dict[str, Optional[int]]]:
         """Retrieve cached scores if available"""
-        content_hash = self.get_content_hash(text, title)
-        
-        conn = sqlite3.connect(self.cache_db_path)
-        cursor = conn.cursor()
+        entry = self.store.get_by_hash(self.get_content_hash(text, title), self.SCORER)
+        if not entry:
+            return None
         
-        cursor.execute('''
-            SELECT ai_cybersecurity, ai_ethics, quantum_cybersecurity, quantum_ethics, provider
-            FROM llm_cache 
-            WHERE content_hash = ?
-        ''', (content_hash,))
-        
-        result = cursor.fetchone()
-        
-        if result:
-            # Update last_used timestamp
-            cursor.execute('''
-                UPDATE llm_cache 
-                SET last_used = ? 
-                WHERE content_hash = ?
-            ''', (datetime.now(), content_hash))
-            conn.commit()
-            
-            scores = {
-                'ai_cybersecurity': result[0],
-                'ai_ethics': result[1], 
-                'quantum_cybersecurity': result[2],
-                'quantum_ethics': result[3]
-            }
-            
-            print(f"Cache HIT: Retrieved scores from {result[4]} provider")
-            conn.close()
-            return scores
-        
-        conn.close()
-        return None
+        print(f"Cache HIT: Retrieved scores from {entry['provider']} provider")
+        return dict(entry['scores'])
     
     def cache_scores(self, text: str, title: str, scores: Dict[str, Optional[int]], provider: str):
         """Cache computed scores"""
-        content_hash = self.get_content_hash(text, title)
-        
-        conn = sqlite3.connect(self.cache_db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO llm_cache 
-            (content_hash, title, content_preview, ai_cybersecurity, ai_ethics, 
-             quantum_cybersecurity, quantum_ethics, provider, created_at, last_used)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            content_hash,
-            title[:100],
-            text[:200],
-            scores.get('ai_cybersecurity'),
-            scores.get('ai_ethics'),
-            scores.get('quantum_cybersecurity'),
-            scores.get('quantum_ethics'),
-            provider,
-            datetime.now(),
-            datetime.now()
-        ))
-        
-        conn.commit()
-        conn.close()
+        self.store.put_by_hash(self.get_content_hash(text, title), scores, self.SCORER, provider)
         print(f"Cache STORE: Saved scores from {provider} provider")
 
 def analyze_with_groq(text: str, title: str) -> Dict[str, Optional[int]]:
@@ -246,9 +178,10 @@ Respond with JSON only: {{"ai_cybersecurity": score_or_null, "ai_ethics": score_
     
     return {'ai_cybersecurity': None, 'ai_ethics': None, 'quantum_cybersecurity': None, 'quantum_ethics': None}
 
-def smart_multi_llm_scoring(text: str, title: str) -> Dict[str, Optional[int]]:
+def smart_multi_llm_scoring(text: str, title: str, index=None) -> Dict[str, Optional[int]]:
     """
-    Smart multi-LLM scoring with caching and load balancing
+    Smart multi-LLM scoring with caching and load balancing; ``index`` is the
+    document's title + text term index, passed on to the pattern fallback
     """
     cache = SmartLLMCache()
     
@@ -270,7 +203,7 @@ def smart_multi_llm_scoring(text: str, title: str) -> Dict[str, Optional[int]]:
     
     # Enhanced pattern scoring as reliable fallback
     from utils.enhanced_pattern_scoring import enhanced_pattern_scoring
-    providers.append(('enhanced_patterns', enhanced_pattern_scoring))
+    providers.append(('enhanced_patterns', lambda text, title: enhanced_pattern_scoring(text, title, index)))
     
     for provider_name, provider_func in providers:
         try:
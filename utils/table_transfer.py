@@ -0,0 +1,428 @@
+"""
+Table Transfer for GUARDIAN
+Streams tables to and from gzip-compressed CSV chunks with PostgreSQL COPY, one
+worker per table, checkpointing every chunk so interrupted runs resume
+"""
+
+import os
+import gzip
+import json
+import logging
+import threading
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import psycopg2
+from psycopg2 import sql
+
+logger = logging.getLogger(__name__)
+
+# Rows per chunk file; each chunk is one COPY and one checkpoint
+CHUNK_ROWS = 50000
+
+TRANSFER_WORKERS = int(os.getenv('GUARDIAN_TRANSFER_WORKERS', '4'))
+
+# COPY output is mostly text and compresses well at fast levels
+COMPRESS_LEVEL = 3
+COPY_BUFFER_BYTES = 1024 * 1024
+
+# Rows per round trip when COPY is unavailable and a server-side cursor is used
+CURSOR_ITERSIZE = 2000
+
+MANIFEST_FILE = 'export_manifest.json'
+
+# Chunks imported so far, recorded in the target in the same transaction as their COPY
+PROGRESS_TABLE = '_guardian_import_progress'
+
+INTEGER_TYPES = ('smallint', 'integer', 'bigint')
+
+class TransferManifest:
+    """
+    The chunk files exported per table, saved after every chunk. An export
+    resumes after the last recorded chunk; an import reads its file list here.
+    """
+
+    def __init__(self, export_dir: Path):
+        self.path = Path(export_dir) / MANIFEST_FILE
+        self._lock = threading.Lock()
+        self.data = {'tables': {}}
+        if self.path.exists():
+            with open(self.path) as f:
+                self.data = json.load(f)
+
+    def table(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            state = self.data['tables'].get(name)
+            return json.loads(json.dumps(state)) if state else None
+
+    def reset(self, tables: List[str]):
+        """Forget the progress of these tables so they are exported from scratch"""
+        with self._lock:
+            for name in tables:
+                self.data['tables'].pop(name, None)
+            self._save()
+
+    def start_table(self, name: str, columns: List[str], key: Optional[str]) -> Dict[str, Any]:
+        """Progress of a table, reset if its columns changed since the recorded run"""
+        with self._lock:
+            state = self.data['tables'].get(name)
+            if not state or state['columns'] != columns or state['key'] != key:
+                state = self.data['tables'][name] = {'columns': columns, 'key': key,
+                                                     'chunks': [], 'complete': False}
+                self._save()
+            return json.loads(json.dumps(state))
+
+    def record_chunk(self, name: str, chunk: Dict[str, Any]):
+        with self._lock:
+            self.data['tables'][name]['chunks'].append(chunk)
+            self._save()
+
+    def complete_table(self, name: str):
+        with self._lock:
+            self.data['tables'][name]['complete'] = True
+            self._save()
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(self.data, f, indent=2, default=str)
+        os.replace(temp_path, self.path)
+
+# ---- shared helpers --------------------------------------------------------
+
+def _table_columns(cursor, table: str) -> List[str]:
+    """Insertable columns in table order (generated columns are recomputed on import)"""
+    cursor.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = %s AND is_generated = 'NEVER'
+        ORDER BY ordinal_position
+    """, (table,))
+    return [row[0] for row in cursor.fetchall()]
+
+def _table_key(cursor, table: str) -> Optional[str]:
+    """The single-column integer primary key used to split a table into chunks, if any"""
+    cursor.execute("""
+        SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+        FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indrelid = to_regclass(%s) AND i.indisprimary
+    """, (sql.Identifier(table).as_string(cursor),))
+    rows = cursor.fetchall()
+    if len(rows) == 1 and rows[0][1] in INTEGER_TYPES:
+        return rows[0][0]
+    return None
+
+def _column_list(columns: List[str]) -> sql.Composed:
+    return sql.SQL(', ').join(sql.Identifier(column) for column in columns)
+
+# ---- export ----------------------------------------------------------------
+
+def _chunk_upper_bound(cursor, table: str, key: str, after: Optional[int], chunk_rows: int) -> Optional[int]:
+    """Key of the last row in the next chunk, or None if fewer than chunk_rows rows remain"""
+    cursor.execute(sql.SQL("SELECT {key} FROM {table} {where} ORDER BY {key} OFFSET %s LIMIT 1").format(
+        key=sql.Identifier(key),
+        table=sql.Identifier(table),
+        where=sql.SQL("WHERE {} > %s").format(sql.Identifier(key)) if after is not None else sql.SQL('')
+    ), ([after] if after is not None else []) + [chunk_rows - 1])
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def _chunk_query(table: str, columns: List[str], key: Optional[str],
+                 after: Optional[int], upper: Optional[int], as_text: bool = False) -> sql.Composed:
+    """SELECT for one chunk, with bounds inlined so it can be wrapped in COPY"""
+    if as_text:
+        fields = sql.SQL(', ').join(sql.SQL('{}::text').format(sql.Identifier(column)) for column in columns)
+    else:
+        fields = _column_list(columns)
+
+    conditions = []
+    if after is not None:
+        conditions.append(sql.SQL("{} > {}").format(sql.Identifier(key), sql.Literal(after)))
+    if upper is not None:
+        conditions.append(sql.SQL("{} <= {}").format(sql.Identifier(key), sql.Literal(upper)))
+
+    query = sql.SQL("SELECT {} FROM {}").format(fields, sql.Identifier(table))
+    if conditions:
+        query += sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions)
+    if key:
+        query += sql.SQL(" ORDER BY {}").format(sql.Identifier(key))
+    return query
+
+def _csv_field(value: Optional[str]) -> str:
+    # COPY's CSV conventions: NULL is an unquoted empty field, '' is a quoted one
+    if value is None:
+        return ''
+    return '"' + value.replace('"', '""') + '"'
+
+def _copy_out(cursor, query: sql.Composed, out) -> int:
+    cursor.copy_expert(sql.SQL("COPY ({}) TO STDOUT WITH (FORMAT csv, HEADER)").format(query),
+                       out, size=COPY_BUFFER_BYTES)
+    return cursor.rowcount
+
+def _cursor_out(conn, name: str, query: sql.Composed, columns: List[str], out) -> int:
+    """Fallback for connections without COPY: stream text values through a server-side cursor"""
+    rows = 0
+    out.write((','.join(_csv_field(column) for column in columns) + '\n').encode('utf-8'))
+    with conn.cursor(name=name) as cursor:
+        cursor.itersize = CURSOR_ITERSIZE
+        cursor.execute(query)
+        for row in cursor:
+            out.write((','.join(_csv_field(value) for value in row) + '\n').encode('utf-8'))
+            rows += 1
+    return rows
+
+def _write_chunk(conn, cursor, table: str, columns: List[str], key: Optional[str],
+                 after: Optional[int], upper: Optional[int], path: Path, state: Dict[str, bool]) -> int:
+    """Write one chunk file atomically; switches the table to the cursor fallback if COPY fails"""
+    temp_path = path.with_name(path.name + '.tmp')
+    if state['copy']:
+        cursor.execute("SAVEPOINT chunk_copy")
+        try:
+            with gzip.open(temp_path, 'wb', compresslevel=COMPRESS_LEVEL) as out:
+                rows = _copy_out(cursor, _chunk_query(table, columns, key, after, upper), out)
+            cursor.execute("RELEASE SAVEPOINT chunk_copy")
+            os.replace(temp_path, path)
+            return rows
+        except psycopg2.Error as e:
+            logger.warning(f"COPY unavailable for {table}, using a server-side cursor: {e}")
+            cursor.execute("ROLLBACK TO SAVEPOINT chunk_copy")
+            state['copy'] = False
+
+    query = _chunk_query(table, columns, key, after, upper, as_text=True)
+    with gzip.open(temp_path, 'wb', compresslevel=COMPRESS_LEVEL) as out:
+        rows = _cursor_out(conn, f"export_{table}", query, columns, out)
+    os.replace(temp_path, path)
+    return rows
+
+def export_table(source_url: str, table: str, export_dir: Path, manifest: TransferManifest,
+                 snapshot: Optional[str] = None, chunk_rows: int = CHUNK_ROWS) -> Dict[str, Any]:
+    """
+    Export one table as <table>.<n>.csv.gz chunks, resuming after the last
+    chunk in the manifest. Tables with an integer primary key are split into
+    key ranges (no OFFSET scans); others are exported as a single chunk.
+    """
+    conn = psycopg2.connect(source_url)
+    try:
+        conn.set_client_encoding('UTF8')
+        conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        with conn.cursor() as cursor:
+            if snapshot:
+                cursor.execute("SET TRANSACTION SNAPSHOT %s", (snapshot,))
+
+            columns = _table_columns(cursor, table)
+            key = _table_key(cursor, table)
+            state = manifest.start_table(table, columns, key)
+            chunks = state['chunks']
+            if state['complete'] or (chunks and chunks[-1]['last_key'] is None):
+                manifest.complete_table(table)
+                return manifest.table(table)
+            if chunks:
+                logger.info(f"Resuming {table} after chunk {len(chunks)}")
+
+            after = chunks[-1]['last_key'] if chunks else None
+            copy_state = {'copy': True}
+            exported = sum(chunk['rows'] for chunk in chunks)
+            for index in itertools.count(len(chunks)):
+                upper = _chunk_upper_bound(cursor, table, key, after, chunk_rows) if key else None
+                path = Path(export_dir) / f"{table}.{index:05d}.csv.gz"
+                rows = _write_chunk(conn, cursor, table, columns, key, after, upper, path, copy_state)
+                manifest.record_chunk(table, {'file': path.name, 'rows': rows, 'last_key': upper})
+                exported += rows
+                logger.info(f"Exported {exported} rows from {table}")
+                if upper is None:
+                    break
+                after = upper
+
+        manifest.complete_table(table)
+        return manifest.table(table)
+    finally:
+        conn.close()
+
+def export_tables(source_url: str, tables: List[str], export_dir: Path, workers: int = TRANSFER_WORKERS,
+                  fresh: bool = False, chunk_rows: int = CHUNK_ROWS) -> TransferManifest:
+    """
+    Export tables in parallel, one worker per table. All workers read the same
+    exported snapshot, so rows referenced across tables stay consistent
+    (a resumed run continues from a new snapshot).
+    """
+    export_dir = Path(export_dir)
+    export_dir.mkdir(parents=True, exist_ok=True)
+    manifest = TransferManifest(export_dir)
+    if fresh:
+        manifest.reset(tables)
+
+    # The snapshot stays importable only while this transaction is open
+    coordinator = psycopg2.connect(source_url)
+    try:
+        coordinator.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        snapshot = None
+        try:
+            with coordinator.cursor() as cursor:
+                cursor.execute("SELECT pg_export_snapshot()")
+                snapshot = cursor.fetchone()[0]
+        except psycopg2.Error as e:
+            logger.warning(f"Could not export a snapshot, tables are read independently: {e}")
+            coordinator.rollback()
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(tables) or 1))) as pool:
+            futures = {table: pool.submit(export_table, source_url, table, export_dir, manifest,
+                                          snapshot, chunk_rows) for table in tables}
+            for table, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Error exporting table {table}: {e}")
+                    failed.append(table)
+    finally:
+        coordinator.close()
+
+    if failed:
+        raise RuntimeError(f"Export incomplete for {', '.join(failed)}; rerun to resume")
+    return manifest
+
+def copy_commands(manifest: TransferManifest) -> List[str]:
+    """psql \\copy commands loading every exported chunk (for manual imports)"""
+    commands = []
+    for table, state in manifest.data['tables'].items():
+        if not state['complete']:
+            continue
+        columns = ', '.join(f'"{column}"' for column in state['columns'])
+        for chunk in state['chunks']:
+            commands.append(f"\\copy \"{table}\" ({columns}) FROM PROGRAM 'gzip -dc {chunk['file']}' "
+                            f"WITH (FORMAT csv, HEADER)")
+    return commands
+
+# ---- import ----------------------------------------------------------------
+
+def _dependency_order(cursor, tables: List[str]) -> List[str]:
+    """Tables ordered so referenced tables load before the tables referencing them"""
+    cursor.execute("""
+        SELECT child.relname, parent.relname
+        FROM pg_constraint c
+        JOIN pg_class child ON child.oid = c.conrelid
+        JOIN pg_class parent ON parent.oid = c.confrelid
+        WHERE c.contype = 'f' AND c.conrelid <> c.confrelid
+    """)
+    parents = {table: set() for table in tables}
+    for child, parent in cursor.fetchall():
+        if child in parents and parent in parents:
+            parents[child].add(parent)
+
+    ordered = []
+    while parents:
+        ready = [table for table in tables if table in parents and not parents[table]]
+        if not ready:
+            # Reference cycle: load the rest in export order
+            ready = [table for table in tables if table in parents]
+        for table in ready:
+            ordered.append(table)
+            del parents[table]
+        for remaining in parents.values():
+            remaining.difference_update(ready)
+    return ordered
+
+def _import_table(target_url: str, table: str, state: Dict[str, Any], export_dir: Path,
+                  imported: set, replica: bool) -> int:
+    """Load a table's remaining chunks, each in its own transaction with its progress row"""
+    conn = psycopg2.connect(target_url)
+    rows = 0
+    try:
+        conn.set_client_encoding('UTF8')
+        copy = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, HEADER)").format(
+            sql.Identifier(table), _column_list(state['columns']))
+        for chunk in state['chunks']:
+            if chunk['file'] in imported:
+                continue
+            with conn, conn.cursor() as cursor:
+                if replica:
+                    # Skip foreign key triggers so tables can load in parallel
+                    cursor.execute("SET LOCAL session_replication_role = replica")
+                with gzip.open(Path(export_dir) / chunk['file'], 'rb') as source:
+                    cursor.copy_expert(copy, source, size=COPY_BUFFER_BYTES)
+                cursor.execute(sql.SQL("INSERT INTO {} (table_name, chunk_file, row_count) VALUES (%s, %s, %s)").format(
+                    sql.Identifier(PROGRESS_TABLE)), (table, chunk['file'], chunk['rows']))
+            rows += chunk['rows']
+            logger.info(f"Imported {chunk['file']} ({chunk['rows']} rows)")
+    finally:
+        conn.close()
+    return rows
+
+def _reset_sequences(cursor, tables: List[str]):
+    cursor.execute("""
+        SELECT table_name, column_name FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = ANY(%s)
+          AND (column_default LIKE 'nextval(%%' OR is_identity = 'YES')
+    """, (tables,))
+    for table, column in cursor.fetchall():
+        cursor.execute(sql.SQL(
+            "SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE(MAX({column}), 1), MAX({column}) IS NOT NULL) "
+            "FROM {table}").format(column=sql.Identifier(column), table=sql.Identifier(table)),
+            (sql.Identifier(table).as_string(cursor), column))
+
+def import_tables(target_url: str, export_dir: Path, workers: int = TRANSFER_WORKERS) -> Dict[str, int]:
+    """
+    Load an export into a database whose tables already exist, with
+    COPY FROM STDIN straight from the compressed chunks. Chunks already
+    recorded in the progress table are skipped, so an interrupted import
+    resumes. Tables load in parallel when foreign key triggers can be
+    suspended (session_replication_role), otherwise one by one in
+    dependency order.
+    """
+    export_dir = Path(export_dir)
+    manifest = TransferManifest(export_dir)
+    tables = [table for table, state in manifest.data['tables'].items() if state['complete']]
+    for table, state in manifest.data['tables'].items():
+        if not state['complete']:
+            logger.warning(f"Skipping {table}: its export did not finish")
+
+    conn = psycopg2.connect(target_url)
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL("""
+                CREATE TABLE IF NOT EXISTS {} (
+                    table_name TEXT NOT NULL,
+                    chunk_file TEXT PRIMARY KEY,
+                    row_count BIGINT NOT NULL,
+                    imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """).format(sql.Identifier(PROGRESS_TABLE)))
+            cursor.execute(sql.SQL("SELECT chunk_file FROM {}").format(sql.Identifier(PROGRESS_TABLE)))
+            imported = {row[0] for row in cursor.fetchall()}
+
+            try:
+                cursor.execute("SET session_replication_role = replica")
+                cursor.execute("RESET session_replication_role")
+                replica = True
+            except psycopg2.Error as e:
+                logger.warning(f"Cannot suspend foreign key checks, importing tables in dependency order: {e}")
+                replica = False
+
+            if not replica:
+                tables = _dependency_order(cursor, tables)
+                workers = 1
+
+        results, failed = {}, []
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(tables) or 1))) as pool:
+            futures = {table: pool.submit(_import_table, target_url, table, manifest.data['tables'][table],
+                                          export_dir, imported, replica) for table in tables}
+            for table, future in futures.items():
+                try:
+                    results[table] = future.result()
+                except Exception as e:
+                    logger.error(f"Error importing table {table}: {e}")
+                    failed.append(table)
+
+        if failed:
+            raise RuntimeError(f"Import incomplete for {', '.join(failed)}; rerun to resume")
+
+        with conn.cursor() as cursor:
+            _reset_sequences(cursor, tables)
+            cursor.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(PROGRESS_TABLE)))
+        return results
+    finally:
+        conn.close()
@@ -0,0 +1,245 @@
+"""
+Shared Term Index for GUARDIAN Scoring Engines
+Scans a document once with an Aho-Corasick automaton over every indicator term and
+answers each scorer's "is this indicator present / how often" question from a table
+"""
+
+import re
+import threading
+from collections import Counter, OrderedDict
+from operator import itemgetter
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+class TermVocabulary:
+    """
+    Process-wide set of indicator terms compiled into one Aho-Corasick automaton.
+
+    The vocabulary grows as scorers query new terms, so after the first document
+    every indicator used anywhere in the scoring engines is matched by one pass.
+    Without pyahocorasick no automaton is built and every term falls back to a
+    cached substring scan.
+    """
+
+    def __init__(self, terms: Iterable[str] = ()):
+        self._lock = threading.Lock()
+        self._terms = set()
+        self._compiled = None
+        self.register(terms)
+
+    def register(self, terms: Iterable[str]) -> None:
+        """Add terms to the vocabulary; the automaton is rebuilt lazily."""
+        terms = {term for term in terms if term}
+        with self._lock:
+            new_terms = terms - self._terms
+            if not new_terms:
+                return
+            self._terms.update(new_terms)
+            self._compiled = None
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._terms
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def compiled(self) -> Tuple[Optional["ahocorasick.Automaton"], frozenset]:
+        """Return the automaton (None if unavailable or empty) and the term set it covers."""
+        with self._lock:
+            if self._compiled is None:
+                terms = frozenset(self._terms)
+                automaton = None
+                if AHOCORASICK_AVAILABLE and terms:
+                    automaton = ahocorasick.Automaton()
+                    for term in terms:
+                        automaton.add_word(term, term)
+                    automaton.make_automaton()
+                self._compiled = (automaton, terms if automaton is not None else frozenset())
+            return self._compiled
+
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def _has_border(term: str) -> bool:
+    """True if a proper prefix of the term is also a suffix (occurrences may overlap)."""
+    return any(term[:i] == term[-i:] for i in range(1, len(term)))
+
+
+class TermIndex:
+    """
+    Term occurrence table for one lowercased document.
+
+    Membership checks follow plain substring semantics (``term in text_lower``)
+    and ``count`` matches ``str.count``, so scorers can switch to the index
+    without any change in results.
+    """
+
+    def __init__(self, text_lower: str, vocabulary: Optional[TermVocabulary] = None):
+        self.text = text_lower
+        self.vocabulary = vocabulary or default_vocabulary
+        self._occurrences = Counter()
+        self._fallback = {}
+        self._positions = {}
+        self._words = None
+
+        # The automaton reports every (overlapping) occurrence of every term in one pass
+        automaton, self._covered = self.vocabulary.compiled()
+        if automaton is not None and text_lower:
+            self._occurrences = Counter(map(itemgetter(1), automaton.iter(text_lower)))
+
+    def _overlapping_count(self, term: str) -> int:
+        if term in self._covered:
+            return self._occurrences.get(term, 0)
+        if term not in self._fallback:
+            self._fallback[term] = len(self.positions(term))
+            self.vocabulary.register((term,))
+        return self._fallback[term]
+
+    def contains(self, term: str) -> bool:
+        """Return True if the term occurs anywhere in the document."""
+        return self._overlapping_count(term) > 0
+
+    __contains__ = contains
+
+    def count(self, term: str) -> int:
+        """Number of non-overlapping occurrences, identical to ``str.count``."""
+        if not self.contains(term):
+            return 0
+        if _has_border(term):
+            return self.text.count(term)
+        return self._overlapping_count(term)
+
+    def positions(self, term: str) -> List[int]:
+        """Start offsets of every (possibly overlapping) occurrence of the term."""
+        if term not in self._positions:
+            found = []
+            start = self.text.find(term)
+            while start != -1:
+                found.append(start)
+                start = self.text.find(term, start + 1)
+            self._positions[term] = found
+        return self._positions[term]
+
+    def count_present(self, terms: Iterable[str]) -> int:
+        """Number of distinct terms from the list that occur in the document."""
+        return sum(1 for term in terms if self.contains(term))
+
+    def any_present(self, terms: Iterable[str]) -> bool:
+        """True if at least one of the terms occurs in the document."""
+        return any(self.contains(term) for term in terms)
+
+    def total_count(self, terms: Iterable[str]) -> int:
+        """Sum of ``count`` over the terms."""
+        return sum(self.count(term) for term in terms)
+
+    def word_prefix_count(self, prefixes: Tuple[str, ...]) -> int:
+        """
+        Number of words starting with any of the prefixes, the same as a
+        ``\\b(prefix|...)\\w*`` findall, from a word table built once.
+        """
+        if self._words is None:
+            self._words = Counter(_WORD_PATTERN.findall(self.text))
+        return sum(count for word, count in self._words.items() if word.startswith(prefixes))
+
+
+# Characters of the body indexed together with the title, so terms spanning the
+# title/body boundary are still found; longer terms fall back to the joined text
+BOUNDARY_CHARS = 256
+
+
+class CombinedTermIndex(TermIndex):
+    """
+    Term index over ``f"{title} {text}"`` for a body that is already indexed.
+
+    Only the title and the first BOUNDARY_CHARS characters of the body are
+    scanned again, so the text-only and title + text views of a document
+    share one scan of the body. Answers are identical to a TermIndex built
+    over the joined string.
+    """
+
+    def __init__(self, title_lower: str, body: TermIndex):
+        self.body = body
+        self.vocabulary = body.vocabulary
+        self._title_words = Counter(_WORD_PATTERN.findall(title_lower))
+        # Occurrences in the head starting before this offset begin in the title or the separator
+        self._title_end = len(title_lower) + 1
+        self.head = TermIndex(f"{title_lower} {body.text[:BOUNDARY_CHARS]}", body.vocabulary)
+        self._positions = {}
+        self._text = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.head.text[:self._title_end] + self.body.text
+        return self._text
+
+    def _title_positions(self, term: str) -> List[int]:
+        if not self.head.contains(term):
+            return []
+        return [start for start in self.head.positions(term) if start < self._title_end]
+
+    def contains(self, term: str) -> bool:
+        if len(term) > BOUNDARY_CHARS:
+            return term in self.text
+        return self.head.contains(term) or self.body.contains(term)
+
+    __contains__ = contains
+
+    def count(self, term: str) -> int:
+        if len(term) > BOUNDARY_CHARS or _has_border(term):
+            return self.text.count(term) if self.contains(term) else 0
+        return len(self._title_positions(term)) + self.body.count(term)
+
+    def positions(self, term: str) -> List[int]:
+        if len(term) > BOUNDARY_CHARS:
+            return TermIndex.positions(self, term)
+        return self._title_positions(term) + [start + self._title_end for start in self.body.positions(term)]
+
+    def word_prefix_count(self, prefixes: Tuple[str, ...]) -> int:
+        title_count = sum(count for word, count in self._title_words.items() if word.startswith(prefixes))
+        return title_count + self.body.word_prefix_count(prefixes)
+
+
+# Global vocabulary shared by all scoring engines
+default_vocabulary = TermVocabulary()
+
+_INDEX_CACHE_SIZE = 32
+_index_cache = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+def get_term_index(text: str, title: Optional[str] = None) -> TermIndex:
+    """
+    Return the term index for a document, building it at most once.
+
+    Without a title the index covers ``text.lower()``; with a title it covers
+    ``f"{title.lower()} {text.lower()}"``, the combined form most scorers use,
+    and reuses the text-only index for the body. Indexes are kept in a small
+    LRU keyed on the original strings, so the scorers for all four frameworks
+    share a single scan per document.
+    """
+    text = text or ""
+    key = (text, title)
+    with _index_cache_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+
+    if title is None:
+        index = TermIndex(text.lower())
+    else:
+        index = CombinedTermIndex(title.lower(), get_term_index(text))
+
+    with _index_cache_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > _INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
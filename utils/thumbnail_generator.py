@@ -4,12 +4,9 @@ Creates actual thumbnails from PDF files and other documents
 """
 
 import base64
-from io import BytesIO
 import re
 import os
-from pdf2image import convert_from_path, convert_from_bytes
-from PIL import Image
-import tempfile
+from utils.thumbnail_service import ASSETS_DIR, get_thumbnail_service, thumbnail_img_html
 
 def generate_pdf_thumbnail(file_path, doc_id):
     """
@@ -20,56 +17,10 @@ def generate_pdf_thumbnail(file_path, doc_id):
         doc_id: Document ID for caching
         
     Returns:
-        Base64 encoded thumbnail image or None if failed
+        URL of the served thumbnail image or None if failed
     """
     try:
-        # Check if thumbnail already exists in cache
-        thumbnail_cache_path = f"thumbnails/thumb_{doc_id}.png"
-        
-        if os.path.exists(thumbnail_cache_path):
-            with open(thumbnail_cache_path, 'rb') as f:
-                img_data = f.read()
-                return image_to_base64(img_data)
-        
-        # Create thumbnails directory if it doesn't exist
-        os.makedirs("thumbnails", exist_ok=True)
-        
-        # Convert first page of PDF to image
-        if os.path.exists(file_path):
-            pages = convert_from_path(file_path, first_page=1, last_page=1, dpi=150)
-        else:
-            return None
-            
-        if not pages:
-            return None
-            
-        # Get first page
-        page = pages[0]
-        
-        # Resize to thumbnail size (120x150 - 3x the original 40x50)
-        thumbnail_size = (120, 150)
-        page.thumbnail(thumbnail_size, Image.Resampling.LANCZOS)
-        
-        # Create new image with white background
-        thumbnail = Image.new('RGB', thumbnail_size, 'white')
-        
-        # Calculate position to center the image
-        x = (thumbnail_size[0] - page.width) // 2
-        y = (thumbnail_size[1] - page.height) // 2
-        
-        # Paste the page onto the white background
-        thumbnail.paste(page, (x, y))
-        
-        # Save to cache
-        thumbnail.save(thumbnail_cache_path, 'PNG', optimize=True)
-        
-        # Convert to base64
-        buffer = BytesIO()
-        thumbnail.save(buffer, format='PNG')
-        img_data = buffer.getvalue()
-        
-        return image_to_base64(img_data)
-        
+        return get_thumbnail_service().thumbnail_for_file(file_path, alias=f"doc:{doc_id}")
     except Exception as e:
         print(f"Error generating PDF thumbnail: {e}")
         return None
@@ -83,57 +34,22 @@ def generate_pdf_thumbnail_from_bytes(pdf_bytes, doc_id):
         doc_id: Document ID for caching
         
     Returns:
-        Base64 encoded thumbnail image or None if failed
+        URL of the served thumbnail image or None if failed
     """
     try:
-        # Check if thumbnail already exists in cache
-        thumbnail_cache_path = f"thumbnails/thumb_{doc_id}.png"
-        
-        if os.path.exists(thumbnail_cache_path):
-            with open(thumbnail_cache_path, 'rb') as f:
-                img_data = f.read()
-                return image_to_base64(img_data)
-        
-        # Create thumbnails directory if it doesn't exist
-        os.makedirs("thumbnails", exist_ok=True)
-        
-        # Convert first page of PDF to image
-        pages = convert_from_bytes(pdf_bytes, first_page=1, last_page=1, dpi=150)
-            
-        if not pages:
-            return None
-            
-        # Get first page
-        page = pages[0]
-        
-        # Resize to thumbnail size (120x150 - 3x the original 40x50)
-        thumbnail_size = (120, 150)
-        page.thumbnail(thumbnail_size, Image.Resampling.LANCZOS)
-        
-        # Create new image with white background
-        thumbnail = Image.new('RGB', thumbnail_size, 'white')
-        
-        # Calculate position to center the image
-        x = (thumbnail_size[0] - page.width) // 2
-        y = (thumbnail_size[1] - page.height) // 2
-        
-        # Paste the page onto the white background
-        thumbnail.paste(page, (x, y))
-        
-        # Save to cache
-        thumbnail.save(thumbnail_cache_path, 'PNG', optimize=True)
-        
-        # Convert to base64
-        buffer = BytesIO()
-        thumbnail.save(buffer, format='PNG')
-        img_data = buffer.getvalue()
-        
-        return image_to_base64(img_data)
-        
+        return get_thumbnail_service().thumbnail_for_pdf(pdf_bytes, alias=f"doc:{doc_id}")
     except Exception as e:
         print(f"Error generating PDF thumbnail from bytes: {e}")
         return None
 
+def get_document_thumbnail_url(doc_id):
+    """URL of a rendered thumbnail for the document, adopting one from the old thumbnails/ cache if present"""
+    service = get_thumbnail_service()
+    url = service.url_for_alias(f"doc:{doc_id}")
+    if url is None and os.path.exists(f"thumbnails/thumb_{doc_id}.png"):
+        url = service.import_image(f"thumbnails/thumb_{doc_id}.png", f"doc:{doc_id}")
+    return url
+
 def image_to_base64(img_data):
     """Convert image bytes to base64 data URL"""
     img_b64 = base64.b64encode(img_data).decode('utf-8')
@@ -348,12 +264,8 @@ def get_thumbnail_html(doc_title, doc_type, organization, doc_id=None, file_path
     
     # Special case: Use real PDF thumbnail only for NIST document (ID 18)
     if doc_id == 18 and organization and 'NIST' in organization.upper():
-        thumbnail_cache_path = f"thumbnails/thumb_{doc_id}.png"
-        if os.path.exists(thumbnail_cache_path):
-            with open(thumbnail_cache_path, 'rb') as f:
-                img_data = f.read()
-                thumbnail_data = image_to_base64(img_data)
-        else:
+        thumbnail_data = get_document_thumbnail_url(doc_id)
+        if not thumbnail_data:
             # Generate PDF thumbnail for NIST document
             pdf_path = find_pdf_in_assets(doc_title, organization)
             if pdf_path:
@@ -364,17 +276,14 @@ def get_thumbnail_html(doc_title, doc_type, organization, doc_id=None, file_path
         thumbnail_data = generate_thumbnail_svg(doc_title, doc_type, organization)
     
     # 3x size: 120x150 instead of 40x50
-    return f'<img src="{thumbnail_data}" style="width:120px;height:150px;margin-right:8px;border-radius:2px;box-shadow:0 1px 3px rgba(0,0,0,0.2);" alt="Document thumbnail">'
+    return thumbnail_img_html(thumbnail_data)
 
 def find_pdf_in_assets(doc_title, organization):
     """Find corresponding PDF file in attached_assets directory"""
-    assets_dir = "attached_assets"
+    assets_dir = ASSETS_DIR
     
-    if not os.path.exists(assets_dir):
-        return None
-        
-    # Get all PDF files in the directory
-    pdf_files = [f for f in os.listdir(assets_dir) if f.lower().endswith('.pdf')]
+    # Cached listing; the directory is only re-read when it changes
+    pdf_files = get_thumbnail_service().asset_pdfs(assets_dir)
     
     if not pdf_files:
         return None
@@ -0,0 +1,269 @@
+"""
+Thumbnail Service for GUARDIAN
+Renders each PDF's first page once, straight at thumbnail size, into a compact
+WebP (or PNG) file keyed by content hash and served by URL instead of inline base64
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from io import BytesIO
+from typing import Dict, List, Optional, Union
+
+from PIL import Image, features
+
+from utils.data_dir import data_path
+
+THUMBNAIL_SIZE = (120, 150)
+
+# Served by Streamlit's static file server (server.enableStaticServing), which
+# exposes ./static at app/static
+THUMBNAIL_DIR = os.getenv('GUARDIAN_THUMBNAIL_DIR', 'static/thumbnails')
+THUMBNAIL_URL_PREFIX = os.getenv('GUARDIAN_THUMBNAIL_URL', 'app/static/thumbnails')
+
+WEBP_QUALITY = 80
+ASSETS_DIR = "attached_assets"
+
+PdfSource = Union[bytes, str]
+
+def _image_format() -> str:
+    return 'webp' if features.check('webp') else 'png'
+
+class ThumbnailService:
+    """
+    Content-addressed thumbnail files plus a SQLite manifest.
+
+    The manifest maps content hashes to rendered files and aliases (a document
+    id, an ingestion id, a file path with its size and mtime) to content
+    hashes, so lookups never scan directories or re-hash PDFs. Resolved URLs
+    are also kept in memory; a content hash always names the same image.
+    """
+
+    def __init__(self, directory: str = THUMBNAIL_DIR, url_prefix: str = THUMBNAIL_URL_PREFIX,
+                 manifest_path: Optional[str] = None):
+        self.directory = directory
+        self.url_prefix = url_prefix.rstrip('/')
+        # Kept in the data directory, outside the served one
+        self.manifest_path = (manifest_path or os.getenv('GUARDIAN_THUMBNAIL_MANIFEST')
+                              or data_path('thumbnail_manifest.db'))
+        self.format = _image_format()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._urls: Dict[str, str] = {}
+        self._aliases: Dict[str, str] = {}
+        self._assets = (None, [])
+        self.init_db()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.manifest_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def init_db(self):
+        """Initialize manifest tables"""
+        conn = self._connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS thumbnails (
+                content_hash TEXT PRIMARY KEY,
+                file TEXT NOT NULL,
+                format TEXT NOT NULL,
+                bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS thumbnail_aliases (
+                alias TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL
+            )
+        ''')
+        conn.commit()
+
+    # ---- lookups -----------------------------------------------------------
+
+    def url(self, file_name: str) -> str:
+        return f"{self.url_prefix}/{file_name}"
+
+    def url_for_hash(self, content_hash: str) -> Optional[str]:
+        """URL of an already rendered thumbnail"""
+        cached = self._urls.get(content_hash)
+        if cached:
+            return cached
+        row = self._connection().execute(
+            'SELECT file FROM thumbnails WHERE content_hash = ?', (content_hash,)
+        ).fetchone()
+        if not row or not os.path.exists(os.path.join(self.directory, row[0])):
+            return None
+        self._urls[content_hash] = self.url(row[0])
+        return self._urls[content_hash]
+
+    def hash_for_alias(self, alias: str) -> Optional[str]:
+        cached = self._aliases.get(alias)
+        if cached:
+            return cached
+        row = self._connection().execute(
+            'SELECT content_hash FROM thumbnail_aliases WHERE alias = ?', (alias,)
+        ).fetchone()
+        if row:
+            self._aliases[alias] = row[0]
+        return row[0] if row else None
+
+    def url_for_alias(self, alias: str) -> Optional[str]:
+        """URL of the thumbnail registered under an alias such as 'doc:18'"""
+        content_hash = self.hash_for_alias(alias)
+        return self.url_for_hash(content_hash) if content_hash else None
+
+    def register_alias(self, alias: str, content_hash: str):
+        conn = self._connection()
+        conn.execute('INSERT OR REPLACE INTO thumbnail_aliases (alias, content_hash) VALUES (?, ?)',
+                     (alias, content_hash))
+        conn.commit()
+        self._aliases[alias] = content_hash
+
+    # ---- rendering ---------------------------------------------------------
+
+    @staticmethod
+    def _render(source: PdfSource) -> Optional[Image.Image]:
+        """First page rasterised at thumbnail height rather than at full DPI"""
+        from pdf2image import convert_from_bytes, convert_from_path
+        options = {'first_page': 1, 'last_page': 1, 'size': (None, THUMBNAIL_SIZE[1]), 'single_file': True}
+        if isinstance(source, (bytes, bytearray)):
+            pages = convert_from_bytes(source, **options)
+        elif os.path.exists(source):
+            pages = convert_from_path(source, **options)
+        else:
+            return None
+        return pages[0] if pages else None
+
+    @staticmethod
+    def _fit(page: Image.Image) -> Image.Image:
+        """Centre the page on a white THUMBNAIL_SIZE canvas (landscape pages are shrunk to fit)"""
+        page.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+        canvas = Image.new('RGB', THUMBNAIL_SIZE, 'white')
+        canvas.paste(page, ((THUMBNAIL_SIZE[0] - page.width) // 2, (THUMBNAIL_SIZE[1] - page.height) // 2))
+        return canvas
+
+    def store_image(self, image: Image.Image, content_hash: str) -> str:
+        """Encode once, write atomically and record in the manifest; returns the URL"""
+        buffer = BytesIO()
+        if self.format == 'webp':
+            image.save(buffer, format='WEBP', quality=WEBP_QUALITY, method=6)
+        else:
+            image.save(buffer, format='PNG', optimize=True)
+        data = buffer.getvalue()
+
+        file_name = f"{content_hash[:32]}.{self.format}"
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, file_name)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        conn = self._connection()
+        conn.execute('''
+            INSERT OR REPLACE INTO thumbnails (content_hash, file, format, bytes, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (content_hash, file_name, self.format, len(data), time.time()))
+        conn.commit()
+        self._urls[content_hash] = self.url(file_name)
+        return self._urls[content_hash]
+
+    def thumbnail_for_pdf(self, source: PdfSource, alias: Optional[str] = None,
+                          content_hash: Optional[str] = None) -> Optional[str]:
+        """URL of the PDF's first-page thumbnail, rendering it only if this content was never seen"""
+        if alias:
+            cached = self.url_for_alias(alias)
+            if cached:
+                return cached
+
+        if content_hash is None:
+            from utils.pdf_text_extractor import pdf_content_hash
+            if not isinstance(source, (bytes, bytearray)) and not os.path.exists(source):
+                return None
+            content_hash = pdf_content_hash(source)
+
+        url = self.url_for_hash(content_hash)
+        if url is None:
+            try:
+                page = self._render(source)
+            except Exception as e:
+                print(f"Error rendering PDF thumbnail: {e}")
+                return None
+            if page is None:
+                return None
+            url = self.store_image(self._fit(page), content_hash)
+
+        if alias:
+            self.register_alias(alias, content_hash)
+        return url
+
+    def thumbnail_for_file(self, file_path: str, alias: Optional[str] = None) -> Optional[str]:
+        """Like thumbnail_for_pdf, but a file is only hashed again when its size or mtime changes"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        file_alias = f"file:{os.path.abspath(file_path)}:{stat.st_size}:{int(stat.st_mtime)}"
+        url = self.thumbnail_for_pdf(file_path, file_alias)
+        if url and alias:
+            self.register_alias(alias, self.hash_for_alias(file_alias))
+        return url
+
+    def import_image(self, image_path: str, alias: str) -> Optional[str]:
+        """Adopt a thumbnail rendered by the old pipeline (thumbnails/*.png) under an alias"""
+        try:
+            with open(image_path, 'rb') as f:
+                data = f.read()
+            content_hash = hashlib.sha256(data).hexdigest()
+            url = self.url_for_hash(content_hash)
+            if url is None:
+                with Image.open(BytesIO(data)) as image:
+                    url = self.store_image(image.convert('RGB'), content_hash)
+            self.register_alias(alias, content_hash)
+            return url
+        except Exception as e:
+            print(f"Error importing thumbnail {image_path}: {e}")
+            return None
+
+    # ---- attached assets ---------------------------------------------------
+
+    def asset_pdfs(self, assets_dir: str = ASSETS_DIR) -> List[str]:
+        """PDF file names in the assets directory, re-listed only when the directory changes"""
+        try:
+            mtime = os.stat(assets_dir).st_mtime
+        except OSError:
+            return []
+        with self._lock:
+            if self._assets[0] != (assets_dir, mtime):
+                files = sorted(f for f in os.listdir(assets_dir) if f.lower().endswith('.pdf'))
+                self._assets = ((assets_dir, mtime), files)
+            return self._assets[1]
+
+    def get_stats(self) -> Dict:
+        row = self._connection().execute('SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM thumbnails').fetchone()
+        aliases = self._connection().execute('SELECT COUNT(*) FROM thumbnail_aliases').fetchone()[0]
+        return {'thumbnails': row[0], 'bytes': row[1], 'aliases': aliases, 'format': self.format}
+
+def thumbnail_img_html(src: str) -> str:
+    """Card thumbnail tag; src is a served URL (or an SVG data URL for generated covers)"""
+    return (f'<img src="{src}" loading="lazy" decoding="async" width="120" height="150" '
+            f'style="width:120px;height:150px;margin-right:8px;border-radius:2px;'
+            f'box-shadow:0 1px 3px rgba(0,0,0,0.2);" alt="Document thumbnail">')
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_thumbnail_service() -> ThumbnailService:
+    """Process-wide thumbnail service"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = ThumbnailService()
+    return _service
@@ -5,137 +5,357 @@ Validates that URLs are accessible and return valid content before making them c
 
 import requests
 import logging
-from typing import Dict, Optional, Tuple
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
 import time
 from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
 import psycopg2
+from psycopg2.extras import execute_values
 import os
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How long a stored check stays fresh before the URL is validated again
+VALID_TTL_HOURS = 7 * 24
+BROKEN_TTL_HOURS = 24
+TRANSIENT_TTL_HOURS = 1  # timeouts, connection failures and 5xx responses
+
+MAX_WORKERS = 16
+MAX_CONNECTIONS_PER_HOST = 2
+# Hosts whose connection pools the shared session keeps open
+HOST_POOLS = 64
+
+class HostScheduler:
+    """
+    Per-host queues of URLs drained by a shared worker pool.
+
+    A URL is handed out only when its host has a free connection slot and
+    the host's request spacing has elapsed, so workers never sit waiting on
+    a busy host while other hosts have URLs ready.
+    """
+
+    def __init__(self, urls: List[str], max_connections: int = MAX_CONNECTIONS_PER_HOST, delay: float = 0.5):
+        self.max_connections = max_connections
+        self.delay = max(delay, 0.0)
+        self._queues = {}
+        for url in urls:
+            self._queues.setdefault(self._host(url), deque()).append(url)
+        self._in_flight = {host: 0 for host in self._queues}
+        self._next_request = {host: 0.0 for host in self._queues}
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _ready(self, host: str, now: float) -> bool:
+        return (self._queues[host] and self._in_flight[host] < self.max_connections
+                and self._next_request[host] <= now)
+
+    def take(self, limit: int) -> List[str]:
+        """Up to ``limit`` URLs whose hosts may be requested now, round-robin across hosts"""
+        taken = []
+        now = time.monotonic()
+        while len(taken) < limit:
+            ready = [host for host in self._queues if self._ready(host, now)]
+            if not ready:
+                break
+            for host in ready[:limit - len(taken)]:
+                taken.append(self._queues[host].popleft())
+                self._in_flight[host] += 1
+                self._next_request[host] = now + self.delay
+        return taken
+
+    def release(self, url: str):
+        """Free the host's connection slot once a check has finished"""
+        self._in_flight[self._host(url)] -= 1
+
+    def wait_time(self) -> Optional[float]:
+        """Seconds until a queued URL's host can be requested again (None if all are waiting on a slot)"""
+        now = time.monotonic()
+        waits = [self._next_request[host] - now for host, queue in self._queues.items()
+                 if queue and self._in_flight[host] < self.max_connections]
+        return max(min(waits), 0.0) if waits else None
+
+def _shared_session() -> requests.Session:
+    """One pooled session shared by every worker; connections are kept per host"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HOST_POOLS, pool_maxsize=MAX_CONNECTIONS_PER_HOST)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    })
+    return session
+
 class URLValidator:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.session = _shared_session()
         self.timeout = 10
         self.verified_urls = set()
         self.broken_urls = set()
-        
+        # url -> stored validators (etag, last_modified, redirect) for conditional requests
+        self.conditional_headers = {}
+        self._cache_lock = threading.Lock()
+        self._table_ready = False
+
     def validate_url(self, url: str) -> Tuple[bool, str, Optional[str]]:
         """
         Validate a single URL
         Returns: (is_valid, status_message, redirect_url)
         """
+        result = self.check_url(url)
+        return result['valid'], result['status'], result['redirect']
+
+    def check_url(self, url: str) -> Dict:
+        """
+        Validate a single URL, returning the full check: valid, status, redirect,
+        http_status, etag, last_modified and ttl_hours (how long it stays fresh)
+        """
+        result = {'valid': False, 'status': '', 'redirect': None, 'http_status': None,
+                  'etag': None, 'last_modified': None, 'ttl_hours': BROKEN_TTL_HOURS}
+
         if not url or not url.strip():
-            return False, "Empty URL", None
+            return dict(result, status="Empty URL")
             
         url = url.strip()
         
         # Check cache first
         if url in self.verified_urls:
-            return True, "Previously verified", None
+            return dict(result, valid=True, status="Previously verified", ttl_hours=VALID_TTL_HOURS)
         if url in self.broken_urls:
-            return False, "Previously failed", None
+            return dict(result, status="Previously failed")
             
         try:
             # Parse URL to ensure it's valid
             parsed = urlparse(url)
             if not parsed.scheme or not parsed.netloc:
-                return False, "Invalid URL format", None
+                return dict(result, status="Invalid URL format")
                 
             logger.info(f"Validating URL: {url}")
             
+            # Conditional request: an unchanged resource answers 304 without a body
+            stored = self.conditional_headers.get(url, {})
+            headers = {}
+            if stored.get('etag'):
+                headers['If-None-Match'] = stored['etag']
+            if stored.get('last_modified'):
+                headers['If-Modified-Since'] = stored['last_modified']
+            
             # Make HEAD request first (faster)
             try:
-                response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+                response = self.session.head(url, timeout=self.timeout, allow_redirects=True, headers=headers)
                 status_code = response.status_code
                 final_url = response.url
                 
                 # If HEAD is not allowed, try GET
                 if status_code == 405:
-                    response = self.session.get(url, timeout=self.timeout, allow_redirects=True, stream=True)
+                    response = self.session.get(url, timeout=self.timeout, allow_redirects=True, stream=True, headers=headers)
                     status_code = response.status_code
                     final_url = response.url
                     response.close()  # Close stream immediately
                     
             except requests.exceptions.RequestException:
                 # If HEAD fails, try GET
-                response = self.session.get(url, timeout=self.timeout, allow_redirects=True, stream=True)
+                response = self.session.get(url, timeout=self.timeout, allow_redirects=True, stream=True, headers=headers)
                 status_code = response.status_code
                 final_url = response.url
                 response.close()
+            
+            result.update(http_status=status_code,
+                          etag=response.headers.get('ETag') or stored.get('etag'),
+                          last_modified=response.headers.get('Last-Modified') or stored.get('last_modified'))
                 
             # Check if URL is accessible
-            if 200 <= status_code < 400:
-                self.verified_urls.add(url)
+            if status_code == 304:
+                with self._cache_lock:
+                    self.verified_urls.add(url)
+                return dict(result, valid=True, status="Valid (not modified)", redirect=stored.get('redirect'),
+                            ttl_hours=VALID_TTL_HOURS)
+            
+            elif 200 <= status_code < 400:
+                with self._cache_lock:
+                    self.verified_urls.add(url)
                 if final_url != url:
                     logger.info(f"URL redirected: {url} -> {final_url}")
-                    return True, f"Valid (redirected to {final_url})", final_url
+                    return dict(result, valid=True, status=f"Valid (redirected to {final_url})", redirect=final_url,
+                                ttl_hours=VALID_TTL_HOURS)
                 else:
-                    return True, "Valid", None
+                    return dict(result, valid=True, status="Valid", ttl_hours=VALID_TTL_HOURS)
                     
             elif status_code == 404:
-                self.broken_urls.add(url)
-                return False, "Resource not found (404)", None
+                with self._cache_lock:
+                    self.broken_urls.add(url)
+                return dict(result, status="Resource not found (404)")
                 
             elif status_code == 403:
-                self.broken_urls.add(url)
-                return False, "Access forbidden (403)", None
+                with self._cache_lock:
+                    self.broken_urls.add(url)
+                return dict(result, status="Access forbidden (403)")
                 
             elif status_code >= 500:
-                return False, f"Server error ({status_code})", None
+                return dict(result, status=f"Server error ({status_code})", ttl_hours=TRANSIENT_TTL_HOURS)
                 
             else:
-                self.broken_urls.add(url)
-                return False, f"HTTP {status_code}", None
+                with self._cache_lock:
+                    self.broken_urls.add(url)
+                return dict(result, status=f"HTTP {status_code}")
                 
         except requests.exceptions.Timeout:
-            return False, "Request timeout", None
+            return dict(result, status="Request timeout", ttl_hours=TRANSIENT_TTL_HOURS)
             
         except requests.exceptions.ConnectionError:
-            return False, "Connection failed", None
+            return dict(result, status="Connection failed", ttl_hours=TRANSIENT_TTL_HOURS)
             
         except requests.exceptions.RequestException as e:
-            return False, f"Request error: {str(e)}", None
+            return dict(result, status=f"Request error: {str(e)}", ttl_hours=TRANSIENT_TTL_HOURS)
             
         except Exception as e:
             logger.error(f"Unexpected error validating {url}: {e}")
-            return False, f"Validation error: {str(e)}", None
+            return dict(result, status=f"Validation error: {str(e)}", ttl_hours=TRANSIENT_TTL_HOURS)
+    
+    def _connect(self):
+        """Database connection with the url_checks table in place"""
+        conn = psycopg2.connect(os.environ.get('DATABASE_URL'))
+        if not self._table_ready:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS url_checks (
+                        url TEXT PRIMARY KEY,
+                        is_valid BOOLEAN NOT NULL,
+                        status TEXT,
+                        redirect_url TEXT,
+                        http_status INTEGER,
+                        etag TEXT,
+                        last_modified TEXT,
+                        checked_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        expires_at TIMESTAMP NOT NULL
+                    )
+                """)
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_url_checks_expires_at ON url_checks(expires_at)")
+            conn.commit()
+            self._table_ready = True
+        return conn
+    
+    def load_stored_checks(self, urls: List[str]) -> Dict[str, Dict]:
+        """
+        Stored checks for the given URLs that have not expired yet. Expired
+        checks still provide their ETag/Last-Modified for conditional requests.
+        """
+        fresh = {}
+        try:
+            conn = self._connect()
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT url, is_valid, status, redirect_url, etag, last_modified, expires_at > CURRENT_TIMESTAMP
+                    FROM url_checks
+                    WHERE url = ANY(%s)
+                """, (list(urls),))
+                for url, is_valid, status, redirect, etag, last_modified, is_fresh in cursor.fetchall():
+                    if is_valid:
+                        self.conditional_headers[url] = {'etag': etag, 'last_modified': last_modified,
+                                                         'redirect': redirect}
+                    if is_fresh:
+                        fresh[url] = {'valid': is_valid, 'status': status, 'redirect': redirect, 'cached': True}
+            conn.close()
+        except Exception as e:
+            logger.warning(f"Could not read stored URL checks: {e}")
+        return fresh
+    
+    def store_checks(self, checks: Dict[str, Dict]):
+        """Upsert check results into url_checks, each with its own expiry"""
+        if not checks:
+            return
+        try:
+            conn = self._connect()
+            with conn.cursor() as cursor:
+                execute_values(cursor, """
+                    INSERT INTO url_checks (url, is_valid, status, redirect_url, http_status, etag,
+                                            last_modified, checked_at, expires_at)
+                    VALUES %s
+                    ON CONFLICT (url) DO UPDATE
+                    SET is_valid = EXCLUDED.is_valid,
+                        status = EXCLUDED.status,
+                        redirect_url = EXCLUDED.redirect_url,
+                        http_status = EXCLUDED.http_status,
+                        etag = EXCLUDED.etag,
+                        last_modified = EXCLUDED.last_modified,
+                        checked_at = EXCLUDED.checked_at,
+                        expires_at = EXCLUDED.expires_at
+                """, [(url, c['valid'], c['status'], c['redirect'], c['http_status'], c['etag'], c['last_modified'],
+                       c['ttl_hours']) for url, c in checks.items()],
+                    template="(%s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP, "
+                             "CURRENT_TIMESTAMP + %s * INTERVAL '1 hour')")
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.warning(f"Could not store URL checks: {e}")
             
-    def validate_batch(self, urls: list, delay: float = 0.5) -> Dict[str, Dict]:
+    def validate_batch(self, urls: list, delay: float = 0.5, force: bool = False,
+                       progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, Dict]:
         """
-        Validate multiple URLs with rate limiting
+        Validate multiple URLs concurrently with per-host rate limiting
+        delay: minimum seconds between requests to the same host
+        force: re-check URLs even if a stored check is still fresh
         Returns: {url: {'valid': bool, 'status': str, 'redirect': str}}
         """
-        results = {}
+        unique_urls = list(dict.fromkeys(url.strip() for url in urls if url and url.strip()))
+        stored = self.load_stored_checks(unique_urls)
+        results = {} if force else stored
         
-        for i, url in enumerate(urls):
-            if url:
-                is_valid, status, redirect = self.validate_url(url)
-                results[url] = {
-                    'valid': is_valid,
-                    'status': status,
-                    'redirect': redirect
-                }
+        pending = [url for url in unique_urls if url not in results]
+        logger.info(f"Validating {len(pending)} URLs ({len(results)} fresh stored checks skipped)")
+        
+        scheduler = HostScheduler(pending, delay=delay)
+        checks = {}
+        done = len(results)
+        if progress_callback:
+            progress_callback(done, len(unique_urls))
+        
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = {}
+            while scheduler.queued or futures:
+                # Only URLs whose host is free are submitted, so no worker blocks on a busy host
+                for url in scheduler.take(MAX_WORKERS - len(futures)):
+                    futures[executor.submit(self.check_url, url)] = url
                 
-                # Rate limiting
-                if i < len(urls) - 1:
-                    time.sleep(delay)
-                    
-            logger.info(f"Validated {i+1}/{len(urls)} URLs")
-            
+                timeout = scheduler.wait_time() if scheduler.queued else None
+                if not futures:
+                    time.sleep(timeout or 0)
+                    continue
+                finished, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    url = futures.pop(future)
+                    scheduler.release(url)
+                    checks[url] = future.result()
+                    results[url] = {
+                        'valid': checks[url]['valid'],
+                        'status': checks[url]['status'],
+                        'redirect': checks[url]['redirect']
+                    }
+                    done += 1
+                    if progress_callback:
+                        progress_callback(done, len(unique_urls))
+        
+        self.store_checks(checks)
+        logger.info(f"Validated {len(unique_urls)} URLs")
+        
         return results
         
-    def update_database_url_status(self):
+    def update_database_url_status(self, force: bool = False):
         """
         Validate all URLs in the database and update their status
         """
         try:
             # Connect to database
-            conn = psycopg2.connect(os.environ.get('DATABASE_URL'))
+            conn = self._connect()
             cursor = conn.cursor()
             
             # Get all documents with source URLs
@@ -151,42 +371,23 @@ class URLValidator:
             documents = cursor.fetchall()
             logger.info(f"Found {len(documents)} documents with URLs to validate")
             
-            validation_results = []
+            checks = self.validate_batch([source_url for _, _, source_url in documents], force=force)
             
+            validation_results = []
             for doc_id, title, source_url in documents:
-                logger.info(f"Validating: {title[:50]}... -> {source_url}")
-                
-                is_valid, status, redirect = self.validate_url(source_url)
-                
+                check = checks.get(source_url.strip(), {'valid': False, 'status': 'Empty URL', 'redirect': None})
                 validation_results.append({
                     'id': doc_id,
                     'title': title,
                     'url': source_url,
-                    'valid': is_valid,
-                    'status': status,
-                    'redirect': redirect
+                    'valid': check['valid'],
+                    'status': check['status'],
+                    'redirect': check['redirect']
                 })
-                
-                # Update database with validation status
-                cursor.execute("""
-                    UPDATE documents 
-                    SET url_valid = %s, 
-                        url_status = %s,
-                        url_checked = CURRENT_TIMESTAMP
-                    WHERE id = %s
-                """, (is_valid, status, doc_id))
-                
-                # If URL redirected, optionally update with final URL
-                if redirect and redirect != source_url:
-                    logger.info(f"URL redirected for {title}: {source_url} -> {redirect}")
-                    cursor.execute("""
-                        UPDATE documents 
-                        SET source_redirect = %s
-                        WHERE id = %s
-                    """, (redirect, doc_id))
-                
+            
+            if validation_results:
+                write_document_url_status(cursor, validation_results)
                 conn.commit()
-                time.sleep(0.5)  # Rate limiting
                 
             cursor.close()
             conn.close()
@@ -210,6 +411,34 @@ class URLValidator:
             logger.error(f"Database validation error: {e}")
             return []
 
+def write_document_url_status(cursor, validation_results: List[Dict]):
+    """
+    Write validation results ({'id', 'url', 'valid', 'status', 'redirect'}) to
+    documents in one statement; redirects only overwrite when present
+    """
+    execute_values(cursor, """
+        UPDATE documents AS d
+        SET url_valid = v.valid,
+            url_status = v.status,
+            url_checked = CURRENT_TIMESTAMP,
+            source_redirect = COALESCE(v.redirect, d.source_redirect)
+        FROM (VALUES %s) AS v(id, valid, status, redirect)
+        WHERE d.id = v.id
+    """, [(r['id'], r['valid'], r['status'],
+           r['redirect'] if r['redirect'] != r['url'] else None) for r in validation_results],
+        template="(%s, %s::boolean, %s::text, %s::text)")
+
+def clear_url_checks():
+    """Forget every stored URL check so the next run validates all URLs again"""
+    try:
+        conn = URLValidator()._connect()
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM url_checks")
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        logger.warning(f"Could not clear URL checks: {e}")
+
 def validate_single_url(url: str) -> Tuple[bool, str]:
     """
     Quick validation for a single URL
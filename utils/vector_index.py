@@ -0,0 +1,238 @@
+"""
+Persisted Sparse Vector Index for GUARDIAN
+TF-IDF document vectors stored as memory-mappable arrays, updated incrementally
+as documents are added or changed, with vectorized top-k similarity search
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever tokenization or weighting changes so persisted indexes are rebuilt
+INDEX_VERSION = "1"
+N_FEATURES = 2 ** 18
+
+# Stored rows are weighted with the IDF of the moment they were added; once the
+# corpus has grown or shrunk by this fraction every row is re-weighted from its
+# stored term frequencies (no re-tokenization)
+REWEIGHT_DRIFT = 0.2
+
+# Text that is vectorized and its hash, computed in PostgreSQL so unchanged
+# documents are never read
+VECTOR_TEXT_SQL = "COALESCE(title, '') || ' ' || COALESCE(content, '') || ' ' || LEFT(COALESCE(text_content, ''), 1000)"
+VECTOR_HASH_SQL = f"md5({VECTOR_TEXT_SQL})"
+
+_ARRAYS = ('indptr', 'indices', 'tf', 'weights', 'ids', 'hashes', 'doc_freq')
+
+class SparseVectorIndex:
+    """
+    TF-IDF vectors for every document, kept as CSR arrays on disk.
+
+    Terms are hashed (no fitted vocabulary), so new or changed documents are
+    vectorized on their own and appended; document frequencies are updated
+    in place. Replaced and deleted rows are tombstoned and dropped when the
+    index is saved. ``row_of`` maps document ids to matrix rows.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('GUARDIAN_VECTOR_INDEX', 'recommendation_index')
+        self.vectorizer = HashingVectorizer(
+            n_features=N_FEATURES,
+            stop_words='english',
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm=None
+        )
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.tf = sparse.csr_matrix((0, N_FEATURES), dtype=np.float32)
+        self.weights = sparse.csr_matrix((0, N_FEATURES), dtype=np.float32)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.hashes = np.empty(0, dtype='S32')
+        self.live = np.empty(0, dtype=bool)
+        self.doc_freq = np.zeros(N_FEATURES, dtype=np.int32)
+        self.weighted_count = 0
+        self.row_of = {}
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    # ---- persistence -------------------------------------------------------
+
+    def load(self) -> bool:
+        """Memory-map a saved index; False (and an empty index) if none is usable"""
+        meta_path = os.path.join(self.path, 'meta.json')
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get('version') != INDEX_VERSION or meta.get('n_features') != N_FEATURES:
+                logger.info("Vector index format changed; rebuilding")
+                return False
+
+            arrays = {name: np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r') for name in _ARRAYS}
+        except (OSError, ValueError) as e:
+            logger.info(f"No usable vector index at {self.path}: {e}")
+            return False
+
+        with self._lock:
+            shape = (len(arrays['ids']), N_FEATURES)
+            self.tf = sparse.csr_matrix((arrays['tf'], arrays['indices'], arrays['indptr']), shape=shape, copy=False)
+            self.weights = sparse.csr_matrix((arrays['weights'], arrays['indices'], arrays['indptr']), shape=shape,
+                                             copy=False)
+            self.ids = arrays['ids']
+            self.hashes = arrays['hashes']
+            self.doc_freq = np.array(arrays['doc_freq'])
+            self.live = np.ones(len(self.ids), dtype=bool)
+            self.weighted_count = meta.get('weighted_count', len(self.ids))
+            self.row_of = {int(doc_id): row for row, doc_id in enumerate(self.ids.tolist())}
+        return True
+
+    def save(self):
+        """Drop tombstoned rows and write the arrays (each replaced atomically)"""
+        with self._lock:
+            self._compact()
+            os.makedirs(self.path, exist_ok=True)
+            arrays = {
+                'indptr': self.tf.indptr,
+                'indices': self.tf.indices,
+                'tf': self.tf.data,
+                'weights': self.weights.data,
+                'ids': self.ids,
+                'hashes': self.hashes,
+                'doc_freq': self.doc_freq
+            }
+            for name, array in arrays.items():
+                tmp_path = os.path.join(self.path, f'{name}.tmp.npy')
+                np.save(tmp_path, np.ascontiguousarray(array))
+                os.replace(tmp_path, os.path.join(self.path, f'{name}.npy'))
+
+            meta = {'version': INDEX_VERSION, 'n_features': N_FEATURES, 'weighted_count': self.weighted_count,
+                    'documents': len(self.ids)}
+            with open(os.path.join(self.path, 'meta.json'), 'w') as f:
+                json.dump(meta, f)
+
+    def _compact(self):
+        if self.live.all():
+            return
+        keep = np.flatnonzero(self.live)
+        self.tf = self.tf[keep]
+        self.weights = self.weights[keep]
+        self.ids = np.asarray(self.ids)[keep]
+        self.hashes = np.asarray(self.hashes)[keep]
+        self.live = np.ones(len(keep), dtype=bool)
+        self.row_of = {int(doc_id): row for row, doc_id in enumerate(self.ids.tolist())}
+
+    # ---- updates -----------------------------------------------------------
+
+    def _idf(self) -> np.ndarray:
+        count = len(self.row_of)
+        return (np.log((1 + count) / (1 + self.doc_freq)) + 1).astype(np.float32)
+
+    def _weigh(self, tf: sparse.csr_matrix) -> sparse.csr_matrix:
+        weighted = tf.multiply(self._idf()).tocsr().astype(np.float32)
+        return normalize(weighted, norm='l2', copy=False)
+
+    def _remove_rows(self, rows: List[int]):
+        for row in rows:
+            start, end = self.tf.indptr[row], self.tf.indptr[row + 1]
+            np.subtract.at(self.doc_freq, self.tf.indices[start:end], 1)
+            self.live[row] = False
+            del self.row_of[int(self.ids[row])]
+
+    def remove(self, doc_ids: Iterable[int]):
+        """Tombstone documents; their rows are dropped on the next save"""
+        with self._lock:
+            self._remove_rows([self.row_of[doc_id] for doc_id in doc_ids if doc_id in self.row_of])
+
+    def add(self, documents: List[Tuple[int, str, str]]):
+        """
+        Add or replace documents given as (id, text, content_hash) without
+        refitting: only the new texts are vectorized.
+        """
+        if not documents:
+            return
+        texts = [(text or "").lower() for _, text, _ in documents]
+        tf = self.vectorizer.transform(texts).astype(np.float32).tocsr()
+        tf.sum_duplicates()
+
+        with self._lock:
+            self._remove_rows([self.row_of[doc_id] for doc_id, _, _ in documents if doc_id in self.row_of])
+            np.add.at(self.doc_freq, tf.indices, 1)
+
+            first_row = len(self.ids)
+            self.tf = sparse.vstack([self.tf, tf], format='csr')
+            self.ids = np.concatenate([self.ids, np.array([doc_id for doc_id, _, _ in documents], dtype=np.int64)])
+            self.hashes = np.concatenate([self.hashes, np.array([h for _, _, h in documents], dtype='S32')])
+            self.live = np.concatenate([self.live, np.ones(len(documents), dtype=bool)])
+            for offset, (doc_id, _, _) in enumerate(documents):
+                self.row_of[doc_id] = first_row + offset
+
+            count = len(self.row_of)
+            if abs(count - self.weighted_count) > REWEIGHT_DRIFT * max(self.weighted_count, 1):
+                self.weights = self._weigh(self.tf)
+                self.weighted_count = count
+            else:
+                self.weights = sparse.vstack([self.weights, self._weigh(tf)], format='csr')
+
+    def sync(self, current_hashes: Dict[int, str], load_texts: Callable[[List[int]], List[Tuple[int, str]]],
+             batch_size: int = 500) -> Dict[str, int]:
+        """
+        Bring the index in line with the database: ``current_hashes`` maps every
+        document id to its content hash and ``load_texts`` returns (id, text)
+        for the ids that are new or changed. Unchanged documents are not read.
+        """
+        with self._lock:
+            stored = {doc_id: self.hashes[row].decode() for doc_id, row in self.row_of.items()}
+        changed = [doc_id for doc_id, content_hash in current_hashes.items() if stored.get(doc_id) != content_hash]
+        deleted = [doc_id for doc_id in stored if doc_id not in current_hashes]
+
+        self.remove(deleted)
+        for start in range(0, len(changed), batch_size):
+            batch = changed[start:start + batch_size]
+            self.add([(doc_id, text, current_hashes[doc_id]) for doc_id, text in load_texts(batch)])
+
+        return {'added': len(changed), 'removed': len(deleted)}
+
+    # ---- queries -----------------------------------------------------------
+
+    def most_similar(self, doc_id: int, top_k: int = 5, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """Top-k documents by cosine similarity to doc_id, best first"""
+        with self._lock:
+            row = self.row_of.get(doc_id)
+            if row is None:
+                return []
+            scores = self.weights @ self.weights[row].toarray().ravel()
+            scores[~self.live] = -1.0
+            scores[row] = -1.0
+
+            k = min(top_k, len(scores) - 1)
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [(int(self.ids[i]), float(scores[i])) for i in top if scores[i] > min_score]
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_vector_index() -> SparseVectorIndex:
+    """Process-wide vector index, memory-mapped from disk on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = SparseVectorIndex()
+                index.load()
+                _index = index
+    return _index